@@ -0,0 +1,199 @@
+# ./benchmarks/fake_omdb.py
+
+"""
+    A local stand-in for the OMDB API, for load testing metadata updates
+    without a network connection or an API key quota.
+
+    Responses have the shape of OMDB's JSON responses. Titles listed in a
+    manifest written by benchmarks.synthetic are found with their year;
+    without a manifest any title is found. Each response can be delayed to
+    mimic network latency, and requests beyond a rate limit are answered
+    with 429, as the real API does when a key makes too many requests.
+
+    Point pyvorg at the server by setting OMDB_URL, e.g.
+        PYTHONPATH=.:source python -m benchmarks.fake_omdb --manifest /tmp/library/manifest.json --latency 0.2
+        OMDB_URL=http://127.0.0.1:8765 python main.py fetch OMDBFetcher
+"""
+
+# Standard library
+import argparse
+from hashlib import sha256
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# Local imports
+# n/a
+
+# Third-party packages
+# n/a
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class RateLimiter:
+    """
+        Token bucket allowing 'rate' requests per second on average and
+        bursts of up to 'burst' requests. A rate of 0 disables the limit.
+    """
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FakeOMDBServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self,
+                 address: tuple[str, int] = (DEFAULT_HOST, DEFAULT_PORT),
+                 movies: Optional[dict[str, list[dict]]] = None,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 rate_limit: float = 0.0,
+                 burst: Optional[int] = None):
+        super().__init__(address, FakeOMDBRequestHandler)
+        self.movies = movies
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = RateLimiter(rate_limit, burst)
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'found': 0, 'not_found': 0, 'throttled': 0, 'unauthorized': 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+
+    def find_movie(self, title: str, year: Optional[str]) -> Optional[dict]:
+        if self.movies is None:
+            return make_movie(title, year)
+        for movie in self.movies.get(title.lower(), []):
+            if year is None or movie['Year'] == year:
+                return movie
+        return None
+
+
+class FakeOMDBRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        server = self.server
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        if not params.get('apikey'):
+            server.count('unauthorized')
+            self.send_json(HTTPStatus.UNAUTHORIZED, {'Response': 'False', 'Error': 'No API key provided.'})
+        elif not server.limiter.acquire():
+            server.count('throttled')
+            self.send_json(HTTPStatus.TOO_MANY_REQUESTS, {'Response': 'False', 'Error': 'Request limit reached!'})
+        elif not params.get('t'):
+            server.count('not_found')
+            self.send_json(HTTPStatus.OK, {'Response': 'False', 'Error': 'Incorrect IMDb ID.'})
+        else:
+            movie = server.find_movie(params['t'], params.get('y'))
+            if movie is None:
+                server.count('not_found')
+                self.send_json(HTTPStatus.OK, {'Response': 'False', 'Error': 'Movie not found!'})
+            else:
+                server.count('found')
+                self.send_json(HTTPStatus.OK, movie)
+
+    def send_json(self, status: HTTPStatus, data: dict) -> None:
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # Thousands of requests would flood the console
+        pass
+
+
+def make_movie(title: str, year: Optional[str] = None) -> dict:
+    digest = sha256(f"{title.lower()}-{year}".encode()).hexdigest()
+    return {
+        'Title': title,
+        'Year': str(year or 1930 + int(digest[:4], 16) % 95),
+        'Rated': 'PG-13',
+        'Runtime': f"{80 + int(digest[4:6], 16) % 90} min",
+        'Genre': 'Drama',
+        'Director': 'Jane Doe',
+        'Plot': f"A synthetic film called {title}.",
+        'imdbRating': f"{1 + int(digest[6:8], 16) % 90 / 10:.1f}",
+        'imdbID': f"tt{int(digest[8:15], 16) % 10 ** 7:07d}",
+        'Type': 'movie',
+        'Response': 'True'
+    }
+
+
+def load_movies(manifest_path: Path) -> dict[str, list[dict]]:
+    manifest = json.loads(manifest_path.read_text())
+    movies = {}
+    for video in manifest['videos']:
+        movie = make_movie(video['title'], str(video['year']))
+        movies.setdefault(video['title'].lower(), []).append(movie)
+    return movies
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='benchmarks.fake_omdb', description='Serve a local stand-in for OMDB')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--manifest', type=Path,
+                        help='Manifest written by benchmarks.synthetic; without one every title is found')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before each response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many more seconds at random')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Requests per second before responding with 429; 0 for no limit')
+    parser.add_argument('--burst', type=int, help='Requests allowed at once before the rate limit applies')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    movies = load_movies(args.manifest) if args.manifest else None
+    server = FakeOMDBServer((args.host, args.port), movies, args.latency, args.jitter, args.rate_limit, args.burst)
+    print(f"Serving fake OMDB at {server.url}; set OMDB_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# ./benchmarks/library.py
+
+"""
+    Synthetic libraries used by the benchmarks. Files are created with
+    helper.create_dummy_files, a thousand to a directory, and given
+    guessit-style metadata without calling guessit so that filtering and
+    formatting can be measured on their own.
+"""
+
+# Standard library
+from hashlib import sha256
+from pathlib import Path
+
+# Local imports
+from source.constants import FILE_DATA, GUESSIT_DATA, GUESSIT_TITLE, GUESSIT_YEAR, HASH, PATH, TIMESTAMP
+from source.state.col import Collection
+from source.state.mediafile import MediaFile
+from source.utils import fileutils
+from source.utils.helper import create_dummy_files, timestamp_generate
+
+# Third-party packages
+# n/a
+
+FILES_PER_DIR = 1000
+TITLES = ['Alien', 'Extraction', 'Neo Tokyo', 'Namakura Gatana', 'Double Suicide', 'Stalker', 'Ran', 'Metropolis']
+
+
+def get_title(n: int) -> str:
+    return f"{TITLES[n % len(TITLES)]} {n}"
+
+
+def get_year(n: int) -> int:
+    return 1920 + n % 100
+
+
+def get_filename(n: int) -> str:
+    return f"{get_title(n).replace(' ', '.')}.{get_year(n)}.1080p.WEBRip.x264.mp4"
+
+
+def create_library(root: Path, size: int) -> list[Path]:
+    file_paths = []
+    for start in range(0, size, FILES_PER_DIR):
+        sub_dir = root / f"{start // FILES_PER_DIR:04d}"
+        sub_dir.mkdir(parents=True)
+        count = min(FILES_PER_DIR, size - start)
+        file_paths += create_dummy_files(sub_dir, count, lambda x: get_filename(start + x))
+    return file_paths
+
+
+def copy_library(src: Path, dst: Path) -> list[Path]:
+    # The copy has the same layout; mimic_folder gives each file new contents
+    dst.mkdir(parents=True)
+    fileutils.mimic_folder(src, dst)
+    return sorted(path for path in dst.rglob('*.mp4'))
+
+
+def add_metadata(collection: Collection) -> None:
+    for n, video in enumerate(collection.get_videos()):
+        video.set_source_data(GUESSIT_DATA, {GUESSIT_TITLE: get_title(n), GUESSIT_YEAR: str(get_year(n))})
+
+
+def create_collection(file_paths: list[Path]) -> Collection:
+    # Dummy files repeat their contents every directory, so most are copies in
+    # a scanned collection. Here each file is a video of its own, with a hash
+    # derived from its path rather than read from the file.
+    collection = Collection()
+    timestamp = timestamp_generate()
+    for path in file_paths:
+        file_data = {PATH: str(path), HASH: sha256(str(path).encode()).hexdigest(), TIMESTAMP: timestamp}
+        collection.add_video_instance(MediaFile.from_dict({FILE_DATA: file_data}))
+    add_metadata(collection)
+    return collection
@@ -0,0 +1,430 @@
+# ./benchmarks/run.py
+
+"""
+    Benchmarks for the hot paths of pyvorg: scanning, hashing, filtering,
+    formatting destination paths, executing staged moves and saving and
+    loading state. Each benchmark runs against synthetic libraries of the
+    requested sizes and the timings are written as JSON, so results from
+    different commits can be compared. encode_state and decode_state time
+    the state file format on a collection of distinct videos; the *_pickle
+    benchmarks do the same with pickle, the format used before, for
+    comparison. save_state_changed saves the state of distinct videos after
+    one of them changed.
+    filter_scalar and filter_vectorized filter distinct videos one at a
+    time and with NumPy; the latter is skipped, with a note, where NumPy is
+    not installed. query_snapshot opens a snapshot and filters it, which is
+    what 'list' does in place of load_state and filter;
+    query_snapshot_contains does so with a query whose 'contains' uses the
+    snapshot's index of titles.
+
+    Usage, from the repository root:
+        PYTHONPATH=.:source python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+        PYTHONPATH=.:source python -m benchmarks.run --compare baseline.json --output results.json
+"""
+
+# Standard library
+import argparse
+from contextlib import ExitStack, redirect_stderr
+from datetime import datetime, timezone
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import time
+from typing import Optional
+from unittest.mock import patch
+
+# Local imports
+from benchmarks import library
+from source.commands.cmdbuffer import CommandBuffer
+from source.services.loadstate_svc import LoadState
+from source.services.savestate_svc import SaveState
+from source.services.scanfilesinpath_svc import ScanFilesInPath
+from source.state.application_state import PyvorgState
+from source.state.col import Collection
+from source.utils import cmdutils, collectionutils, columnutils, configutils, fileutils, shardutils, snapshotutils
+from source.utils.videoutils import generate_str_from_metadata
+
+# Third-party packages
+# n/a
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.2
+FILTER_STRINGS = ['year>1990', 'title>m']
+RANGE_FILTER_STRINGS = ['year>1990', 'year<2000', 'title>m']
+QUERY_STRINGS = ['title contains "tokyo 12" or (year in (1950, 1960) and not title^alien)']
+FORMAT_STRING = '%title (%year)'
+
+
+class Benchmark:
+    """
+        A benchmark times run() only. setup() and teardown() are called
+        around every repeat, so run() may change the library.
+    """
+    name = None
+
+    def __init__(self, library_root: Path, file_paths: list[Path], collection: Collection, work_dir: Path):
+        self.library_root = library_root
+        self.file_paths = file_paths
+        self.collection = collection
+        self.work_dir = work_dir
+
+    @classmethod
+    def get_skip_reason(cls) -> Optional[str]:
+        # Why the benchmark cannot run here, such as a missing optional package
+        return None
+
+    def setup(self) -> None:
+        pass
+
+    def run(self) -> None:
+        raise NotImplementedError
+
+    def teardown(self) -> None:
+        pass
+
+
+class ScanBenchmark(Benchmark):
+    name = 'scan'
+
+    def setup(self) -> None:
+        self.target = Collection()
+
+    def run(self) -> None:
+        ScanFilesInPath().call(self.target, str(self.library_root), True)
+
+
+class HashBenchmark(Benchmark):
+    name = 'hash'
+
+    def run(self) -> None:
+        for path in self.file_paths:
+            fileutils.hash_sha256(path)
+
+
+class FilterBenchmark(Benchmark):
+    name = 'filter'
+
+    def run(self) -> None:
+        collectionutils.get_filtered_videos(self.collection, FILTER_STRINGS)
+
+
+class FilterScalarBenchmark(Benchmark):
+    name = 'filter_scalar'
+    vectorized = False
+
+    def setup(self) -> None:
+        self.source = library.create_collection(self.file_paths)
+
+    def run(self) -> None:
+        collectionutils.get_filtered_videos(self.source, RANGE_FILTER_STRINGS, vectorized=self.vectorized)
+
+
+class FilterVectorizedBenchmark(FilterScalarBenchmark):
+    name = 'filter_vectorized'
+    vectorized = True
+
+    @classmethod
+    def get_skip_reason(cls) -> Optional[str]:
+        if not columnutils.has_numpy():
+            return "needs numpy: pip install .[numpy]"
+        return None
+
+
+class FormatBenchmark(Benchmark):
+    name = 'format'
+
+    def run(self) -> None:
+        for video in self.collection.get_videos():
+            generate_str_from_metadata(video, FORMAT_STRING)
+
+
+class OrganizeBenchmark(Benchmark):
+    name = 'organize'
+
+    def setup(self) -> None:
+        # Moves change the files, so every repeat starts from a fresh copy
+        copy = library.copy_library(self.library_root, self.work_dir / 'copy')
+        collection = Collection()
+        collection.add_files(copy)
+        library.add_metadata(collection)
+        self.command_buffer = CommandBuffer()
+        commands = cmdutils.build_commands('MoveVideoCmd',
+                                           ((video, self.work_dir / 'organized', FORMAT_STRING)
+                                            for video in collection.get_videos()),
+                                           ({} for _ in collection.get_videos()))
+        cmdutils.stage_commands(self.command_buffer, commands)
+
+    def run(self) -> None:
+        cmdutils.execute_cmd_buffer(self.command_buffer)
+
+    def teardown(self) -> None:
+        shutil.rmtree(self.work_dir / 'copy', ignore_errors=True)
+        shutil.rmtree(self.work_dir / 'organized', ignore_errors=True)
+
+
+class SaveStateBenchmark(Benchmark):
+    name = 'save_state'
+
+    def setup(self) -> None:
+        self.state = PyvorgState(self.collection)
+
+    def run(self) -> None:
+        SaveState().call(self.state)
+
+
+class SaveStateChangedBenchmark(Benchmark):
+    name = 'save_state_changed'
+
+    def setup(self) -> None:
+        self.state = PyvorgState(library.create_collection(self.file_paths))
+        SaveState().call(self.state)
+        next(iter(self.state.collection.get_videos())).set_user_data('title', 'changed')
+
+    def run(self) -> None:
+        SaveState().call(self.state)
+
+
+class LoadStateBenchmark(Benchmark):
+    name = 'load_state'
+
+    def setup(self) -> None:
+        SaveState().call(PyvorgState(self.collection))
+        self.state = PyvorgState()
+
+    def run(self) -> None:
+        LoadState().call(self.state)
+
+
+class EncodeStateBenchmark(Benchmark):
+    name = 'encode_state'
+
+    def setup(self) -> None:
+        collection = library.create_collection(self.file_paths)
+        self.shards = shardutils.split_collection(collection)
+
+    def run(self) -> None:
+        for shard in self.shards.values():
+            shardutils.encode_shard(shard)
+
+
+class EncodeStatePickleBenchmark(EncodeStateBenchmark):
+    name = 'encode_state_pickle'
+
+    def run(self) -> None:
+        for shard in self.shards.values():
+            pickle.dumps(shard)
+
+
+class DecodeStateBenchmark(Benchmark):
+    name = 'decode_state'
+
+    def setup(self) -> None:
+        shards = shardutils.split_collection(library.create_collection(self.file_paths)).values()
+        self.encoded = [shardutils.encode_shard(shard) for shard in shards]
+
+    def run(self) -> None:
+        for data in self.encoded:
+            shardutils.read_shard(data)
+
+
+class DecodeStatePickleBenchmark(Benchmark):
+    name = 'decode_state_pickle'
+
+    def setup(self) -> None:
+        shards = shardutils.split_collection(library.create_collection(self.file_paths)).values()
+        self.encoded = [pickle.dumps(shard) for shard in shards]
+
+    def run(self) -> None:
+        for data in self.encoded:
+            pickle.loads(data)
+
+
+class WriteSnapshotBenchmark(Benchmark):
+    name = 'write_snapshot'
+
+    def setup(self) -> None:
+        self.source = library.create_collection(self.file_paths)
+
+    def run(self) -> None:
+        snapshotutils.write_snapshot(self.source, self.work_dir / 'state.snapshot')
+
+
+class QuerySnapshotBenchmark(Benchmark):
+    name = 'query_snapshot'
+    filter_strings = FILTER_STRINGS
+
+    def setup(self) -> None:
+        self.path = self.work_dir / 'state.snapshot'
+        snapshotutils.write_snapshot(library.create_collection(self.file_paths), self.path)
+
+    def run(self) -> None:
+        with snapshotutils.Snapshot(self.path) as snapshot:
+            for row in snapshot.filter_rows(self.filter_strings):
+                snapshot.get_row(row)
+
+
+class QuerySnapshotContainsBenchmark(QuerySnapshotBenchmark):
+    name = 'query_snapshot_contains'
+    filter_strings = QUERY_STRINGS
+
+
+BENCHMARKS = [
+    ScanBenchmark,
+    HashBenchmark,
+    FilterBenchmark,
+    FilterScalarBenchmark,
+    FilterVectorizedBenchmark,
+    FormatBenchmark,
+    OrganizeBenchmark,
+    SaveStateBenchmark,
+    SaveStateChangedBenchmark,
+    LoadStateBenchmark,
+    EncodeStateBenchmark,
+    EncodeStatePickleBenchmark,
+    DecodeStateBenchmark,
+    DecodeStatePickleBenchmark,
+    WriteSnapshotBenchmark,
+    QuerySnapshotBenchmark,
+    QuerySnapshotContainsBenchmark
+]
+
+
+def get_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        benchmark.setup()
+        try:
+            start = time.perf_counter()
+            benchmark.run()
+            timings.append(time.perf_counter() - start)
+        finally:
+            benchmark.teardown()
+    return timings
+
+
+def summarize(timings: list[float], size: int) -> dict:
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'repeat': len(timings),
+        'per_file_us': min(timings) / size * 1e6
+    }
+
+
+def run_benchmarks(sizes: list[int], repeat: int, names: Optional[list[str]] = None) -> dict:
+    selected = []
+    for cls in BENCHMARKS:
+        if names and cls.name not in names:
+            continue
+        reason = cls.get_skip_reason()
+        if reason is not None:
+            print(f"{cls.name:<20}skipped; {reason}")
+            continue
+        selected.append(cls)
+    results = {cls.name: {} for cls in selected}
+
+    for size in sizes:
+        with TemporaryDirectory() as temp_dir, ExitStack() as stack:
+            temp_dir = Path(temp_dir)
+            # State is saved to the temporary directory rather than the profile
+            stack.enter_context(patch.object(configutils, 'get_default_state_path',
+                                             return_value=temp_dir / 'state.json'))
+            stack.enter_context(patch.object(configutils, 'get_default_journal_path',
+                                             return_value=temp_dir / 'state.journal'))
+            # Keeps progress output out of the results printed to stdout
+            stack.enter_context(redirect_stderr(stack.enter_context(open(os.devnull, 'w'))))
+
+            library_root = temp_dir / 'library'
+            file_paths = library.create_library(library_root, size)
+            collection = Collection()
+            collection.add_files(file_paths)
+            library.add_metadata(collection)
+            work_dir = temp_dir / 'work'
+            work_dir.mkdir()
+
+            for cls in selected:
+                benchmark = cls(library_root, file_paths, collection, work_dir)
+                timings = time_benchmark(benchmark, repeat)
+                results[cls.name][str(size)] = summarize(timings, size)
+                print(f"{cls.name:<20}{size:>8} files  {min(timings):10.4f}s")
+
+    return {
+        'commit': get_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    # Returns the benchmarks whose best time grew by more than the threshold
+    regressions = []
+    for name, sizes in current['results'].items():
+        for size, result in sizes.items():
+            previous = baseline.get('results', {}).get(name, {}).get(size)
+            if previous is None:
+                continue
+            ratio = result['min'] / previous['min'] if previous['min'] else float('inf')
+            flag = '  REGRESSION' if ratio > threshold else ''
+            print(f"{name:<20}{size:>8} files  {previous['min']:10.4f}s -> {result['min']:10.4f}s  x{ratio:.2f}{flag}")
+            if ratio > threshold:
+                regressions.append(f"{name}[{size}]")
+    return regressions
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='benchmarks.run', description='Run the pyvorg benchmarks')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='Number of files in each synthetic library')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Times each benchmark is run; the best time is compared')
+    parser.add_argument('--only', nargs='+', choices=[cls.name for cls in BENCHMARKS],
+                        help='Run only these benchmarks')
+    parser.add_argument('--output', type=Path,
+                        help='Write the results to this JSON file')
+    parser.add_argument('--compare', type=Path,
+                        help='Compare against results written by an earlier run')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Slowdown ratio reported as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    # A log line for every file would be measured along with the work
+    logging.disable(logging.INFO)
+    results = run_benchmarks(args.sizes, args.repeat, args.only)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
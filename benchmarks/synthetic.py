@@ -0,0 +1,185 @@
+# ./benchmarks/synthetic.py
+
+"""
+    Generates large synthetic video libraries for load testing.
+
+    Videos get release-style filenames in the formats guessit is used for,
+    sit in a tree of genre, letter and title directories, and are sparse
+    files of realistic sizes: a few KiB of data unique to each video
+    followed by a hole, so hashing reads as much as it would for a real
+    library while the library takes almost no disk space. Some videos are
+    copied elsewhere in the tree, and some have subtitle and poster files
+    next to them.
+
+    The same seed always produces the same library. The returned manifest
+    lists the title and year of every video and can be passed to
+    benchmarks.fake_omdb so that lookups find them.
+
+    Usage, from the repository root:
+        PYTHONPATH=.:source python -m benchmarks.synthetic /tmp/library --size 10000
+"""
+
+# Standard library
+import argparse
+from hashlib import sha256
+import json
+from pathlib import Path
+import random
+import sys
+from typing import Optional
+
+# Local imports
+# n/a
+
+# Third-party packages
+# n/a
+
+MANIFEST_NAME = 'manifest.json'
+HEADER_SIZE = 4096
+MIN_SIZE = 200 * 2 ** 20
+MAX_SIZE = 8 * 2 ** 30
+DUPLICATE_RATIO = 0.05
+SIDE_FILE_RATIO = 0.3
+
+ADJECTIVES = ['Silent', 'Broken', 'Crimson', 'Last', 'Hidden', 'Frozen', 'Burning', 'Lost', 'Iron', 'Hollow',
+              'Distant', 'Golden', 'Savage', 'Quiet', 'Endless', 'Fallen', 'Wild', 'Pale', 'Dark', 'Bright']
+NOUNS = ['Harbor', 'Empire', 'River', 'Witness', 'Frontier', 'Garden', 'Machine', 'Signal', 'Kingdom', 'Storm',
+         'Stranger', 'Horizon', 'Orchard', 'Circus', 'Station', 'Voyage', 'Mirror', 'Desert', 'Island', 'Night']
+GENRES = ['Action', 'Animation', 'Comedy', 'Documentary', 'Drama', 'Horror', 'Romance', 'Sci-Fi', 'Thriller']
+RESOLUTIONS = ['480p', '720p', '1080p', '2160p']
+SOURCES = ['BluRay', 'BRrip', 'WEBRip', 'WEB-DL', 'HDTV', 'DVDRip']
+CODECS = ['x264', 'x265', 'H264', 'HEVC', 'XviD']
+AUDIO = ['AAC', 'AC3', 'DD5.1', 'DTS']
+GROUPS = ['YIFY', 'GalaxyRG', 'RARBG', 'SPARKS', 'FGT', 'NTb', 'Kuraze']
+EXTENSIONS = ['.mkv', '.mp4', '.avi', '.m4v']
+RELEASE_FORMATS = [
+    '{dotted}.{year}.{resolution}.{source}.{codec}-{group}{ext}',
+    '{dotted}.{year}.{resolution}.{source}.{audio}.{codec}-[{group}]{ext}',
+    '{title} ({year}) [{resolution}] [{source}]{ext}',
+    '[{group}] {title} - ({source} {resolution} {codec} {audio}) [{crc}]{ext}',
+    '{lower}_{year}_{resolution}{ext}',
+    '{title} {year}{ext}'
+]
+
+
+def generate_title(rng: random.Random) -> str:
+    title = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    if rng.random() < 0.3:
+        title = 'The ' + title
+    if rng.random() < 0.15:
+        title += f" {rng.randint(2, 4)}"
+    return title
+
+
+def generate_filename(rng: random.Random, title: str, year: int) -> str:
+    return rng.choice(RELEASE_FORMATS).format(
+        title=title,
+        dotted=title.replace(' ', '.'),
+        lower=title.lower().replace(' ', '_'),
+        year=year,
+        resolution=rng.choice(RESOLUTIONS),
+        source=rng.choice(SOURCES),
+        codec=rng.choice(CODECS),
+        audio=rng.choice(AUDIO),
+        group=rng.choice(GROUPS),
+        crc=f"{rng.getrandbits(32):08X}",
+        ext=rng.choice(EXTENSIONS)
+    )
+
+
+def generate_size(rng: random.Random, min_size: int, max_size: int) -> int:
+    # Most files are near the low end, as with a real mix of SD and HD releases
+    return int(min_size + (max_size - min_size) * rng.random() ** 3)
+
+
+def write_sparse_file(path: Path, header: bytes, size: int) -> None:
+    with path.open('wb') as file:
+        file.write(header[:size])
+        file.truncate(size)
+
+
+def get_header(seed: int, n: int) -> bytes:
+    block = sha256(f"{seed}-{n}".encode()).digest()
+    return block * (HEADER_SIZE // len(block))
+
+
+def get_video_dir(root: Path, rng: random.Random, title: str, year: int, depth: int) -> Path:
+    parts = [rng.choice(GENRES), title[0].upper(), f"{title} ({year})"]
+    return root.joinpath(*parts[-depth:]) if depth else root
+
+
+def generate_library(root: Path,
+                     size: int,
+                     seed: int = 0,
+                     depth: int = 3,
+                     min_size: int = MIN_SIZE,
+                     max_size: int = MAX_SIZE,
+                     duplicate_ratio: float = DUPLICATE_RATIO,
+                     side_file_ratio: float = SIDE_FILE_RATIO) -> dict:
+    rng = random.Random(seed)
+    videos = []
+    duplicates = []
+    side_files = []
+
+    for n in range(size):
+        title = generate_title(rng)
+        year = rng.randint(1930, 2024)
+        video_dir = get_video_dir(root, rng, title, year, depth)
+        video_dir.mkdir(parents=True, exist_ok=True)
+        path = video_dir / generate_filename(rng, title, year)
+        header = get_header(seed, n)
+        file_size = generate_size(rng, min_size, max_size)
+        write_sparse_file(path, header, file_size)
+        videos.append({'path': str(path), 'title': title, 'year': year, 'size': file_size})
+
+        if rng.random() < side_file_ratio:
+            subtitle = path.with_suffix('.en.srt')
+            subtitle.write_text(f"1\n00:00:01,000 --> 00:00:04,000\n{title}\n")
+            poster = video_dir / 'poster.jpg'
+            poster.write_bytes(b'\xff\xd8\xff\xe0' + header[:1024] + b'\xff\xd9')
+            side_files += [str(subtitle), str(poster)]
+
+        if rng.random() < duplicate_ratio:
+            copy_dir = root / 'Unsorted'
+            copy_dir.mkdir(parents=True, exist_ok=True)
+            copy = copy_dir / f"{n:06d} {path.name}"
+            write_sparse_file(copy, header, file_size)
+            duplicates.append({'path': str(copy), 'original': str(path)})
+
+    return {
+        'seed': seed,
+        'videos': videos,
+        'duplicates': duplicates,
+        'side_files': side_files
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='benchmarks.synthetic', description='Generate a synthetic video library')
+    parser.add_argument('root', type=Path, help='Directory to create the library in')
+    parser.add_argument('--size', type=int, default=1000, help='Number of videos')
+    parser.add_argument('--seed', type=int, default=0, help='Libraries with the same seed are identical')
+    parser.add_argument('--depth', type=int, default=3, choices=range(4),
+                        help='Directories between the root and each video')
+    parser.add_argument('--min-size', type=int, default=MIN_SIZE, help='Smallest video in bytes')
+    parser.add_argument('--max-size', type=int, default=MAX_SIZE, help='Largest video in bytes')
+    parser.add_argument('--duplicates', type=float, default=DUPLICATE_RATIO,
+                        help='Fraction of videos that are also copied elsewhere')
+    parser.add_argument('--side-files', type=float, default=SIDE_FILE_RATIO,
+                        help='Fraction of videos with subtitle and poster files')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    manifest = generate_library(args.root, args.size, args.seed, args.depth, args.min_size, args.max_size,
+                                args.duplicates, args.side_files)
+    manifest_path = args.root / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=4))
+    print(f"Created {len(manifest['videos'])} videos, {len(manifest['duplicates'])} copies and "
+          f"{len(manifest['side_files'])} side files in '{args.root}'; manifest written to '{manifest_path}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,8 +23,14 @@ setup(
         'python-dotenv~=1.0.1',
         'requests',
         'setuptools',
-        'tqdm',
     ],
+    extras_require={
+        'zstd': ['zstandard'],
+        'arrow': ['pyarrow'],
+        'numpy': ['numpy'],
+        # The vectorised filter tests are skipped without numpy
+        'test': ['numpy'],
+    },
     author='Brett DeWitt',
     author_email='bdewitt1984@gmail.com',
     description='A lightweight CLI based media organizer',
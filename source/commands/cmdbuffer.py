@@ -7,9 +7,12 @@
 
 # Standard library
 from collections import deque
+from typing import Any, Callable, Iterator, Optional
 
 # Local imports
-from source.commands.command_base import Command
+from source.commands.cmdjournal import CommandJournal
+from source.commands.command_base import Command, command_from_dict, command_to_dict
+from source.utils import progressutils
 
 # Third-party packages
 
@@ -30,18 +33,24 @@ class CommandBuffer:
     def clear_undo_buffer(self):
         self.undo_buffer.clear()
 
-    def execute_cmd_buffer(self):
+    def execute_cmd_buffer(self, journal: Optional[CommandJournal] = None):
         if not self.cmd_buffer:
             raise IndexError("Cannot execute; command buffer is empty.\n")
         while self.cmd_buffer:
-            self.exec_command()
+            self.exec_command(journal)
 
-    def exec_command(self):
+    def exec_command(self, journal: Optional[CommandJournal] = None):
         if not self.cmd_buffer:
             raise IndexError("No commands in buffer to execute")
         cmd = self.cmd_buffer.popleft()
+        seq = len(self.undo_buffer)
+        if journal is not None:
+            journal.record_intent(seq, cmd)
         cmd.exec()
+        progressutils.get_current().update(items=1)
         self.undo_buffer.append(cmd)
+        if journal is not None:
+            journal.record_complete(seq, cmd)
 
     def exec_is_empty(self) -> bool:
         return not bool(len(self.cmd_buffer))
@@ -52,9 +61,25 @@ class CommandBuffer:
         while self.undo_buffer:
             self.undo_cmd()
 
-    def from_dict(self):
-        # TODO: implement
-        pass
+    def restore_from_journal(self, journal: CommandJournal) -> None:
+        completed = journal.get_completed()
+        for seq in sorted(completed):
+            if not self.cmd_buffer:
+                raise IndexError("Journal does not match the command buffer; too many completed commands")
+            cmd = self.cmd_buffer.popleft()
+            if completed[seq] is not None:
+                cmd.restore(completed[seq])
+            self.undo_buffer.append(cmd)
+
+    @staticmethod
+    def from_dict(data: dict,
+                  read_video: Callable[[Any], Any],
+                  dropped: Optional[list[dict]] = None) -> 'CommandBuffer':
+        # Given 'dropped', commands that cannot be read are left out and added to it instead of raising
+        new = CommandBuffer()
+        new.cmd_buffer.extend(_read_commands(data['staged'], read_video, dropped))
+        new.undo_buffer.extend(_read_commands(data['executed'], read_video, dropped))
+        return new
 
     def _get_commands(self):
         return [cmd for cmd in self.cmd_buffer]
@@ -88,9 +113,11 @@ class CommandBuffer:
         else:
             print('Nothing to validate, undo_buffer is empty.\n')
 
-    def to_dict(self):
-        # TODO: Implement
-        pass
+    def to_dict(self, write_video: Callable[[Any], Any]) -> dict:
+        return {
+            'staged': [command_to_dict(cmd, write_video) for cmd in self.cmd_buffer],
+            'executed': [command_to_dict(cmd, write_video) for cmd in self.undo_buffer]
+        }
 
     def __str__(self):
         ret = ''
@@ -101,3 +128,15 @@ class CommandBuffer:
             ret = "Command buffer is empty."
 
         return ret
+
+
+def _read_commands(commands: list[dict],
+                   read_video: Callable[[Any], Any],
+                   dropped: Optional[list[dict]]) -> Iterator[Command]:
+    for data in commands:
+        try:
+            yield command_from_dict(data, read_video)
+        except ValueError:
+            if dropped is None:
+                raise
+            dropped.append(data)
@@ -0,0 +1,138 @@
+# source/commands/cmdjournal.py
+
+"""
+    Write-ahead journal used by CommandBuffer while committing staged
+    operations. Each command is recorded with an intent entry before it
+    executes and a completion entry, holding a snapshot of the executed
+    command, afterwards. Entries are flushed to disk in batches so that an
+    interrupted commit can later be resumed or rolled back.
+
+    The intent entry of a command that is not idempotent also holds a
+    snapshot of the command, and is flushed before the command executes,
+    so that a command interrupted after it changed the disk is never
+    missing from the journal.
+
+    Entries are JSON lines. Snapshots hold a copy of the command's video
+    rather than a reference, since the collection may not match them.
+"""
+
+# Standard library
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+# Local imports
+from source.commands.command_base import Command, command_from_dict, command_to_dict
+from source.constants import JOURNAL_BATCH_SIZE
+from source.state.mediafile import MediaFile
+
+# Third-party packages
+# n/a
+
+BEGIN = 'begin'
+INTENT = 'intent'
+COMPLETE = 'complete'
+END = 'end'
+
+
+class CommandJournal:
+    def __init__(self, path: Path, batch_size: int = JOURNAL_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+
+    def begin(self, total: int) -> None:
+        self.pending.clear()
+        with self.path.open('wb'):
+            pass
+        self._append((BEGIN, total))
+        self.flush()
+
+    def record_intent(self, seq: int, cmd: Optional[Command] = None) -> None:
+        if cmd is None or cmd.idempotent:
+            self._append((INTENT, seq))
+            return
+        self._append((INTENT, seq, _get_snapshot(seq, cmd)))
+        self.flush()
+
+    def record_complete(self, seq: int, cmd: Command) -> None:
+        self._append((COMPLETE, seq, _get_snapshot(seq, cmd)))
+
+    def end(self) -> None:
+        self._append((END,))
+        self.flush()
+
+    def _append(self, record: tuple) -> None:
+        self.pending.append(json.dumps(record, default=str).encode('utf-8') + b'\n')
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with self.path.open('ab') as file:
+            file.write(b''.join(self.pending))
+            file.flush()
+            os.fsync(file.fileno())
+        self.pending.clear()
+
+    def discard(self) -> None:
+        self.pending.clear()
+        if self.path.exists():
+            self.path.unlink()
+
+    def read_records(self) -> list[tuple]:
+        records = []
+        if not self.path.exists():
+            return records
+        with self.path.open('rb') as file:
+            for line in file:
+                try:
+                    records.append(tuple(json.loads(line)))
+                except ValueError:
+                    # A torn write at the tail marks the end of the usable journal
+                    break
+        return records
+
+    def is_pending(self) -> bool:
+        # Saving the state discards a finished journal, so any journal still on
+        # disk describes a commit the saved state does not reflect
+        return bool(self.read_records())
+
+    def is_finished(self) -> bool:
+        records = self.read_records()
+        return bool(records) and records[-1][0] == END
+
+    def get_completed(self) -> dict[int, Optional[Command]]:
+        return {
+            record[1]: command_from_dict(record[2], MediaFile.from_record) if record[2] is not None else None
+            for record
+            in self.read_records()
+            if record[0] == COMPLETE
+        }
+
+    def get_in_doubt(self) -> list[int]:
+        records = self.read_records()
+        completed = {record[1] for record in records if record[0] == COMPLETE}
+        return [record[1] for record in records if record[0] == INTENT and record[1] not in completed]
+
+    def get_in_doubt_commands(self) -> dict[int, Command]:
+        # Snapshots, taken before they executed, of the in-doubt commands that have one
+        records = self.read_records()
+        completed = {record[1] for record in records if record[0] == COMPLETE}
+        return {
+            record[1]: command_from_dict(record[2], MediaFile.from_record)
+            for record
+            in records
+            if record[0] == INTENT and len(record) > 2 and record[2] is not None and record[1] not in completed
+        }
+
+
+def _get_snapshot(seq: int, cmd: Command) -> Optional[dict]:
+    try:
+        return command_to_dict(cmd, MediaFile.to_record)
+    except (AttributeError, NotImplementedError, TypeError, ValueError):
+        logging.warning(f"Command '{seq}' could not be journaled; it will not be recoverable")
+        return None
@@ -4,10 +4,15 @@
     Command base class and derived classes providing functions for use
     in the command buffer via the collection class, which include moving
     videos and creating directories.
+
+    Commands are saved as {'type': <class name>, 'data': <fields>}. Videos
+    in the fields are written and read by the callables passed in, so that
+    a video in the collection is saved as a reference to it.
 """
 
 # Standard library
 from abc import ABC
+from typing import Any, Callable
 
 # Local imports
 # n/a
@@ -16,10 +21,22 @@ from abc import ABC
 # n/a
 
 
+# Command classes by name, for reading saved commands
+COMMAND_TYPES: dict[str, type['Command']] = {}
+
+
 class Command(ABC):
+    # Whether running the command again after an interrupted commit is harmless;
+    # the commit journal makes the intent to run any other command durable first
+    idempotent = False
+
     def __init__(self, *args, **kwargs):
         pass
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        COMMAND_TYPES[cls.__name__] = cls
+
     def exec(self):
         raise NotImplementedError
 
@@ -31,3 +48,27 @@ class Command(ABC):
 
     def undo(self):
         raise NotImplementedError
+
+    @classmethod
+    def from_dict(cls, data: dict, read_video: Callable[[Any], Any]) -> 'Command':
+        raise NotImplementedError
+
+    def to_dict(self, write_video: Callable[[Any], Any]) -> dict:
+        raise NotImplementedError
+
+    def restore(self, journaled: 'Command') -> None:
+        # Adopts the post-execution state of a copy recovered from the commit journal
+        self.__dict__.update(journaled.__dict__)
+
+
+def command_from_dict(data: dict, read_video: Callable[[Any], Any]) -> Command:
+    command_class = COMMAND_TYPES.get(data['type'])
+    if command_class is None:
+        raise ValueError(f"'{data['type']}' is not a known command")
+    return command_class.from_dict(data['data'], read_video)
+
+
+def command_to_dict(cmd: Command, write_video: Callable[[Any], Any]) -> dict:
+    if not isinstance(cmd, Command):
+        raise TypeError(f"'{cmd!r}' is not a command")
+    return {'type': type(cmd).__name__, 'data': cmd.to_dict(write_video)}
@@ -5,7 +5,9 @@ Implementation of MoveVideoCmd command used by CommandBuffer
 """
 
 # Standard library
+import logging
 from pathlib import Path
+from typing import Any, Callable, Optional
 
 # Local imports
 from source.commands.command_base import Command
@@ -55,8 +57,39 @@ class MoveVideoCmd(Command):
         self.created_dirs = fileutils.make_dirs(self.target_subdir)
 
     def _move_video(self):
-        fileutils.move_file(self.video.get_path(), self.target_subdir, False)
-        self.video.update_file_data(self.target_subdir / self.video.get_filename(), True)
+        dest_path = self.target_subdir / self.video.get_filename()
+        if not self.video.get_path().exists() and dest_path.is_file():
+            # An interrupted commit moved the file before it could record doing so
+            logging.info(f"'{self.video.get_path()}' was already moved to '{dest_path}'")
+        else:
+            fileutils.move_file(self.video.get_path(), self.target_subdir, False)
+        self.video.update_file_data(dest_path, True)
+
+    @classmethod
+    def from_dict(cls, data: dict, read_video: Callable[[Any], Any]) -> 'MoveVideoCmd':
+        cmd = cls(read_video(data['video']), Path(data['target_root']), data['format_string'])
+        cmd.target_subdir = _to_path(data['target_subdir'])
+        cmd.target_file_path = _to_path(data['target_file_path'])
+        cmd.origin_dir = _to_path(data['origin_dir'])
+        cmd.created_dirs = [Path(path) for path in data['created_dirs']]
+        return cmd
+
+    def to_dict(self, write_video: Callable[[Any], Any]) -> dict:
+        return {
+            'video': write_video(self.video),
+            'target_root': str(self.target_root),
+            'target_subdir': _to_str(self.target_subdir),
+            'target_file_path': _to_str(self.target_file_path),
+            'format_string': self.format_string,
+            'origin_dir': _to_str(self.origin_dir),
+            'created_dirs': [str(path) for path in self.created_dirs]
+        }
+
+    def restore(self, journaled: Command) -> None:
+        # Keep the collection's MediaFile rather than the journaled copy
+        self.video.data = journaled.video.data
+        journaled.video = self.video
+        super().restore(journaled)
 
     def undo(self):
         self._undo_move_video()
@@ -77,3 +110,11 @@ class MoveVideoCmd(Command):
         current_path = self.video.get_path()
         origin_path = self.origin_dir / self.video.get_filename()
         return fileutils.validate_move(current_path, origin_path)
+
+
+def _to_path(path: Optional[str]) -> Optional[Path]:
+    return Path(path) if path is not None else None
+
+
+def _to_str(path: Optional[Path]) -> Optional[str]:
+    return str(path) if path is not None else None
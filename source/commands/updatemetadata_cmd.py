@@ -2,41 +2,118 @@
 
 """
     Implementation of UpdateVideoData command used by CommandBuffer
+
+    The plugin is saved by name. A command read from saved state creates
+    its plugin when it first runs, so that loading and previewing staged
+    commands neither imports plugins nor needs their API keys.
+
+    Each fetch is recorded on the video with MediaFile.record_fetch. A fetch
+    that fails for its video, such as a title the plugin cannot find, is
+    logged and recorded with its error rather than stopping the commit, so
+    the videos it failed for can be staged again with 'fetch --failed-only'.
+    Any other error, such as an exhausted quota or a rejected API key, would
+    fail every remaining fetch as well, so it is recorded and then stops the
+    commit, which can be resumed once the cause is dealt with.
 """
 
 # Standard library
+from http import HTTPStatus
+import logging
+from typing import Any, Callable
 
 # Local imports
+import source.datasources
 from source.commands.command_base import Command
 from source.datasources.base_metadata_source import MetadataSource
 from source.state.mediafile import MediaFile
+from source.utils import configutils, metricsutils, pluginutils
 
 # Third-party packages
 # n/a
 
 
 class UpdateVideoData(Command):
+    idempotent = True
+
     def __init__(self, video: MediaFile, api: MetadataSource, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.undo_data = None
+        self.undo_fetch_record = None
         self.video = video
         self.api = api
         self.kwargs = kwargs
         self.metadata = None
 
+    @property
+    def api(self) -> MetadataSource:
+        if self._api is None:
+            self._api = pluginutils.get_plugin_instance(self.api_name,
+                                                        source.datasources,
+                                                        configutils.get_plugin_manifest_path())
+        return self._api
+
+    @api.setter
+    def api(self, api: MetadataSource) -> None:
+        self._api = api
+        self.api_name = api.get_name()
+
     def exec(self):
         self._update_undo_data()
-        self._get_video_metadata()
+        # A plugin that cannot be created fails the commit, as it would fail for every video
+        api = self.api
+        try:
+            self._get_video_metadata(api)
+        except Exception as e:
+            logging.warning(f"Could not fetch '{self.api_name}' data for '{self.video.get_path()}': {e}")
+            metricsutils.increment('fetch_failures_total', source=self.api_name)
+            self.video.record_fetch(self.api_name, str(e) or e.__class__.__name__)
+            if not _is_video_error(e):
+                raise
+            return
         self._update_video_metadata()
+        self.video.record_fetch(self.api_name)
 
     def _update_undo_data(self):
-        self.undo_data = self.video.get_source_data(self.api.get_name())
+        self.undo_data = self.video.get_source_data(self.api_name)
+        self.undo_fetch_record = self.video.get_fetch_record(self.api_name)
 
-    def _get_video_metadata(self):
-        self.metadata = self.api.fetch_data(**self.kwargs)
+    def _get_video_metadata(self, api: MetadataSource):
+        with metricsutils.timed('fetch', source=self.api_name):
+            self.metadata = api.fetch_data(**self.kwargs)
 
     def _update_video_metadata(self):
-        self.video.set_source_data(self.api.get_name(), self.metadata)
+        self.video.set_source_data(self.api_name, self.metadata)
+
+    @classmethod
+    def from_dict(cls, data: dict, read_video: Callable[[Any], Any]) -> 'UpdateVideoData':
+        cmd = cls.__new__(cls)
+        cmd._api = None
+        cmd.api_name = data['api']
+        cmd.video = read_video(data['video'])
+        cmd.kwargs = data['kwargs']
+        cmd.undo_data = data['undo_data']
+        # Commands saved before fetches were recorded have no record to restore
+        cmd.undo_fetch_record = data.get('undo_fetch_record')
+        cmd.metadata = data['metadata']
+        return cmd
+
+    def to_dict(self, write_video: Callable[[Any], Any]) -> dict:
+        return {
+            'video': write_video(self.video),
+            'api': self.api_name,
+            'kwargs': self.kwargs,
+            'undo_data': self.undo_data,
+            'undo_fetch_record': self.undo_fetch_record,
+            'metadata': self.metadata
+        }
+
+    def restore(self, journaled: Command) -> None:
+        # Keep the collection's MediaFile rather than the journaled copy
+        self.video.data = journaled.video.data
+        journaled.video = self.video
+        # and the plugin this command already created
+        journaled._api = self._api
+        super().restore(journaled)
 
     def undo(self):
         self._restore_video_metadata()
@@ -44,12 +121,15 @@ class UpdateVideoData(Command):
 
     def _restore_video_metadata(self):
         if self.undo_data is None:
-            self.video.data.pop(self.api.get_name())
+            # A failed fetch left the video without data from the source
+            self.video.data.pop(self.api_name, None)
         else:
-            self.video.set_source_data(self.api.get_name(), self.undo_data)
+            self.video.set_source_data(self.api_name, self.undo_data)
+        self.video.set_fetch_record(self.api_name, self.undo_fetch_record)
 
     def _nullify_undo_data(self):
         self.undo_data = None
+        self.undo_fetch_record = None
 
     def validate_exec(self):
         # TODO: Implement
@@ -63,4 +143,13 @@ class UpdateVideoData(Command):
         pass
 
     def __str__(self):
-        return f"Fetch '{self.api.get_name()}' data for '{self.video.get_path()}'"
+        return f"Fetch '{self.api_name}' data for '{self.video.get_path()}'"
+
+
+def _is_video_error(e: Exception) -> bool:
+    # Whether a fetch failed because of its video rather than the plugin or its service.
+    # HTTP errors raised by requests carry their response
+    response = getattr(e, 'response', None)
+    if response is not None:
+        return response.status_code == HTTPStatus.NOT_FOUND
+    return isinstance(e, (LookupError, ValueError))
@@ -12,6 +12,7 @@ APP_NAME = 'Pyvorg'
 # Environment variable constants
 ENV_FILE_PATH = './config.env'
 ENV_OMDB_KEY = 'OMDB_KEY'
+ENV_OMDB_URL = 'OMDB_URL'
 ENV_ORGANIZE_PATH = 'ORGANIZE_PATH'
 
 # String constants
@@ -19,6 +20,7 @@ FILE_DATA = 'file_data'
 OMDB_DATA = 'omdb_data'
 OMDB_TITLE = 'Title'
 OMDB_YEAR = 'Year'
+OMDB_API_URL = 'https://www.omdbapi.com'
 GUESSIT_DATA = 'guessit'
 GUESSIT_TITLE = 'title'
 GUESSIT_YEAR = 'year'
@@ -30,7 +32,121 @@ ROOT = 'root'
 FILENAME = 'filename'
 HASH = 'hash'
 TIMESTAMP = 'timestamp'
+SIZE = 'size'
+# Timestamps are stored as UTC in this format
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
 LOCAL_TRAILER = 'local_trailer'
+# When each source was last fetched for a video: the time of the last attempt, of the last success and its error
+FETCH_DATA = 'fetch_data'
+FETCH_ATTEMPTED = 'attempted'
+FETCH_SUCCEEDED = 'succeeded'
+FETCH_ERROR = 'error'
+
+# Export formats and compression schemes
+EXPORT_JSON = 'json'
+EXPORT_JSON_LINES = 'jsonl'
+EXPORT_JSON_COMPACT = 'compact'
+EXPORT_CSV = 'csv'
+EXPORT_PARQUET = 'parquet'
+EXPORT_ARROW = 'arrow'
+EXPORT_COLUMNAR_FORMATS = (EXPORT_CSV, EXPORT_PARQUET, EXPORT_ARROW)
+EXPORT_FORMATS = (EXPORT_JSON, EXPORT_JSON_LINES, EXPORT_JSON_COMPACT) + EXPORT_COLUMNAR_FORMATS
+# Preferred values flattened into their own columns by columnar exports
+PREFERRED_COLUMNS = ('title', 'year')
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+# Codecs Arrow IPC files can be compressed with
+ARROW_COMPRESSIONS = ('lz4', COMPRESSION_ZSTD)
+COMPRESSION_SUFFIXES = {
+    '.gz': COMPRESSION_GZIP,
+    '.zst': COMPRESSION_ZSTD
+}
+
+# Filters over at least this many videos are evaluated with NumPy, when it is installed
+VECTORIZED_FILTER_MIN_VIDEOS = 10000
+
+# Keys whose distinct values are indexed by their trigrams, so 'contains' filters on them look up candidates
+TRIGRAM_INDEXED_KEYS = ('title',)
+
+# Strategies for merging imported metadata into existing videos
+MERGE_OVERWRITE = 'overwrite'
+MERGE_KEEP = 'keep'
+MERGE_NEWEST = 'newest'
+MERGE_STRATEGIES = (MERGE_OVERWRITE, MERGE_KEEP, MERGE_NEWEST)
+# Characters a single member of an imported JSON document may take up
+IMPORT_MAX_MEMBER_SIZE = 64 * 1024 * 1024
+
+# Number of journal entries buffered before they are flushed to disk
+JOURNAL_BATCH_SIZE = 100
+
+# Seconds between saves of a daemon's state while it has unsaved changes
+DAEMON_SAVE_INTERVAL = 30
+
+# File system events reported by watchers
+WATCH_CREATED = 'created'
+WATCH_MODIFIED = 'modified'
+WATCH_MOVED = 'moved'
+WATCH_DELETED = 'deleted'
+WATCH_RESCAN = 'rescan'
+# Seconds a watcher waits for events, and a file's size and modification
+# time must stay unchanged before it is hashed
+WATCH_POLL_INTERVAL = 1.0
+WATCH_SETTLE_TIME = 2.0
+WATCH_HASH_WORKERS = 2
+WATCH_SAVE_INTERVAL = 30
+
+# Bytes read from each end of a file to tell apart files of equal size
+DUPLICATE_PARTIAL_BYTES = 65536
+
+# Collection state is saved in shards keyed by the first hex digits of each video's hash
+COLLECTION_SHARD_KEY_LENGTH = 2
+COLLECTION_SHARD_SUFFIX = '.json'
+LEGACY_SHARD_SUFFIX = '.pickle'  # shards pickled by earlier versions, read once to convert them
+STATE_LOCK_TIMEOUT = 60.0  # seconds to wait for another process to finish loading or saving
+STATE_LOCK_POLL_INTERVAL = 0.05
+
+# State file formats; readers accept documents of their version and older
+STATE_FORMAT = 'pyvorg-state'
+STATE_FORMAT_VERSION = 1
+COLLECTION_SHARD_FORMAT = 'pyvorg-collection-shard'
+COLLECTION_SHARD_FORMAT_VERSION = 1
+SNAPSHOT_FORMAT = 'pyvorg-snapshot'
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Scan work queue shared by workers on several hosts; times are in seconds
+WORK_QUEUE_LEASE = 600.0  # a claimed directory is offered again if its worker is silent this long
+WORK_QUEUE_MAX_ATTEMPTS = 3
+WORK_QUEUE_POLL_INTERVAL = 5.0  # how often a waiting worker checks for new directories
+WORK_QUEUE_TIMEOUT = 30.0  # how long to wait for another process writing to the queue
+
+# Metrics recorded during a run; latency bucket bounds are in seconds
+METRICS_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+METRICS_PREFIX = 'pyvorg_'
+
+# Progress reporting; PYVORG_PROGRESS overrides the automatic choice
+ENV_PROGRESS = 'PYVORG_PROGRESS'
+PROGRESS_AUTO = 'auto'
+PROGRESS_BAR = 'bar'
+PROGRESS_LOG = 'log'
+PROGRESS_OFF = 'off'
+PROGRESS_MODES = (PROGRESS_AUTO, PROGRESS_BAR, PROGRESS_LOG, PROGRESS_OFF)
+PROGRESS_REFRESH_INTERVAL = 0.1  # seconds between redraws on a terminal
+PROGRESS_LOG_INTERVAL = 10.0  # seconds between log lines otherwise
+
+# Logging; PYVORG_LOG_LEVELS sets levels for single modules, e.g. 'fileutils=DEBUG,urllib3=WARNING'
+ENV_LOG_LEVEL = 'PYVORG_LOG_LEVEL'
+ENV_LOG_LEVELS = 'PYVORG_LOG_LEVELS'
+# Directory for the log file, metrics and profiles, in place of the platform's default
+ENV_LOGS_DIR = 'PYVORG_LOGS_DIR'
+LOG_DEFAULT_LEVEL = 'INFO'
+LOG_BATCH_SIZE = 256  # records written to the log file between flushes while busy
+
+# Profiling of CLI commands
+PROFILE_CPROFILE = 'cprofile'
+PROFILE_SAMPLE = 'sample'
+PROFILE_MODES = (PROFILE_CPROFILE, PROFILE_SAMPLE)
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds
+PROFILE_TOP_N = 20
 
 # TODO: move this to config.env
 DATA_PREF_ORDER = [USER_DATA, FILE_DATA, OMDB_DATA, GUESSIT_DATA]
@@ -13,13 +13,13 @@
 
 
 # Standard library
-# n/a
+import json
 
 # Local imports
 from source.datasources.base_metadata_source import MetadataSource
 
 # Third-party packages
-from guessit import guessit
+# guessit builds its rule set on import, so it is imported on first use
 
 
 class GuessitAPI(MetadataSource):
@@ -28,12 +28,14 @@ class GuessitAPI(MetadataSource):
 
     def fetch_data(self, **kwargs):
         if 'filename' in kwargs.keys():
+            from guessit import guessit
             filename = kwargs.get('filename')
             guessit_data = guessit(filename)
         else:
             raise ValueError("'filename', a required keyword, was not found in the argument dict'")
 
-        return dict(guessit_data)
+        # Values such as languages and dates are kept as strings, which the state can hold
+        return json.loads(json.dumps(dict(guessit_data), default=str))
 
     def get_optional_params(self):
         return None
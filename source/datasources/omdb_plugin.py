@@ -83,7 +83,8 @@ class OMDBFetcher(MetadataSource):
 
     @staticmethod
     def get_api_url() -> str:
-        return 'https://www.omdbapi.com'
+        # OMDB_URL points the plugin at another server, such as a local stand-in for load testing
+        return os.getenv(ENV_OMDB_URL) or OMDB_API_URL
 
     @staticmethod
     def get_omdb_api_key() -> str:
@@ -159,8 +160,7 @@ class OMDBFetcher(MetadataSource):
         response = requests.get(self.get_api_url(), params=params)
         title = params.get(P_TITLE, 'Err: Unknown Title')
         data = self._get_response_data(response)
-        response_code = response.status_code
-        self._handle_response_status_code(data, response_code, title)
+        self._handle_response_status_code(data, response, title)
         return data
 
     def _get_response_data(self, response: requests.Response) -> dict:
@@ -174,8 +174,10 @@ class OMDBFetcher(MetadataSource):
             raise requests.HTTPError(msg)
         return data
 
-    def _handle_response_status_code(self, data, status_code, title: str):
+    def _handle_response_status_code(self, data, response: requests.Response, title: str):
         # TODO: use response.raise_for_status() instead
+        # Errors carry the response so that callers can tell a rate limit from a missing title
+        status_code = response.status_code
 
         if status_code == 200:
             if data['Response'] == 'True':
@@ -186,20 +188,20 @@ class OMDBFetcher(MetadataSource):
         elif status_code == 429:
             msg = f"Status code {data['Error']}: Rate limit exceeded."
             logging.error(msg)
-            raise requests.HTTPError(msg)
+            raise requests.HTTPError(msg, response=response)
 
         # Handle unspecified status codes
         elif 400 <= status_code <= 499:
             msg = f"Status code {data['Error']}: Undefined client error"
             logging.error(msg)
-            raise requests.HTTPError(msg)
+            raise requests.HTTPError(msg, response=response)
 
         elif 500 <= status_code <= 599:
             msg = f"Status code {data['Error']}: Undefined server error"
             logging.error(msg)
-            raise requests.HTTPError(msg)
+            raise requests.HTTPError(msg, response=response)
 
         else:
             msg = f"Status code {status_code}: Undefined error"
             logging.error(msg)
-            raise requests.HTTPError(msg)
+            raise requests.HTTPError(msg, response=response)
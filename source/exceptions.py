@@ -5,6 +5,10 @@ Custom exceptions for use within the package
 """
 
 
+class DaemonError(Exception):
+    pass
+
+
 class RateLimitExceededError(Exception):
     def __init__(self):
         super().__init__("Rate limit exceeded.")
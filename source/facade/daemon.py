@@ -0,0 +1,234 @@
+# ./source/facade/daemon.py
+
+"""
+    Long-running daemon that keeps a Facade and its state resident in memory
+    and serves the Facade's methods as JSON-RPC over a Unix-domain socket.
+
+    Requests are handled one at a time, so services never see concurrent
+    changes to the state. The state is saved right after operations that
+    change files on disk, and otherwise every DAEMON_SAVE_INTERVAL seconds
+    while it has unsaved changes and when the daemon stops.
+"""
+
+# Standard library
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import socketserver
+import threading
+from typing import Any, Optional
+
+# Local imports
+from source.constants import DAEMON_SAVE_INTERVAL
+from source.facade.daemonclient import DaemonClient, JSONRPC_VERSION
+from source.facade.pyvorg_facade import Facade
+
+# Third-party packages
+# n/a
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Facade methods the daemon handles itself rather than exposing. watch_path
+# and run_scan_worker run until they are interrupted and would hold the
+# daemon's lock throughout, profile returns a context manager, which
+# cannot be sent to a client, and list_videos is read by the client from
+# the snapshot the daemon saves.
+HIDDEN_METHODS = {'list_videos', 'load_state', 'profile', 'run_daemon', 'run_scan_worker', 'stop_daemon',
+                  'get_daemon_status', 'watch_path'}
+READ_ONLY_METHODS = {'find_duplicates', 'get_preview_of_staged_operations', 'get_scan_queue_status',
+                     'has_interrupted_commit', 'queue_scan', 'write_metrics'}
+# Operations that move files are saved immediately so the state on disk
+# never lags behind the file system
+SAVE_IMMEDIATELY_METHODS = {'commit_staged_operations', 'rollback_interrupted_commit', 'undo_transaction'}
+
+
+class FacadeDaemon:
+    def __init__(self,
+                 session: Facade,
+                 socket_path: Path,
+                 save_interval: float = DAEMON_SAVE_INTERVAL):
+        self.session = session
+        self.socket_path = socket_path
+        self.save_interval = save_interval
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.server = None
+        self.stopping = threading.Event()
+
+    def get_methods(self) -> list[str]:
+        return [
+            name
+            for name, _
+            in inspect.getmembers(type(self.session), inspect.isfunction)
+            if not name.startswith('_') and name not in HIDDEN_METHODS
+        ]
+
+    def call(self, method: str, params: Any) -> Any:
+        if method == 'status':
+            return self.get_status()
+        if method == 'shutdown':
+            self.stop()
+            return None
+        with self.lock:
+            if method == 'save_state':
+                self.save()
+                return None
+            if method in SAVE_IMMEDIATELY_METHODS:
+                return self._call_and_save(method, params)
+            if method not in READ_ONLY_METHODS:
+                self.dirty = True
+            return self._call_facade(method, params)
+
+    def _call_and_save(self, method: str, params: Any) -> Any:
+        # Earlier changes are saved first so that, if the operation fails, the
+        # saved state can be reloaded without losing them. As with a single CLI
+        # invocation, the journal then describes what the failed commit did.
+        if self.dirty:
+            self.save()
+        try:
+            result = self._call_facade(method, params)
+        except Exception:
+            self.session.load_state()
+            raise
+        self.save()
+        return result
+
+    def _call_facade(self, method: str, params: Any) -> Any:
+        facade_method = getattr(self.session, method)
+        if isinstance(params, dict):
+            return facade_method(**params)
+        return facade_method(*params)
+
+    def get_status(self) -> dict:
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'socket': str(self.socket_path),
+                'videos': len(self.session.state.get_collection().videos),
+                'unsaved_changes': self.dirty
+            }
+
+    def handle_request(self, line: bytes) -> Optional[bytes]:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return self._error_response(None, PARSE_ERROR, f"Parse error: {e}")
+
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self._error_response(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params', [])
+
+        if method not in self.get_methods() + ['status', 'shutdown']:
+            return self._error_response(request_id, METHOD_NOT_FOUND, f"Method not found: '{method}'")
+        if not isinstance(params, (list, dict)):
+            return self._error_response(request_id, INVALID_PARAMS, "'params' must be a list or an object")
+        if method in self.get_methods():
+            try:
+                signature = inspect.signature(getattr(self.session, method))
+                signature.bind(**params) if isinstance(params, dict) else signature.bind(*params)
+            except TypeError as e:
+                return self._error_response(request_id, INVALID_PARAMS, str(e))
+
+        try:
+            result = self.call(method, params)
+        except Exception as e:
+            logging.exception(f"Daemon call '{method}' failed")
+            return self._error_response(request_id, SERVER_ERROR, str(e), type(e).__name__)
+
+        if request_id is None:
+            # Notifications receive no response
+            return None
+        response = {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'result': result}
+        return json.dumps(response, default=str).encode('utf-8')
+
+    @staticmethod
+    def _error_response(request_id, code: int, message: str, error_type: Optional[str] = None) -> bytes:
+        error = {'code': code, 'message': message}
+        if error_type is not None:
+            error['data'] = {'type': error_type}
+        response = {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'error': error}
+        return json.dumps(response).encode('utf-8')
+
+    def save(self) -> None:
+        with self.lock:
+            self.session.save_state()
+            self.dirty = False
+
+    def _save_periodically(self) -> None:
+        while not self.stopping.wait(self.save_interval):
+            if self.dirty:
+                self.save()
+
+    def _prepare_socket_path(self) -> None:
+        if not self.socket_path.exists():
+            return
+        client = DaemonClient.connect(self.socket_path)
+        if client is not None:
+            client.close()
+            raise RuntimeError(f"A daemon is already running at '{self.socket_path}'")
+        self.socket_path.unlink()
+
+    def serve_forever(self, ready: Optional[threading.Event] = None) -> None:
+        self._prepare_socket_path()
+        self.server = DaemonServer(str(self.socket_path), DaemonRequestHandler)
+        self.server.facade_daemon = self
+        saver = threading.Thread(target=self._save_periodically, daemon=True)
+        saver.start()
+        logging.info(f"Daemon listening on '{self.socket_path}'")
+        if ready is not None:
+            ready.set()
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping.set()
+            self.server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            if self.dirty:
+                self.save()
+            logging.info("Daemon stopped")
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.server is not None:
+            # shutdown() waits for serve_forever to return, so it must not
+            # block the handler thread that asked for it
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    block_on_close = False
+
+    def server_bind(self) -> None:
+        # Anyone who can connect can drive the Facade, so the socket is
+        # created readable and writable by its owner only
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        # A connection may send any number of requests, one per line
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.facade_daemon.handle_request(line)
+            if response is not None:
+                self.wfile.write(response + b'\n')
+                self.wfile.flush()
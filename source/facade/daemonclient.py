@@ -0,0 +1,138 @@
+# ./source/facade/daemonclient.py
+
+"""
+    Client for a running pyvorg daemon. DaemonClient stands in for the Facade:
+    its methods are sent to the daemon as JSON-RPC requests over the daemon's
+    Unix-domain socket, one JSON document per line, and exceptions raised by
+    the daemon are raised again here.
+"""
+
+# Standard library
+import builtins
+import json
+import logging
+from pathlib import Path
+import socket
+from typing import Any, Optional
+
+# Local imports
+from source import exceptions
+from source.constants import PROFILE_CPROFILE, PROFILE_TOP_N
+from source.exceptions import DaemonError
+from source.utils import configutils
+
+# Third-party packages
+# n/a
+
+JSONRPC_VERSION = '2.0'
+
+
+class DaemonClient:
+    def __init__(self, socket_path: Path, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(str(socket_path))
+        self.file = self.sock.makefile('rwb')
+        self.next_id = 0
+
+    @staticmethod
+    def connect(socket_path: Optional[Path] = None) -> Optional['DaemonClient']:
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+        socket_path = socket_path or configutils.get_daemon_socket_path()
+        if not socket_path.exists():
+            return None
+        try:
+            return DaemonClient(socket_path)
+        except OSError:
+            # A socket left behind by a daemon that did not shut down cleanly
+            return None
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def remote_method(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        return remote_method
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        if args and kwargs:
+            raise ValueError("Daemon calls take either positional or keyword arguments, not both")
+        self.next_id += 1
+        request = {
+            'jsonrpc': JSONRPC_VERSION,
+            'id': self.next_id,
+            'method': method,
+            'params': kwargs or list(args)
+        }
+        self.file.write(json.dumps(request, default=str).encode('utf-8') + b'\n')
+        self.file.flush()
+
+        line = self.file.readline()
+        if not line:
+            raise DaemonError("The daemon closed the connection")
+        response = json.loads(line)
+        if 'error' in response:
+            raise to_exception(response['error'])
+        return response.get('result')
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+    def load_state(self) -> None:
+        # The daemon owns the state; it is loaded once when the daemon starts
+        pass
+
+    def save_state(self) -> None:
+        # The daemon saves its state itself; call('save_state') forces a save
+        pass
+
+    def profile(self, name: str, mode: str = PROFILE_CPROFILE, top: int = PROFILE_TOP_N):
+        # Only this process is profiled; the daemon does the work, so stop it to profile a command
+        logging.warning("A daemon is running; the profile covers sending the command to it, not running it")
+        from source.utils import profileutils
+        return profileutils.profiled(name, mode, top)
+
+    def run_daemon(self) -> None:
+        raise RuntimeError(f"A daemon is already running at '{self.socket_path}'")
+
+    def stop_daemon(self) -> None:
+        self.call('shutdown')
+        self.close()
+
+    def get_daemon_status(self) -> dict:
+        return self.call('status')
+
+    def list_videos(self, *args, **kwargs) -> list[dict]:
+        # Read from the snapshot here once the daemon has saved its changes
+        from source.facade.pyvorg_facade import Facade
+        self.call('save_state')
+        return Facade().list_videos(*args, **kwargs)
+
+    def run_scan_worker(self, *args, **kwargs) -> dict[str, int]:
+        # Workers do not use the collection, so this process does the hashing rather than the daemon
+        from source.facade.pyvorg_facade import Facade
+        return Facade().run_scan_worker(*args, **kwargs)
+
+    def watch_path(self, *args, **kwargs) -> None:
+        raise RuntimeError("'watch' cannot run while a daemon is running; stop the daemon first")
+
+    def write_metrics(self, prometheus_path: Optional[str] = None) -> None:
+        # The daemon records the metrics, so it writes them; after 'daemon stop' there is nothing to write
+        if not self.file.closed:
+            self.call('write_metrics', prometheus_path)
+
+
+def to_exception(error: dict) -> Exception:
+    error_type = (error.get('data') or {}).get('type')
+    exception_class = getattr(exceptions, error_type or '', None) or getattr(builtins, error_type or '', None)
+    if isinstance(exception_class, type) and issubclass(exception_class, Exception):
+        try:
+            return exception_class(error.get('message'))
+        except TypeError:
+            pass
+    return DaemonError(error.get('message'))
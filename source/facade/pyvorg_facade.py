@@ -3,24 +3,21 @@
 """
     Acts as entry point for user interface.
     Should only interact with the services layer.
+
+    Services are imported by the methods that use them so that starting the
+    CLI only loads what the invoked command needs.
 """
 
 # Standard library
+from datetime import timedelta
 from pathlib import Path
+import threading
 from typing import Optional
 
 # Local imports
+from source.constants import PROFILE_CPROFILE, PROFILE_TOP_N
 from source.state.application_state import PyvorgState
 from source.utils import cmdutils as cmd_svc
-from source.services.clearstagedoperations_svc import ClearStagedOperations
-from source.services.commitstagedoperations_svc import CommitStagedOperations
-from source.services.exportcollectionmetadata_svc import ExportCollectionMetadata
-from source.services.importcollectionmetadata_svc import ImportCollectionMetadata
-from source.services.savestate_svc import SaveState
-from source.services.loadstate_svc import LoadState
-from source.services.stageorganizevideofiles_svc import StageOrganizeVideoFiles
-from source.services.stageupdatemetadata_svc import StageUpdateMetadata
-from source.services.undotransaction_svc import UndoTransaction
 
 
 # Third-party packages
@@ -39,21 +36,88 @@ class Facade:
         self.state = state or PyvorgState()
 
     def clear_staged_operations(self) -> None:
+        from source.services.clearstagedoperations_svc import ClearStagedOperations
         ClearStagedOperations().call(self.state.get_command_buffer())
 
-    def commit_staged_operations(self) -> None:
-        CommitStagedOperations().call(self.state)
-
-    def export_collection_metadata(self, path: str) -> None:
+    def commit_staged_operations(self, resume: bool = False) -> None:
+        from source.services.commitstagedoperations_svc import CommitStagedOperations
+        try:
+            CommitStagedOperations().call(self.state, resume)
+        finally:
+            # Moved videos are found under their new paths
+            self.state.get_collection().reindex()
+
+    def collect_scan_results(self, queue_path: str) -> dict[str, int]:
+        from source.services.collectscanresults_svc import CollectScanResults
+        counts, result_ids = CollectScanResults().call(self.state.get_collection(), queue_path)
+        # Results still in the queue are collected again if the save fails, which adds the same videos
+        self.save_state()
+        CollectScanResults.mark_collected(queue_path, result_ids)
+        return counts
+
+    def export_collection_metadata(self,
+                                   path: str,
+                                   export_format: Optional[str] = None,
+                                   compression: Optional[str] = None,
+                                   filter_strings: Optional[list[str]] = None) -> None:
+        from source.services.exportcollectionmetadata_svc import ExportCollectionMetadata
         ExportCollectionMetadata().call(self.state.get_collection(),
-                                        path)
+                                        path,
+                                        export_format,
+                                        compression,
+                                        filter_strings)
+
+    def find_duplicates(self,
+                        path_string: str,
+                        recursive: bool = False) -> dict:
+
+        from source.services.findduplicates_svc import FindDuplicates
+        return FindDuplicates().call(self.state.get_collection(),
+                                     path_string,
+                                     recursive)
+
+    def get_daemon_status(self) -> dict:
+        raise RuntimeError("No daemon is running")
+
+    def get_scan_queue_status(self, queue_path: str) -> dict:
+        from source.utils.workqueueutils import WorkQueue
+        with WorkQueue(Path(queue_path)) as queue:
+            return queue.get_status()
 
     def get_preview_of_staged_operations(self) -> str:
         # TODO: Figure out what to do with this one
         return cmd_svc.get_exec_preview(self.state.get_command_buffer())
 
-    def import_collection_metadata(self, path: Path) -> None:
-        ImportCollectionMetadata().call(self.state.get_collection(), path)
+    def has_interrupted_commit(self) -> bool:
+        return cmd_svc.get_default_journal().is_pending()
+
+    def import_collection_metadata(self,
+                                   path: Path,
+                                   strategy: Optional[str] = None,
+                                   compression: Optional[str] = None) -> dict[str, int]:
+        from source.services.importcollectionmetadata_svc import ImportCollectionMetadata
+        return ImportCollectionMetadata().call(self.state.get_collection(),
+                                               path,
+                                               strategy,
+                                               compression)
+
+    def list_videos(self,
+                    filter_strings: Optional[list[str]] = None,
+                    keys: Optional[list[str]] = None) -> list[dict]:
+        # Read from a snapshot of the saved collection, without loading the state
+        from source.services.listvideos_svc import ListVideos
+        from source.services.loadstate_svc import LoadState
+        from source.utils import configutils, snapshotutils
+        snapshot_path = configutils.get_snapshot_path()
+        # Tagged before loading, so shards saved meanwhile leave the snapshot stale rather than hidden
+        shard_tag = snapshotutils.get_shard_tag(configutils.get_collection_shard_dir())
+        if not snapshotutils.is_current(snapshot_path, shard_tag):
+            # Saves leave the snapshot to the first query after them. It is written
+            # from a separate copy of the saved state, outside the state lock
+            saved = PyvorgState()
+            LoadState().call(saved)
+            snapshotutils.write_snapshot(saved.get_collection(), snapshot_path, shard_tag)
+        return ListVideos().call(snapshot_path, filter_strings, keys)
 
     def scan_files_in_path(self,
                            path_string: str,
@@ -64,10 +128,48 @@ class Facade:
                                path_string,
                                recursive)
 
+    def profile(self,
+                name: str,
+                mode: str = PROFILE_CPROFILE,
+                top: int = PROFILE_TOP_N):
+        # Context manager; everything run inside it is profiled
+        from source.utils import profileutils
+        return profileutils.profiled(name, mode, top)
+
+    def queue_scan(self,
+                   queue_path: str,
+                   path_string: str,
+                   recursive: bool = False) -> int:
+        from source.services.queuescan_svc import QueueScan
+        return QueueScan().call(queue_path, path_string, recursive)
+
+    def rollback_interrupted_commit(self) -> None:
+        from source.services.rollbackinterruptedcommit_svc import RollbackInterruptedCommit
+        try:
+            RollbackInterruptedCommit().call()
+        finally:
+            self.state.get_collection().reindex()
+
+    def run_daemon(self) -> None:
+        from source.facade.daemon import FacadeDaemon
+        from source.utils import configutils
+        FacadeDaemon(self, configutils.get_daemon_socket_path()).serve_forever()
+
+    def run_scan_worker(self,
+                        queue_path: str,
+                        worker_name: Optional[str] = None,
+                        wait: bool = False,
+                        stop_event: Optional[threading.Event] = None) -> dict[str, int]:
+        # Needs no state; workers on other hosts only share the queue
+        from source.services.runscanworker_svc import RunScanWorker
+        return RunScanWorker().call(queue_path, worker_name, wait, stop_event)
+
     def save_state(self):
+        from source.services.savestate_svc import SaveState
         SaveState().call(self.state)
 
     def load_state(self):
+        from source.services.loadstate_svc import LoadState
         LoadState().call(self.state)
 
     def stage_organize_video_files(self,
@@ -75,6 +177,7 @@ class Facade:
                                    format_str: Optional[str] = None,
                                    filter_strings: Optional[list[str]] = None) -> None:
 
+        from source.services.stageorganizevideofiles_svc import StageOrganizeVideoFiles
         StageOrganizeVideoFiles().call(self.state.get_collection(),
                                        self.state.get_command_buffer(),
                                        destination,
@@ -83,12 +186,44 @@ class Facade:
 
     def stage_update_api_metadata(self,
                                   api_name: str,
-                                  filter_strings: Optional[list[str]] = None) -> None:
-
+                                  filter_strings: Optional[list[str]] = None,
+                                  missing_only: bool = False,
+                                  older_than: Optional[float] = None,
+                                  failed_only: bool = False) -> None:
+        # 'older_than' is in seconds, so that requests to a daemon can carry it
+        from source.services.stageupdatemetadata_svc import StageUpdateMetadata
         StageUpdateMetadata().call(self.state.get_collection(),
                                    self.state.get_command_buffer(),
                                    api_name,
-                                   filter_strings)
+                                   filter_strings,
+                                   missing_only,
+                                   timedelta(seconds=older_than) if older_than is not None else None,
+                                   failed_only)
+
+    def stop_daemon(self) -> None:
+        raise RuntimeError("No daemon is running")
 
     def undo_transaction(self) -> None:
-        UndoTransaction().call(self.state.get_batch_history())
+        from source.services.undotransaction_svc import UndoTransaction
+        try:
+            UndoTransaction().call(self.state.get_batch_history())
+        finally:
+            self.state.get_collection().reindex()
+
+    def watch_path(self,
+                   path_string: str,
+                   recursive: bool = False,
+                   force_polling: bool = False,
+                   stop_event: Optional[threading.Event] = None) -> None:
+
+        from source.services.watchpath_svc import WatchPath
+        WatchPath().call(self.state.get_collection(),
+                         path_string,
+                         recursive,
+                         force_polling,
+                         on_change=self.save_state,
+                         stop_event=stop_event)
+
+    def write_metrics(self, prometheus_path: Optional[str] = None) -> None:
+        from source.services.writemetrics_svc import WriteMetrics
+        WriteMetrics().call(prometheus_path)
@@ -4,8 +4,7 @@
 import sys
 
 # Local imports
-from source.state.col import Collection
-from source.commands.cmdbuffer import CommandBuffer
+from source.facade.daemonclient import DaemonClient
 from source.facade.pyvorg_facade import Facade
 from source.ui.cli import run
 
@@ -13,5 +12,6 @@ from source.ui.cli import run
 
 
 def main():
-    session = Facade()
+    # When a daemon is running the CLI forwards commands to it
+    session = DaemonClient.connect() or Facade()
     run(sys.argv[1:], session)
@@ -0,0 +1,49 @@
+# ./source/services/collectscanresults_svc.py
+
+# Standard library
+import logging
+from pathlib import Path
+
+# Local imports
+from source.exceptions import ValidationError
+from source.state.col import Collection
+from source.state.mediafile import MediaFile
+from source.utils import collectionutils, \
+                         progressutils
+from source.utils.workqueueutils import WorkQueue
+
+# Third party packages
+# n/a
+
+
+class CollectScanResults:
+    def __init__(self):
+        pass
+
+    def call(self,
+             collection: Collection,
+             queue_path: Path) -> tuple[dict[str, int], list[int]]:
+        # The ids of the results read are returned rather than marked collected,
+        # so the caller marks them once the collection holding them is saved
+        counts = {'added': 0, 'invalid': 0}
+        collected = []
+        with WorkQueue(Path(queue_path)) as queue:
+            with progressutils.track('Collecting') as progress:
+                for result_id, video_id, data in progress.iterate(queue.iter_results()):
+                    collected.append(result_id)
+                    try:
+                        collectionutils.validate_metadata(video_id, data)
+                    except ValidationError as error:
+                        logging.warning(f"Skipping scanned record '{video_id}': {error}")
+                        counts['invalid'] += 1
+                        continue
+                    # Added as a local scan adds videos, so copies found by workers are recorded as copies
+                    collectionutils.add_videos(collection, [MediaFile.from_dict(data)])
+                    counts['added'] += 1
+        logging.info(f"Collected {counts['added']} scanned videos from '{queue_path}'; {counts['invalid']} invalid")
+        return counts, collected
+
+    @staticmethod
+    def mark_collected(queue_path: Path, result_ids: list[int]) -> None:
+        with WorkQueue(Path(queue_path)) as queue:
+            queue.mark_collected(result_ids)
@@ -1,13 +1,17 @@
 # ./source/services/commitstagedoperations_svc.py
 
 # Standard library
-# n/a
+import logging
+from typing import Optional
 
 # Local imports
 from source.commands.cmdbuffer import CommandBuffer
+from source.commands.cmdjournal import CommandJournal
 from source.state.application_state import PyvorgState
 from source.utils import \
-    cmdutils
+    cmdutils, \
+    metricsutils, \
+    progressutils
 
 # Third-party packages
 # n/a
@@ -17,8 +21,34 @@ class CommitStagedOperations:
     def __init__(self):
         pass
 
+    @metricsutils.timed('commit')
     def call(self,
-             state: PyvorgState):
-        cmdutils.execute_cmd_buffer(state.command_buffer)
+             state: PyvorgState,
+             resume: bool = False,
+             journal: Optional[CommandJournal] = None):
+        journal = journal or cmdutils.get_default_journal()
+
+        if resume:
+            if not journal.is_pending():
+                raise ValueError("Cannot resume; no interrupted commit was found")
+            cmdutils.restore_from_journal(state.command_buffer, journal)
+        elif journal.is_pending():
+            raise RuntimeError("An interrupted commit was found; resume or roll it back before committing")
+        else:
+            if state.command_buffer.exec_is_empty():
+                raise IndexError("Cannot commit; command buffer is empty")
+            journal.begin(len(state.command_buffer.cmd_buffer))
+
+        try:
+            if not state.command_buffer.exec_is_empty():
+                count = len(state.command_buffer.cmd_buffer)
+                metricsutils.increment('commit_commands_total', count)
+                with progressutils.track('Committing', count):
+                    cmdutils.execute_cmd_buffer(state.command_buffer, journal)
+                logging.info(f"Committed {count} operations")
+        finally:
+            journal.flush()
+
+        journal.end()
         state.batch_history.append(state.command_buffer)
         state.command_buffer = CommandBuffer()
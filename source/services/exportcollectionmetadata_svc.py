@@ -2,8 +2,11 @@
 
 # Standard library
 from pathlib import Path
+from typing import Optional
 
 # Local imports
+from source.constants import ARROW_COMPRESSIONS, EXPORT_ARROW, EXPORT_CSV, EXPORT_JSON, EXPORT_JSON_COMPACT, \
+                             EXPORT_JSON_LINES, EXPORT_PARQUET
 from source.state.col import Collection
 from source.utils import \
     collectionutils, \
@@ -20,7 +23,35 @@ class ExportCollectionMetadata:
 
     def call(self,
              collection: Collection,
-             path: str):
-        metadata_dict = collectionutils.get_metadata(collection)
-        write_data = serializeutils.dict_to_json(metadata_dict)
-        fileutils.file_write(Path(path), write_data)
+             path: str,
+             export_format: Optional[str] = None,
+             compression: Optional[str] = None,
+             filter_strings: Optional[list[str]] = None):
+        export_format = export_format or EXPORT_JSON
+
+        if export_format == EXPORT_ARROW and compression not in (None,) + ARROW_COMPRESSIONS:
+            raise ValueError(f"Arrow files cannot be compressed with '{compression}'; "
+                             f"use one of: {', '.join(ARROW_COMPRESSIONS)}")
+
+        if export_format in (EXPORT_PARQUET, EXPORT_ARROW):
+            columns = collectionutils.get_metadata_columns(collection, filter_strings)
+            table = serializeutils.columns_to_arrow_table(columns)
+            fileutils.file_write_arrow(Path(path), table, export_format, compression=compression)
+            return
+
+        records = collectionutils.iter_metadata(collection, filter_strings)
+
+        if export_format == EXPORT_JSON:
+            write_data = serializeutils.dict_to_json(dict(records))
+            chunks = [write_data]
+        elif export_format == EXPORT_JSON_LINES:
+            chunks = serializeutils.records_to_json_lines(records)
+        elif export_format == EXPORT_JSON_COMPACT:
+            chunks = serializeutils.records_to_json_chunks(records)
+        elif export_format == EXPORT_CSV:
+            columns = collectionutils.get_metadata_columns(collection, filter_strings)
+            chunks = serializeutils.columns_to_csv_chunks(columns)
+        else:
+            raise ValueError(f"'{export_format}' is not a valid export format")
+
+        fileutils.file_write_chunks(Path(path), chunks, compression=compression)
@@ -0,0 +1,30 @@
+# ./source/services/findduplicates_svc.py
+
+# Standard library
+import logging
+
+# Local imports
+from source.state.col import Collection
+from source.utils import duplicateutils, \
+                         fileutils
+
+# Third party packages
+# n/a
+
+
+class FindDuplicates:
+    def __init__(self):
+        pass
+
+    def call(self,
+             collection: Collection,
+             path_string: str,
+             recursive: bool = False) -> dict:
+
+        root, glob_pattern = fileutils.parse_glob_string(path_string)
+        file_paths = fileutils.get_files_from_path(root, recursive, glob_pattern)
+        cached_hashes = duplicateutils.get_cached_hashes(collection)
+        report = duplicateutils.find_duplicates(file_paths, cached_hashes)
+        logging.info(f"Found {report['duplicates']} duplicates among {report['files']} files in '{root}', "
+                     f"reading {report['bytes_read']} bytes")
+        return report
@@ -1,14 +1,18 @@
-# ./source/services/exportcollectionmetadata_svc.py
+# ./source/services/importcollectionmetadata_svc.py
 
 # Standard library
+import logging
 from pathlib import Path
+from typing import Optional
 
 # Local imports
+from source.constants import MERGE_OVERWRITE
 from source.state.col import Collection
 from source.utils import \
     collectionutils, \
     serializeutils, \
-    fileutils
+    fileutils, \
+    progressutils
 
 # Third-party packages
 # n/a
@@ -20,7 +24,15 @@ class ImportCollectionMetadata:
 
     def call(self,
              collection: Collection,
-             path: Path):
-        metadata = fileutils.file_read(path)
-        collectionutils.validate_metadata(metadata)
-        collectionutils.import_metadata(collection, metadata)
\ No newline at end of file
+             path: Path,
+             strategy: Optional[str] = None,
+             compression: Optional[str] = None) -> dict[str, int]:
+        with fileutils.open_text_reader(Path(path), compression) as file:
+            records = serializeutils.iter_json_members(file)
+            with progressutils.track('Importing') as progress:
+                counts = collectionutils.import_metadata(collection,
+                                                         progress.iterate(records),
+                                                         strategy or MERGE_OVERWRITE)
+        logging.info(f"Imported '{path}': {counts['added']} added, {counts['merged']} merged, "
+                     f"{counts['invalid']} invalid")
+        return counts
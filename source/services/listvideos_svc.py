@@ -0,0 +1,28 @@
+# ./source/services/listvideos_svc.py
+
+# Standard library
+from pathlib import Path
+from typing import Optional
+
+# Local imports
+from source.utils import metricsutils, snapshotutils
+
+# Third party packages
+# n/a
+
+
+class ListVideos:
+    def __init__(self):
+        pass
+
+    @metricsutils.timed('list_videos')
+    def call(self,
+             snapshot_path: Path,
+             filter_strings: Optional[list[str]] = None,
+             keys: Optional[list[str]] = None) -> list[dict]:
+
+        keys = [key.lower() for key in keys or []]
+        with snapshotutils.Snapshot(snapshot_path) as snapshot:
+            rows = snapshot.filter_rows(filter_strings)
+            metricsutils.increment('list_videos_rows_total', len(rows))
+            return [snapshot.get_row(row, keys) for row in rows]
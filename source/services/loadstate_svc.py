@@ -1,13 +1,19 @@
 # ./source/services/loadstate_svc.py
 
 # Standard library
+import logging
+import pickle
 
 # Local imports
 from source.state.application_state import PyvorgState
+from source.state.col import Collection
 from source.utils import \
     configutils, \
     fileutils, \
-    serializeutils
+    lockutils, \
+    metricsutils, \
+    serializeutils, \
+    shardutils
 
 # Third party packages
 # n/a
@@ -17,11 +23,62 @@ class LoadState:
     def __init__(self):
         pass
 
+    @metricsutils.timed('load_state')
     def call(self,
              state: PyvorgState):
-        pickle_path = configutils.get_default_state_path()
-        serialized_state = fileutils.file_read_bytes(pickle_path)
-        loaded_state = serializeutils.pickle_to_object(serialized_state) or PyvorgState()
-        state.collection = loaded_state.collection
+        state_path = configutils.get_default_state_path()
+        legacy_path = configutils.get_legacy_state_path()
+        shard_dir = configutils.get_collection_shard_dir()
+        collection = Collection()
+        # Other processes may load at the same time, but not save
+        with lockutils.FileLock(configutils.get_state_lock_path(), shared=True):
+            serialized_state = fileutils.file_read_bytes(state_path)
+            legacy = not serialized_state and legacy_path != state_path and legacy_path.exists()
+            if legacy:
+                self.load_legacy(state, legacy_path, shard_dir)
+                return
+            stats = shardutils.load_shards(collection, shard_dir)
+        metricsutils.increment('load_state_bytes_total', len(serialized_state) + stats['bytes'])
+        # Staged commands may refer to videos in a shard that was set aside. Those
+        # are dropped, and the state file is kept as it was, since the next save replaces it
+        dropped = []
+        try:
+            loaded_state = shardutils.read_state(serialized_state, collection, dropped)
+        except shardutils.SHARD_ERRORS as e:
+            backup_path = shardutils.keep_backup(state_path, serialized_state)
+            logging.error(f"Staged operations and history could not be restored: {e}; "
+                          f"the state file was kept as '{backup_path}'")
+            loaded_state = PyvorgState(collection)
+        else:
+            if dropped:
+                backup_path = shardutils.keep_backup(state_path, serialized_state)
+                logging.error(f"{len(dropped)} staged or executed operations refer to videos that could not be "
+                              f"loaded and were dropped; the state file was kept as '{backup_path}'")
+        state.collection = collection
         state.command_buffer = loaded_state.command_buffer
         state.batch_history = loaded_state.batch_history
+        state.base = serialized_state
+
+    @staticmethod
+    def load_legacy(state: PyvorgState, legacy_path, shard_dir) -> None:
+        # State pickled by earlier versions, in one file or with the collection in
+        # shards. Nothing is removed; the next save writes the current format.
+        logging.info(f"Converting state saved by an earlier version in '{legacy_path}'")
+        collection = Collection()
+        shardutils.load_shards(collection, shard_dir, legacy=True)
+        serialized_state = fileutils.file_read_bytes(legacy_path)
+        try:
+            loaded_state = serializeutils.pickle_to_object(serialized_state,
+                                                           shardutils.get_reference_reader(collection)) \
+                           or PyvorgState()
+        except pickle.UnpicklingError as e:
+            logging.error(f"Staged operations and history could not be restored: {e}")
+            loaded_state = PyvorgState()
+        if loaded_state.collection.videos:
+            # Saved before the collection was sharded
+            collection = loaded_state.collection
+        state.collection = collection
+        state.command_buffer = loaded_state.command_buffer
+        state.batch_history = loaded_state.batch_history
+        # Differs from the empty state file, so the first save writes it
+        state.base = None
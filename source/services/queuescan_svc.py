@@ -0,0 +1,33 @@
+# ./source/services/queuescan_svc.py
+
+# Standard library
+import logging
+import os
+from pathlib import Path
+
+# Local imports
+from source.utils import fileutils
+from source.utils.workqueueutils import WorkQueue
+
+# Third party packages
+# n/a
+
+
+class QueueScan:
+    def __init__(self):
+        pass
+
+    def call(self,
+             queue_path: Path,
+             path_string: str,
+             recursive: bool = False) -> int:
+        # Each directory is a task of its own, so workers split a tree between them
+        root, glob_pattern = fileutils.parse_glob_string(path_string)
+        if not root.is_dir():
+            raise NotADirectoryError(f"'{root}' is not a directory")
+        root = root.resolve()
+        directories = [Path(dirpath) for dirpath, _, _ in os.walk(root)] if recursive else [root]
+        with WorkQueue(Path(queue_path)) as queue:
+            added = queue.add_tasks((str(directory), glob_pattern) for directory in directories)
+        logging.info(f"Queued {added} directories under '{root}' in '{queue_path}'")
+        return added
@@ -0,0 +1,24 @@
+# ./source/services/rollbackinterruptedcommit_svc.py
+
+# Standard library
+from typing import Optional
+
+# Local imports
+from source.commands.cmdjournal import CommandJournal
+from source.utils import \
+    cmdutils
+
+# Third party packages
+# n/a
+
+
+class RollbackInterruptedCommit:
+    def __init__(self):
+        pass
+
+    def call(self, journal: Optional[CommandJournal] = None):
+        journal = journal or cmdutils.get_default_journal()
+        if not journal.is_pending():
+            raise ValueError("Cannot roll back; no interrupted commit was found")
+        cmdutils.rollback_journal(journal)
+        journal.discard()
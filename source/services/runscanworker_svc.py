@@ -0,0 +1,93 @@
+# ./source/services/runscanworker_svc.py
+
+# Standard library
+import logging
+import os
+from pathlib import Path
+import socket
+import threading
+import time
+from typing import Optional
+
+# Local imports
+from source.constants import WORK_QUEUE_LEASE, WORK_QUEUE_POLL_INTERVAL
+from source.utils import fileutils, \
+                         metricsutils, \
+                         progressutils, \
+                         videoutils
+from source.utils.workqueueutils import Task, WorkQueue
+
+# Third party packages
+# n/a
+
+
+class RunScanWorker:
+    def __init__(self):
+        pass
+
+    def call(self,
+             queue_path: Path,
+             worker_name: Optional[str] = None,
+             wait: bool = False,
+             stop_event: Optional[threading.Event] = None,
+             lease: float = WORK_QUEUE_LEASE) -> dict[str, int]:
+        worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+        stop_event = stop_event or threading.Event()
+        counts = {'directories': 0, 'files': 0, 'failed': 0, 'lost': 0}
+        logging.info(f"Worker '{worker_name}' taking directories from '{queue_path}'")
+        with WorkQueue(Path(queue_path)) as queue, progressutils.track('Hashing') as progress:
+            while not stop_event.is_set():
+                task = queue.claim(worker_name, lease)
+                if task is None:
+                    if not wait:
+                        break
+                    stop_event.wait(WORK_QUEUE_POLL_INTERVAL)
+                    continue
+                try:
+                    records = self.scan_directory(queue, task, worker_name, lease, progress)
+                except KeyboardInterrupt:
+                    queue.release(task[0], worker_name)
+                    raise
+                except OSError as e:
+                    logging.warning(f"Could not scan '{task[1]}': {e}")
+                    queue.fail(task[0], worker_name, str(e))
+                    counts['failed'] += 1
+                    continue
+                if records is None or not queue.complete(task[0], worker_name, records):
+                    # Another worker claimed the task after the lease ran out, and records it instead
+                    logging.warning(f"Stopped scanning '{task[1]}': its lease ran out and another worker took it")
+                    counts['lost'] += 1
+                    continue
+                counts['directories'] += 1
+                counts['files'] += len(records)
+        logging.info(f"Worker '{worker_name}' scanned {counts['files']} files in {counts['directories']} "
+                     f"directories; {counts['failed']} directories failed")
+        return counts
+
+    @staticmethod
+    @metricsutils.timed('scan_worker_task')
+    def scan_directory(queue: WorkQueue,
+                       task: Task,
+                       worker_name: str,
+                       lease: float,
+                       progress: progressutils.NullProgress) -> Optional[list[tuple[str, dict]]]:
+        # None if the lease could not be renewed, since the task is then another worker's
+        task_id, directory, glob_pattern = task
+        records = []
+        renewed = time.monotonic()
+        for path in fileutils.get_files_from_path(Path(directory), False, glob_pattern):
+            try:
+                video = videoutils.create_video_from_file_path(path)
+            except OSError as e:
+                # The file went away or became unreadable while it was hashed
+                logging.warning(f"Could not scan '{path}': {e}")
+                continue
+            records.append((video.get_hash(), video.to_dict()))
+            metricsutils.increment('scan_worker_files_total')
+            progress.update(items=1)
+            # Large directories take longer than a lease to hash
+            if time.monotonic() - renewed > lease / 3:
+                if not queue.renew(task_id, worker_name, lease):
+                    return None
+                renewed = time.monotonic()
+        return records
@@ -1,13 +1,17 @@
 # ./source/services/savestate_svc.py
 
 # Standard library
+import logging
 
 # Local imports
 from source.state.application_state import PyvorgState
 from source.utils import \
+    cmdutils, \
     configutils, \
     fileutils, \
-    serializeutils
+    lockutils, \
+    metricsutils, \
+    shardutils
 
 # Third party packages
 # n/a
@@ -17,7 +21,48 @@ class SaveState:
     def __init__(self):
         pass
 
+    @metricsutils.timed('save_state')
     def call(self, state: PyvorgState):
         jar_path = configutils.get_default_state_path()
-        serialized_state = serializeutils.obj_to_pickle(state)
-        fileutils.file_write_bytes(jar_path, serialized_state, overwrite=True)
+        shard_dir = configutils.get_collection_shard_dir()
+        with lockutils.FileLock(configutils.get_state_lock_path()):
+            # Changes saved by other processes since the state was loaded are kept
+            merged = shardutils.merge_shards(state.collection, shard_dir)
+            if merged['merged']:
+                logging.info(f"Merged changes saved by another process into {merged['merged']} collection shards")
+            metricsutils.increment('save_state_merged_shards_total', merged['merged'])
+            metricsutils.increment('save_state_conflicts_total', merged['conflicts'])
+            stats = shardutils.save_shards(state.collection, shard_dir)
+            # The snapshot is left to the next query, which finds it no longer matches the shards
+            written = self.save_remainder(state, jar_path)
+        metricsutils.increment('save_state_bytes_total', written + stats['bytes'])
+        metricsutils.increment('save_state_shards_written_total', stats['written'])
+        # Once the state reflecting a finished commit is on disk its journal is obsolete
+        journal = cmdutils.get_default_journal()
+        if journal.is_finished():
+            journal.discard()
+
+    @staticmethod
+    def save_remainder(state: PyvorgState, jar_path) -> int:
+        # The collection is in the shards; the state file refers to its videos by id
+        serialized_state = shardutils.encode_state(state)
+        theirs = fileutils.file_read_bytes(jar_path) if jar_path.exists() else b''
+        if serialized_state == theirs:
+            state.base = theirs
+            return 0
+        if theirs and theirs != state.base:
+            if serialized_state == state.base:
+                # Only another process changed staged operations or history
+                try:
+                    saved = shardutils.read_state(theirs, state.collection)
+                    state.command_buffer = saved.command_buffer
+                    state.batch_history = saved.batch_history
+                    state.base = theirs
+                    return 0
+                except shardutils.SHARD_ERRORS as e:
+                    logging.warning(f"Staged operations saved by another process could not be read: {e}")
+            else:
+                logging.warning("Staged operations and history saved by another process were replaced")
+        fileutils.file_replace_bytes(jar_path, serialized_state)
+        state.base = serialized_state
+        return len(serialized_state)
@@ -1,11 +1,13 @@
 # ./source/services/scanfilesinpath_svc.py
 
 # Standard library
-# n/a
+import logging
 
 # Local imports
 from source.state.col import Collection
 from source.utils import fileutils, \
+                         metricsutils, \
+                         progressutils, \
                          videoutils, \
                          collectionutils
 
@@ -19,6 +21,7 @@ class ScanFilesInPath:
         # dependency injections go here
         pass
 
+    @metricsutils.timed('scan')
     def call(self,
              collection: Collection,
              path_string: str,
@@ -26,5 +29,9 @@ class ScanFilesInPath:
 
         root, glob_pattern = fileutils.parse_glob_string(path_string)
         file_paths = fileutils.get_files_from_path(root, recursive, glob_pattern)
-        videos = videoutils.create_videos_from_file_paths(file_paths)
+        metricsutils.increment('scan_files_total', len(file_paths))
+        total_bytes = sum(path.stat().st_size for path in file_paths)
+        with progressutils.track('Scanning', len(file_paths), total_bytes) as progress:
+            videos = videoutils.create_videos_from_file_paths(progress.iterate(file_paths))
         collectionutils.add_videos(collection, videos)
+        logging.info(f"Scanned {len(file_paths)} files in '{root}'; {len(videos)} videos added to collection")
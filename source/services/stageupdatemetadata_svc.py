@@ -1,6 +1,7 @@
 # ./source/services/stageupdatemetadata_svc.py
 
 # Standard library
+from datetime import timedelta
 from typing import Optional
 from itertools import repeat
 
@@ -12,7 +13,9 @@ from source.utils import \
     videoutils, \
     collectionutils, \
     pluginutils, \
-    cmdutils
+    cmdutils, \
+    configutils, \
+    metricsutils
 
 # Third party packages
 # n/a
@@ -22,16 +25,32 @@ class StageUpdateMetadata:
     def __init__(self):
         pass
 
+    @metricsutils.timed('stage_update_metadata')
     def call(self,
              collection: Collection,
              command_buffer: CommandBuffer,
              api_name: str,
-             filter_strings: Optional[list[str]] = None) -> None:
+             filter_strings: Optional[list[str]] = None,
+             missing_only: bool = False,
+             older_than: Optional[timedelta] = None,
+             failed_only: bool = False) -> None:
 
-        videos = collectionutils.get_filtered_videos(collection, filter_strings)
-        api_instance = pluginutils.get_plugin_instance(api_name, source.datasources)
+        api_instance = pluginutils.get_plugin_instance(
+            api_name,
+            source.datasources,
+            configutils.get_plugin_manifest_path()
+        )
+        matched = collectionutils.get_filtered_videos(collection, filter_strings)
+        # Fetches are recorded under the plugin's name, which is also the name of the source it fills
+        videos = videoutils.filter_videos_to_fetch(matched,
+                                                   api_instance.get_name(),
+                                                   missing_only,
+                                                   older_than,
+                                                   failed_only)
         req_plugin_params = pluginutils.get_required_params(api_instance)
         cmd_args_tuples = zip(videos, repeat(api_instance))
         cmd_kwargs_dicts = videoutils.build_cmd_kwargs(videos, req_plugin_params)
         cmds = cmdutils.build_commands('UpdateVideoData', cmd_args_tuples, cmd_kwargs_dicts)
         cmdutils.stage_commands(command_buffer, cmds)
+        metricsutils.increment('stage_update_metadata_commands_total', len(cmds), source=api_name)
+        metricsutils.increment('stage_update_metadata_skipped_total', len(matched) - len(videos), source=api_name)
@@ -0,0 +1,69 @@
+# ./source/services/watchpath_svc.py
+
+# Standard library
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+# Local imports
+from source.constants import WATCH_POLL_INTERVAL, WATCH_RESCAN, WATCH_SAVE_INTERVAL, WATCH_SETTLE_TIME
+from source.state.col import Collection
+from source.utils import fileutils, \
+                         watchutils
+
+# Third party packages
+# n/a
+
+
+class WatchPath:
+    def __init__(self):
+        pass
+
+    def call(self,
+             collection: Collection,
+             path_string: str,
+             recursive: bool = False,
+             force_polling: bool = False,
+             on_change: Optional[Callable[[], None]] = None,
+             stop_event: Optional[threading.Event] = None,
+             poll_interval: Optional[float] = None,
+             settle_time: Optional[float] = None,
+             save_interval: Optional[float] = None) -> None:
+
+        poll_interval = WATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        settle_time = WATCH_SETTLE_TIME if settle_time is None else settle_time
+        save_interval = WATCH_SAVE_INTERVAL if save_interval is None else save_interval
+
+        root, glob_pattern = fileutils.parse_glob_string(path_string)
+        root = root.resolve()
+        if not root.is_dir():
+            raise NotADirectoryError(f"'{root}' is not a directory")
+        stop_event = stop_event or threading.Event()
+
+        watcher = watchutils.get_watcher(root, recursive, force_polling)
+        sync = watchutils.CollectionSync(collection, glob_pattern, settle_time)
+        logging.info(f"Watching '{root}' using {type(watcher).__name__}")
+
+        unsaved = sync.reconcile(root, fileutils.get_files_from_path(root, recursive, glob_pattern), recursive)
+        last_saved = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                events = watcher.poll(poll_interval)
+                if any(event == WATCH_RESCAN for event, _, _ in events):
+                    # The kernel dropped events, so compare against the directory instead
+                    unsaved |= sync.reconcile(root, fileutils.get_files_from_path(root, recursive, glob_pattern), recursive)
+                unsaved |= sync.handle_events(events)
+                unsaved |= sync.process()
+                if unsaved and on_change and time.monotonic() - last_saved >= save_interval:
+                    on_change()
+                    unsaved = False
+                    last_saved = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            unsaved |= sync.close()
+            if unsaved and on_change:
+                on_change()
+            logging.info(f"Stopped watching '{root}'")
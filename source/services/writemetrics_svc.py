@@ -0,0 +1,28 @@
+# ./source/services/writemetrics_svc.py
+
+# Standard library
+import logging
+from pathlib import Path
+from typing import Optional
+
+# Local imports
+from source.utils import \
+    configutils, \
+    metricsutils
+
+# Third party packages
+# n/a
+
+
+class WriteMetrics:
+    def __init__(self):
+        pass
+
+    def call(self, prometheus_path: Optional[str] = None) -> None:
+        # Metrics are a diagnostic aid; failing to write them must not fail the command
+        try:
+            metricsutils.write_summary(configutils.get_metrics_path())
+            if prometheus_path:
+                metricsutils.write_prometheus(Path(prometheus_path))
+        except OSError as e:
+            logging.warning(f"Could not write metrics: {e}")
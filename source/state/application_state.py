@@ -1,7 +1,7 @@
 # ./source/state/application_state.py
 
 # Standard library
-from typing import Optional
+from typing import Any, Callable, Optional
 
 # Local Imports
 from source.state.col import Collection
@@ -18,6 +18,23 @@ class PyvorgState:
         self.collection = collection or Collection()
         self.command_buffer = command_buffer or CommandBuffer()
         self.batch_history = batch_history or []
+        # The state file as last read or written, other than the collection
+        self.base: Optional[bytes] = None
+
+    @staticmethod
+    def from_dict(data: dict,
+                  read_video: Callable[[Any], Any],
+                  dropped: Optional[list[dict]] = None) -> 'PyvorgState':
+        return PyvorgState(None,
+                           CommandBuffer.from_dict(data['command_buffer'], read_video, dropped),
+                           [CommandBuffer.from_dict(batch, read_video, dropped) for batch in data['batch_history']])
+
+    def to_dict(self, write_video: Callable[[Any], Any]) -> dict:
+        # The collection is saved separately, in shards
+        return {
+            'command_buffer': self.command_buffer.to_dict(write_video),
+            'batch_history': [batch.to_dict(write_video) for batch in self.batch_history]
+        }
 
     def get_collection(self):
         return self.collection
@@ -3,14 +3,34 @@
 """
     Collection class handles storing videos, and retrieving subsets
     of the collection by applying filters
+
+    Videos are keyed by the hash of their contents. When the same contents
+    are found in more than one place, the first video found keeps its
+    metadata and the other paths are recorded as copies of it. A path to
+    video id index answers lookups by path, and a sorted list of the same
+    paths lookups of the paths under a directory; neither is saved with the
+    collection, and both are rebuilt when they are first needed.
+
+    The collection is saved in shards by shardutils. shard_bases holds each
+    shard as last read or written, so that changes saved meanwhile by
+    another process can be merged, shard_stats the signature of its file
+    then, and shard_members the ids of each shard's videos. The collection
+    records which videos were changed since, through its own methods or the
+    setters of the videos it holds, so that a save only encodes the shards
+    of those videos. Videos changed in any other way, such as by assigning
+    to 'videos', are only saved by a save that checks every shard, which
+    get_changed_ids asks for by returning None.
 """
 
 # Standard library
+import bisect
 import logging
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 # Local imports
+from source.constants import FILE_DATA, FILENAME, PATH, ROOT
 from source.state.mediafile import MediaFile
 from source.utils.fileutils import get_file_type
 from source.utils.videoutils import create_video_from_file_path
@@ -28,6 +48,42 @@ from source.utils.videoutils import create_video_from_file_path
 class Collection:
     def __init__(self):
         self.videos = {}
+        self.copies: dict[str, list[str]] = {}
+        self._path_index: Optional[dict[str, str]] = None
+        self._sorted_paths: Optional[list[str]] = None
+        self.shard_bases: dict[str, bytes] = {}
+        self.shard_members: Optional[dict[str, set[str]]] = None
+        self.shard_stats: dict[str, Optional[tuple]] = {}
+        self.changed_ids: Optional[set[str]] = set()
+        self.changed_videos: set[MediaFile] = set()
+        # One listener shared by every video, rather than one bound method each
+        self._listener = self.changed_videos.add
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_listener']
+        state['_path_index'] = None
+        state['_sorted_paths'] = None
+        state['shard_bases'] = {}
+        state['shard_members'] = None
+        state['shard_stats'] = {}
+        state['changed_ids'] = None
+        state['changed_videos'] = set()
+        return state
+
+    def __setstate__(self, state):
+        # Collections saved before copies were tracked hold only 'videos'
+        state.setdefault('copies', {})
+        state['_path_index'] = None
+        state['_sorted_paths'] = None
+        state['shard_bases'] = {}
+        # Changes made before the collection was pickled are not known
+        state['shard_members'] = None
+        state['shard_stats'] = {}
+        state['changed_ids'] = None
+        state['changed_videos'] = set()
+        self.__dict__.update(state)
+        self._listener = self.changed_videos.add
 
     def add_file(self, file_path: Path) -> Optional[MediaFile]:
         # TODO: Consider factoring this out so that Collection
@@ -48,15 +104,48 @@ class Collection:
 
     def add_video_file(self, file_path: Path) -> MediaFile:
         new_video = create_video_from_file_path(file_path)
-        self.videos.update({new_video.get_hash(): new_video})
-        logging.info(f"Added '{file_path}' to collection")
-        return new_video
+        video_id = self.add_video_instance(new_video)
+        logging.debug(f"Added '{file_path}' to collection")
+        return self.get_video(video_id)
 
     def add_video_instance(self, video: MediaFile) -> Optional[str]:
         video_id = self.generate_video_id(video)
-        self.videos.update({video_id: video})
+        existing = self.videos.get(video_id)
+        path = self._get_path_string(video)
+        if existing is None or path is None or path == self._get_path_string(existing):
+            if path is not None:
+                self.remove_path(path, keep=video_id)
+            self.set_video(video_id, video)
+        elif path not in self.copies.get(video_id, []):
+            # The same contents in another place keep the existing metadata
+            self.remove_path(path, keep=video_id)
+            self.copies.setdefault(video_id, []).append(path)
+            self.mark_changed(video_id)
+        self._index_paths(video_id)
         return video_id
 
+    def clear_changes(self) -> None:
+        # Call once the collection matches its saved shards
+        self.changed_ids = set()
+        self.changed_videos.clear()
+
+    def get_changed_ids(self) -> Optional[set[str]]:
+        # Ids of the videos changed since the last clear_changes, or None if they are not known
+        if self.changed_ids is None:
+            return None
+        changed_ids = set(self.changed_ids)
+        for video in self.changed_videos:
+            video_id = self.generate_video_id(video)
+            if self.videos.get(video_id) is not video:
+                # Its hash changed, so its id is not known without a search
+                return None
+            changed_ids.add(video_id)
+        return changed_ids
+
+    def mark_changed(self, video_id: str) -> None:
+        if self.changed_ids is not None:
+            self.changed_ids.add(video_id)
+
     @staticmethod
     def generate_video_id(video: MediaFile):
         return video.get_hash()
@@ -67,20 +156,171 @@ class Collection:
     def get_video(self, key: str) -> MediaFile:
         return self.videos.get(key)
 
+    def get_video_by_path(self, path) -> Optional[MediaFile]:
+        video_id = self.get_video_id_by_path(path)
+        return self.get_video(video_id) if video_id is not None else None
+
+    def get_video_id_by_path(self, path) -> Optional[str]:
+        path = str(path)
+        video_id = self._get_path_index().get(path)
+        if video_id is not None and path not in self.get_locations(video_id):
+            # The video was moved since the index was built
+            self.reindex()
+            video_id = self._get_path_index().get(path)
+        return video_id
+
+    def get_locations(self, video_id: str) -> list[str]:
+        video = self.videos.get(video_id)
+        if video is None:
+            return []
+        path = self._get_path_string(video)
+        primary = [path] if path is not None else []
+        return primary + self.copies.get(video_id, [])
+
+    def get_paths(self) -> list[str]:
+        return list(self._get_path_index().keys())
+
+    def get_paths_under(self, root) -> list[str]:
+        # 'root' if it is a path in the collection, otherwise the sorted paths in the directory 'root' and below it
+        root = str(root)
+        if root in self._get_path_index():
+            return [root]
+        prefix = root.rstrip(os.sep) + os.sep
+        paths = self._get_sorted_paths()
+        start = end = bisect.bisect_left(paths, prefix)
+        while end < len(paths) and paths[end].startswith(prefix):
+            end += 1
+        return paths[start:end]
+
     def get_videos(self) -> list[MediaFile]:
         return list(self.videos.values())
 
+    def move_path(self, src: str, dst: str) -> bool:
+        video_id = self.get_video_id_by_path(src)
+        if video_id is None:
+            return False
+        video = self.videos[video_id]
+        if src == self._get_path_string(video):
+            self._set_path(video, dst)
+        else:
+            copies = self.copies[video_id]
+            copies[copies.index(src)] = dst
+            self.mark_changed(video_id)
+        self._unindex_path(src)
+        self._index_path(dst, video_id)
+        return True
+
+    def reindex(self) -> None:
+        # Call after paths change outside the collection, such as when
+        # committed operations move videos; the index is rebuilt on next use
+        self._path_index = None
+        self._sorted_paths = None
+
     def remove_from_collection(self, videos: list[MediaFile]) -> None:
+        removed = {id(video) for video in videos}
+        for key, value in self.videos.items():
+            if id(value) in removed:
+                self._untrack(value)
+                self.mark_changed(key)
         self.videos = {
             key: value
             for key, value
             in self.videos.items()
-            if value not in videos
+            if id(value) not in removed
         }
+        self.copies = {
+            key: value
+            for key, value
+            in self.copies.items()
+            if key in self.videos
+        }
+        self.reindex()
+
+    def remove_path(self, path, keep: Optional[str] = None) -> bool:
+        # Removes one location. The video is removed along with its last
+        # location, and a copy takes the place of a removed primary path.
+        path = str(path)
+        video_id = self.get_video_id_by_path(path)
+        if video_id is None or video_id == keep:
+            return False
+        self._unindex_path(path)
+        self.mark_changed(video_id)
+        copies = self.copies.get(video_id, [])
+        if path in copies:
+            copies.remove(path)
+        elif copies:
+            self._set_path(self.videos[video_id], copies.pop(0))
+        else:
+            self._untrack(self.videos.pop(video_id))
+        if not copies:
+            self.copies.pop(video_id, None)
+        return True
+
+    def set_video(self, video_id: str, video: Optional[MediaFile]) -> None:
+        # Sets the video under 'video_id' as it is, or removes it given None; paths are not reindexed
+        existing = self.videos.pop(video_id, None)
+        if existing is not None and existing is not video:
+            self._untrack(existing)
+        if video is not None:
+            self.videos[video_id] = video
+            self.track([video])
+        self.mark_changed(video_id)
 
     def to_dict(self) -> dict:
         return {
-            video.get_hash(): video.data
+            video.get_hash(): video.to_dict()
             for video
             in self.get_videos()
         }
+
+    def track(self, videos: Iterable[MediaFile]) -> None:
+        # Records changes made through the setters of 'videos', which are in the collection
+        for video in videos:
+            video.set_listener(self._listener)
+
+    def _untrack(self, video: MediaFile) -> None:
+        video.set_listener(None)
+        self.changed_videos.discard(video)
+
+    def _get_path_index(self) -> dict[str, str]:
+        if self._path_index is None:
+            self._path_index = {}
+            self._sorted_paths = None
+            for video_id in self.videos:
+                self._index_paths(video_id)
+        return self._path_index
+
+    def _get_sorted_paths(self) -> list[str]:
+        if self._sorted_paths is None:
+            self._sorted_paths = sorted(self._get_path_index())
+        return self._sorted_paths
+
+    def _index_path(self, path: str, video_id: str) -> None:
+        if path not in self._path_index and self._sorted_paths is not None:
+            bisect.insort(self._sorted_paths, path)
+        self._path_index[path] = video_id
+
+    def _index_paths(self, video_id: str) -> None:
+        if self._path_index is not None:
+            for path in self.get_locations(video_id):
+                self._index_path(path, video_id)
+
+    def _unindex_path(self, path: str) -> None:
+        del self._get_path_index()[path]
+        if self._sorted_paths is not None:
+            del self._sorted_paths[bisect.bisect_left(self._sorted_paths, path)]
+
+    @staticmethod
+    def _get_path_string(video: MediaFile) -> Optional[str]:
+        if not video.get_filename():
+            return None
+        return str(video.get_path())
+
+    @staticmethod
+    def _set_path(video: MediaFile, path: str) -> None:
+        # Only the location changes; the stored hash and timestamp are kept
+        file_data = video.get_source_data(FILE_DATA)
+        file_data.pop(ROOT, None)
+        file_data.pop(FILENAME, None)
+        file_data[PATH] = path
+        video.set_source_data(FILE_DATA, file_data)
@@ -3,12 +3,27 @@
 """
     MediaFile class representing individual videos and their related functions
     for use by the Collection class.
+
+    File data is held in slots rather than in a nested dict: roots are interned
+    so files sharing a directory share one string, hashes are kept as raw
+    digests and timestamps as epoch seconds. The size is recorded at scan time
+    so exports need not stat every file. The 'data' attribute presents the
+    same dict-of-dicts view as before, built from these fields on access; its
+    file data entry is a view too, so writes to it reach the fields.
+
+    A collection sets a listener on the videos it holds, which each setter
+    calls, so that saves only write the shards of videos that changed.
 """
 
 # Standard library
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from functools import lru_cache
 import logging
+import os
 from pathlib import Path
-from typing import Any, Optional
+import sys
+from typing import Any, Callable, Iterator, Optional
 
 # Local imports
 from source.constants import *
@@ -16,33 +31,184 @@ from source.utils.fileutils import hash_sha256
 from source.utils.helper import get_preferred_sources, timestamp_generate
 
 # Third-party packages
+# n/a
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: int) -> str:
+    # Files scanned together share timestamps, so most are formatted once
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(TIMESTAMP_FORMAT)
 
 
 # TODO: Refactor to Media
 
 
 class MediaFile:
+    __slots__ = ('_root', '_filename', '_hash', '_timestamp', '_size', '_sources', '_listener')
+
     def __init__(self, path: Path = None):
-        self.data = {USER_DATA: {}}
+        self._listener = None
+        self._clear_file_data()
+        self._sources = {USER_DATA: {}}
         if path is not None:
             self.update_file_data(path)
 
+    @staticmethod
+    def from_dict(data: dict) -> 'MediaFile':
+        new = MediaFile()
+        new.data.update(data)
+        return new
+
+    @staticmethod
+    def from_record(record: list) -> 'MediaFile':
+        # Records written before sizes were kept have no size
+        root, filename, sha256, timestamp, sources, *size = record
+        new = MediaFile.__new__(MediaFile)
+        new._listener = None
+        new._root = sys.intern(root) if root is not None else None
+        new._filename = filename
+        new._timestamp = timestamp
+        new._size = size[0] if size else None
+        new._sources = sources
+        new._hash = None
+        if sha256 is not None:
+            new.set_hash(sha256)
+        return new
+
+    def to_record(self) -> list:
+        # The fields as stored, in a form JSON can hold; read back by from_record
+        return [self._root, self._filename, self._get_file_field(HASH), self._timestamp, self._sources, self._size]
+
+    def __getstate__(self):
+        return self._root, self._filename, self._hash, self._timestamp, self._sources, self._size
+
+    def __setstate__(self, state):
+        self._listener = None
+        if isinstance(state, dict):
+            # Pickles written before MediaFile used slots hold {'data': ...}
+            self._clear_file_data()
+            self._sources = {}
+            self.data = state['data']
+        else:
+            self._root, self._filename, self._hash, self._timestamp, self._sources, *size = state
+            self._size = size[0] if size else None
+
+    @property
+    def data(self) -> 'MediaFileData':
+        return MediaFileData(self)
+
+    @data.setter
+    def data(self, data: dict) -> None:
+        # File data is copied first, since 'data' may be a view of this video
+        items = [
+            (source_name, dict(source_data) if isinstance(source_data, MediaFileFileData) else source_data)
+            for source_name, source_data in data.items()
+        ]
+        self._clear_file_data()
+        self._sources = {}
+        for source_name, source_data in items:
+            self.set_source_data(source_name, source_data)
+        self._changed()
+
     def _append_available_sources(self, sources: list) -> None:
+        # Fetch records are about the sources, not values of the video
         for source in self.get_source_names():
-            if source not in sources:
+            if source not in sources and source != FETCH_DATA:
                 sources.append(source)
 
+    def _changed(self) -> None:
+        if self._listener is not None:
+            self._listener(self)
+
+    def _clear_file_data(self) -> None:
+        self._root = None
+        self._filename = None
+        self._hash = None
+        self._timestamp = None
+        self._size = None
+
+    def _get_file_data(self) -> dict:
+        # The fields of _get_file_keys, built directly since snapshots read them for every video
+        file_data = {}
+        if self._filename is not None:
+            file_data[PATH] = os.path.join(self._root, self._filename)
+            file_data[ROOT] = self._root
+            file_data[FILENAME] = self._filename
+        if self._hash is not None:
+            file_data[HASH] = self._get_file_field(HASH)
+        if self._timestamp is not None:
+            file_data[TIMESTAMP] = self._get_file_field(TIMESTAMP)
+        if self._size is not None:
+            file_data[SIZE] = self._size
+        return file_data
+
+    def _get_file_field(self, key: str) -> Any:
+        if key == PATH:
+            return os.path.join(self._root, self._filename)
+        elif key == ROOT:
+            return self._root
+        elif key == FILENAME:
+            return self._filename
+        elif key == HASH:
+            return self._hash.hex() if isinstance(self._hash, bytes) else self._hash
+        elif key == TIMESTAMP:
+            if isinstance(self._timestamp, int):
+                return _format_timestamp(self._timestamp)
+            return self._timestamp
+        elif key == SIZE:
+            return self._size
+        return None
+
+    def _get_file_keys(self) -> list[str]:
+        keys = [PATH, ROOT, FILENAME] if self._filename is not None else []
+        if self._hash is not None:
+            keys.append(HASH)
+        if self._timestamp is not None:
+            keys.append(TIMESTAMP)
+        if self._size is not None:
+            keys.append(SIZE)
+        return keys
+
+    def _set_file_data(self, file_data: dict) -> None:
+        self._clear_file_data()
+        path = file_data.get(PATH)
+        if path is not None:
+            root, filename = os.path.split(str(path))
+        else:
+            root, filename = file_data.get(ROOT), file_data.get(FILENAME)
+        if filename is not None:
+            self._root = sys.intern(str(root or ''))
+            self._filename = str(filename)
+        if HASH in file_data:
+            self.set_hash(file_data[HASH])
+        if TIMESTAMP in file_data:
+            self._set_timestamp(file_data[TIMESTAMP])
+        self._size = file_data.get(SIZE)
+        self._sources.setdefault(FILE_DATA, None)
+        self._changed()
+
+    def _set_timestamp(self, timestamp: Any) -> None:
+        # Timestamps are stored as epoch seconds when they survive the round trip
+        try:
+            parsed = datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+            self._timestamp = int(parsed.timestamp())
+        except (TypeError, ValueError):
+            self._timestamp = timestamp
+
+    def get_fetch_record(self, api_name: str) -> Optional[dict]:
+        # The times of the last attempt and last success of fetches from 'api_name', or None if none was recorded
+        return (self._sources.get(FETCH_DATA) or {}).get(api_name)
+
     def get_filename(self) -> str:
-        return self.data[FILE_DATA][FILENAME]
+        return self._filename
 
     def get_hash(self) -> str:
-        return self.data[FILE_DATA][HASH]
+        return self._get_file_field(HASH)
 
     def get_path(self) -> Path:
-        return Path(self.data[FILE_DATA][PATH]).resolve()
+        return Path(self._root, self._filename)
 
     def get_pref_data(self, key: str, default: Optional[str] = None, fill: bool = True) -> Any:
-        ordered_sources = get_preferred_sources()
+        ordered_sources = list(get_preferred_sources())
 
         if fill is True:
             self._append_available_sources(ordered_sources)
@@ -53,49 +219,107 @@ class MediaFile:
                     return self.get_source_data(source, source_key)
         return default
 
+    def get_pref_items(self, fill: bool = True) -> dict[str, Any]:
+        # Every key in lower case, with the value get_pref_data returns for it
+        ordered_sources = list(get_preferred_sources())
+
+        if fill is True:
+            self._append_available_sources(ordered_sources)
+
+        items = {}
+        for source in ordered_sources:
+            for source_key, value in (self.get_source_data(source) or {}).items():
+                items.setdefault(source_key.lower(), value)
+        return items
+
     def get_root(self) -> Path:
-        return Path(self.data[FILE_DATA][ROOT])
+        return Path(self._root)
 
     def get_source_data(self, api_name: str, key: Optional[str] = None) -> Any:
-        data = self.data.get(api_name)
+        if api_name == FILE_DATA and FILE_DATA in self._sources:
+            if key is not None:
+                return self._get_file_field(key) if key in self._get_file_keys() else None
+            return self._get_file_data()
+        data = self._sources.get(api_name)
         if key is not None:
             data = data.get(key)
         return data
 
     def get_source_keys(self, source_name: Optional[str] = None) -> list:
         if source_name:
-            if self.data.get(source_name):
-                return list(self.data.get(source_name).keys())
+            if source_name == FILE_DATA and FILE_DATA in self._sources:
+                return self._get_file_keys()
+            if self._sources.get(source_name):
+                return list(self._sources.get(source_name).keys())
             else:
                 return []
         else:
-            return [key for source in self.data.values() for key in source.keys()]
+            return [key for source in self.get_source_names() for key in self.get_source_keys(source)]
 
     def get_source_names(self) -> list[str]:
-        return list(self.data.keys())
+        return list(self._sources.keys())
 
     def get_user_data(self, key: str) -> str:
-        return self.data[USER_DATA][key]
+        return self._sources[USER_DATA][key]
+
+    def record_fetch(self, api_name: str, error: Optional[str] = None) -> None:
+        # A failed fetch keeps the time of the last one that succeeded
+        now = timestamp_generate()
+        previous = self.get_fetch_record(api_name) or {}
+        self.set_fetch_record(api_name, {
+            FETCH_ATTEMPTED: now,
+            FETCH_SUCCEEDED: previous.get(FETCH_SUCCEEDED) if error is not None else now,
+            FETCH_ERROR: error
+        })
+
+    def set_fetch_record(self, api_name: str, record: Optional[dict]) -> None:
+        # Replaced rather than changed in place, since commands keep the records they replace for undo
+        records = dict(self._sources.get(FETCH_DATA) or {})
+        if record is None:
+            records.pop(api_name, None)
+        else:
+            records[api_name] = record
+        if records:
+            self._sources[FETCH_DATA] = records
+        else:
+            self._sources.pop(FETCH_DATA, None)
+        self._changed()
 
     def set_hash(self, sha256) -> None:
-        self.data[FILE_DATA][HASH] = sha256
+        # Hex digests are stored as raw bytes, anything else as given
+        try:
+            digest = bytes.fromhex(sha256)
+            self._hash = digest if digest.hex() == sha256 and digest else sha256
+        except (TypeError, ValueError):
+            self._hash = sha256
+        self._sources.setdefault(FILE_DATA, None)
+        self._changed()
+
+    def set_listener(self, listener: Optional[Callable[['MediaFile'], None]]) -> None:
+        # Called with the video whenever it is changed through its setters
+        self._listener = listener
 
     def set_source_data(self, api_name: str, data: dict) -> None:
-        self.data.update({api_name: data})
+        if api_name == FILE_DATA:
+            self._set_file_data(data)
+        else:
+            self._sources.update({api_name: data})
+            self._changed()
 
     def set_user_data(self, key: str, value):
         # TODO: Should this simply be part of set_source_data?
         #       consider renaming to override?
-        self.data.update(
+        self._sources.update(
             {
                 USER_DATA: {
                     key: value
                 }
             }
         )
+        self._changed()
 
     def to_dict(self) -> dict:
-        return self.data
+        return {source_name: self.get_source_data(source_name) for source_name in self._sources}
 
     def update_file_data(self, path: Path, skip_hash: bool = False) -> None:
         # TODO: Add member for 'media_type'
@@ -115,14 +339,97 @@ class MediaFile:
             ROOT: str(path.parent),
             FILENAME: path.name,
             HASH: '',
-            TIMESTAMP: timestamp_generate()
+            TIMESTAMP: timestamp_generate(),
+            SIZE: path.stat().st_size
         }
 
         if skip_hash is False:
             file_data.update({HASH: hash_sha256(path)})
 
-        self.data.update({FILE_DATA: file_data})
+        self._set_file_data(file_data)
 
     def update_hash(self) -> None:
         # TODO: Should this be Videos responsibility?
         self.set_hash(hash_sha256(self.get_path()))
+
+
+class MediaFileData(MutableMapping):
+    """
+        Dict-like view of a MediaFile's data keyed by source name. Writes go
+        through to the MediaFile; the file data entry is a MediaFileFileData.
+    """
+    __slots__ = ('_video',)
+
+    def __init__(self, video: MediaFile):
+        self._video = video
+
+    def __getitem__(self, source_name: str) -> Any:
+        if source_name not in self._video._sources:
+            raise KeyError(source_name)
+        if source_name == FILE_DATA:
+            return MediaFileFileData(self._video)
+        return self._video.get_source_data(source_name)
+
+    def __setitem__(self, source_name: str, data: dict) -> None:
+        self._video.set_source_data(source_name, data)
+
+    def __delitem__(self, source_name: str) -> None:
+        del self._video._sources[source_name]
+        if source_name == FILE_DATA:
+            self._video._clear_file_data()
+        self._video._changed()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._video._sources))
+
+    def __len__(self) -> int:
+        return len(self._video._sources)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class MediaFileFileData(MutableMapping):
+    """
+        Dict-like view of a MediaFile's file data. Writes go through to the
+        MediaFile's fields; the path, root and filename are set and deleted
+        together, since each is derived from the others.
+    """
+    __slots__ = ('_video',)
+
+    def __init__(self, video: MediaFile):
+        self._video = video
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._video._get_file_keys():
+            raise KeyError(key)
+        return self._video._get_file_field(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in (PATH, ROOT, FILENAME, HASH, TIMESTAMP, SIZE):
+            raise KeyError(f"File data has no field '{key}'")
+        file_data = self._video._get_file_data()
+        if key == PATH:
+            file_data.pop(ROOT, None)
+            file_data.pop(FILENAME, None)
+        elif key in (ROOT, FILENAME):
+            file_data.pop(PATH, None)
+        file_data[key] = value
+        self._video._set_file_data(file_data)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._video._get_file_keys():
+            raise KeyError(key)
+        file_data = self._video._get_file_data()
+        for field in ((PATH, ROOT, FILENAME) if key in (PATH, ROOT, FILENAME) else (key,)):
+            del file_data[field]
+        self._video._set_file_data(file_data)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._video._get_file_keys())
+
+    def __len__(self) -> int:
+        return len(self._video._get_file_keys())
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
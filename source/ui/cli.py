@@ -8,7 +8,11 @@
 from argparse import ArgumentParser, HelpFormatter, Namespace
 
 # Local imports
+from source.constants import ARROW_COMPRESSIONS, COMPRESSION_GZIP, COMPRESSION_ZSTD, EXPORT_ARROW, EXPORT_FORMATS, \
+                             EXPORT_JSON, MERGE_OVERWRITE, MERGE_STRATEGIES, PROFILE_CPROFILE, PROFILE_MODES, \
+                             PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N
 from source.facade.pyvorg_facade import Facade
+from source.utils.helper import parse_duration
 
 # Third-party packages
 # n/a
@@ -20,16 +24,67 @@ def handle_parsed_args(parsed_args: Namespace, session: Facade) -> None:
         session.clear_staged_operations()
 
     if parsed_args.command == 'commit':
-        print("Committing staged operations")
-        session.commit_staged_operations()
+        if parsed_args.rollback:
+            print("Rolling back interrupted commit")
+            session.rollback_interrupted_commit()
+        elif parsed_args.resume:
+            print("Resuming interrupted commit")
+            session.commit_staged_operations(resume=True)
+        else:
+            print("Committing staged operations")
+            session.commit_staged_operations()
+
+    elif parsed_args.command == 'daemon':
+        if parsed_args.action == 'start':
+            print("Starting daemon. Press Ctrl+C or use 'daemon stop' to stop it")
+            session.run_daemon()
+        elif parsed_args.action == 'stop':
+            print("Stopping daemon")
+            session.stop_daemon()
+        else:
+            status = session.get_daemon_status()
+            print(f"Daemon running with pid {status['pid']} on '{status['socket']}', "
+                  f"{status['videos']} videos in collection")
+
+    elif parsed_args.command == 'duplicates':
+        print(f"Finding duplicate files in '{parsed_args.path}'")
+        report = session.find_duplicates(parsed_args.path, parsed_args.recurse)
+        for group in report['groups']:
+            print(f"{len(group['paths'])} copies of {group['size']:,} bytes ({group['hash'][:12]}):")
+            for path in group['paths']:
+                print(f"    {path}")
+        print(f"{report['duplicates']} duplicates in {len(report['groups'])} groups, "
+              f"{report['reclaimable']:,} bytes reclaimable")
 
     elif parsed_args.command == 'export':
         print(f"Exporting collection data to '{parsed_args.path}'")
-        session.export_collection_metadata(parsed_args.path)
+        session.export_collection_metadata(parsed_args.path,
+                                           parsed_args.export_format,
+                                           parsed_args.compression,
+                                           parsed_args.filters)
 
     elif parsed_args.command == 'fetch':
         print(f"Staging fetch from {parsed_args.plugins}")
-        session.stage_update_api_metadata(parsed_args.plugins, parsed_args.filters)
+        older_than = parsed_args.older_than.total_seconds() if parsed_args.older_than is not None else None
+        session.stage_update_api_metadata(api_name=parsed_args.plugins,
+                                          filter_strings=parsed_args.filters,
+                                          missing_only=parsed_args.missing_only,
+                                          older_than=older_than,
+                                          failed_only=parsed_args.failed_only)
+
+    elif parsed_args.command == 'import':
+        print(f"Importing collection data from '{parsed_args.path}'")
+        counts = session.import_collection_metadata(parsed_args.path,
+                                                    parsed_args.strategy,
+                                                    parsed_args.compression)
+        print(f"{counts['added']} added, {counts['merged']} merged, {counts['invalid']} invalid")
+
+    elif parsed_args.command == 'list':
+        rows = session.list_videos(parsed_args.filters, parsed_args.keys)
+        for row in rows:
+            values = [row[key] if row[key] is not None else '' for key in parsed_args.keys or []]
+            print('\t'.join([row['path']] + values))
+        print(f"{len(rows)} videos")
 
     elif parsed_args.command == 'organize':
         print(f"Staging files for organization at '{parsed_args.destination_folder}'")
@@ -41,6 +96,25 @@ def handle_parsed_args(parsed_args: Namespace, session: Facade) -> None:
         print(f"Switching profile to {parsed_args.name}")
         # facade.set_profile(parsed_args.name)
 
+    elif parsed_args.command == 'queue':
+        if parsed_args.action == 'add':
+            if parsed_args.path is None:
+                print("'queue add' needs the path of the directory to scan")
+                return
+            print(f"Queueing '{parsed_args.path}' in '{parsed_args.queue}'")
+            added = session.queue_scan(parsed_args.queue, parsed_args.path, parsed_args.recurse)
+            print(f"{added} directories queued")
+        elif parsed_args.action == 'collect':
+            print(f"Collecting scanned videos from '{parsed_args.queue}'")
+            counts = session.collect_scan_results(parsed_args.queue)
+            print(f"{counts['added']} added, {counts['invalid']} invalid")
+        else:
+            status = session.get_scan_queue_status(parsed_args.queue)
+            print(f"{status['pending']} pending, {status['claimed']} claimed, {status['done']} done, "
+                  f"{status['failed']} failed; {status['results']} videos to collect")
+            for error in status['errors']:
+                print(f"    {error['directory']}: {error['error']}")
+
     elif parsed_args.command == 'scan':
         # TODO: Plan and implement option for discriminating based on file type
         print(f"Scanning '{parsed_args.path}'")
@@ -54,6 +128,16 @@ def handle_parsed_args(parsed_args: Namespace, session: Facade) -> None:
         print(f"Viewing staged operations")
         print(session.get_preview_of_staged_operations())
 
+    elif parsed_args.command == 'watch':
+        print(f"Watching '{parsed_args.path}' for changes. Press Ctrl+C to stop")
+        session.watch_path(parsed_args.path, parsed_args.recurse, parsed_args.poll)
+
+    elif parsed_args.command == 'worker':
+        print(f"Scanning directories queued in '{parsed_args.queue}'. Press Ctrl+C to stop")
+        counts = session.run_scan_worker(parsed_args.queue, parsed_args.name, parsed_args.wait)
+        print(f"{counts['files']} files scanned in {counts['directories']} directories, "
+              f"{counts['failed']} directories failed, {counts['lost']} left to other workers")
+
     else:
         print(f"Unrecognized command. Use -h or --help to see list of commands. Use <command> -h to see help specific "
               f"to the command.")
@@ -69,11 +153,42 @@ def parse_args(args):
         add_help=True
     )
 
+    filter_help = "only include videos matching this query on their preferred values, e.g. " \
+                  "\"year>1990 and not genre contains drama\". can be invoked multiple times"
     # TODO: write help strings
-    filter_help = "write help string for filter_help"
     export_path_help = "write help string for export_path_help"
     profile_path_help = "write help string for profile_path_help"
 
+    prometheus_help = "also write the run's metrics to this file in the Prometheus text format"
+    parser.add_argument(
+        '--prometheus',
+        metavar='<PATH>',
+        help=prometheus_help
+    )
+
+    profile_help = "profile the command, write the profile to the logs directory and print the slowest functions"
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=profile_help
+    )
+    profile_mode_help = ("'cprofile' records every call; 'sample' records the call stack every "
+                         f"{PROFILE_SAMPLE_INTERVAL * 1000:g} ms, which slows long runs down less")
+    parser.add_argument(
+        '--profile-mode',
+        choices=PROFILE_MODES,
+        default=PROFILE_CPROFILE,
+        help=profile_mode_help
+    )
+    profile_top_help = "number of functions to print in the profile summary"
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=PROFILE_TOP_N,
+        metavar='<N>',
+        help=profile_top_help
+    )
+
     subparsers = parser.add_subparsers(dest='command')
 
     # Clear
@@ -83,6 +198,45 @@ def parse_args(args):
     # Commit
     commit_help = "execute staged operations"
     commit_parser = subparsers.add_parser('commit', help=commit_help)
+    commit_recovery_group = commit_parser.add_mutually_exclusive_group()
+    commit_resume_help = "resume a commit that was interrupted before it finished"
+    commit_recovery_group.add_argument(
+        '--resume',
+        action='store_true',
+        help=commit_resume_help
+    )
+    commit_rollback_help = "undo the completed operations of a commit that was interrupted before it finished"
+    commit_recovery_group.add_argument(
+        '--rollback',
+        action='store_true',
+        help=commit_rollback_help
+    )
+
+    # Daemon
+    daemon_help = "keep the collection loaded in a background process that later commands are sent to"
+    daemon_parser = subparsers.add_parser('daemon', help=daemon_help)
+    daemon_action_help = "'start' runs the daemon in the foreground; 'stop' and 'status' act on a running daemon"
+    daemon_parser.add_argument(
+        'action',
+        help=daemon_action_help,
+        choices=['start', 'stop', 'status']
+    )
+
+    # Duplicates
+    duplicates_help = "report files with identical contents and the space removing them would free"
+    duplicates_parser = subparsers.add_parser('duplicates', help=duplicates_help)
+    duplicates_path_help = "path to directory containing files to compare"
+    duplicates_parser.add_argument(
+        'path',
+        metavar='<PATH>',
+        help=duplicates_path_help
+    )
+    duplicates_recurse_help = 'compare files in subdirectories recursively'
+    duplicates_parser.add_argument(
+        '-r', '--recurse',
+        action='store_true',
+        help=duplicates_recurse_help
+    )
 
     # Export
     export_help = "export collection metadata as a json file"
@@ -91,6 +245,31 @@ def parse_args(args):
         'path',
         help=export_path_help,
         metavar='<PATH>')
+    export_format_help = "'json' writes an indented document; 'jsonl' and 'compact' are streamed record by record; " \
+                         "'csv', 'parquet' and 'arrow' flatten metadata into columns for analysis"
+    export_parser.add_argument(
+        '--format',
+        dest='export_format',
+        help=export_format_help,
+        choices=EXPORT_FORMATS,
+        default=EXPORT_JSON
+    )
+    export_compression_help = "compress the exported file. inferred from a '.gz' or '.zst' suffix if omitted"
+    export_parser.add_argument(
+        '--compress',
+        dest='compression',
+        help=export_compression_help,
+        choices=[COMPRESSION_GZIP, COMPRESSION_ZSTD],
+        default=None
+    )
+    export_parser.add_argument(
+        '-f', '--filter',
+        dest='filters',
+        help=filter_help,
+        metavar='<FILTER EXPRESSION>',
+        action='append',
+        default=None
+    )
 
     # Fetch
     fetch_help = "stage files in collection to be updated with metadata fetched using the specified plugin"
@@ -112,6 +291,74 @@ def parse_args(args):
         action='append',
         default=None
     )
+    fetch_missing_only_help = "only stage videos without data from the plugin. " \
+                              "given several of these options, videos any of them selects are staged"
+    fetch_parser.add_argument(
+        '--missing-only',
+        action='store_true',
+        help=fetch_missing_only_help
+    )
+    fetch_older_than_help = "only stage videos last fetched successfully at least this long ago, or never, " \
+                            "e.g. '30d', '12h' or '1w'"
+    fetch_parser.add_argument(
+        '--older-than',
+        type=parse_duration,
+        metavar='<DURATION>',
+        help=fetch_older_than_help
+    )
+    fetch_failed_only_help = "only stage videos whose last fetch from the plugin failed"
+    fetch_parser.add_argument(
+        '--failed-only',
+        action='store_true',
+        help=fetch_failed_only_help
+    )
+
+    # Import
+    import_help = "import collection metadata from a json or json lines file"
+    import_parser = subparsers.add_parser('import', help=import_help)
+    import_path_help = "path to a file produced by 'export'"
+    import_parser.add_argument(
+        'path',
+        help=import_path_help,
+        metavar='<PATH>')
+    import_strategy_help = "how imported data is merged into videos already in the collection. 'newest' keeps " \
+                           "each source from whichever side fetched it last, or scanned its file last for " \
+                           "sources without fetch records such as user data"
+    import_parser.add_argument(
+        '--strategy',
+        help=import_strategy_help,
+        choices=MERGE_STRATEGIES,
+        default=MERGE_OVERWRITE
+    )
+    import_compression_help = "compression of the imported file. inferred from a '.gz' or '.zst' suffix if omitted"
+    import_parser.add_argument(
+        '--compress',
+        dest='compression',
+        help=import_compression_help,
+        choices=[COMPRESSION_GZIP, COMPRESSION_ZSTD],
+        default=None
+    )
+
+    # List
+    list_help = "list the paths of videos in the collection, read from a snapshot of the saved collection"
+    list_parser = subparsers.add_parser('list', help=list_help)
+    list_parser.add_argument(
+        '-f', '--filter',
+        dest='filters',
+        help=filter_help,
+        metavar='<FILTER EXPRESSION>',
+        action='append',
+        default=None
+    )
+    list_key_help = "print the preferred value of this key after each path. can be given more than once"
+    list_parser.add_argument(
+        '-k', '--key',
+        dest='keys',
+        help=list_key_help,
+        metavar='<KEY>',
+        action='append',
+        default=None
+    )
 
     # Organize
     organize_help = "stage files in collection to be moved to a subdirectory in 'dest'"
@@ -150,6 +397,37 @@ def parse_args(args):
         help=profile_path_help,
         metavar='<PATH>')
 
+    # Queue
+    queue_help = "share a scan between workers on several hosts through a queue file"
+    queue_parser = subparsers.add_parser('queue', help=queue_help)
+    queue_action_help = "'add' queues the directories under a path for workers; 'collect' adds the videos workers " \
+                        "scanned to the collection; 'status' shows the progress of the queue"
+    queue_parser.add_argument(
+        'action',
+        help=queue_action_help,
+        choices=['add', 'collect', 'status']
+    )
+    queue_file_help = "path to the queue file, created if it does not exist"
+    queue_parser.add_argument(
+        'queue',
+        metavar='<QUEUE>',
+        help=queue_file_help
+    )
+    queue_path_help = "path to directory containing files to scan, for 'add'"
+    queue_parser.add_argument(
+        'path',
+        metavar='<PATH>',
+        nargs='?',
+        default=None,
+        help=queue_path_help
+    )
+    queue_recurse_help = 'queue subdirectories recursively, one task per directory'
+    queue_parser.add_argument(
+        '-r', '--recurse',
+        action='store_true',
+        help=queue_recurse_help
+    )
+
     # Scan
     scan_help = "scan source directory for video files and adds them to the collection"
     scan_parser = subparsers.add_parser('scan', help=scan_help)
@@ -178,12 +456,83 @@ def parse_args(args):
         'view',
         help=view_help)
 
-    return parser.parse_args(args)
+    # Watch
+    watch_help = "keep the collection in sync with a directory as video files are added, moved and deleted"
+    watch_parser = subparsers.add_parser('watch', help=watch_help)
+    watch_path_help = "path to directory to watch"
+    watch_parser.add_argument(
+        'path',
+        metavar='<PATH>',
+        help=watch_path_help
+    )
+    watch_recurse_help = 'watch subdirectories recursively'
+    watch_parser.add_argument(
+        '-r', '--recurse',
+        action='store_true',
+        help=watch_recurse_help
+    )
+    watch_poll_help = 'poll the directory for changes instead of using inotify'
+    watch_parser.add_argument(
+        '--poll',
+        action='store_true',
+        help=watch_poll_help
+    )
+
+    # Worker
+    worker_help = "hash the files in directories taken from a scan queue"
+    worker_parser = subparsers.add_parser('worker', help=worker_help)
+    worker_queue_help = "path to the queue file written by 'queue add'"
+    worker_parser.add_argument(
+        'queue',
+        metavar='<QUEUE>',
+        help=worker_queue_help
+    )
+    worker_name_help = "name recorded against the directories this worker scans. defaults to <host>-<pid>"
+    worker_parser.add_argument(
+        '--name',
+        metavar='<NAME>',
+        default=None,
+        help=worker_name_help
+    )
+    worker_wait_help = "keep waiting for directories to be queued instead of stopping when the queue is empty"
+    worker_parser.add_argument(
+        '--wait',
+        action='store_true',
+        help=worker_wait_help
+    )
+
+    parsed_args = parser.parse_args(args)
+    if parsed_args.command == 'export' and parsed_args.export_format == EXPORT_ARROW \
+            and parsed_args.compression not in (None,) + ARROW_COMPRESSIONS:
+        parser.error(f"arrow files cannot be compressed with '{parsed_args.compression}'; "
+                     f"use one of: {', '.join(ARROW_COMPRESSIONS)}")
+    return parsed_args
 
 
 def run(args: list[str], session: Facade):
     parsed_args = parse_args(args)
+    try:
+        if parsed_args.profile:
+            with session.profile(parsed_args.command or 'pyvorg', parsed_args.profile_mode, parsed_args.profile_top) \
+                    as report:
+                run_command(parsed_args, session)
+            print(report['summary'])
+            print(f"Profile written to '{report['path']}'")
+        else:
+            run_command(parsed_args, session)
+    finally:
+        session.write_metrics(parsed_args.prometheus)
+
+
+def run_command(parsed_args: Namespace, session: Facade) -> None:
+    if parsed_args.command == 'list':
+        # Read from the snapshot of the collection, so the state is neither loaded nor saved
+        handle_parsed_args(parsed_args, session)
+        return
     session.load_state()
+    if session.has_interrupted_commit() and parsed_args.command not in ('commit', 'daemon', 'duplicates', 'view', 'worker'):
+        print("An interrupted commit was found. Use 'commit --resume' or 'commit --rollback' before continuing.")
+        return
     try:
         handle_parsed_args(parsed_args, session)
     except Exception as exception:
@@ -1,13 +1,16 @@
 # source/services/cmdutils.py
 
 # Standard library
-from typing import Iterable, Type
+import logging
+from typing import Iterable, Optional, Type
 
 # Local imports
 from source.commands.cmdbuffer import CommandBuffer
-from source.commands.command_base import Command
+from source.commands.cmdjournal import CommandJournal
+from source.commands.command_base import COMMAND_TYPES, Command
 from source.commands.updatemetadata_cmd import UpdateVideoData
 from source.commands.movevideo_cmd import MoveVideoCmd
+from source.utils import configutils
 
 # Third-party packages
 
@@ -16,8 +19,35 @@ def clear_exec_buffer(command_buffer: CommandBuffer) -> None:
     command_buffer.clear_exec_buffer()
 
 
-def execute_cmd_buffer(command_buffer: CommandBuffer) -> None:
-    command_buffer.execute_cmd_buffer()
+def execute_cmd_buffer(command_buffer: CommandBuffer, journal: Optional[CommandJournal] = None) -> None:
+    command_buffer.execute_cmd_buffer(journal)
+
+
+def get_default_journal() -> CommandJournal:
+    return CommandJournal(configutils.get_default_journal_path())
+
+
+def restore_from_journal(command_buffer: CommandBuffer, journal: CommandJournal) -> None:
+    for seq in journal.get_in_doubt():
+        logging.warning(f"Outcome of interrupted command '{seq}' is unknown; it will be executed again")
+    command_buffer.restore_from_journal(journal)
+
+
+def rollback_journal(journal: CommandJournal) -> None:
+    completed = journal.get_completed()
+    in_doubt = journal.get_in_doubt_commands()
+    for seq in sorted(completed.keys() | in_doubt.keys(), reverse=True):
+        if seq in in_doubt:
+            # The command may have been cut off part way; finishing it first
+            # leaves it in a state its undo can reverse
+            cmd = in_doubt[seq]
+            cmd.exec()
+        else:
+            cmd = completed[seq]
+        if cmd is None:
+            logging.warning(f"Cannot roll back command '{seq}'; it was not journaled")
+            continue
+        cmd.undo()
 
 
 def get_exec_preview(command_buffer):
@@ -41,16 +71,12 @@ def build_commands(cmd_name: str,
 
 
 def get_command_from_name(command_name) -> Type:
-    # TODO: Use discovery like plugins, or use a registry instead. I think we might try
-    #       the registry approach, since it does not imply that the user should be
-    #       adding their own commands. It also means we don't have to modify this
-    #       class when adding a new command.
-    if command_name == 'MoveVideoCmd':
-        return MoveVideoCmd
-    elif command_name == 'UpdateVideoData':
-        return UpdateVideoData
-    else:
+    # Commands register themselves by class name; MoveVideoCmd and
+    # UpdateVideoData are imported above so that they are always known
+    command = COMMAND_TYPES.get(command_name)
+    if command is None:
         raise ValueError(f"'{command_name}' is not a valid command name")
+    return command
 
 
 def stage_commands(command_buffer: CommandBuffer,
@@ -1,10 +1,18 @@
 # source/services/collectionutils.py
 
 # Standard library
+from datetime import datetime
+import json
+import logging
+from typing import Any, Iterable, Iterator, Optional
 
 # Local imports
+from source.constants import *
+from source.exceptions import ValidationError
 from source.state.col import Collection
-from source.utils.filter import Filter
+from source.state.mediafile import MediaFile
+from source.utils import columnutils, queryutils
+from source.utils.helper import timestamp_validate
 
 # Third-party packages
 
@@ -19,8 +27,8 @@ def add_videos(collection: Collection, videos) -> None:
 
 
 def apply_filter(videos, filter_string) -> list:
-    f = Filter.from_string(filter_string)
-    return [video for video in videos if f.matches(video.get_pref_data(f.key))]
+    query = queryutils.compile_query([filter_string])
+    return [video for video in videos if query.matches(queryutils.get_video_parts(video))]
 
 
 def get_metadata(collection: Collection) -> dict:
@@ -31,24 +39,175 @@ def get_metadata(collection: Collection) -> dict:
     }
 
 
-def get_filtered_videos(collection: Collection, filter_strings: list[str]) -> list:
+def get_metadata_columns(collection: Collection, filter_strings: Optional[list[str]] = None) -> dict[str, list]:
+    """
+    Flattens video metadata into equal-length, uniformly typed columns: the file
+    data fields, the preferred value of each of PREFERRED_COLUMNS, and one
+    '<source>.<key>' column per field of every other source.
+    """
+    rows = []
+    for video_id, video in iter_filtered_videos(collection, filter_strings):
+        metadata = video.to_dict()
+        file_data = metadata.get(FILE_DATA, {})
+        row = {
+            'id': video_id,
+            f'{FILE_DATA}.{PATH}': file_data.get(PATH),
+            f'{FILE_DATA}.{ROOT}': file_data.get(ROOT),
+            f'{FILE_DATA}.{FILENAME}': file_data.get(FILENAME),
+            f'{FILE_DATA}.{HASH}': file_data.get(HASH),
+            f'{FILE_DATA}.{TIMESTAMP}': _parse_timestamp(file_data.get(TIMESTAMP)),
+            f'{FILE_DATA}.{SIZE}': file_data.get(SIZE),
+        }
+        for key in PREFERRED_COLUMNS:
+            row[key] = video.get_pref_data(key)
+        for source_name, source_data in metadata.items():
+            if source_name == FILE_DATA:
+                continue
+            for key, value in source_data.items():
+                row[f'{source_name}.{key}'] = value
+        rows.append(row)
+
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    return {name: _normalize_column([row.get(name) for row in rows]) for name in names}
+
+
+def _normalize_column(values: list) -> list:
+    # Columns must hold a single type; mixed columns fall back to strings
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, bool) for value in present):
+        return values
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return values
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return [float(value) if value is not None else None for value in values]
+    if any(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        # Numbers mixed with text, e.g. years from different sources, are inferred as filters infer them
+        encoded = [columnutils.encode_value(value) if value is not None else None for value in values]
+        if all(parts[0] == columnutils.NUMBER for parts in encoded if parts is not None):
+            numbers = [parts[1] if parts is not None else None for parts in encoded]
+            if all(number.is_integer() for number in numbers if number is not None):
+                return [int(number) if number is not None else None for number in numbers]
+            return numbers
+    if all(isinstance(value, datetime) for value in present):
+        return values
+    return [_to_str(value) if value is not None else None for value in values]
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> Any:
+    if timestamp is not None and timestamp_validate(timestamp):
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    return timestamp
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def iter_filtered_videos(collection: Collection,
+                         filter_strings: Optional[list[str]] = None) -> Iterator[tuple[str, MediaFile]]:
+    query = queryutils.compile_query(filter_strings)
+    for video_id in collection.get_video_ids():
+        video = collection.get_video(video_id)
+        if query is None or query.matches(queryutils.get_video_parts(video)):
+            yield video_id, video
+
+
+def iter_metadata(collection: Collection, filter_strings: Optional[list[str]] = None) -> Iterator[tuple[str, dict]]:
+    for video_id, video in iter_filtered_videos(collection, filter_strings):
+        yield video_id, video.to_dict()
+
+
+def get_filtered_videos(collection: Collection,
+                        filter_strings: list[str],
+                        vectorized: Optional[bool] = None) -> list:
+    # By default, filters over large collections are evaluated with NumPy when it is installed
     ret = collection.get_videos()
-    if filter_strings:
-        for string in filter_strings:
-            ret = apply_filter(ret, string)
+    if vectorized is None:
+        vectorized = len(ret) >= VECTORIZED_FILTER_MIN_VIDEOS and columnutils.has_numpy()
+    if vectorized and filter_strings:
+        return columnutils.ColumnView(ret).filter(filter_strings, keep=False)
+    query = queryutils.compile_query(filter_strings)
+    if query is not None:
+        ret = [video for video in ret if query.matches(queryutils.get_video_parts(video))]
     return ret
 
 
-def import_metadata(collection, metadata, overwrite=True):
-    # TODO: Consider using or writing Collection methods
-    #       so we don't have to directly access video member
-    if overwrite:
-        collection.videos = collection.videos | metadata
-    else:
-        collection.videos = metadata | collection.videos
-
-
-def validate_metadata(metadata) -> None:
-    # Todo: implement
-    # Should we raise or return bool?
-    return None
+def import_metadata(collection: Collection,
+                    records: Iterable[tuple[str, dict]],
+                    strategy: str = MERGE_OVERWRITE) -> dict[str, int]:
+    if strategy not in MERGE_STRATEGIES:
+        raise ValueError(f"'{strategy}' is not a valid merge strategy")
+    counts = {'added': 0, 'merged': 0, 'invalid': 0}
+    for video_id, data in records:
+        try:
+            validate_metadata(video_id, data)
+        except ValidationError as error:
+            logging.warning(f"Skipping imported record '{video_id}': {error}")
+            counts['invalid'] += 1
+            continue
+        existing = collection.get_video(video_id)
+        if existing is None:
+            collection.add_video_instance(MediaFile.from_dict(data))
+            counts['added'] += 1
+        else:
+            merge_video_data(existing, data, strategy)
+            counts['merged'] += 1
+    return counts
+
+
+def merge_video_data(video: MediaFile, data: dict, strategy: str) -> None:
+    """
+    Merges the metadata sources of imported 'data' into 'video'. File data
+    describes where this node keeps its copy, so it is not merged. Sources the
+    video lacks are always taken; with MERGE_NEWEST, others are taken when
+    'data' fetched them last, by the fetch records of both, or, for sources
+    neither has a fetch record for, such as user data, when 'data' was
+    scanned last. A source's fetch record is taken along with it.
+    """
+    imported_records = data.get(FETCH_DATA) or {}
+    taken = set()
+    for source_name, source_data in data.items():
+        if source_name in (FILE_DATA, FETCH_DATA):
+            continue
+        if not video.get_source_data(source_name) \
+                or strategy == MERGE_OVERWRITE \
+                or (strategy == MERGE_NEWEST and _is_imported_newer(video, data, source_name)):
+            video.set_source_data(source_name, source_data)
+            taken.add(source_name)
+    for api_name, record in imported_records.items():
+        if isinstance(record, dict) and (api_name in taken or video.get_fetch_record(api_name) is None):
+            video.set_fetch_record(api_name, record)
+
+
+def _get_fetch_succeeded(records: Any, api_name: str) -> Optional[str]:
+    record = records.get(api_name) if isinstance(records, dict) else None
+    return record.get(FETCH_SUCCEEDED) if isinstance(record, dict) else None
+
+
+def _is_imported_newer(video: MediaFile, data: dict, source_name: str) -> bool:
+    # Timestamps share one format, so they compare as strings
+    local = _get_fetch_succeeded(video.get_source_data(FETCH_DATA), source_name)
+    imported = _get_fetch_succeeded(data.get(FETCH_DATA), source_name)
+    if local is None and imported is None:
+        return data[FILE_DATA][TIMESTAMP] > video.get_source_data(FILE_DATA, TIMESTAMP)
+    return (imported or '') > (local or '')
+
+
+def validate_metadata(video_id: str, data: dict) -> None:
+    if not isinstance(data, dict):
+        raise ValidationError("metadata must be an object")
+    file_data = data.get(FILE_DATA)
+    if not isinstance(file_data, dict):
+        raise ValidationError(f"'{FILE_DATA}' is missing")
+    for key in (PATH, ROOT, FILENAME, HASH, TIMESTAMP):
+        if not isinstance(file_data.get(key), str):
+            raise ValidationError(f"'{FILE_DATA}.{key}' is missing or not a string")
+    if file_data[HASH] != video_id:
+        raise ValidationError(f"'{FILE_DATA}.{HASH}' does not match the record id")
+    if not timestamp_validate(file_data[TIMESTAMP]):
+        raise ValidationError(f"'{FILE_DATA}.{TIMESTAMP}' is not a valid timestamp")
+    for source_name, source_data in data.items():
+        if not isinstance(source_data, dict):
+            raise ValidationError(f"data for source '{source_name}' must be an object")
@@ -0,0 +1,333 @@
+# ./source/utils/columnutils.py
+
+"""
+    Vectorised evaluation of filters over columns of preferred values.
+
+    Filter.matches compares one value at a time. Here the values of a key
+    are resolved once per video into columns: the kind of each value, the
+    number Filter infers from it and the rank of its text among the
+    distinct lower-cased texts of the column. A filter then becomes a
+    comparison of a whole column with NumPy, and lexical comparisons become
+    integer comparisons of ranks, so a range such as 'year>1990' and
+    'year<2000' costs one pass to build the column and two array
+    comparisons. A prefix is a range of ranks, and the other text operators
+    are evaluated once per distinct text, or for 'contains' on the keys of
+    TRIGRAM_INDEXED_KEYS, only for the texts a TrigramIndex finds. Videos
+    without a value, values of the other kind and lists or dicts never
+    match, as with Filter.matches.
+
+    NumPy is optional; has_numpy tells whether it is installed.
+"""
+
+# Standard library
+from array import array
+from bisect import bisect_left, bisect_right
+import importlib.util
+import json
+import operator
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+# Local imports
+from source.constants import TRIGRAM_INDEXED_KEYS
+from source.state.mediafile import MediaFile
+from source.utils import queryutils
+from source.utils.filter import CONTAINS, EQUAL, EXISTS, GREATER, GREATER_EQUAL, IN, LESS, LESS_EQUAL, NOT_CONTAINS, \
+                                NOT_EQUAL, PREFIX, REGEX, TEXT_OPERATORS, Filter
+
+# Third-party packages
+# n/a
+
+# Kinds of value; filters never match OTHER values, such as lists, as with Filter.matches
+MISSING = 0
+NUMBER = 1
+TEXT = 2
+OTHER = 3
+
+TRIGRAM_LENGTH = 3
+# Sorts after every string starting with the same prefix
+LAST_CHAR = '\U0010ffff'
+
+# Applied to arrays, these compare every element
+NUMERIC_COMPARISONS = {
+    EQUAL: operator.eq,
+    NOT_EQUAL: operator.ne,
+    LESS: operator.lt,
+    LESS_EQUAL: operator.le,
+    GREATER: operator.gt,
+    GREATER_EQUAL: operator.ge
+}
+
+
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Vectorised filters require the 'numpy' package: pip install numpy")
+    return numpy
+
+
+def has_numpy() -> bool:
+    return importlib.util.find_spec('numpy') is not None
+
+
+def encode_value(value: Any) -> tuple[int, float, str]:
+    # The kind of the value, the number Filter infers from it and its text
+    if isinstance(value, str):
+        text = value
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value, default=str)
+    else:
+        text = str(value)
+    if not isinstance(value, (str, int, float)):
+        return OTHER, 0.0, text
+    inferred = Filter.infer_value(value)
+    if isinstance(inferred, float):
+        return NUMBER, inferred, text
+    return TEXT, 0.0, text
+
+
+def get_trigrams(text: str) -> set[str]:
+    return {text[start:start + TRIGRAM_LENGTH] for start in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+class TrigramIndex:
+    """
+        Maps each trigram, three consecutive characters, of lower-cased texts
+        to the sorted positions of the texts containing it. A text contains
+        a needle only if it contains every trigram of the needle, so search
+        only checks the texts of the needle's rarest trigram.
+    """
+    def __init__(self, texts: Iterable[tuple[int, str]] = ()):
+        self.postings = {}
+        for position, text in texts:
+            for trigram in get_trigrams(text):
+                self.postings.setdefault(trigram, []).append(position)
+
+    def get_postings(self, trigram: str) -> Sequence[int]:
+        return self.postings.get(trigram, ())
+
+    def search(self, needle: str, get_text: Callable[[int], str]) -> Optional[list[int]]:
+        """
+        Positions of the texts containing 'needle', where 'get_text' returns
+        the lower-cased text at a position, or None if the needle is too
+        short to have a trigram
+        """
+        postings = [self.get_postings(trigram) for trigram in get_trigrams(needle)]
+        if not postings:
+            return None
+        return [position for position in min(postings, key=len) if needle in get_text(position)]
+
+
+def get_numeric_mask(f: Filter, kinds, numbers):
+    np = get_numpy()
+    kinds = np.asarray(kinds)
+    numbers = np.asarray(numbers)
+    if f.operator == IN:
+        compared = np.isin(numbers, [value for value in f.right_operand if isinstance(value, float)])
+    elif f.operator in NUMERIC_COMPARISONS and isinstance(f.right_operand, (int, float)):
+        compared = NUMERIC_COMPARISONS[f.operator](numbers, f.right_operand)
+    else:
+        return np.zeros(len(kinds), dtype=bool)
+    return compared & (kinds == NUMBER)
+
+
+def get_text_kinds(f: Filter, kinds):
+    # Text operators compare the text of numbers too; comparisons only match text with text
+    if f.operator in TEXT_OPERATORS:
+        return (kinds == NUMBER) | (kinds == TEXT)
+    return kinds == TEXT
+
+
+def find_rank(sorted_texts: list[str], text: str) -> Optional[int]:
+    rank = bisect_left(sorted_texts, text)
+    return rank if rank < len(sorted_texts) and sorted_texts[rank] == text else None
+
+
+def get_rank_mask(f: Filter, kinds, ranks, sorted_texts: list[str], index: Optional[TrigramIndex] = None):
+    # 'ranks' index 'sorted_texts', the distinct lower-cased strings of the column in order
+    np = get_numpy()
+    kinds = np.asarray(kinds)
+    ranks = np.asarray(ranks)
+    if not sorted_texts or not (f.operator in (IN, *TEXT_OPERATORS) or isinstance(f.right_operand, str)):
+        return np.zeros(len(kinds), dtype=bool)
+    right = f.right_operand
+    if f.operator == IN:
+        found = (find_rank(sorted_texts, value) for value in right if isinstance(value, str))
+        compared = np.isin(ranks, [rank for rank in found if rank is not None])
+    elif f.operator == PREFIX:
+        # The texts starting with the prefix are the consecutive ranks sorting from it up to its last extension
+        compared = (ranks >= bisect_left(sorted_texts, right)) & (ranks < bisect_left(sorted_texts, right + LAST_CHAR))
+    elif f.operator in TEXT_OPERATORS:
+        contains = Filter(f.key, CONTAINS, right) if f.operator == NOT_CONTAINS else f
+        found = index.search(right, sorted_texts.__getitem__) if index is not None and f.operator != REGEX else None
+        if found is None:
+            table = np.fromiter((contains.matches_parts((text, text)) for text in sorted_texts),
+                                dtype=bool,
+                                count=len(sorted_texts))
+        else:
+            table = np.zeros(len(sorted_texts), dtype=bool)
+            table[found] = True
+        compared = table[ranks] if f.operator != NOT_CONTAINS else ~table[ranks]
+    elif f.operator in (EQUAL, NOT_EQUAL):
+        rank = find_rank(sorted_texts, right)
+        if rank is None:
+            compared = np.full(len(kinds), f.operator == NOT_EQUAL)
+        else:
+            compared = ranks == rank if f.operator == EQUAL else ranks != rank
+    elif f.operator == LESS:
+        compared = ranks < bisect_left(sorted_texts, right)
+    elif f.operator == LESS_EQUAL:
+        compared = ranks < bisect_right(sorted_texts, right)
+    elif f.operator == GREATER:
+        compared = ranks >= bisect_right(sorted_texts, right)
+    elif f.operator == GREATER_EQUAL:
+        compared = ranks >= bisect_left(sorted_texts, right)
+    else:
+        raise ValueError("Unknown operator")
+    return compared & get_text_kinds(f, kinds)
+
+
+def get_lexical_mask(f: Filter,
+                     kinds,
+                     codes,
+                     get_text: Callable[[int], str],
+                     within=None,
+                     index: Optional[TrigramIndex] = None):
+    """
+    For columns of string indices in no particular order: each distinct index
+    among the rows of 'within' is compared once. 'index' maps the trigrams of
+    the lower-cased strings to their indices.
+    """
+    np = get_numpy()
+    kinds = np.asarray(kinds)
+    codes = np.asarray(codes)
+    mask = np.zeros(len(kinds), dtype=bool)
+    if not (f.operator in (IN, *TEXT_OPERATORS) or isinstance(f.right_operand, str)):
+        return mask
+    valid = get_text_kinds(f, kinds)
+    if f.operator in (CONTAINS, NOT_CONTAINS) and index is not None:
+        found = index.search(f.right_operand, lambda code: get_text(code).lower())
+        if found is not None:
+            compared = np.isin(codes, found)
+            return (compared if f.operator == CONTAINS else ~compared) & valid
+    if within is not None:
+        valid &= np.asarray(within)
+    distinct, inverse = np.unique(codes[valid], return_inverse=True)
+    compared = np.fromiter((f.matches_parts((text, text)) for text in map(get_text, distinct.tolist())),
+                           dtype=bool,
+                           count=len(distinct))
+    mask[valid] = compared[inverse]
+    return mask
+
+
+class ColumnView:
+    """
+        Columns of the preferred values of 'videos', built for each key the
+        first time a filter uses it and kept for later filters. A view does
+        not see later changes to the videos, so it is kept only while they
+        are not changed.
+    """
+    def __init__(self, videos: Iterable[MediaFile]):
+        self.videos = list(videos)
+        self.columns = {}
+        self.indexes = {}
+        self._keep = True
+        self._partial_keys = set()
+
+    def __len__(self) -> int:
+        return len(self.videos)
+
+    def get_column(self, key: str, rows=None) -> tuple[Any, Any, Any, list[str]]:
+        """
+        The columns of 'key'. Given the indices 'rows', a column that was not
+        built yet is built for those rows only, with the other rows missing,
+        and is not kept.
+        """
+        key = key.lower()
+        column = self.columns.get(key)
+        if column is None:
+            column = self._build_column(key, rows)
+            if rows is None:
+                self.columns[key] = column
+        return column
+
+    def _build_column(self, key: str, rows=None) -> tuple[Any, Any, Any, list[str]]:
+        np = get_numpy()
+        count = len(self.videos)
+        videos = self.videos
+        # Filled as arrays of the standard library, since setting NumPy elements one at a time is slow
+        kinds = bytearray(count)
+        numbers = array('d', bytes(8 * count))
+        codes = array('q', bytes(8 * count))
+        texts = {}
+        # Titles, years and the like repeat, so each distinct string is encoded once
+        encoded = {}
+        for row in range(count) if rows is None else rows.tolist():
+            value = videos[row].get_pref_data(key)
+            if value is None:
+                continue
+            cell = encoded.get(value) if isinstance(value, str) else None
+            if cell is None:
+                kind, number, text = encode_value(value)
+                cell = kind, number, texts.setdefault(text.lower(), len(texts)) if kind != OTHER else 0
+                if isinstance(value, str):
+                    encoded[value] = cell
+            kinds[row], numbers[row], codes[row] = cell
+        # Codes are replaced by ranks, so lexical order is integer order
+        sorted_texts = sorted(texts)
+        rank_of_code = np.zeros(len(texts), dtype=np.int64)
+        rank_of_code[[texts[text] for text in sorted_texts]] = np.arange(len(sorted_texts))
+        codes = np.frombuffer(codes, dtype=np.int64)
+        ranks = rank_of_code[codes] if texts else codes
+        return np.frombuffer(kinds, dtype=np.uint8), np.frombuffer(numbers, dtype=np.float64), ranks, sorted_texts
+
+    def get_index(self, key: str) -> Optional[TrigramIndex]:
+        # Only columns of TRIGRAM_INDEXED_KEYS in kept views are indexed, as building an index costs more than one scan
+        key = key.lower()
+        if not self._keep or key not in TRIGRAM_INDEXED_KEYS or key not in self.columns:
+            return None
+        index = self.indexes.get(key)
+        if index is None:
+            index = self.indexes[key] = TrigramIndex(enumerate(self.columns[key][3]))
+        return index
+
+    def get_filter_mask(self, f: Filter, within):
+        """
+        Rows matching 'f'. Rows outside 'within', the rows left to decide,
+        may match or not.
+        """
+        np = get_numpy()
+        rows = np.flatnonzero(within) if f.key in self._partial_keys and not within.all() else None
+        kinds, numbers, ranks, sorted_texts = self.get_column(f.key, rows)
+        if f.operator == EXISTS:
+            return kinds != MISSING
+        mask = get_rank_mask(f, kinds, ranks, sorted_texts, self.get_index(f.key))
+        if f.operator not in TEXT_OPERATORS:
+            mask |= get_numeric_mask(f, kinds, numbers)
+        return mask
+
+    def get_mask(self, filter_strings: Optional[list[str]] = None, keep: bool = True):
+        """
+        Rows matching all of the queries 'filter_strings'. With 'keep' false,
+        columns not built yet are built only for the rows the query has not
+        decided before them, as a filter applied once to a large collection
+        needs.
+        """
+        np = get_numpy()
+        mask = np.ones(len(self.videos), dtype=bool)
+        query = queryutils.compile_query(filter_strings)
+        if query is None:
+            return mask
+        keys = query.get_keys()
+        # A key used by several conditions is built once, for all rows
+        self._keep = keep
+        self._partial_keys = set() if keep else {key for key in keys if keys.count(key) == 1}
+        try:
+            return query.get_mask(self, mask)
+        finally:
+            self._keep = True
+            self._partial_keys = set()
+
+    def filter(self, filter_strings: Optional[list[str]] = None, keep: bool = True) -> list[MediaFile]:
+        np = get_numpy()
+        return [self.videos[row] for row in np.flatnonzero(self.get_mask(filter_strings, keep)).tolist()]
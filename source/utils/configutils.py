@@ -11,6 +11,7 @@ import platform
 
 # Local imports
 from source.constants import APP_NAME,\
+                      ENV_LOGS_DIR,\
                       ENV_ORGANIZE_PATH
 
 # Third-party packages
@@ -18,12 +19,43 @@ from source.constants import APP_NAME,\
 
 
 def get_default_state_path():
-    path = get_user_profile_dir() / 'default_state.pickle'
+    path = get_user_profile_dir() / 'default_state.json'
     if not path.exists():
         path.touch()
     return path
 
 
+def get_legacy_state_path():
+    # Pickled by earlier versions; read when there is no state in the current format yet
+    return get_default_state_path().with_suffix('.pickle')
+
+
+def get_collection_shard_dir():
+    # Kept next to the state file so that a state file moved elsewhere brings its shards
+    state_path = get_default_state_path()
+    shard_dir = state_path.with_name(state_path.stem + '_shards')
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    return shard_dir
+
+
+def get_snapshot_path():
+    # Read-only copy of the collection for queries, rewritten by each save that changes it
+    return get_default_state_path().with_suffix('.snapshot')
+
+
+def get_state_lock_path():
+    state_path = get_default_state_path()
+    return state_path.with_name(state_path.stem + '.lock')
+
+
+def get_default_journal_path():
+    return get_user_profile_dir() / 'default_state.journal'
+
+
+def get_daemon_socket_path():
+    return get_user_profile_dir().resolve() / 'pyvorg.sock'
+
+
 def get_default_organize_path():
     return os.getenv(ENV_ORGANIZE_PATH)
 
@@ -32,6 +64,20 @@ def get_default_format_str():
     return os.getenv('DEFAULT_FORMAT_STRING')
 
 
+def get_metrics_path():
+    return get_user_logs_dir() / 'metrics.json'
+
+
+def get_profiler_dir():
+    profiler_dir = get_user_logs_dir() / 'profiler'
+    profiler_dir.mkdir(parents=True, exist_ok=True)
+    return profiler_dir
+
+
+def get_plugin_manifest_path():
+    return get_user_cache_dir() / 'plugin_manifest.json'
+
+
 def get_user_cache_dir():
     system = platform.system()
 
@@ -87,7 +133,9 @@ def get_user_profile_dir():
 def get_user_logs_dir():
     system = platform.system()
 
-    if system == 'Windows':
+    if os.getenv(ENV_LOGS_DIR):
+        logs_dir = Path(os.getenv(ENV_LOGS_DIR))
+    elif system == 'Windows':
         logs_dir = Path(os.getenv('LOCALAPPDATA')) / APP_NAME / 'Logs'
     else:
         # TODO: Implement default case
@@ -0,0 +1,127 @@
+# ./source/utils/duplicateutils.py
+
+"""
+    Utilities for finding duplicate files without reading every file in full.
+
+    Files are grouped by size, since files of different sizes cannot match.
+    Within a group of equal size, files are compared by a hash of their first
+    and last chunks, and only files that still collide are hashed in full.
+    Hashes already stored in a collection are reused when the file has not
+    been modified since it was hashed. Hard links to one file are hashed once
+    and do not count towards the space that can be reclaimed.
+"""
+
+# Standard library
+from collections import defaultdict
+from datetime import datetime, timezone
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+# Local imports
+from source.constants import DUPLICATE_PARTIAL_BYTES, FILE_DATA, TIMESTAMP, TIMESTAMP_FORMAT
+from source.state.col import Collection
+from source.utils import fileutils
+
+# Third-party packages
+# n/a
+
+
+def get_cached_hashes(collection: Collection) -> dict[str, tuple[str, float]]:
+    # Maps path to the stored hash and the time it was computed
+    cached = {}
+    for video in collection.get_videos():
+        sha256 = video.get_hash()
+        timestamp = video.get_source_data(FILE_DATA, TIMESTAMP)
+        if not sha256 or not video.get_filename() or not isinstance(timestamp, str):
+            continue
+        try:
+            hashed_at = datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            continue
+        cached[str(video.get_path())] = (sha256, hashed_at)
+    return cached
+
+
+def group_by_size(file_paths: list[Path]) -> dict[int, list[list[Path]]]:
+    # Each size maps to a list of inodes, each holding the paths linked to it
+    inodes = defaultdict(list)
+    for path in file_paths:
+        try:
+            stat = path.stat()
+        except OSError as e:
+            logging.warning(f"Skipping '{path}': {e}")
+            continue
+        if stat.st_size > 0:
+            inodes[(stat.st_size, stat.st_dev, stat.st_ino)].append(path)
+
+    sizes = defaultdict(list)
+    for (size, _, _), paths in inodes.items():
+        sizes[size].append(paths)
+    return sizes
+
+
+def find_duplicates(file_paths: list[Path],
+                    cached_hashes: Optional[dict[str, tuple[str, float]]] = None,
+                    chunk_size: int = DUPLICATE_PARTIAL_BYTES) -> dict:
+    cached_hashes = cached_hashes or {}
+    bytes_read = 0
+    groups = []
+
+    for size, inodes in group_by_size(file_paths).items():
+        if len(inodes) < 2:
+            continue
+
+        cached = {id(paths): get_valid_cached_hash(paths, cached_hashes) for paths in inodes}
+        if all(cached.values()):
+            candidates = inodes
+        else:
+            # Only files that share their first and last chunks can match
+            by_partial = defaultdict(list)
+            for paths in inodes:
+                by_partial[fileutils.hash_partial(paths[0], chunk_size)].append(paths)
+                bytes_read += min(size, 2 * chunk_size)
+            candidates = [paths for group in by_partial.values() if len(group) > 1 for paths in group]
+
+        full_hashes = {}
+        for paths in candidates:
+            if cached[id(paths)] is not None:
+                full_hashes[id(paths)] = cached[id(paths)]
+            else:
+                full_hashes[id(paths)] = fileutils.hash_sha256(paths[0])
+                bytes_read += size
+
+        by_hash = defaultdict(list)
+        for paths in inodes:
+            if id(paths) in full_hashes:
+                by_hash[full_hashes[id(paths)]].append(paths)
+        for sha256, matches in by_hash.items():
+            if len(matches) > 1:
+                groups.append({
+                    'hash': sha256,
+                    'size': size,
+                    'paths': sorted(str(path) for paths in matches for path in paths),
+                    'reclaimable': size * (len(matches) - 1)
+                })
+
+    groups.sort(key=lambda group: group['reclaimable'], reverse=True)
+    return {
+        'groups': groups,
+        'files': len(file_paths),
+        'duplicates': sum(len(group['paths']) - 1 for group in groups),
+        'reclaimable': sum(group['reclaimable'] for group in groups),
+        'bytes_read': bytes_read
+    }
+
+
+def get_valid_cached_hash(paths: list[Path], cached_hashes: dict[str, tuple[str, float]]) -> Optional[str]:
+    for path in paths:
+        cached = cached_hashes.get(str(path.resolve()))
+        if cached is None:
+            continue
+        sha256, hashed_at = cached
+        # A file modified since it was hashed must be read again
+        if os.path.getmtime(path) < hashed_at:
+            return sha256
+    return None
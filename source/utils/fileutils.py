@@ -5,17 +5,22 @@
 """
 
 # Standard library
+import gzip
 from hashlib import sha256
+import io
 import logging
 import os
 from pathlib import Path
 import shutil
+import threading
+from typing import Iterable, Optional, TextIO
 
 # Local imports
 from source.constants import *
+from source.utils import metricsutils, progressutils
 
 # Third-party packages
-from tqdm import tqdm
+# n/a
 
 
 def dir_is_empty(path: Path) -> bool:
@@ -42,6 +47,53 @@ def file_write(path: Path, data: str, overwrite=False) -> None:
         file.write(data)
 
 
+def file_write_chunks(path: Path, chunks: Iterable[str], overwrite=False, compression: Optional[str] = None) -> None:
+    """
+    Writes each chunk yielded by 'chunks' to the file at the specified path as
+    it is produced, so the full contents never need to be held in memory.
+
+    :param path: (Path) Path to file.
+    :param chunks: (Iterable[str]) Data to write to the file.
+    :param overwrite: (bool) Overwrite if file exists
+    :param compression: (str) 'gzip', 'zstd' or None. Inferred from the file suffix if None
+    :return : None
+    :raises FileExistsError: if the file already exists
+    """
+    if path.exists() and not overwrite:
+        raise FileExistsError(f"The file '{path}' already exists")
+    with open_text_writer(path, compression) as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+def file_write_arrow(path: Path, table, file_format: str, overwrite=False, compression: Optional[str] = None) -> None:
+    """
+    Writes a pyarrow Table to the file at the specified path as Parquet or as an
+    Arrow IPC file.
+
+    :param path: (Path) Path to file.
+    :param table: (pyarrow.Table) Table to write.
+    :param file_format: (str) 'parquet' or 'arrow'
+    :param overwrite: (bool) Overwrite if file exists
+    :param compression: (str) Codec applied to the columns, e.g. 'gzip' or 'zstd'.
+        Arrow IPC files support only 'lz4' and 'zstd'
+    :return : None
+    :raises FileExistsError: if the file already exists
+    """
+    if path.exists() and not overwrite:
+        raise FileExistsError(f"The file '{path}' already exists")
+    if file_format == 'parquet':
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, str(path), compression=compression or 'snappy')
+    elif file_format == 'arrow':
+        import pyarrow.ipc
+        options = pyarrow.ipc.IpcWriteOptions(compression=compression)
+        with pyarrow.ipc.new_file(str(path), table.schema, options=options) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"'{file_format}' is not a supported Arrow file format")
+
+
 def file_write_bytes(path: Path, data: bytes, overwrite=False) -> None:
     if path.exists() and not overwrite:
         raise FileExistsError(f"The file '{path}' already exists")
@@ -49,6 +101,28 @@ def file_write_bytes(path: Path, data: bytes, overwrite=False) -> None:
         file.write(data)
 
 
+def file_replace_bytes(path: Path, data: bytes) -> None:
+    file_replace_chunks(path, [data])
+
+
+def file_replace_chunks(path: Path, chunks: Iterable[bytes]) -> int:
+    # Readers see either the old or the new contents, never a partial write. The
+    # temporary file is named for its writer, so writers do not share one
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    written = 0
+    try:
+        with temp_path.open('wb') as file:
+            for chunk in chunks:
+                written += file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return written
+
+
 def file_read(path: Path) -> str:
     """
     Reads data from file at 'path'
@@ -68,6 +142,46 @@ def file_read_bytes(path: Path) -> bytes:
         return file.read()
 
 
+def get_compression(path: Path, compression: Optional[str] = None) -> Optional[str]:
+    return compression or COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def get_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the 'zstandard' package: pip install zstandard")
+    return zstandard
+
+
+def open_text_writer(path: Path, compression: Optional[str] = None) -> TextIO:
+    compression = get_compression(path, compression)
+    if compression is None:
+        return path.open('w', encoding='utf-8')
+    elif compression == COMPRESSION_GZIP:
+        return gzip.open(path, 'wt', encoding='utf-8')
+    elif compression == COMPRESSION_ZSTD:
+        writer = get_zstandard().ZstdCompressor().stream_writer(path.open('wb'))
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    else:
+        raise ValueError(f"'{compression}' is not a supported compression scheme")
+
+
+def open_text_reader(path: Path, compression: Optional[str] = None) -> TextIO:
+    if not path.exists():
+        raise FileNotFoundError(f"The file '{path}' cannot be found")
+    compression = get_compression(path, compression)
+    if compression is None:
+        return path.open('r', encoding='utf-8')
+    elif compression == COMPRESSION_GZIP:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    elif compression == COMPRESSION_ZSTD:
+        reader = get_zstandard().ZstdDecompressor().stream_reader(path.open('rb'))
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    else:
+        raise ValueError(f"'{compression}' is not a supported compression scheme")
+
+
 def get_files_from_path(root: Path, recursive: bool = False, glob_pattern: str = '*') -> list[Path]:
     if recursive:
         return [item for item in root.rglob(glob_pattern) if item.is_file()]
@@ -85,30 +199,41 @@ def get_file_type(path: Path) -> str:
         return ''
 
 
+@metricsutils.timed('hash')
 def hash_sha256(path: Path):
     hasher = sha256()
     file_size = os.path.getsize(path)
+    metricsutils.increment('hash_files_total')
+    metricsutils.increment('hash_bytes_total', file_size)
+    progress = progressutils.get_current()
 
     with path.open('rb') as file:
         chunk_size = 65536  # 64kb
-        with tqdm(total=file_size, unit='MB', unit_scale=True, position=0) as progress_bar:
-            max_desc_width = 80 - len(' [Hashing]')
-            file_name = os.path.basename(path)
-            file_name = file_name[:max_desc_width].ljust(max_desc_width)
-            progress_bar.set_description(f'[Hashing] {file_name}')
-            for chunk in iter(lambda: file.read(chunk_size), b''):
-                hasher.update(chunk)
-                progress_bar.update(len(chunk))
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            hasher.update(chunk)
+            progress.update(size=len(chunk))
     sha256_hash = hasher.hexdigest()
     return sha256_hash
 
 
+def hash_partial(path: Path, chunk_size: int = DUPLICATE_PARTIAL_BYTES) -> str:
+    # Hashes the first and last chunk of a file; files this small are read whole
+    hasher = sha256()
+    with path.open('rb') as file:
+        hasher.update(file.read(chunk_size))
+        file.seek(0, os.SEEK_END)
+        if file.tell() > chunk_size:
+            file.seek(max(chunk_size, file.tell() - chunk_size))
+            hasher.update(file.read(chunk_size))
+    return hasher.hexdigest()
+
+
 def make_dir(path: Path):
     if not path.exists():
         path.mkdir()
-        logging.info(f"Directory '{path}' created")
+        logging.debug(f"Directory '{path}' created")
     else:
-        logging.info(f"Directory '{path}' already exists")
+        logging.debug(f"Directory '{path}' already exists")
 
 
 def make_dirs(dest_dir: Path) -> list[Path]:
@@ -137,6 +262,7 @@ def mimic_folder(src_tree: Path, dest_tree: Path) -> None:
             file_write(dest_file_path, dummy_file_data, overwrite=False)
 
 
+@metricsutils.timed('move')
 def move_file(src: Path, dst: Path, overwrite=False) -> None:
     if not src.exists():
         raise FileNotFoundError(f"'source '{src}' does not exist")
@@ -152,8 +278,11 @@ def move_file(src: Path, dst: Path, overwrite=False) -> None:
         else:
             logging.info(f"overwriting '{dst}'")
 
+    size = src.stat().st_size
     shutil.move(src, dst)
-    logging.info(f"Moved '{src}' to '{dst}'")
+    metricsutils.increment('move_files_total')
+    metricsutils.increment('move_bytes_total', size)
+    logging.debug(f"Moved '{src}' to '{dst}'")
 
 
 def parse_glob_string(path_string: str) -> (Path, str):
@@ -7,39 +7,92 @@ import re
 
 # Third-party packages
 
-# TODO: Add '+' operator for 'contains', '-' operator for 'does not contain'
+EQUAL = '='
+NOT_EQUAL = '!='
+LESS = '<'
+LESS_EQUAL = '<='
+GREATER = '>'
+GREATER_EQUAL = '>='
+CONTAINS = '+'
+NOT_CONTAINS = '-'
+PREFIX = '^'
+REGEX = '~'
+IN = 'in'
+EXISTS = 'exists'
+
+# Operators that compare the text of a value rather than the number inferred from it
+TEXT_OPERATORS = (CONTAINS, NOT_CONTAINS, PREFIX, REGEX)
+
+FILTER_PATTERN = re.compile(r"(\w+)\s*(!=|<=|>=|[<>=+\-^~])\s*(.+)")
+
 
 class Filter:
     def __init__(self, key, operator, right_operand):
         self.key = key
         self.operator = operator
-        self.right_operand = self.infer_value(right_operand)
+        self.right_operand = self.prepare_operand(operator, right_operand)
 
     @staticmethod
     def compare_lexical(left, operator, right):
-        if operator == "=":
+        if operator == EQUAL:
             return left.lower() == right.lower()
 
-        elif operator == "<":
+        elif operator == NOT_EQUAL:
+            return left.lower() != right.lower()
+
+        elif operator == LESS:
             return left.lower() < right.lower()
 
-        elif operator == ">":
+        elif operator == LESS_EQUAL:
+            return left.lower() <= right.lower()
+
+        elif operator == GREATER:
             return left.lower() > right.lower()
 
+        elif operator == GREATER_EQUAL:
+            return left.lower() >= right.lower()
+
         else:
             raise ValueError("Unknown operator")
 
     @staticmethod
     def compare_numeric(left, operator, right):
-        if operator == "=":
+        if operator == EQUAL:
             return left == right
 
-        elif operator == "<":
+        elif operator == NOT_EQUAL:
+            return left != right
+
+        elif operator == LESS:
             return left < right
 
-        elif operator == ">":
+        elif operator == LESS_EQUAL:
+            return left <= right
+
+        elif operator == GREATER:
             return left > right
 
+        elif operator == GREATER_EQUAL:
+            return left >= right
+
+        else:
+            raise ValueError("Unknown operator")
+
+    @staticmethod
+    def compare_text(text, operator, right):
+        # 'right' is lower case, or a pattern compiled to ignore case
+        if operator == CONTAINS:
+            return right in text.lower()
+
+        elif operator == NOT_CONTAINS:
+            return right not in text.lower()
+
+        elif operator == PREFIX:
+            return text.lower().startswith(right)
+
+        elif operator == REGEX:
+            return right.search(text) is not None
+
         else:
             raise ValueError("Unknown operator")
 
@@ -48,6 +101,19 @@ class Filter:
         key, operator, value = Filter.parse_filter_string(string)
         return Filter(key, operator, value)
 
+    @staticmethod
+    def get_parts(value):
+        """
+        The number or string infer_value returns for 'value' and its text, as
+        compared by matches_parts. None for a missing value, and no inferred
+        value for lists and dicts, which only 'exists' matches.
+        """
+        if value is None:
+            return None
+        if not isinstance(value, (str, int, float)):
+            return None, str(value)
+        return Filter.infer_value(value), value if isinstance(value, str) else str(value)
+
     @staticmethod
     def infer_value(string):
         try:
@@ -64,18 +130,55 @@ class Filter:
             return string
 
     def matches(self, left_operand):
-        inferred_value = self.infer_value(left_operand)
-        if isinstance(inferred_value, (int, float)):
-            return self.compare_numeric(inferred_value, self.operator, self.right_operand)
-        elif isinstance(inferred_value, str):
-            return self.compare_lexical(inferred_value, self.operator, self.right_operand)
+        return self.matches_parts(self.get_parts(left_operand))
+
+    def matches_parts(self, parts):
+        # Videos without the key, values of the other kind and lists or dicts never match
+        if self.operator == EXISTS:
+            return parts is not None
+        if parts is None or parts[0] is None:
+            return False
+        inferred_value, text = parts
+        if self.operator in TEXT_OPERATORS:
+            return self.compare_text(text, self.operator, self.right_operand)
+        if self.operator == IN:
+            return any(self.compare_values(inferred_value, EQUAL, value) for value in self.right_operand)
+        return self.compare_values(inferred_value, self.operator, self.right_operand)
+
+    @staticmethod
+    def compare_values(left, operator, right):
+        if isinstance(left, (int, float)):
+            if not isinstance(right, (int, float)):
+                return False
+            return Filter.compare_numeric(left, operator, right)
+        elif isinstance(left, str):
+            if not isinstance(right, str):
+                return False
+            return Filter.compare_lexical(left, operator, right)
 
     @staticmethod
     def parse_filter_string(string):
-        match = re.match(r"(\w+)([<>=])(.+)", string)
+        match = FILTER_PATTERN.match(string)
 
         if match is None:
             raise ValueError("Invalid filter string")
 
         key, operator, value = match.groups()
-        return key.lower(), operator, value.lower()
+        # Regular expressions keep their case, since '\D' is not '\d'
+        return key.lower(), operator, value if operator == REGEX else value.lower()
+
+    @staticmethod
+    def prepare_operand(operator, operand):
+        if operator == EXISTS:
+            return None
+        elif operator == IN:
+            values = operand.split(',') if isinstance(operand, str) else operand
+            return [Filter.infer_value(value.strip()) for value in values]
+        elif operator == REGEX:
+            try:
+                return re.compile(operand, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression '{operand}': {e}")
+        elif operator in TEXT_OPERATORS:
+            return operand.lower()
+        return Filter.infer_value(operand)
@@ -5,17 +5,21 @@
 """
 
 # Standard library
-from datetime import datetime
-import logging
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Callable
+import re
+from typing import Callable, Optional
 
 # Local imports
 from source.datasources.base_metadata_source import MetadataSource
-from source.constants import DATA_PREF_ORDER
+from source.constants import DATA_PREF_ORDER, TIMESTAMP_FORMAT
+from source.utils import logutils, metricsutils
 
 # Third-party imports
-import colorlog
+# n/a
+
+DURATION_PART = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([wdhms])", re.IGNORECASE)
+DURATION_UNITS = {'w': 'weeks', 'd': 'days', 'h': 'hours', 'm': 'minutes', 's': 'seconds'}
 
 
 def class_name(obj):
@@ -72,40 +76,40 @@ def get_preferred_sources() -> list[str]:
     return DATA_PREF_ORDER
 
 
+def parse_duration(string: str) -> timedelta:
+    # Durations such as '90m', '12h', '30d' or '2w', or sums of them such as '1d12h'
+    duration = timedelta()
+    position = 0
+    for match in DURATION_PART.finditer(string):
+        if match.start() != position:
+            break
+        duration += timedelta(**{DURATION_UNITS[match.group(2).lower()]: float(match.group(1))})
+        position = match.end()
+    if position == 0 or string[position:].strip():
+        raise ValueError(f"Invalid duration '{string}'; use a number and a unit of w, d, h, m or s, e.g. '30d'")
+    return duration
+
+
 def logger_init(path):
-    log_path = path / 'logs.txt'
-    logging.basicConfig(
-        filename=log_path,
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s')
-
-    console_handler = logging.StreamHandler()
-
-    formatter = colorlog.ColoredFormatter(
-        "%(asctime)s - %(log_color)s%(levelname)s - %(message)s",
-        log_colors={
-            'DEBUG': 'white',
-            'INFO': 'white',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_yellow',
-        },
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-
-    console_handler.setFormatter(formatter)
-    root_logger = logging.getLogger()
-    root_logger.addHandler(console_handler)
+    logutils.configure(path / 'logs.txt')
 
 
 def timestamp_generate():
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    return datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+
+
+def timestamp_parse(timestamp) -> Optional[datetime]:
+    # The time of a timestamp of timestamp_generate, or None if it is not one
+    try:
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
 
 
 def timestamp_validate(timestamp):
     valid = True
     try:
-        datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+        datetime.strptime(timestamp, TIMESTAMP_FORMAT)
     except ValueError:
         valid = False
     return valid
@@ -115,5 +119,6 @@ def update_api_data(video, api: MetadataSource, **kwargs) -> None:
     required_params = api.get_required_params()
     if missing := find_missing_params(required_params, kwargs):
         raise ValueError(f"Parameters {missing} were not supplied and could not be retrieved from '{video}' metadata")
-    data = api.fetch_data(**kwargs)
+    with metricsutils.timed('fetch', source=api.get_name()):
+        data = api.fetch_data(**kwargs)
     video.set_source_data(api.get_name(), data)
@@ -0,0 +1,78 @@
+# ./source/utils/lockutils.py
+
+"""
+    Advisory file locks shared between pyvorg processes.
+
+    Readers take a shared lock and writers an exclusive one, so any number
+    of processes can load the state at once while a save waits for them,
+    and the other way around. Locks are held on a separate lock file rather
+    than the data files, which are replaced rather than written in place.
+    Windows has no shared locks, so there every lock is exclusive.
+"""
+
+# Standard library
+import os
+from pathlib import Path
+import time
+from typing import Optional
+
+# Local imports
+from source.constants import STATE_LOCK_POLL_INTERVAL, STATE_LOCK_TIMEOUT
+
+# Third-party packages
+# n/a
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock(file, shared: bool) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock(file) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(file, shared: bool) -> None:
+        fcntl.flock(file.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+
+    def _unlock(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    def __init__(self, path: Path, shared: bool = False, timeout: Optional[float] = STATE_LOCK_TIMEOUT):
+        self.path = path
+        self.shared = shared
+        self.timeout = timeout
+        self.file = None
+
+    def acquire(self) -> None:
+        file = self.path.open('a+b')
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                _lock(file, self.shared)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    file.close()
+                    raise TimeoutError(f"Timed out after {self.timeout:g} seconds waiting for '{self.path}'; "
+                                       f"another pyvorg process is using the state")
+                time.sleep(STATE_LOCK_POLL_INTERVAL)
+        self.file = file
+
+    def release(self) -> None:
+        if self.file is not None:
+            _unlock(self.file)
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,201 @@
+# ./source/utils/logutils.py
+
+"""
+    Logging that does not hold up the code doing the logging.
+
+    Records are put on a queue and written to the log file and the console
+    by a background thread. While records keep arriving the log file is
+    only flushed every LOG_BATCH_SIZE records, and again as soon as the
+    queue runs empty, so a busy scan or commit is not slowed down by a
+    flush per line. Errors are flushed straight away.
+
+    PYVORG_LOG_LEVEL sets the level for everything, and PYVORG_LOG_LEVELS
+    sets it for single modules or loggers, e.g. 'fileutils=DEBUG' to see
+    every file that is moved. Records below their level are dropped before
+    they reach the queue.
+"""
+
+# Standard library
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+from pathlib import Path
+import queue
+import sys
+from typing import Optional
+
+# Local imports
+from source.constants import ENV_LOG_LEVEL, ENV_LOG_LEVELS, LOG_BATCH_SIZE, LOG_DEFAULT_LEVEL
+
+# Third-party packages
+import colorlog
+
+FILE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+CONSOLE_FORMAT = '%(asctime)s - %(log_color)s%(levelname)s - %(message)s'
+CONSOLE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+CONSOLE_COLORS = {
+    'DEBUG': 'white',
+    'INFO': 'white',
+    'WARNING': 'yellow',
+    'ERROR': 'red',
+    'CRITICAL': 'red,bg_yellow',
+}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class BatchingFileHandler(logging.FileHandler):
+    def __init__(self, filename, mode: str = 'a', encoding: Optional[str] = None, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__(filename, mode, encoding)
+        self.batch_size = batch_size
+        self.pending = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # As StreamHandler.emit, without flushing after every record
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self.pending += 1
+            if self.pending >= self.batch_size or record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        super().flush()
+        self.pending = 0
+
+
+class BatchingQueueListener(QueueListener):
+    def dequeue(self, block: bool):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            if not block:
+                raise
+        # Nothing else is waiting to be written
+        self.flush()
+        return self.queue.get()
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+        Drops records below the level set for their module or logger.
+        Records logged through the root logger are matched by module name,
+        such as 'fileutils'; records from named loggers are also matched by
+        the logger's name and its parents, such as 'urllib3'.
+    """
+    def __init__(self, level: int = logging.INFO, levels: Optional[dict[str, int]] = None):
+        super().__init__()
+        self.level = level
+        self.levels = levels or {}
+        self.cache = {}
+
+    def get_level(self, name: str, module: str) -> int:
+        key = (name, module)
+        level = self.cache.get(key)
+        if level is None:
+            level = self.levels.get(module)
+            while level is None and name:
+                level = self.levels.get(name)
+                name = name.rpartition('.')[0]
+            if level is None:
+                level = self.level
+            self.cache[key] = level
+        return level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.get_level(record.name, record.module)
+
+
+def parse_level(name: str) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"'{name}' is not a logging level")
+    return level
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    levels = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        module, sep, level = entry.partition('=')
+        if not sep or not module.strip():
+            raise ValueError(f"'{entry}' should be written as <module>=<level>")
+        levels[module.strip()] = parse_level(level)
+    return levels
+
+
+def get_levels() -> tuple[int, dict[str, int], list[str]]:
+    # Invalid settings are reported once logging is running
+    problems = []
+    try:
+        level = parse_level(os.getenv(ENV_LOG_LEVEL) or LOG_DEFAULT_LEVEL)
+    except ValueError as e:
+        problems.append(f"Ignoring {ENV_LOG_LEVEL}: {e}")
+        level = parse_level(LOG_DEFAULT_LEVEL)
+    try:
+        levels = parse_levels(os.getenv(ENV_LOG_LEVELS, ''))
+    except ValueError as e:
+        problems.append(f"Ignoring {ENV_LOG_LEVELS}: {e}")
+        levels = {}
+    return level, levels, problems
+
+
+def create_console_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(colorlog.ColoredFormatter(CONSOLE_FORMAT, log_colors=CONSOLE_COLORS,
+                                                   datefmt=CONSOLE_DATE_FORMAT))
+    return handler
+
+
+def create_file_handler(log_path: Path) -> logging.Handler:
+    handler = BatchingFileHandler(log_path)
+    handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    return handler
+
+
+def configure(log_path: Path, handlers: Optional[list[logging.Handler]] = None) -> QueueListener:
+    global _listener, _queue_handler
+    stop()
+
+    level, levels, problems = get_levels()
+    handlers = handlers if handlers is not None else [create_file_handler(log_path), create_console_handler()]
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _queue_handler.addFilter(ModuleLevelFilter(level, levels))
+    _listener = BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root_logger = logging.getLogger()
+    # The logger itself lets through the most verbose level any module asks for
+    root_logger.setLevel(min([level, *levels.values()]))
+    root_logger.addHandler(_queue_handler)
+    _listener.start()
+
+    for problem in problems:
+        logging.warning(problem)
+    return _listener
+
+
+def stop() -> None:
+    # Writes out whatever is still queued; safe to call more than once
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop)
@@ -0,0 +1,178 @@
+# ./source/utils/metricsutils.py
+
+"""
+    Counters and latency histograms recorded while a command runs.
+
+    Services and hot helpers record what they do under a metric name and
+    optional labels. timed() records how long a block takes in the
+    '<name>_seconds' histogram and counts failures in '<name>_errors_total'.
+    Bytes are counted in '<name>_bytes_total', and the summary reports
+    throughput for every name that has both. The summary is written as JSON
+    at the end of each command and can also be exported in the Prometheus
+    text format.
+"""
+
+# Standard library
+from bisect import bisect_left
+from contextlib import contextmanager
+import json
+import math
+from pathlib import Path
+import threading
+import time
+
+# Local imports
+from source.constants import METRICS_LATENCY_BUCKETS, METRICS_PREFIX
+
+# Third-party packages
+# n/a
+
+MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: dict[MetricKey, float] = {}
+_histograms: dict[MetricKey, 'Histogram'] = {}
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, bounds: tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.bounds = bounds
+        # The last bucket holds observations above the largest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        # Estimated as the upper bound of the bucket the quantile falls in
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99)
+        }
+
+
+def get_key(name: str, labels: dict) -> MetricKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def format_key(key: MetricKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{label}="{value}"' for label, value in labels) + '}'
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    key = get_key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    key = get_key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+@contextmanager
+def timed(name: str, **labels):
+    # Also usable as a decorator
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        increment(f'{name}_errors_total', **labels)
+        raise
+    finally:
+        observe(f'{name}_seconds', time.perf_counter() - start, **labels)
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def get_summary() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: histogram.to_dict() for key, histogram in _histograms.items()}
+
+    throughput = {}
+    for (name, labels), total in counters.items():
+        if not name.endswith('_bytes_total'):
+            continue
+        stage = name[:-len('_bytes_total')]
+        seconds = histograms.get((f'{stage}_seconds', labels), {}).get('sum')
+        if seconds:
+            throughput[format_key((f'{stage}_bytes_per_second', labels))] = total / seconds
+
+    return {
+        'counters': {format_key(key): value for key, value in sorted(counters.items())},
+        'histograms': {format_key(key): value for key, value in sorted(histograms.items())},
+        'throughput': throughput
+    }
+
+
+def to_prometheus() -> str:
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, histogram, list(histogram.counts)) for key, histogram in _histograms.items())
+
+    lines = []
+    declared = set()
+    for (name, labels), value in counters:
+        metric = METRICS_PREFIX + name
+        if metric not in declared:
+            lines.append(f'# TYPE {metric} counter')
+            declared.add(metric)
+        lines.append(f'{format_key((metric, labels))} {value}')
+
+    for (name, labels), histogram, counts in histograms:
+        metric = METRICS_PREFIX + name
+        if metric not in declared:
+            lines.append(f'# TYPE {metric} histogram')
+            declared.add(metric)
+        cumulative = 0
+        for bound, count in zip(list(histogram.bounds) + ['+Inf'], counts):
+            cumulative += count
+            lines.append(f'{format_key((metric + "_bucket", labels + (("le", str(bound)),)))} {cumulative}')
+        lines.append(f'{format_key((metric + "_sum", labels))} {histogram.sum}')
+        lines.append(f'{format_key((metric + "_count", labels))} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_summary(path: Path) -> None:
+    path.write_text(json.dumps(get_summary(), indent=4))
+
+
+def write_prometheus(path: Path) -> None:
+    path.write_text(to_prometheus())
@@ -1,8 +1,13 @@
 # source/utils/packageutils.py
 
 # Standard library
+import ast
 import importlib
+import importlib.util
 import inspect
+import json
+import logging
+from pathlib import Path
 import pkgutil
 from types import ModuleType
 from typing import Optional, Type, TypeVar
@@ -15,6 +20,9 @@ from typing import Optional, Type, TypeVar
 
 T = TypeVar('T')
 
+# Registries built this session, keyed by package location, base class and identifier
+_registries: dict[tuple, dict[str, str]] = {}
+
 
 def discover_subclasses(base_class: type[T], modules) -> dict[str, Type[T]]:
     return {
@@ -46,7 +54,143 @@ def discover_plugins(package: ModuleType, base_class: type[T], identifier: str)
     }
 
 
-def get_class_instance(class_name: str, package: ModuleType, base_class: Type[T], identifier: str = '') -> Optional[T]:
+def get_module_paths(package: ModuleType, identifier: str) -> dict[str, str]:
+    modules = pkgutil.iter_modules(package.__path__, package.__name__ + '.')
+    module_paths = {}
+    for _, name, _ in modules:
+        if identifier not in name:
+            continue
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.origin is not None:
+            module_paths[name] = spec.origin
+    return module_paths
+
+
+def get_package_signature(module_paths: dict[str, str]) -> list[list]:
+    # Any added, removed or modified module changes the signature
+    return sorted(
+        [name, Path(path).stat().st_mtime_ns]
+        for name, path
+        in module_paths.items()
+    )
+
+
+def scan_subclass_names(module_path: str, base_class: type) -> list[str]:
+    # Reads class definitions from source so that the module is not imported
+    try:
+        tree = ast.parse(Path(module_path).read_text(encoding='utf-8'))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return []
+
+    known = {base_class.__name__}
+    found = []
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name in known:
+                continue
+            base_names = {
+                base.id if isinstance(base, ast.Name) else base.attr
+                for base
+                in node.bases
+                if isinstance(base, (ast.Name, ast.Attribute))
+            }
+            if base_names & known:
+                known.add(node.name)
+                found.append(node.name)
+                changed = True
+    return found
+
+
+def build_registry(package: ModuleType, base_class: type, identifier: str) -> dict[str, str]:
+    return {
+        class_name: module_name
+        for module_name, module_path
+        in get_module_paths(package, identifier).items()
+        for class_name
+        in scan_subclass_names(module_path, base_class)
+    }
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    try:
+        with manifest_path.open('r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(manifest_path: Path, manifest: dict) -> None:
+    try:
+        with manifest_path.open('w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+    except OSError as e:
+        logging.warning(f"Could not write plugin manifest '{manifest_path}': {e}")
+
+
+def get_registry(package: ModuleType,
+                 base_class: type,
+                 identifier: str = '',
+                 manifest_path: Optional[Path] = None
+                 ) -> dict[str, str]:
+    """
+    Returns a mapping of class name to the name of the module defining it.
+    The registry is built once per session without importing any modules and,
+    when a manifest path is given, reused across sessions until a module in the
+    package is added, removed or modified.
+    """
+    key = (tuple(package.__path__), base_class.__module__, base_class.__name__, identifier)
+    if key in _registries:
+        return _registries[key]
+
+    if manifest_path is None:
+        registry = build_registry(package, base_class, identifier)
+    else:
+        manifest_key = '|'.join([*key[0], *key[1:]])
+        signature = get_package_signature(get_module_paths(package, identifier))
+        manifest = load_manifest(manifest_path)
+        entry = manifest.get(manifest_key)
+        if isinstance(entry, dict) and entry.get('signature') == signature:
+            registry = entry.get('classes', {})
+        else:
+            registry = build_registry(package, base_class, identifier)
+            manifest[manifest_key] = {'signature': signature, 'classes': registry}
+            save_manifest(manifest_path, manifest)
+
+    _registries[key] = registry
+    return registry
+
+
+def clear_registries() -> None:
+    _registries.clear()
+
+
+def get_class(class_name: str,
+              package: ModuleType,
+              base_class: Type[T],
+              identifier: str = '',
+              manifest_path: Optional[Path] = None
+              ) -> Optional[Type[T]]:
+    module_name = get_registry(package, base_class, identifier, manifest_path).get(class_name)
+    if module_name is not None:
+        class_object = getattr(importlib.import_module(module_name), class_name, None)
+        if inspect.isclass(class_object) and issubclass(class_object, base_class):
+            return class_object
+
+    # Classes the source scan cannot see, such as ones created dynamically,
+    # are still found by importing the package's modules
+    return discover_plugins(package, base_class, identifier).get(class_name)
+
+
+def get_class_instance(class_name: str,
+                       package: ModuleType,
+                       base_class: Type[T],
+                       identifier: str = '',
+                       manifest_path: Optional[Path] = None
+                       ) -> Optional[T]:
     # TODO: Consider raising if None
-    class_object = discover_plugins(package, base_class, identifier).get(class_name)
+    class_object = get_class(class_name, package, base_class, identifier, manifest_path)
     return class_object()
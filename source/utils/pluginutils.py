@@ -4,6 +4,7 @@
 import importlib
 import inspect
 import pkgutil
+from pathlib import Path
 from typing import Optional, Type
 from types import ModuleType
 
@@ -45,10 +46,15 @@ def discover_plugins(package: ModuleType) -> dict[str, type[MetadataSource]]:
     }
 
 
-def get_plugin_instance(api_name: str, package: ModuleType = datasources) -> Optional[MetadataSource]:
-    # TODO: Consider raising if None
-    plugin_class = packageutils.discover_plugins(package, MetadataSource, '_plugin').get(api_name)
-    return plugin_class()
+def get_plugin_instance(api_name: str,
+                        package: ModuleType = datasources,
+                        manifest_path: Optional[Path] = None
+                        ) -> Optional[MetadataSource]:
+    return packageutils.get_class_instance(api_name, package, MetadataSource, '_plugin', manifest_path)
+
+
+def get_plugin_names(package: ModuleType = datasources, manifest_path: Optional[Path] = None) -> list[str]:
+    return list(packageutils.get_registry(package, MetadataSource, '_plugin', manifest_path).keys())
 
 
 def get_required_params(api: MetadataSource) -> list[str]:
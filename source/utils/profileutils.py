@@ -0,0 +1,149 @@
+# ./source/utils/profileutils.py
+
+"""
+    Profiling of whole commands, for attaching to performance bug reports.
+
+    The 'cprofile' mode records every function call with cProfile and
+    writes a .prof file that pstats, snakeviz and similar tools can read.
+    The 'sample' mode looks at the profiled thread's stack at a fixed
+    interval instead, which costs far less on long runs, and writes the
+    stacks in the folded format read by flamegraph.pl and speedscope.
+    Both print a summary of the functions where the most time was spent.
+"""
+
+# Standard library
+from collections import Counter
+from contextlib import contextmanager
+import cProfile
+from datetime import datetime
+import io
+import os
+from pathlib import Path
+import pstats
+import sys
+import threading
+from typing import Optional
+
+# Local imports
+from source.constants import PROFILE_CPROFILE, PROFILE_MODES, PROFILE_SAMPLE, PROFILE_SAMPLE_INTERVAL, \
+                             PROFILE_TOP_N
+from source.utils import configutils
+
+# Third-party packages
+# n/a
+
+
+class FunctionProfiler:
+    extension = '.prof'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+
+    def write(self, path: Path) -> None:
+        self.profiler.dump_stats(str(path))
+
+    def get_summary(self, top: int) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        # Sorted by the time spent in each function itself, so entry points
+        # that only call the slow code do not crowd out the hot functions
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        return stream.getvalue()
+
+
+class SamplingProfiler:
+    extension = '.folded'
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.stopping = threading.Event()
+        self.sampler = None
+
+    def start(self) -> None:
+        self.thread_id = self.thread_id or threading.get_ident()
+        self.stopping.clear()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+    def _sample(self) -> None:
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(get_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def write(self, path: Path) -> None:
+        with path.open('w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{';'.join(stack)} {count}\n")
+
+    def get_summary(self, top: int) -> str:
+        samples = sum(self.stacks.values())
+        if not samples:
+            return "No samples were taken\n"
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            # A recursive function counts once per sample
+            for name in set(stack):
+                total[name] += count
+
+        lines = [f"{samples} samples every {self.interval * 1000:g} ms", f"{'own':>7} {'total':>7}  function"]
+        for name, count in own.most_common(top):
+            lines.append(f"{count / samples:7.1%} {total[name] / samples:7.1%}  {name}")
+        return '\n'.join(lines) + '\n'
+
+
+def get_frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def get_profiler(mode: str):
+    if mode == PROFILE_CPROFILE:
+        return FunctionProfiler()
+    if mode == PROFILE_SAMPLE:
+        return SamplingProfiler()
+    raise ValueError(f"'{mode}' is not a valid profiling mode; choose from {', '.join(PROFILE_MODES)}")
+
+
+def get_output_path(output_dir: Path, name: str, extension: str) -> Path:
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return output_dir / f"{name}-{timestamp}{extension}"
+
+
+@contextmanager
+def profiled(name: str,
+             mode: str = PROFILE_CPROFILE,
+             top: int = PROFILE_TOP_N,
+             output_dir: Optional[Path] = None):
+    # Yields a report that is filled in with the profile's path and summary
+    # when the block exits, including when it raises
+    profiler = get_profiler(mode)
+    report = {}
+    profiler.start()
+    try:
+        yield report
+    finally:
+        profiler.stop()
+        path = get_output_path(output_dir or configutils.get_profiler_dir(), name, profiler.extension)
+        profiler.write(path)
+        report['path'] = path
+        report['summary'] = profiler.get_summary(top)
@@ -0,0 +1,175 @@
+# ./source/utils/progressutils.py
+
+"""
+    Run-level progress reporting shared by scan, import and commit.
+
+    A service starts tracking with track(), giving the number of items and
+    bytes it expects when it knows them. Code further down, such as
+    hash_sha256 or a command executing, reports to whatever is being
+    tracked through get_current() and does not need to be handed a progress
+    object. Reports are cheap and may come from any thread; the display is
+    only redrawn every PROGRESS_REFRESH_INTERVAL seconds.
+
+    On a terminal, progress is drawn on one line of stderr. Otherwise a log
+    line is written every PROGRESS_LOG_INTERVAL seconds, so redirected
+    output is not flooded. Setting PYVORG_PROGRESS to 'bar', 'log' or 'off'
+    overrides the choice. Outside of track() reports do nothing.
+"""
+
+# Standard library
+from contextlib import contextmanager
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Iterable, Iterator, Optional, TextIO
+
+# Local imports
+from source.constants import ENV_PROGRESS, PROGRESS_AUTO, PROGRESS_BAR, PROGRESS_LOG, PROGRESS_LOG_INTERVAL, \
+                             PROGRESS_MODES, PROGRESS_OFF, PROGRESS_REFRESH_INTERVAL
+
+# Third-party packages
+# n/a
+
+
+class NullProgress:
+    def update(self, items: int = 0, size: int = 0) -> None:
+        pass
+
+    def iterate(self, iterable: Iterable) -> Iterator:
+        return iter(iterable)
+
+
+class Progress(NullProgress):
+    def __init__(self,
+                 description: str,
+                 total_items: Optional[int] = None,
+                 total_bytes: Optional[int] = None,
+                 mode: str = PROGRESS_BAR,
+                 stream: Optional[TextIO] = None):
+        self.description = description
+        self.total_items = total_items
+        self.total_bytes = total_bytes
+        self.mode = mode
+        self.stream = stream or sys.stderr
+        self.interval = PROGRESS_LOG_INTERVAL if mode == PROGRESS_LOG else PROGRESS_REFRESH_INTERVAL
+        self.items = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.next_report = self.started + self.interval
+        self.width = 0
+        self.lock = threading.Lock()
+
+    def update(self, items: int = 0, size: int = 0) -> None:
+        with self.lock:
+            self.items += items
+            self.bytes += size
+            now = time.monotonic()
+            if now < self.next_report:
+                return
+            self.next_report = now + self.interval
+            text = self.format(now)
+        self.emit(text)
+
+    def iterate(self, iterable: Iterable) -> Iterator:
+        for item in iterable:
+            yield item
+            self.update(items=1)
+
+    def close(self) -> None:
+        with self.lock:
+            text = self.format(time.monotonic())
+        if self.mode == PROGRESS_BAR:
+            self.emit(text)
+            self.stream.write('\n')
+            self.stream.flush()
+        else:
+            logging.info(text)
+
+    def emit(self, text: str) -> None:
+        if self.mode == PROGRESS_BAR:
+            # Pad over the end of a longer previous line
+            self.stream.write('\r' + text.ljust(self.width))
+            self.stream.flush()
+            self.width = len(text)
+        elif self.mode == PROGRESS_LOG:
+            logging.info(text)
+
+    def format(self, now: float) -> str:
+        elapsed = max(now - self.started, 1e-9)
+        parts = [f"[{self.description}]", format_count(self.items, self.total_items)]
+        if self.bytes or self.total_bytes:
+            parts.append(format_count(self.bytes, self.total_bytes, format_bytes))
+            parts.append(f"{format_bytes(self.bytes / elapsed)}/s")
+        else:
+            parts.append(f"{self.items / elapsed:,.1f}/s")
+
+        done, total = (self.bytes, self.total_bytes) if self.total_bytes else (self.items, self.total_items)
+        if total and done:
+            remaining = elapsed * (total - done) / done
+            parts.append(f"ETA {format_duration(max(remaining, 0))}")
+        else:
+            parts.append(f"elapsed {format_duration(elapsed)}")
+        return '  '.join(parts)
+
+
+_lock = threading.Lock()
+_current: list[NullProgress] = []
+_null = NullProgress()
+
+
+def get_current() -> NullProgress:
+    return _current[-1] if _current else _null
+
+
+def get_mode(stream: TextIO) -> str:
+    mode = os.getenv(ENV_PROGRESS, PROGRESS_AUTO).lower()
+    if mode not in PROGRESS_MODES:
+        logging.warning(f"Ignoring {ENV_PROGRESS}='{mode}'; expected one of {', '.join(PROGRESS_MODES)}")
+        mode = PROGRESS_AUTO
+    if mode == PROGRESS_AUTO:
+        isatty = getattr(stream, 'isatty', None)
+        mode = PROGRESS_BAR if isatty is not None and isatty() else PROGRESS_LOG
+    return mode
+
+
+@contextmanager
+def track(description: str,
+          total_items: Optional[int] = None,
+          total_bytes: Optional[int] = None,
+          stream: Optional[TextIO] = None):
+    stream = stream or sys.stderr
+    mode = get_mode(stream)
+    progress = _null if mode == PROGRESS_OFF else Progress(description, total_items, total_bytes, mode, stream)
+    with _lock:
+        _current.append(progress)
+    try:
+        yield progress
+    finally:
+        with _lock:
+            _current.remove(progress)
+        if progress is not _null:
+            progress.close()
+
+
+def format_bytes(size: float) -> str:
+    if abs(size) < 1000:
+        return f"{size:.0f} B"
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1000
+        if abs(size) < 1000:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1000:.1f} TB"
+
+
+def format_count(count: float, total: Optional[float], formatter=lambda x: f"{x:,}") -> str:
+    if total:
+        return f"{formatter(count)}/{formatter(total)}"
+    return formatter(count)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
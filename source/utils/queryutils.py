@@ -0,0 +1,330 @@
+# ./source/utils/queryutils.py
+
+"""
+    The filter language: conditions on the preferred values of videos,
+    combined with 'and', 'or', 'not' and parentheses.
+
+    A condition is a key, an operator and a value:
+        year>1990           =, !=, <, <=, > and >= compare numbers, or text
+                            when the value has no leading number
+        title+alien         contains; 'title contains alien' is the same
+        title-alien         does not contain
+        title^the           starts with; also 'title startswith the'
+        title~^the .*man$   matches a regular expression, ignoring case;
+                            also 'title matches ...'
+        year in (1999, 2001) equals one of the values
+        imdbid exists       has a value
+
+    Text is compared ignoring case. Values run to the next ')', 'and' or
+    'or' that is followed by another condition, or are quoted with ' or "
+    and may then contain quotes escaped with a backslash.
+    Each string given with -f is a query; the queries must all match.
+
+    Queries are compiled into a plan of nodes. The children of 'and' and
+    'or' are ordered so that cheap conditions run first, and each child is
+    evaluated only for videos its siblings have not decided yet. A plan is
+    evaluated one video at a time with matches, or over a whole column
+    store with get_mask, which lets the store use its indexes, such as the
+    trigram index of titles in the snapshot.
+"""
+
+# Standard library
+import re
+from typing import Any, Callable, Optional
+
+# Local imports
+from source.utils.filter import CONTAINS, EQUAL, EXISTS, GREATER, GREATER_EQUAL, IN, LESS, LESS_EQUAL, \
+                                NOT_CONTAINS, NOT_EQUAL, PREFIX, REGEX, Filter
+
+# Third-party packages
+# n/a
+
+WORD_OPERATORS = {'contains': CONTAINS, 'startswith': PREFIX, 'matches': REGEX}
+SYMBOL_OPERATOR = re.compile(r"\s*(!=|<=|>=|[<>=+\-^~])")
+KEY = re.compile(r"\s*(\w+)")
+KEYWORD = re.compile(r"\s*(and|or|not|in|exists|contains|startswith|matches)\b", re.IGNORECASE)
+# What may follow 'and' or 'or' for them to end an unquoted value
+CONDITION_START = re.compile(r"\s*(not\b|\(|\w+\s*(!=|<=|>=|[<>=+\-^~]|(in|exists|contains|startswith|matches)\b))",
+                             re.IGNORECASE)
+VALUE_END = re.compile(r"\s+(and|or)\s", re.IGNORECASE)
+
+# Relative cost of evaluating each operator, by which siblings are ordered
+OPERATOR_COSTS = {
+    EXISTS: 1,
+    EQUAL: 2, NOT_EQUAL: 2, IN: 2,
+    LESS: 3, LESS_EQUAL: 3, GREATER: 3, GREATER_EQUAL: 3,
+    PREFIX: 4,
+    CONTAINS: 5, NOT_CONTAINS: 5,
+    REGEX: 8
+}
+
+# Returns the parts of Filter.get_parts for a key
+PartsGetter = Callable[[str], Optional[tuple[Any, str]]]
+
+
+class Condition:
+    def __init__(self, f: Filter):
+        self.filter = f
+
+    def get_cost(self) -> int:
+        return OPERATOR_COSTS.get(self.filter.operator, 3)
+
+    def get_keys(self) -> list[str]:
+        return [self.filter.key]
+
+    def matches(self, get_parts: PartsGetter) -> bool:
+        return self.filter.matches_parts(get_parts(self.filter.key))
+
+    def get_mask(self, store, within):
+        return store.get_filter_mask(self.filter, within) & within
+
+
+class And:
+    def __init__(self, children: list):
+        self.children = children
+
+    def get_cost(self) -> int:
+        return sum(child.get_cost() for child in self.children)
+
+    def get_keys(self) -> list[str]:
+        return [key for child in self.children for key in child.get_keys()]
+
+    def matches(self, get_parts: PartsGetter) -> bool:
+        for child in self.children:
+            if not child.matches(get_parts):
+                return False
+        return True
+
+    def get_mask(self, store, within):
+        # Each child only decides the rows that all children before it matched
+        for child in self.children:
+            if not within.any():
+                break
+            within = child.get_mask(store, within)
+        return within
+
+
+class Or:
+    def __init__(self, children: list):
+        self.children = children
+
+    def get_cost(self) -> int:
+        return sum(child.get_cost() for child in self.children)
+
+    def get_keys(self) -> list[str]:
+        return [key for child in self.children for key in child.get_keys()]
+
+    def matches(self, get_parts: PartsGetter) -> bool:
+        for child in self.children:
+            if child.matches(get_parts):
+                return True
+        return False
+
+    def get_mask(self, store, within):
+        # Each child only decides the rows that no child before it matched
+        matched = within & False
+        for child in self.children:
+            undecided = within & ~matched
+            if not undecided.any():
+                break
+            matched |= child.get_mask(store, undecided)
+        return matched
+
+
+class Not:
+    def __init__(self, child):
+        self.child = child
+
+    def get_cost(self) -> int:
+        return self.child.get_cost()
+
+    def get_keys(self) -> list[str]:
+        return self.child.get_keys()
+
+    def matches(self, get_parts: PartsGetter) -> bool:
+        return not self.child.matches(get_parts)
+
+    def get_mask(self, store, within):
+        return within & ~self.child.get_mask(store, within)
+
+
+def optimize(node):
+    # Flattens nested 'and' and 'or', removes double negations and puts cheap children first
+    if isinstance(node, Not):
+        child = optimize(node.child)
+        return child.child if isinstance(child, Not) else Not(child)
+    if isinstance(node, (And, Or)):
+        children = []
+        for child in map(optimize, node.children):
+            children.extend(child.children if type(child) is type(node) else [child])
+        if len(children) == 1:
+            return children[0]
+        return type(node)(sorted(children, key=lambda child: child.get_cost()))
+    return node
+
+
+def compile_query(filter_strings: Optional[list[str]]):
+    """
+    Parses the queries in 'filter_strings' into a plan matching videos that
+    all of them match, or None when there are none
+    """
+    if not filter_strings:
+        return None
+    return optimize(And([parse_query(string) for string in filter_strings]))
+
+
+def get_video_parts(video) -> PartsGetter:
+    # The parts of the preferred values of 'video', as conditions compare them
+    return lambda key: Filter.get_parts(video.get_pref_data(key))
+
+
+def parse_query(string: str):
+    return QueryParser(string).parse()
+
+
+class QueryParser:
+    def __init__(self, string: str):
+        self.string = string
+        self.position = 0
+        self.depth = 0
+
+    def error(self, expected: str) -> ValueError:
+        return ValueError(f"Invalid filter string '{self.string}': expected {expected} at position {self.position}")
+
+    def parse(self):
+        node = self.parse_or()
+        if self.string[self.position:].strip():
+            raise self.error("'and', 'or' or the end")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.accept_keyword('or'):
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.accept_keyword('and'):
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self):
+        if self.accept_keyword('not'):
+            return Not(self.parse_not())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        if self.accept('('):
+            self.depth += 1
+            node = self.parse_or()
+            if not self.accept(')'):
+                raise self.error("')'")
+            self.depth -= 1
+            return node
+        return self.parse_condition()
+
+    def parse_condition(self) -> Condition:
+        match = KEY.match(self.string, self.position)
+        if match is None or match.group(1).lower() in ('and', 'or', 'not'):
+            raise self.error("a key")
+        self.position = match.end()
+        key = match.group(1).lower()
+
+        match = SYMBOL_OPERATOR.match(self.string, self.position)
+        if match is not None:
+            self.position = match.end()
+            operator = match.group(1)
+            return Condition(Filter(key, operator, self.parse_value(operator)))
+
+        keyword = self.accept_keyword('exists', 'in', *WORD_OPERATORS)
+        if keyword == EXISTS:
+            return Condition(Filter(key, EXISTS, None))
+        elif keyword == IN:
+            return Condition(Filter(key, IN, self.parse_list()))
+        elif keyword is not None:
+            operator = WORD_OPERATORS[keyword]
+            return Condition(Filter(key, operator, self.parse_value(operator)))
+        raise self.error("an operator")
+
+    def parse_list(self) -> list[str]:
+        if not self.accept('('):
+            raise self.error("'('")
+        values = [self.parse_item()]
+        while self.accept(','):
+            values.append(self.parse_item())
+        if not self.accept(')'):
+            raise self.error("',' or ')'")
+        return values
+
+    def parse_item(self) -> str:
+        quoted = self.parse_quoted()
+        if quoted is not None:
+            return quoted.lower()
+        end = self.position
+        while end < len(self.string) and self.string[end] not in ',)':
+            end += 1
+        value = self.string[self.position:end].strip()
+        if not value:
+            raise self.error("a value")
+        self.position = end
+        return value.lower()
+
+    def parse_value(self, operator: str) -> str:
+        quoted = self.parse_quoted()
+        if quoted is None:
+            quoted = self.parse_unquoted()
+        # Regular expressions keep their case, since '\D' is not '\d'
+        return quoted if operator == REGEX else quoted.lower()
+
+    def parse_quoted(self) -> Optional[str]:
+        start = self.position
+        while start < len(self.string) and self.string[start].isspace():
+            start += 1
+        if start == len(self.string) or self.string[start] not in '\'"':
+            return None
+        quote = self.string[start]
+        chars = []
+        position = start + 1
+        while position < len(self.string) and self.string[position] != quote:
+            if self.string[position] == '\\' and position + 1 < len(self.string):
+                position += 1
+            chars.append(self.string[position])
+            position += 1
+        # Without a closing quote, the quote is part of an unquoted value, as in "title='71"
+        if position == len(self.string):
+            return None
+        self.position = position + 1
+        return ''.join(chars)
+
+    def parse_unquoted(self) -> str:
+        end = len(self.string)
+        # Inside parentheses, a value ends at the first ')'
+        if self.depth:
+            closing = self.string.find(')', self.position)
+            end = closing if closing != -1 else end
+        for match in VALUE_END.finditer(self.string, self.position, end):
+            if CONDITION_START.match(self.string, match.end() - 1, end):
+                end = match.start()
+                break
+        value = self.string[self.position:end].strip()
+        if not value:
+            raise self.error("a value")
+        self.position = end
+        return value
+
+    def accept(self, char: str) -> bool:
+        position = self.position
+        while position < len(self.string) and self.string[position].isspace():
+            position += 1
+        if self.string.startswith(char, position):
+            self.position = position + len(char)
+            return True
+        return False
+
+    def accept_keyword(self, *keywords: str) -> Optional[str]:
+        match = KEYWORD.match(self.string, self.position)
+        if match is not None and match.group(1).lower() in keywords:
+            self.position = match.end()
+            return match.group(1).lower()
+        return None
@@ -1,31 +1,215 @@
 # source/services/serializeutils.py
 
 # Standard library
+from contextlib import contextmanager
+import csv
+import gc
+import io
 import pickle
 import json
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
 
 # Local imports
+from source.constants import IMPORT_MAX_MEMBER_SIZE
+from source.exceptions import ValidationError
 
 # Third-party packages
 
 
+def columns_to_arrow_table(columns: dict[str, list]):
+    pyarrow = get_pyarrow()
+    return pyarrow.table(columns)
+
+
+def columns_to_csv_chunks(columns: dict[str, list]) -> Iterator[str]:
+    """
+    Serializes equal-length columns as CSV, one row at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns.keys())
+    for row in zip(*columns.values()):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
 def dict_to_json(input_dict: dict):
     return json.dumps(input_dict,
                       indent=4,
                       skipkeys=True)
 
 
+def records_to_json_chunks(records: Iterable[tuple[str, dict]]) -> Iterator[str]:
+    """
+    Serializes (key, value) pairs as a single compact JSON object, one member at a time
+    """
+    separator = '{'
+    for key, value in records:
+        yield separator + json.dumps(key) + ':' + json.dumps(value, separators=(',', ':'), skipkeys=True)
+        separator = ','
+    yield '{}' if separator == '{' else '}'
+
+
+def records_to_json_lines(records: Iterable[tuple[str, dict]]) -> Iterator[str]:
+    """
+    Serializes (key, value) pairs as JSON Lines, each line holding a one-member object
+    """
+    for key, value in records:
+        yield json.dumps({key: value}, separators=(',', ':'), skipkeys=True) + '\n'
+
+
+def iter_json_members(file: TextIO,
+                      chunk_size: int = 65536,
+                      max_member_size: int = IMPORT_MAX_MEMBER_SIZE) -> Iterator[tuple[str, Any]]:
+    """
+    Incrementally parses one or more top-level JSON objects from 'file' and yields
+    their members as (key, value) pairs, holding at most one member in memory.
+    Handles indented and compact JSON documents as well as JSON Lines.
+
+    :raises ValidationError: if a key or value is longer than 'max_member_size'
+        characters, so a malformed or hostile file cannot exhaust memory
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        if len(buffer) - pos > max_member_size:
+            raise ValidationError(f"A JSON key or value is longer than {max_member_size} characters")
+        chunk = file.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ''
+            read_more()
+
+    def decode():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            # A value touching the end of the buffer may have been cut short
+            if end == len(buffer) and not eof:
+                read_more()
+                continue
+            pos = end
+            return value
+
+    def expect(char):
+        nonlocal pos
+        if next_char() != char:
+            raise ValueError(f"Malformed JSON: expected '{char}' at offset {pos}")
+        pos += 1
+
+    while next_char():
+        expect('{')
+        if next_char() == '}':
+            pos += 1
+            continue
+        while True:
+            key = decode()
+            expect(':')
+            yield key, decode()
+            if next_char() == ',':
+                pos += 1
+                continue
+            expect('}')
+            break
+
+
 def dict_to_xml(input_dict: dict):
     raise NotImplementedError("dict_to_xml has not been implemented")
 
 
-def obj_to_pickle(input_obj: type(object)) -> bytes:
-    return pickle.dumps(input_obj)
+def get_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow exports require the 'pyarrow' package: pip install pyarrow")
+    return pyarrow
+
+
+@contextmanager
+def gc_paused():
+    """
+    Disables the cyclic garbage collector. Decoding a large state creates
+    millions of containers, each allocation counting towards a collection
+    that would traverse all of them and find nothing to free.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def obj_to_versioned_json(format_name: str, version: int, body: dict) -> bytes:
+    """
+    Serializes 'body' as a compact JSON document tagged with its format and
+    version. Values JSON has no type for, such as those returned by some
+    plugins, are saved as their string form rather than failing the save.
+    """
+    document = {'format': format_name, 'version': version, **body}
+    with gc_paused():
+        return json.dumps(document, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def versioned_json_to_obj(data: bytes, format_name: str, version: int) -> dict:
+    """
+    Parses a document written by obj_to_versioned_json, raising ValueError
+    if it is of another format or of a version newer than 'version'
+    """
+    with gc_paused():
+        document = json.loads(data)
+    if not isinstance(document, dict) or document.get('format') != format_name:
+        raise ValueError(f"The data is not a '{format_name}' document")
+    found = document.get('version')
+    if not isinstance(found, int) or found > version:
+        raise ValueError(f"'{format_name}' version {found} is not supported; "
+                         f"it was written by a newer version of pyvorg")
+    return document
+
+
+def obj_to_pickle(input_obj: type(object), persistent_id: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Pickles 'input_obj'. Objects for which 'persistent_id' returns a value
+    other than None are stored as that value instead of being pickled.
+    """
+    if persistent_id is None:
+        return pickle.dumps(input_obj)
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer)
+    pickler.persistent_id = persistent_id
+    pickler.dump(input_obj)
+    return buffer.getvalue()
 
 
-def pickle_to_object(pickle_bytes: bytes) -> type(object):
+def pickle_to_object(pickle_bytes: bytes, persistent_load: Optional[Callable[[Any], Any]] = None) -> type(object):
     try:
-        obj = pickle.loads(pickle_bytes)
+        unpickler = pickle.Unpickler(io.BytesIO(pickle_bytes))
+        if persistent_load is not None:
+            unpickler.persistent_load = persistent_load
+        obj = unpickler.load()
         if isinstance(obj, object):
             return obj
     except EOFError:
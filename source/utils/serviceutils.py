@@ -13,6 +13,4 @@ from source import services
 
 
 def get_service_instance(service_name: str, package: ModuleType = services) -> Optional[BaseService]:
-    # TODO: Consider raising if None
-    plugin_class = packageutils.discover_plugins(package, BaseService, '_svc').get(service_name)
-    return plugin_class()
+    return packageutils.get_class_instance(service_name, package, BaseService, '_svc')
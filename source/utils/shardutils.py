@@ -0,0 +1,415 @@
+# ./source/utils/shardutils.py
+
+"""
+    Saving and loading the collection in shards.
+
+    Videos are assigned to a shard by the first COLLECTION_SHARD_KEY_LENGTH
+    hex digits of their id, which is the hash of their contents, so a video
+    stays in its shard however often it is moved or renamed. Each shard is
+    a versioned JSON document of its own holding its videos and their
+    copies. A save only encodes the shards holding videos the collection
+    recorded as changed, and only rewrites those whose contents differ, and
+    a shard that cannot be read is set aside without losing the others.
+    Shards pickled by earlier versions are read only to convert them.
+
+    Before saving, shards that another process saved since they were read
+    are merged with this process's changes. Shards are only read again when
+    their size, inode or modification time changed. Each video is compared with the
+    shard as it was read: changes made on one side only are kept, and a
+    video changed on both sides is merged by metadata source. Where both
+    changed the file data, which is rewritten whenever a file is hashed, the
+    side that hashed it last wins; where both changed another source, this
+    process's data wins, and the videos for which it did are counted in one
+    warning per save.
+
+    The rest of the state refers to videos in the collection, for example
+    from staged commands. Those references are saved as the video's id
+    rather than as copies of the videos, and resolved against the loaded
+    collection, so commands and the collection keep sharing one MediaFile.
+"""
+
+# Standard library
+from hashlib import sha256
+import logging
+from pathlib import Path
+import pickle
+from string import hexdigits
+from typing import Any, Callable, Iterable, Optional
+
+# Local imports
+from source.constants import COLLECTION_SHARD_FORMAT, COLLECTION_SHARD_FORMAT_VERSION, \
+                             COLLECTION_SHARD_KEY_LENGTH, COLLECTION_SHARD_SUFFIX, FILE_DATA, LEGACY_SHARD_SUFFIX, \
+                             STATE_FORMAT, STATE_FORMAT_VERSION, TIMESTAMP
+from source.state.application_state import PyvorgState
+from source.state.col import Collection
+from source.state.mediafile import MediaFile
+from source.utils import fileutils, serializeutils
+
+# Third-party packages
+# n/a
+
+VIDEO_REFERENCE = 'video'
+CORRUPT_SUFFIX = '.corrupt'
+BACKUP_SUFFIX = '.bak'
+SHARD_ERRORS = (pickle.UnpicklingError, AttributeError, EOFError, ImportError, IndexError, KeyError, TypeError,
+                ValueError)
+
+
+def get_shard_key(video_id, length: int = COLLECTION_SHARD_KEY_LENGTH) -> str:
+    key = str(video_id)[:length].lower()
+    if len(key) == length and all(char in hexdigits for char in key):
+        return key
+    # Ids that are not hashes are spread over the same set of shards
+    return sha256(str(video_id).encode()).hexdigest()[:length]
+
+
+def get_shard_path(shard_dir: Path, key: str) -> Path:
+    return shard_dir / (key + COLLECTION_SHARD_SUFFIX)
+
+
+def get_shard_paths(shard_dir: Path, suffix: str = COLLECTION_SHARD_SUFFIX) -> dict[str, Path]:
+    return {path.stem: path for path in sorted(shard_dir.glob('*' + suffix))}
+
+
+def get_empty_shard() -> dict:
+    return {'videos': {}, 'copies': {}}
+
+
+def split_collection(collection: Collection) -> dict[str, dict]:
+    shards = {}
+    for video_id, video in collection.videos.items():
+        shard = shards.setdefault(get_shard_key(video_id), get_empty_shard())
+        shard['videos'][video_id] = video
+        if video_id in collection.copies:
+            shard['copies'][video_id] = collection.copies[video_id]
+    return shards
+
+
+def get_shard(collection: Collection, video_ids: Iterable[str]) -> dict:
+    shard = get_empty_shard()
+    for video_id in video_ids:
+        shard['videos'][video_id] = collection.videos[video_id]
+        if video_id in collection.copies:
+            shard['copies'][video_id] = collection.copies[video_id]
+    return shard
+
+
+def get_shard_members(collection: Collection) -> dict[str, set[str]]:
+    # The ids of each shard's videos, updated with the changes recorded since they were last known
+    changed_ids = collection.get_changed_ids()
+    if collection.shard_members is None or changed_ids is None:
+        collection.shard_members = {}
+        for video_id in collection.videos:
+            collection.shard_members.setdefault(get_shard_key(video_id), set()).add(video_id)
+        return collection.shard_members
+    for video_id in changed_ids:
+        members = collection.shard_members.setdefault(get_shard_key(video_id), set())
+        if video_id in collection.videos:
+            members.add(video_id)
+        else:
+            members.discard(video_id)
+    return collection.shard_members
+
+
+def get_file_signature(path: Path) -> Optional[tuple[int, int, int]]:
+    # Shards are replaced by renaming a new file over them, which changes the inode and mtime
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def encode_shard(shard: dict) -> bytes:
+    # Sorted, so the same videos encode the same however they were added
+    with serializeutils.gc_paused():
+        videos = {}
+        for video_id in sorted(shard['videos']):
+            record = shard['videos'][video_id].to_record()
+            # Videos are keyed by their hash, which is not saved twice
+            if record[2] == video_id:
+                record[2] = None
+            videos[video_id] = record
+    copies = {video_id: shard['copies'][video_id] for video_id in sorted(shard['copies'])}
+    return serializeutils.obj_to_versioned_json(COLLECTION_SHARD_FORMAT,
+                                                COLLECTION_SHARD_FORMAT_VERSION,
+                                                {'videos': videos, 'copies': copies})
+
+
+def read_shard(data: Optional[bytes]) -> dict:
+    if data is None:
+        return get_empty_shard()
+    document = serializeutils.versioned_json_to_obj(data, COLLECTION_SHARD_FORMAT, COLLECTION_SHARD_FORMAT_VERSION)
+    if not isinstance(document['videos'], dict) or not isinstance(document['copies'], dict):
+        raise TypeError("The data is not a collection shard")
+    with serializeutils.gc_paused():
+        videos = {}
+        for video_id, record in document['videos'].items():
+            if record[2] is None:
+                record[2] = video_id
+            videos[video_id] = MediaFile.from_record(record)
+    return {'videos': videos, 'copies': document['copies']}
+
+
+def read_legacy_shard(data: bytes) -> dict:
+    shard = serializeutils.pickle_to_object(data)
+    if not isinstance(shard, dict) or not all(isinstance(shard.get(key), dict) for key in ('videos', 'copies')):
+        raise TypeError("The data is not a collection shard")
+    return shard
+
+
+def save_shards(collection: Collection, shard_dir: Path) -> dict:
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'bytes': 0}
+    changed_ids = collection.get_changed_ids()
+    if collection.shard_members is None or changed_ids is None:
+        # Changes are not known, so every shard is compared with its base,
+        # and the changes made from now on are recorded
+        keys = set(get_shard_members(collection)) | set(collection.shard_bases)
+        collection.track(collection.videos.values())
+    else:
+        keys = {get_shard_key(video_id) for video_id in changed_ids}
+        get_shard_members(collection)
+
+    for key in sorted(keys):
+        path = get_shard_path(shard_dir, key)
+        members = collection.shard_members.get(key)
+        if not members:
+            # Shards that were read or saved before but have no videos left
+            collection.shard_members.pop(key, None)
+            collection.shard_stats.pop(key, None)
+            if collection.shard_bases.pop(key, None) is not None:
+                path.unlink(missing_ok=True)
+                stats['removed'] += 1
+            continue
+        data = encode_shard(get_shard(collection, members))
+        if collection.shard_bases.get(key) == data:
+            stats['unchanged'] += 1
+            continue
+        fileutils.file_replace_bytes(path, data)
+        collection.shard_bases[key] = data
+        collection.shard_stats[key] = get_file_signature(path)
+        stats['written'] += 1
+        stats['bytes'] += len(data)
+    collection.clear_changes()
+    return stats
+
+
+def load_shards(collection: Collection, shard_dir: Path, legacy: bool = False) -> dict:
+    # Legacy shards are not kept as bases, so the next save writes them all in the current format
+    stats = {'read': 0, 'corrupt': 0, 'bytes': 0}
+    collection.shard_members = None if legacy else {}
+    for key, path in get_shard_paths(shard_dir, LEGACY_SHARD_SUFFIX if legacy else COLLECTION_SHARD_SUFFIX).items():
+        signature = get_file_signature(path)
+        data = fileutils.file_read_bytes(path)
+        try:
+            shard = read_legacy_shard(data) if legacy else read_shard(data)
+        except SHARD_ERRORS as e:
+            # Kept for recovery; the other shards load as usual
+            path.replace(path.with_name(path.name + CORRUPT_SUFFIX))
+            logging.error(f"Collection shard '{path}' could not be read and was set aside: {e!r}")
+            stats['corrupt'] += 1
+            continue
+        collection.videos.update(shard['videos'])
+        collection.copies.update(shard['copies'])
+        collection.track(shard['videos'].values())
+        if not legacy:
+            collection.shard_bases[key] = data
+            collection.shard_stats[key] = signature
+            collection.shard_members[key] = set(shard['videos'])
+        stats['read'] += 1
+        stats['bytes'] += len(data)
+    collection.clear_changes()
+    collection.reindex()
+    return stats
+
+
+def merge_shards(collection: Collection, shard_dir: Path) -> dict:
+    # Call while holding the state lock, right before save_shards
+    stats = {'merged': 0, 'conflicts': 0}
+    members = None
+    for key in sorted(set(collection.shard_bases) | set(get_shard_paths(shard_dir))):
+        path = get_shard_path(shard_dir, key)
+        signature = get_file_signature(path)
+        if key in collection.shard_bases and signature == collection.shard_stats.get(key):
+            continue
+        theirs_data = path.read_bytes() if signature is not None else None
+        base_data = collection.shard_bases.get(key)
+        if theirs_data == base_data:
+            collection.shard_stats[key] = signature
+            continue
+        try:
+            base = read_shard(base_data)
+            theirs = read_shard(theirs_data)
+        except SHARD_ERRORS as e:
+            logging.error(f"Changes to collection shard '{path}' by another process could not be merged: {e!r}")
+            continue
+        if members is None:
+            members = get_shard_members(collection)
+        ours = get_shard(collection, members.get(key, ()))
+        stats['conflicts'] += merge_shard(collection, base, ours, theirs)
+        if theirs_data is None:
+            collection.shard_bases.pop(key, None)
+            collection.shard_stats.pop(key, None)
+        else:
+            collection.shard_bases[key] = theirs_data
+            collection.shard_stats[key] = signature
+        stats['merged'] += 1
+    if stats['merged']:
+        collection.reindex()
+    if stats['conflicts']:
+        logging.warning(f"{stats['conflicts']} videos were also changed by another process; "
+                        f"kept this process's data where both changed the same source")
+    return stats
+
+
+def merge_shard(collection: Collection, base: dict, ours: dict, theirs: dict) -> int:
+    # The number of videos whose sources both sides changed
+    conflicts = 0
+    video_ids = dict.fromkeys([*ours['videos'], *theirs['videos'], *base['videos']])
+    for video_id in video_ids:
+        if merge_video(collection,
+                       video_id,
+                       base['videos'].get(video_id),
+                       ours['videos'].get(video_id),
+                       theirs['videos'].get(video_id)):
+            conflicts += 1
+        copies = merge_values(base['copies'].get(video_id),
+                              ours['copies'].get(video_id),
+                              theirs['copies'].get(video_id),
+                              lambda mine, other: mine + [path for path in other if path not in mine])
+        if copies and video_id in collection.videos:
+            collection.copies[video_id] = copies
+        else:
+            collection.copies.pop(video_id, None)
+        # The merged shard is compared with theirs when saved
+        collection.mark_changed(video_id)
+    return conflicts
+
+
+def merge_video(collection: Collection,
+                video_id: str,
+                base: Optional[MediaFile],
+                ours: Optional[MediaFile],
+                theirs: Optional[MediaFile]) -> int:
+    base_data, our_data, their_data = (video.to_dict() if video is not None else None
+                                       for video in (base, ours, theirs))
+    if their_data == base_data or their_data == our_data:
+        return 0
+    if our_data == base_data or ours is None:
+        # Only they changed it, or they changed what this process removed
+        set_video(collection, video_id, ours, theirs)
+        return 0
+    if theirs is None:
+        # They removed what this process changed
+        return 0
+
+    base_data = base_data or {}
+    conflicts = []
+    merged = {}
+    for source in dict.fromkeys([*our_data, *their_data, *base_data]):
+        base_value, our_value, their_value = base_data.get(source), our_data.get(source), their_data.get(source)
+        if source == FILE_DATA:
+            value = merge_values(base_value, our_value, their_value, merge_file_data)
+        else:
+            if our_value != base_value and their_value not in (base_value, our_value):
+                conflicts.append(source)
+            value = merge_values(base_value, our_value, their_value, lambda mine, other: mine)
+        if value is not None:
+            merged[source] = value
+    ours.data = merged
+    return len(conflicts)
+
+
+def merge_file_data(ours: dict, theirs: dict) -> dict:
+    # Timestamps share one format, so they compare as strings
+    return theirs if str(theirs.get(TIMESTAMP, '')) > str(ours.get(TIMESTAMP, '')) else ours
+
+
+def merge_values(base, ours, theirs, merge_both: Callable):
+    # A change on one side is kept over a removal on the other
+    if ours == base:
+        return theirs
+    if theirs == base or theirs == ours:
+        return ours
+    if ours is None or theirs is None:
+        return ours if theirs is None else theirs
+    return merge_both(ours, theirs)
+
+
+def set_video(collection: Collection,
+              video_id: str,
+              ours: Optional[MediaFile],
+              theirs: Optional[MediaFile]) -> None:
+    if theirs is None:
+        collection.set_video(video_id, None)
+    elif ours is None:
+        collection.set_video(video_id, theirs)
+    else:
+        # Updated in place; staged commands hold this MediaFile
+        ours.data = theirs.to_dict()
+
+
+def keep_backup(path: Path, data: bytes) -> Path:
+    # Named for its contents, so keeping the same data again does not add another copy
+    backup_path = path.with_name(f"{path.name}.{sha256(data).hexdigest()[:12]}{BACKUP_SUFFIX}")
+    if not backup_path.exists():
+        fileutils.file_replace_bytes(backup_path, data)
+    return backup_path
+
+
+def encode_state(state: PyvorgState) -> bytes:
+    return serializeutils.obj_to_versioned_json(STATE_FORMAT,
+                                                STATE_FORMAT_VERSION,
+                                                state.to_dict(get_video_writer(state.collection)))
+
+
+def read_state(data: bytes, collection: Collection, dropped: Optional[list[dict]] = None) -> PyvorgState:
+    # Staged commands and history, referring to videos in 'collection'. Given
+    # 'dropped', commands whose videos are not in it are collected there and left out
+    if not data:
+        return PyvorgState(collection)
+    document = serializeutils.versioned_json_to_obj(data, STATE_FORMAT, STATE_FORMAT_VERSION)
+    state = PyvorgState.from_dict(document, get_video_reader(collection), dropped)
+    state.collection = collection
+    return state
+
+
+def get_video_writer(collection: Optional[Collection] = None) -> Callable[[MediaFile], Any]:
+    # Videos in the collection are saved by id, any others in full
+    video_ids = None
+
+    def write_video(video: MediaFile):
+        nonlocal video_ids
+        if collection is None:
+            return video.to_record()
+        video_id = collection.generate_video_id(video)
+        if video_id is not None and collection.videos.get(video_id) is video:
+            return video_id
+        # Not found by its hash, such as after the hash was updated, so look for it by identity
+        if video_ids is None:
+            video_ids = {id(value): key for key, value in collection.videos.items()}
+        video_id = video_ids.get(id(video))
+        return video_id if video_id is not None else video.to_record()
+    return write_video
+
+
+def get_video_reader(collection: Optional[Collection] = None) -> Callable[[Any], MediaFile]:
+    def read_video(reference) -> MediaFile:
+        if not isinstance(reference, str):
+            return MediaFile.from_record(reference)
+        video = collection.get_video(reference) if collection is not None else None
+        if video is None:
+            raise ValueError(f"Video '{reference}' is not in the collection")
+        return video
+    return read_video
+
+
+def get_reference_reader(collection: Collection) -> Callable[[Any], Any]:
+    # For state pickled by earlier versions, which saved references as ('video', <id>)
+    def persistent_load(reference):
+        kind, video_id = reference
+        video = collection.get_video(video_id) if kind == VIDEO_REFERENCE else None
+        if video is None:
+            raise pickle.UnpicklingError(f"Video '{video_id}' is not in the collection")
+        return video
+    return persistent_load
@@ -0,0 +1,388 @@
+# ./source/utils/snapshotutils.py
+
+"""
+    A read-only snapshot of the collection for listing and filtering videos
+    without loading the state.
+
+    Loading the state builds a MediaFile for every video, which a query that
+    only reads the collection does not need. Each save that changes the
+    collection also writes a snapshot: every video's id, path and the value
+    get_pref_data returns for each key, in fixed-width columns that refer to
+    one table of distinct strings. The file is memory-mapped, so opening it
+    only reads its header, and a filter only reads the columns of its key.
+    Values are kept both as text and as the number Filter infers from them,
+    so filters match the same videos as they do against the collection.
+    With NumPy installed, filters compare the mapped columns as arrays.
+    The texts of TRIGRAM_INDEXED_KEYS are also indexed by their trigrams,
+    so 'contains' on titles only checks the strings with the needle's
+    rarest trigram.
+
+    Rows are sorted by path. The snapshot is replaced as a whole, so a
+    reader that has it open keeps seeing the snapshot it opened.
+
+    Saves do not write the snapshot, as that would cost every save time in
+    proportion to the collection. Instead its header holds a tag of the
+    collection shards it was written from, and a query that finds the tag
+    no longer matches the shards on disk writes a new snapshot first.
+"""
+
+# Standard library
+from array import array
+from bisect import bisect_left
+from hashlib import sha256
+import mmap
+from pathlib import Path
+import struct
+import sys
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+# Local imports
+from source.constants import FILE_DATA, PATH, SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION, TRIGRAM_INDEXED_KEYS
+from source.state.col import Collection
+from source.utils import columnutils, fileutils, queryutils, serializeutils, shardutils
+from source.utils.columnutils import MISSING, NUMBER, TEXT, TrigramIndex, encode_value
+from source.utils.filter import EXISTS, TEXT_OPERATORS, Filter
+
+# Third-party packages
+# n/a
+
+MAGIC = b'PYVSNAP\x00'
+HEADER_LENGTH = struct.Struct('<Q')
+ALIGNMENT = 8
+
+NO_STRING = 0xFFFFFFFF
+
+# Array type codes of the columns and of the string table's offsets
+KIND_TYPE = 'B'
+NUMBER_TYPE = 'd'
+STRING_TYPE = 'I'
+OFFSET_TYPE = 'Q'
+
+
+def _new_column(count: int) -> tuple[bytearray, array, array]:
+    return bytearray(count), array(NUMBER_TYPE, [0.0]) * count, array(STRING_TYPE, [NO_STRING]) * count
+
+
+def _encode_strings(strings: Iterable[str]) -> tuple[array, bytes]:
+    offsets = array(OFFSET_TYPE, [0])
+    chunks = []
+    end = 0
+    for string in strings:
+        chunk = string.encode('utf-8', 'surrogateescape')
+        end += len(chunk)
+        offsets.append(end)
+        chunks.append(chunk)
+    return offsets, b''.join(chunks)
+
+
+def _padding(length: int) -> bytes:
+    return b'\x00' * (-length % ALIGNMENT)
+
+
+def _encode_index(column: tuple[bytearray, array, array], strings: list[str]) -> tuple[array, bytes, array, array]:
+    # The trigrams of the column's distinct texts in order, and for each the sorted indices of the texts with it
+    kinds, _, texts = column
+    codes = sorted({code for kind, code in zip(kinds, texts) if kind in (NUMBER, TEXT)})
+    index = TrigramIndex((code, strings[code].lower()) for code in codes)
+    trigrams = sorted(index.postings)
+    trigram_offsets, trigram_data = _encode_strings(trigrams)
+    posting_offsets = array(OFFSET_TYPE, [0])
+    postings = array(STRING_TYPE)
+    for trigram in trigrams:
+        postings.extend(index.postings[trigram])
+        posting_offsets.append(len(postings))
+    return trigram_offsets, trigram_data, posting_offsets, postings
+
+
+def get_shard_tag(shard_dir: Path) -> str:
+    # Identifies the saved shards from their metadata alone. A save replaces a
+    # shard by renaming a new file over it, which changes its inode and mtime
+    digest = sha256()
+    for name, path in shardutils.get_shard_paths(shard_dir).items():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{name}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def write_snapshot(collection: Collection, path: Path, shard_tag: Optional[str] = None) -> int:
+    """
+    Writes a snapshot of 'collection' to 'path', replacing any snapshot there.
+    'shard_tag' is the tag of the shards the collection was loaded from.
+    :return: number of bytes written
+    """
+    with serializeutils.gc_paused():
+        return _write_snapshot(collection, path, shard_tag)
+
+
+def _write_snapshot(collection: Collection, path: Path, shard_tag: Optional[str]) -> int:
+    rows = sorted(
+        (video.get_source_data(FILE_DATA, PATH) or '', video_id, video)
+        for video_id, video in zip(collection.get_video_ids(), collection.get_videos())
+    )
+    count = len(rows)
+    strings = {}
+    ids = array(STRING_TYPE, [NO_STRING]) * count
+    paths = array(STRING_TYPE, [NO_STRING]) * count
+    columns = {}
+    # Titles, years and the like repeat, so each distinct string is encoded once
+    encoded = {}
+    for row, (video_path, video_id, video) in enumerate(rows):
+        ids[row] = strings.setdefault(video_id, len(strings))
+        paths[row] = strings.setdefault(video_path, len(strings))
+        for key, value in video.get_pref_items().items():
+            if value is None:
+                continue
+            kinds, numbers, texts = columns.get(key) or columns.setdefault(key, _new_column(count))
+            cell = encoded.get(value) if isinstance(value, str) else None
+            if cell is None:
+                kind, number, text = encode_value(value)
+                cell = kind, number, strings.setdefault(text, len(strings))
+                if isinstance(value, str):
+                    encoded[value] = cell
+            kinds[row], numbers[row], texts[row] = cell
+    string_offsets, string_data = _encode_strings(strings)
+    indexes = {key: _encode_index(columns[key], list(strings)) for key in TRIGRAM_INDEXED_KEYS if key in columns}
+
+    sections = [string_offsets, string_data, ids, paths]
+    for kinds, numbers, texts in columns.values():
+        sections.extend((kinds, numbers, texts))
+    for index_sections in indexes.values():
+        sections.extend(index_sections)
+    offsets = []
+    end = 0
+    for section in sections:
+        offsets.append(end)
+        end += len(memoryview(section).cast('B'))
+        end += len(_padding(end))
+
+    header = serializeutils.obj_to_versioned_json(SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION, {
+        'count': count,
+        'byteorder': sys.byteorder,
+        'shards': shard_tag,
+        'strings': {'count': len(strings), 'offsets': offsets[0], 'data': offsets[1]},
+        'ids': offsets[2],
+        'paths': offsets[3],
+        'columns': {key: offsets[4 + 3 * index:7 + 3 * index] for index, key in enumerate(columns)},
+        'indexes': {
+            key: {'trigrams': len(trigram_offsets) - 1,
+                  'postings': len(postings),
+                  'sections': offsets[4 + 3 * len(columns) + 4 * index:8 + 3 * len(columns) + 4 * index]}
+            for index, (key, (trigram_offsets, _, _, postings)) in enumerate(indexes.items())
+        }
+    })
+
+    def iter_chunks() -> Iterator[Any]:
+        prefix = MAGIC + HEADER_LENGTH.pack(len(header)) + header
+        yield prefix
+        yield _padding(len(prefix))
+        for section in sections:
+            yield section
+            yield _padding(len(memoryview(section).cast('B')))
+
+    return fileutils.file_replace_chunks(path, iter_chunks())
+
+
+def read_header(data: bytes) -> tuple[dict, int]:
+    """
+    Parses the header at the start of a snapshot, raising ValueError if it is
+    not a snapshot this version can read
+    :return: the header and the offset of the data that follows it
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("The data is not a snapshot")
+    start = len(MAGIC) + HEADER_LENGTH.size
+    length, = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+    header = serializeutils.versioned_json_to_obj(data[start:start + length], SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION)
+    if header.get('byteorder') != sys.byteorder:
+        raise ValueError("The snapshot was written on a machine of another byte order")
+    end = start + length
+    return header, end + len(_padding(end))
+
+
+def _read_file_header(path: Path) -> Optional[dict]:
+    # Reads only the header, so it is cheap however large the snapshot is
+    try:
+        with path.open('rb') as file:
+            prefix = file.read(len(MAGIC) + HEADER_LENGTH.size)
+            length, = HEADER_LENGTH.unpack_from(prefix, len(MAGIC))
+            header, _ = read_header(prefix + file.read(length))
+        return header
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def is_readable(path: Path) -> bool:
+    return _read_file_header(path) is not None
+
+
+def is_current(path: Path, shard_tag: str) -> bool:
+    # Whether the snapshot is readable and was written from the shards with 'shard_tag'
+    header = _read_file_header(path)
+    return header is not None and header.get('shards') == shard_tag
+
+
+class Snapshot:
+    def __init__(self, path: Path):
+        self.path = path
+        self._views = []
+        with path.open('rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header, self._data_start = read_header(self._mmap)
+            self.count = header['count']
+            strings = header['strings']
+            self._string_offsets = self._get_section(strings['offsets'], OFFSET_TYPE, strings['count'] + 1)
+            self._strings_start = self._data_start + strings['data']
+            self._ids = self._get_section(header['ids'], STRING_TYPE, self.count)
+            self._paths = self._get_section(header['paths'], STRING_TYPE, self.count)
+            self._columns = {
+                key: (self._get_section(kinds, KIND_TYPE, self.count),
+                      self._get_section(numbers, NUMBER_TYPE, self.count),
+                      self._get_section(texts, STRING_TYPE, self.count))
+                for key, (kinds, numbers, texts) in header['columns'].items()
+            }
+            # Snapshots written before indexes were added have none
+            self._indexes = {key: MappedTrigramIndex(self, index) for key, index in header.get('indexes', {}).items()}
+        except (KeyError, TypeError, struct.error) as e:
+            self.close()
+            raise ValueError(f"The snapshot '{path}' is damaged: {e}")
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _get_section(self, offset: int, type_code: str, count: int) -> memoryview:
+        start = self._data_start + offset
+        size = array(type_code).itemsize * count
+        if start + size > len(self._mmap):
+            raise ValueError(f"The snapshot '{self.path}' is truncated")
+        raw = memoryview(self._mmap)[start:start + size]
+        view = raw.cast(type_code)
+        # The map cannot be closed while views of it are held, so they are released first
+        self._views.extend((raw, view))
+        return view
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def get_keys(self) -> list[str]:
+        return list(self._columns)
+
+    def _read_string(self, start: int, offsets: memoryview, index: int) -> str:
+        return self._mmap[start + offsets[index]:start + offsets[index + 1]].decode('utf-8', 'surrogateescape')
+
+    def get_string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        return self._read_string(self._strings_start, self._string_offsets, index)
+
+    def get_id(self, row: int) -> str:
+        return self.get_string(self._ids[row])
+
+    def get_path(self, row: int) -> str:
+        return self.get_string(self._paths[row])
+
+    def get_value(self, key: str, row: int) -> Optional[str]:
+        # The value as text, or None if the video has no value for the key
+        column = self._columns.get(key.lower())
+        if column is None:
+            return None
+        return self.get_string(column[2][row])
+
+    def get_row(self, row: int, keys: Iterable[str] = ()) -> dict[str, Optional[str]]:
+        values = {'id': self.get_id(row), 'path': self.get_path(row)}
+        for key in keys:
+            values[key] = self.get_value(key, row)
+        return values
+
+    def filter_rows(self, filter_strings: Optional[list[str]] = None) -> list[int]:
+        # Rows matching all of the queries 'filter_strings'
+        query = queryutils.compile_query(filter_strings)
+        if query is None:
+            return list(range(self.count))
+        if columnutils.has_numpy():
+            np = columnutils.get_numpy()
+            return np.flatnonzero(query.get_mask(self, np.ones(self.count, dtype=bool))).tolist()
+        # Each distinct string is decoded once, however many videos share it
+        strings = {}
+
+        def get_text(index: int) -> str:
+            text = strings.get(index)
+            if text is None:
+                text = strings[index] = self.get_string(index)
+            return text
+
+        return [row for row in range(self.count) if query.matches(self._get_parts_getter(row, get_text))]
+
+    def _get_parts_getter(self, row: int, get_text) -> queryutils.PartsGetter:
+        # The parts Filter.get_parts returns for the values of 'row'
+        def get_parts(key: str):
+            column = self._columns.get(key)
+            kind = MISSING if column is None else column[0][row]
+            if kind == MISSING:
+                return None
+            text = get_text(column[2][row])
+            if kind == NUMBER:
+                return column[1][row], text
+            return (text if kind == TEXT else None), text
+        return get_parts
+
+    def get_filter_mask(self, f: Filter, within):
+        """
+        Rows matching 'f'. Rows outside 'within', the rows left to decide,
+        may match or not.
+        """
+        np = columnutils.get_numpy()
+        column = self._columns.get(f.key)
+        if column is None:
+            return np.zeros(self.count, dtype=bool)
+        kinds, numbers, texts = column
+        if f.operator == EXISTS:
+            return np.asarray(kinds) != MISSING
+        mask = columnutils.get_lexical_mask(f, kinds, texts, self.get_string, within, self._indexes.get(f.key))
+        if f.operator not in TEXT_OPERATORS:
+            mask |= columnutils.get_numeric_mask(f, kinds, numbers)
+        return mask
+
+
+class MappedTrigramIndex(TrigramIndex):
+    """
+        The trigram index of a snapshot's column, read from the map: the
+        sorted trigrams are a table of strings, searched by bisection, and
+        their postings the indices of the strings containing them.
+    """
+    def __init__(self, snapshot: Snapshot, header: dict):
+        super().__init__()
+        trigram_offsets, trigram_data, posting_offsets, postings = header['sections']
+        self.snapshot = snapshot
+        self.count = header['trigrams']
+        self._trigram_offsets = snapshot._get_section(trigram_offsets, OFFSET_TYPE, self.count + 1)
+        self._trigrams_start = snapshot._data_start + trigram_data
+        self._posting_offsets = snapshot._get_section(posting_offsets, OFFSET_TYPE, self.count + 1)
+        self._postings = snapshot._get_section(postings, STRING_TYPE, header['postings'])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> str:
+        return self.snapshot._read_string(self._trigrams_start, self._trigram_offsets, position)
+
+    def get_postings(self, trigram: str) -> Sequence[int]:
+        position = bisect_left(self, trigram)
+        if position == self.count or self[position] != trigram:
+            return ()
+        return self._postings[self._posting_offsets[position]:self._posting_offsets[position + 1]]
@@ -1,11 +1,15 @@
 # source/services/videoservice/py
 
 # Standard library
+from datetime import datetime, timedelta
 from pathlib import Path
 import re
+from typing import Iterable, Optional
 
 # Local imports
+from source.constants import FETCH_ERROR, FETCH_SUCCEEDED
 from source.state.mediafile import MediaFile
+from source.utils.helper import timestamp_parse
 
 # Third-party packages
 
@@ -38,6 +42,38 @@ def create_video_from_file_path(file_path: Path):
     return new
 
 
+def filter_videos_to_fetch(videos: Iterable[MediaFile],
+                           api_name: str,
+                           missing_only: bool = False,
+                           older_than: Optional[timedelta] = None,
+                           failed_only: bool = False,
+                           now: Optional[datetime] = None) -> list[MediaFile]:
+    """
+    The videos needing a fetch from 'api_name': without options, all of them,
+    and otherwise those selected by any of the options given. 'missing_only'
+    selects videos without data from the source, 'older_than' those whose
+    last successful fetch is at least that old or of unknown time, and
+    'failed_only' those whose last fetch failed.
+    """
+    videos = list(videos)
+    if not (missing_only or older_than is not None or failed_only):
+        return videos
+    # Timestamps of MediaFile.record_fetch are in UTC
+    now = now or datetime.utcnow()
+    selected = []
+    for video in videos:
+        record = video.get_fetch_record(api_name) or {}
+        if missing_only and video.get_source_data(api_name) is None:
+            selected.append(video)
+        elif failed_only and record.get(FETCH_ERROR) is not None:
+            selected.append(video)
+        elif older_than is not None:
+            succeeded = timestamp_parse(record.get(FETCH_SUCCEEDED))
+            if succeeded is None or now - succeeded >= older_than:
+                selected.append(video)
+    return selected
+
+
 def generate_destination_paths(videos, dst_tree: Path, format_string: str) -> list[Path]:
     return [Path(dst_tree) / generate_str_from_metadata(video, format_string) for video in videos]
 
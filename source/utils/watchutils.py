@@ -0,0 +1,368 @@
+# ./source/utils/watchutils.py
+
+"""
+    Utilities for keeping a collection in sync with a directory as files are
+    created, moved and deleted.
+
+    Watchers report file system events as (event, path, destination) tuples.
+    InotifyWatcher uses the Linux inotify API through ctypes; PollingWatcher
+    compares snapshots of the directory and works everywhere. CollectionSync
+    applies the events to a collection, waiting for new files to stop
+    changing before hashing them on background threads.
+"""
+
+# Standard library
+from concurrent.futures import Future, ThreadPoolExecutor
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+from typing import Optional
+
+# Local imports
+from source.constants import *
+from source.state.col import Collection
+from source.state.mediafile import MediaFile
+from source.utils import videoutils
+
+# Third-party packages
+# n/a
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+WatchEvent = tuple[str, Path, Optional[Path]]
+
+
+def is_watched_file(path: Path, glob_pattern: str = '*') -> bool:
+    return path.suffix in VIDEO_EXTENSIONS and path.match(glob_pattern)
+
+
+def is_under(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class PollingWatcher:
+    def __init__(self, root: Path, recursive: bool = False):
+        self.root = root
+        self.recursive = recursive
+        self.snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[Path, tuple]:
+        snapshot = {}
+        paths = self.root.rglob('*') if self.recursive else self.root.glob('*')
+        for path in paths:
+            if not is_watched_file(path):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout: float) -> list[WatchEvent]:
+        time.sleep(timeout)
+        old, new = self.snapshot, self._take_snapshot()
+        self.snapshot = new
+
+        removed = {path: old[path] for path in old.keys() - new.keys()}
+        by_inode = {stat[:2]: path for path, stat in removed.items()}
+        events = []
+        for path in sorted(new.keys() - old.keys()):
+            src = by_inode.pop(new[path][:2], None)
+            if src is not None:
+                del removed[src]
+                events.append((WATCH_MOVED, src, path))
+            else:
+                events.append((WATCH_CREATED, path, None))
+        events.extend((WATCH_DELETED, path, None) for path in sorted(removed))
+        events.extend(
+            (WATCH_MODIFIED, path, None)
+            for path
+            in sorted(old.keys() & new.keys())
+            if old[path][2:] != new[path][2:]
+        )
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    def __init__(self, root: Path, recursive: bool = False):
+        self.root = root
+        self.recursive = recursive
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches: dict[int, Path] = {}
+        self._add_watches(root)
+
+    @staticmethod
+    def is_available() -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+        except OSError:
+            return False
+        return hasattr(libc, 'inotify_init1')
+
+    def _add_watch(self, path: Path) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            logging.warning(f"Cannot watch '{path}': {os.strerror(errno)}")
+            return
+        self.watches[wd] = path
+
+    def _add_watches(self, root: Path) -> list[Path]:
+        # Returns the files already inside a newly watched directory, which
+        # were created before its watch existed
+        self._add_watch(root)
+        files = []
+        for entry in (root.rglob('*') if self.recursive else root.glob('*')):
+            if entry.is_dir():
+                if self.recursive:
+                    self._add_watch(entry)
+            elif is_watched_file(entry):
+                files.append(entry)
+        return files
+
+    def _remove_watches(self, root: Path) -> None:
+        for wd, path in list(self.watches.items()):
+            if is_under(str(path), str(root)):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def _rename_watches(self, src: Path, dst: Path) -> None:
+        for wd, path in self.watches.items():
+            if is_under(str(path), str(src)):
+                self.watches[wd] = dst / path.relative_to(src)
+
+    def _read(self) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _parse(self, data: bytes) -> list[tuple[int, int, int, Optional[Path]]]:
+        records = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            parent = self.watches.get(wd)
+            if parent is not None and name:
+                parent = parent / os.fsdecode(name)
+            records.append((wd, mask, cookie, parent))
+        return records
+
+    def poll(self, timeout: float) -> list[WatchEvent]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        events = []
+        moved_from: dict[int, Path] = {}
+        for wd, mask, cookie, path in self._parse(self._read()):
+            if mask & IN_Q_OVERFLOW:
+                events.append((WATCH_RESCAN, self.root, None))
+            elif mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+            elif path is None:
+                continue
+            elif mask & IN_MOVED_FROM:
+                moved_from[cookie] = path
+            elif mask & IN_MOVED_TO and cookie in moved_from:
+                src = moved_from.pop(cookie)
+                if mask & IN_ISDIR:
+                    self._rename_watches(src, path)
+                events.append((WATCH_MOVED, src, path))
+            elif mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR:
+                if self.recursive:
+                    events.extend((WATCH_CREATED, file, None) for file in self._add_watches(path))
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                events.append((WATCH_CREATED, path, None))
+            elif mask & IN_CLOSE_WRITE:
+                events.append((WATCH_MODIFIED, path, None))
+            elif mask & IN_DELETE:
+                events.append((WATCH_DELETED, path, None))
+
+        # Anything moved out of the watched tree is gone as far as we know
+        for src in moved_from.values():
+            self._remove_watches(src)
+            events.append((WATCH_DELETED, src, None))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def get_watcher(root: Path, recursive: bool = False, force_polling: bool = False):
+    if not force_polling and InotifyWatcher.is_available():
+        try:
+            return InotifyWatcher(root, recursive)
+        except OSError as e:
+            logging.warning(f"inotify is unavailable ({e}); falling back to polling")
+    return PollingWatcher(root, recursive)
+
+
+class CollectionSync:
+    """
+        Applies watcher events to a collection. Moves and deletions are applied
+        at once. New and modified files wait in 'pending' until their size and
+        modification time have been unchanged for settle_time seconds, are then
+        hashed on a thread pool, and are added to the collection by process()
+        on the calling thread, so only that thread changes the collection.
+    """
+
+    def __init__(self,
+                 collection: Collection,
+                 glob_pattern: str = '*',
+                 settle_time: float = WATCH_SETTLE_TIME,
+                 workers: int = WATCH_HASH_WORKERS):
+        self.collection = collection
+        self.glob_pattern = glob_pattern
+        self.settle_time = settle_time
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending: dict[str, tuple] = {}
+        self.hashing: dict[str, Future] = {}
+
+    def reconcile(self, root: Path, file_paths: list[Path], recursive: bool = False) -> bool:
+        # Brings the collection in line with files that changed while nothing
+        # was watching. Only files the collection does not know are hashed, and
+        # only files the watch covers that are gone from the disk are removed.
+        present = {str(path) for path in file_paths if is_watched_file(path, self.glob_pattern)}
+        known = self.collection.get_paths_under(root)
+        missing = [
+            path for path in known
+            if path not in present and self._is_covered(Path(path), root, recursive) and not os.path.exists(path)
+        ]
+        for path in missing:
+            self._remove_path(path)
+        for path in present.difference(known):
+            self._queue(path)
+        return bool(missing)
+
+    def _is_covered(self, path: Path, root: Path, recursive: bool) -> bool:
+        return (recursive or path.parent == root) and is_watched_file(path, self.glob_pattern)
+
+    def handle_events(self, events: list[WatchEvent]) -> bool:
+        changed = False
+        for event, path, dest in events:
+            if event in (WATCH_CREATED, WATCH_MODIFIED):
+                if is_watched_file(path, self.glob_pattern):
+                    self._queue(str(path))
+            elif event == WATCH_MOVED:
+                changed |= self._move(str(path), str(dest))
+            elif event == WATCH_DELETED:
+                changed |= self._delete(str(path))
+        return changed
+
+    def process(self) -> bool:
+        self._submit_settled()
+        return self._collect_hashed()
+
+    def close(self) -> bool:
+        # Hashes already running are finished and added; queued ones are dropped
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        return self._collect_hashed()
+
+    def is_idle(self) -> bool:
+        return not self.pending and not self.hashing
+
+    def _queue(self, path: str) -> None:
+        self.pending[path] = (None, time.monotonic())
+
+    def _submit_settled(self) -> None:
+        now = time.monotonic()
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.settle_time and path not in self.hashing:
+                del self.pending[path]
+                self.hashing[path] = self.executor.submit(videoutils.create_video_from_file_path, Path(path))
+
+    def _collect_hashed(self) -> bool:
+        changed = False
+        for path, future in list(self.hashing.items()):
+            if not future.done():
+                continue
+            del self.hashing[path]
+            if future.cancelled() or not os.path.exists(path):
+                continue
+            try:
+                video = future.result()
+            except OSError as e:
+                # The file went away or became unreadable while it was hashed
+                logging.warning(f"Could not add '{path}': {e}")
+                continue
+            self._add(path, video)
+            changed = True
+        return changed
+
+    def _add(self, path: str, video: MediaFile) -> None:
+        self.collection.add_video_instance(video)
+        logging.info(f"Added '{path}' to collection")
+
+    def _remove_path(self, path: str) -> None:
+        self.collection.remove_path(path)
+        logging.info(f"Removed '{path}' from collection")
+
+    def _delete(self, path: str) -> bool:
+        for pending in [key for key in self.pending if is_under(key, path)]:
+            del self.pending[pending]
+        removed = self.collection.get_paths_under(path)
+        for key in removed:
+            self._remove_path(key)
+        return bool(removed)
+
+    def _move(self, src: str, dst: str) -> bool:
+        # Files still waiting to be hashed are queued again under their new path
+        for pending in [key for key in list(self.pending) + list(self.hashing) if is_under(key, src)]:
+            self.pending.pop(pending, None)
+            self._queue(dst + pending[len(src):])
+
+        moved = self.collection.get_paths_under(src)
+        for key in moved:
+            new_path = dst + key[len(src):]
+            self.collection.move_path(key, new_path)
+            logging.info(f"Moved '{key}' to '{new_path}' in collection")
+        return bool(moved)
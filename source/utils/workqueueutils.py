@@ -0,0 +1,184 @@
+# ./source/utils/workqueueutils.py
+
+"""
+    A work queue in an SQLite file, shared by scan workers on several hosts.
+
+    A coordinator adds one task per directory to scan. Workers claim a task
+    for a lease period, hash the files in the directory and add a record per
+    video, in the same form as exported metadata. A task whose worker stops
+    renewing its lease, for example because its host went down, can be
+    claimed again by another worker; a task that keeps failing is given up
+    after WORK_QUEUE_MAX_ATTEMPTS claims. The coordinator then collects the
+    records into its collection.
+
+    SQLite relies on file locks, so the queue file must be on a file system
+    where those work across hosts, or be reached by all workers through one
+    host that does.
+"""
+
+# Standard library
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import sqlite3
+import time
+from typing import Iterable, Iterator, Optional
+
+# Local imports
+from source.constants import WORK_QUEUE_LEASE, WORK_QUEUE_MAX_ATTEMPTS, WORK_QUEUE_TIMEOUT
+
+# Third-party packages
+# n/a
+
+PENDING = 'pending'
+CLAIMED = 'claimed'
+DONE = 'done'
+FAILED = 'failed'
+TASK_STATES = (PENDING, CLAIMED, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    directory TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (directory, pattern)
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, id);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_collected ON results (collected, id);
+"""
+
+Task = tuple[int, str, str]
+
+
+class WorkQueue:
+    def __init__(self, path: Path, timeout: float = WORK_QUEUE_TIMEOUT):
+        self.path = path
+        # Transactions are begun explicitly so that claims are taken under a write lock
+        self.connection = sqlite3.connect(str(path), timeout=timeout, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'WorkQueue':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        # Holds the write lock from the start, so two workers cannot claim the same task
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def add_tasks(self, tasks: Iterable[tuple[str, str]]) -> int:
+        # Directories that were scanned before are scanned again; ones being scanned are left alone
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT INTO tasks (directory, pattern) VALUES (?, ?) "
+                "ON CONFLICT (directory, pattern) DO UPDATE SET state = 'pending', attempts = 0, error = NULL "
+                "WHERE state != 'claimed'",
+                tasks)
+            return connection.total_changes - before
+
+    def claim(self, worker: str, lease: float = WORK_QUEUE_LEASE) -> Optional[Task]:
+        now = time.time()
+        with self._transaction() as connection:
+            # Tasks whose worker stopped renewing its lease have been tried too often to retry
+            connection.execute(
+                "UPDATE tasks SET state = 'failed', error = 'lease expired' "
+                "WHERE state = 'claimed' AND lease_until < ? AND attempts >= ?",
+                (now, WORK_QUEUE_MAX_ATTEMPTS))
+            # Pending tasks first; the worker holding an expired lease may only be slow
+            task = connection.execute(
+                "SELECT id, directory, pattern FROM tasks "
+                "WHERE state = 'pending' OR (state = 'claimed' AND lease_until < ?) "
+                "ORDER BY state = 'claimed', id LIMIT 1",
+                (now,)).fetchone()
+            if task is not None:
+                connection.execute(
+                    "UPDATE tasks SET state = 'claimed', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now + lease, task[0]))
+        return task
+
+    def renew(self, task_id: int, worker: str, lease: float = WORK_QUEUE_LEASE) -> bool:
+        # False when the lease ran out and another worker claimed the task
+        cursor = self.connection.execute(
+            "UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'claimed'",
+            (time.time() + lease, task_id, worker))
+        return cursor.rowcount == 1
+
+    # complete, fail and release only change a task 'worker' still holds, and
+    # return False once its lease ran out and another worker claimed the task
+
+    def complete(self, task_id: int, worker: str, records: Iterable[tuple[str, dict]]) -> bool:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET state = 'done', lease_until = NULL, error = NULL "
+                "WHERE id = ? AND worker = ? AND state = 'claimed'",
+                (task_id, worker))
+            if cursor.rowcount != 1:
+                return False
+            connection.executemany(
+                "INSERT INTO results (task_id, video_id, data) VALUES (?, ?, ?)",
+                ((task_id, video_id, json.dumps(data)) for video_id, data in records))
+        return True
+
+    def fail(self, task_id: int, worker: str, error: str) -> bool:
+        cursor = self.connection.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = NULL, error = ? WHERE id = ? AND worker = ? AND state = 'claimed'",
+            (WORK_QUEUE_MAX_ATTEMPTS, error, task_id, worker))
+        return cursor.rowcount == 1
+
+    def release(self, task_id: int, worker: str) -> bool:
+        # For a worker that stops before finishing; the claim does not count as an attempt
+        cursor = self.connection.execute(
+            "UPDATE tasks SET state = 'pending', lease_until = NULL, attempts = attempts - 1 "
+            "WHERE id = ? AND worker = ? AND state = 'claimed'",
+            (task_id, worker))
+        return cursor.rowcount == 1
+
+    def iter_results(self) -> Iterator[tuple[int, str, dict]]:
+        # Results not collected yet, as (result id, video id, metadata)
+        cursor = self.connection.execute(
+            "SELECT id, video_id, data FROM results WHERE collected = 0 ORDER BY id")
+        for result_id, video_id, data in cursor.fetchall():
+            yield result_id, video_id, json.loads(data)
+
+    def mark_collected(self, result_ids: Iterable[int]) -> None:
+        with self._transaction() as connection:
+            connection.executemany("UPDATE results SET collected = 1 WHERE id = ?",
+                                   ((result_id,) for result_id in result_ids))
+
+    def get_status(self) -> dict:
+        status = dict.fromkeys(TASK_STATES, 0)
+        status.update(self.connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+        status['results'] = self.connection.execute(
+            "SELECT COUNT(*) FROM results WHERE collected = 0").fetchone()[0]
+        status['errors'] = [
+            {'directory': directory, 'error': error}
+            for directory, error
+            in self.connection.execute("SELECT directory, error FROM tasks WHERE state = 'failed' ORDER BY id")
+        ]
+        return status
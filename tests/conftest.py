@@ -0,0 +1,27 @@
+# ./tests/conftest.py
+
+"""
+    Points the log file, metrics and profiles written while testing at a
+    temporary directory instead of the working directory. Set before any
+    test imports 'source', which sets up logging when it is imported.
+"""
+
+# Standard library
+import logging
+import os
+import shutil
+import tempfile
+
+# Local imports
+# n/a, since importing 'source' would set up logging before PYVORG_LOGS_DIR is set
+
+# Third-party packages
+# n/a
+
+LOGS_DIR = tempfile.mkdtemp(prefix='pyvorg-test-logs-')
+os.environ['PYVORG_LOGS_DIR'] = LOGS_DIR
+
+
+def pytest_unconfigure(config):
+    logging.shutdown()
+    shutil.rmtree(LOGS_DIR, ignore_errors=True)
@@ -6,7 +6,7 @@
 
 # Standard library
 import unittest
-from unittest.mock import MagicMock, Mock
+from unittest.mock import call, MagicMock, Mock
 
 # Local imports
 from source.commands.cmdbuffer import *
@@ -80,6 +80,40 @@ class TestCommandBuffer(unittest.TestCase):
         self.assertFalse(self.buffer.cmd_buffer)
         self.assertTrue(cmd in self.buffer.undo_buffer)
 
+    def test_execute_cmd_buffer_journal(self):
+        # Arrange
+        cmd1 = FauxCmd()
+        cmd2 = FauxCmd()
+        self.buffer.cmd_buffer.append(cmd1)
+        self.buffer.cmd_buffer.append(cmd2)
+        journal = Mock()
+
+        # Act
+        self.buffer.execute_cmd_buffer(journal)
+
+        # Assert
+        journal.record_intent.assert_has_calls([call(0, cmd1), call(1, cmd2)])
+        journal.record_complete.assert_has_calls([call(0, cmd1), call(1, cmd2)])
+
+    def test_restore_from_journal(self):
+        # Arrange
+        cmd1 = FauxCmd()
+        cmd2 = FauxCmd()
+        journaled_cmd1 = FauxCmd()
+        journaled_cmd1.execute_called = True
+        self.buffer.cmd_buffer.append(cmd1)
+        self.buffer.cmd_buffer.append(cmd2)
+        journal = Mock()
+        journal.get_completed.return_value = {0: journaled_cmd1}
+
+        # Act
+        self.buffer.restore_from_journal(journal)
+
+        # Assert
+        self.assertEqual([cmd1], self.buffer.undo_buffer)
+        self.assertTrue(cmd1.execute_called)
+        self.assertEqual([cmd2], list(self.buffer.cmd_buffer))
+
     def test_execute_undo_buffer(self):
         # Arrange
         cmd1 = FauxCmd()
@@ -99,8 +133,19 @@ class TestCommandBuffer(unittest.TestCase):
         self.assertTrue(cmd3.undo_called)
 
     def test_from_dict(self):
-        # TODO: Implement in source
-        pass
+        # Arrange
+        data = {'staged': [{'type': 'FauxCmd', 'data': {'execute_called': False}}],
+                'executed': [{'type': 'FauxCmd', 'data': {'execute_called': True}}]}
+
+        # Act
+        result = CommandBuffer.from_dict(data, lambda reference: None)
+
+        # Assert
+        self.assertIsInstance(result.cmd_buffer[0], Command)
+        self.assertFalse(result.cmd_buffer[0].execute_called)
+        self.assertTrue(result.undo_buffer[0].execute_called)
+        with self.assertRaises(ValueError):
+            CommandBuffer.from_dict({'staged': [{'type': 'NoSuchCmd', 'data': {}}], 'executed': []}, None)
 
     def test_preview_buffer(self):
         # Arrange
@@ -161,11 +206,19 @@ class TestCommandBuffer(unittest.TestCase):
         mock_cmd_2.validate_undo.assert_called_once()
 
     def test_to_dict(self):
-        # TODO: Implement in source
         # Arrange
+        cmd1 = FauxCmd()
+        cmd2 = FauxCmd()
+        self.buffer.add_command(cmd1)
+        self.buffer.add_command(cmd2)
+        self.buffer.exec_command()
+
         # Act
+        result = self.buffer.to_dict(lambda video: None)
+
         # Assert
-        pass
+        self.assertEqual(['FauxCmd'], [cmd['type'] for cmd in result['staged']])
+        self.assertEqual([True], [cmd['data']['execute_called'] for cmd in result['executed']])
 
     def test__str__(self):
         # Arrange
@@ -0,0 +1,134 @@
+# tests/test_commands/test_cmdjournal.py
+
+"""
+    Unit tests for source/commands/cmdjournal.py
+"""
+
+# Standard library
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import Mock
+
+# Local imports
+from source.commands.cmdjournal import CommandJournal
+from tests.test_state.shared import FauxCmd
+
+# Third-party packages
+# n/a
+
+
+class TestCommandJournal(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'test.journal'
+        self.journal = CommandJournal(self.path, batch_size=3)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_begin(self):
+        # Act
+        self.journal.begin(5)
+
+        # Assert
+        self.assertEqual([('begin', 5)], self.journal.read_records())
+        self.assertTrue(self.journal.is_pending())
+        self.assertFalse(self.journal.is_finished())
+
+    def test_records_flushed_in_batches(self):
+        # Arrange
+        self.journal.begin(2)
+
+        # Act
+        self.journal.record_intent(0)
+        self.journal.record_complete(0, FauxCmd())
+
+        # Assert
+        self.assertEqual(1, len(self.journal.read_records()))
+
+        # Act
+        self.journal.record_intent(1)
+
+        # Assert
+        self.assertEqual(4, len(self.journal.read_records()))
+        self.assertFalse(self.journal.pending)
+
+    def test_intent_flushed_before_exec(self):
+        # Arrange
+        self.journal.begin(2)
+        self.journal.record_intent(0)
+        self.journal.record_complete(0, FauxCmd())
+
+        # Act
+        self.journal.record_intent(1, FauxCmd())
+
+        # Assert
+        self.assertEqual(4, len(self.journal.read_records()))
+        self.assertEqual([1], self.journal.get_in_doubt())
+        self.assertIsInstance(self.journal.get_in_doubt_commands()[1], FauxCmd)
+
+    def test_end(self):
+        # Arrange
+        self.journal.begin(0)
+
+        # Act
+        self.journal.end()
+
+        # Assert
+        self.assertTrue(self.journal.is_finished())
+
+    def test_discard(self):
+        # Arrange
+        self.journal.begin(0)
+
+        # Act
+        self.journal.discard()
+
+        # Assert
+        self.assertFalse(self.path.exists())
+        self.assertFalse(self.journal.is_pending())
+
+    def test_get_completed(self):
+        # Arrange
+        cmd = FauxCmd()
+        cmd.execute_called = True
+        self.journal.begin(2)
+        self.journal.record_intent(0)
+        self.journal.record_complete(0, cmd)
+        self.journal.record_intent(1)
+        self.journal.flush()
+
+        # Act
+        result = self.journal.get_completed()
+
+        # Assert
+        self.assertEqual([0], list(result.keys()))
+        self.assertIsInstance(result[0], FauxCmd)
+        self.assertTrue(result[0].execute_called)
+        self.assertEqual([1], self.journal.get_in_doubt())
+
+    def test_record_complete_unpicklable(self):
+        # Arrange
+        self.journal.begin(1)
+
+        # Act
+        self.journal.record_complete(0, Mock())
+        self.journal.flush()
+
+        # Assert
+        self.assertEqual({0: None}, self.journal.get_completed())
+
+    def test_read_records_torn_tail(self):
+        # Arrange
+        self.journal.begin(1)
+        self.journal.record_intent(0)
+        self.journal.flush()
+        with self.path.open('ab') as file:
+            file.write(b'["complete",0,{"type"')
+
+        # Act
+        result = self.journal.read_records()
+
+        # Assert
+        self.assertEqual([('begin', 1), ('intent', 0)], result)
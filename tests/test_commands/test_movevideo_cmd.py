@@ -55,6 +55,36 @@ class TestMoveVideoCommand(unittest.TestCase):
         self.assertEqual(self.test_cmd.origin_dir, self.src_dir)
         self.assertTrue(expected_dest_file.exists())
 
+    def test_exec_already_moved(self):
+        # Arrange
+        expected_dest_file = self.dest_dir / 'format_str' / self.filename
+        expected_dest_file.parent.mkdir(parents=True)
+        self.src_file_path.rename(expected_dest_file)
+
+        # Act
+        self.test_cmd.exec()
+        self.test_cmd.undo()
+
+        # Assert
+        self.assertTrue(self.src_file_path.exists())
+        self.assertFalse(expected_dest_file.exists())
+
+    def test_to_dict_and_from_dict(self):
+        # Arrange
+        self.test_cmd.exec()
+
+        # Act
+        data = self.test_cmd.to_dict(lambda video: 'video_id')
+        result = MoveVideoCmd.from_dict(data, lambda reference: self.vid)
+        result.undo()
+
+        # Assert
+        self.assertEqual('video_id', data['video'])
+        self.assertEqual(self.test_cmd.created_dirs, result.created_dirs)
+        self.assertEqual(self.test_cmd.target_file_path, result.target_file_path)
+        self.assertTrue(self.src_file_path.exists())
+        self.assertFalse(self.dest_dir.exists())
+
     def test_undo(self):
         # Arrange
         self.test_cmd.exec()
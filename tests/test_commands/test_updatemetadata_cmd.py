@@ -6,14 +6,16 @@
 
 # Standard library
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 # Local imports
 from source.state.mediafile import MediaFile
 from source.commands.updatemetadata_cmd import UpdateVideoData
 from source.constants import *
+from source.utils import pluginutils
 
 # Third-party packages
+import requests
 
 
 class TestVideoUpdate(TestCase):
@@ -44,6 +46,61 @@ class TestVideoUpdate(TestCase):
         test_video.set_source_data.assert_called_once_with('mock_api', 'return_fetch_data')
         self.assertEqual(self.test_cmd.undo_data, 'return_source_data')
 
+    def test_exec_records_fetch(self):
+        # Act
+        self.test_cmd.exec()
+
+        # Assert
+        record = self.test_vid.get_fetch_record('mock_api')
+        self.assertIsNone(record[FETCH_ERROR])
+        self.assertEqual(record[FETCH_ATTEMPTED], record[FETCH_SUCCEEDED])
+
+    def test_exec_failed_fetch(self):
+        # Arrange
+        self.mock_api.fetch_data.side_effect = ValueError('not found')
+        self.test_vid.set_source_data(FILE_DATA, {PATH: 'videos/video.mp4'})
+
+        # Act
+        with self.assertLogs(level='WARNING'):
+            self.test_cmd.exec()
+
+        # Assert
+        self.assertIsNone(self.test_vid.get_source_data('mock_api'))
+        record = self.test_vid.get_fetch_record('mock_api')
+        self.assertEqual('not found', record[FETCH_ERROR])
+        self.assertIsNone(record[FETCH_SUCCEEDED])
+        self.test_cmd.undo()
+        self.assertIsNone(self.test_vid.get_fetch_record('mock_api'))
+        self.assertEqual([USER_DATA, FILE_DATA], self.test_vid.get_source_names())
+
+    def test_exec_rate_limited(self):
+        # Arrange
+        response = Mock(status_code=429)
+        self.mock_api.fetch_data.side_effect = requests.HTTPError('Rate limit exceeded.', response=response)
+        self.test_vid.set_source_data(FILE_DATA, {PATH: 'videos/video.mp4'})
+
+        # Act
+        with self.assertLogs(level='WARNING'), self.assertRaises(requests.HTTPError):
+            self.test_cmd.exec()
+
+        # Assert
+        record = self.test_vid.get_fetch_record('mock_api')
+        self.assertEqual('Rate limit exceeded.', record[FETCH_ERROR])
+        self.assertIsNone(self.test_vid.get_source_data('mock_api'))
+
+    def test_exec_not_found(self):
+        # Arrange
+        response = Mock(status_code=404)
+        self.mock_api.fetch_data.side_effect = requests.HTTPError('Not found.', response=response)
+        self.test_vid.set_source_data(FILE_DATA, {PATH: 'videos/video.mp4'})
+
+        # Act
+        with self.assertLogs(level='WARNING'):
+            self.test_cmd.exec()
+
+        # Assert
+        self.assertEqual('Not found.', self.test_vid.get_fetch_record('mock_api')[FETCH_ERROR])
+
     def test_undo(self):
         self.test_cmd.undo_data = {self.test_key: self.test_value}
         self.test_vid.data.update({self.mock_api_name: {'bad_key': 'bad_value'}})
@@ -53,6 +110,25 @@ class TestVideoUpdate(TestCase):
         self.assertEqual(expected_value, result)
         self.assertTrue(self.test_cmd.undo_data is None)
 
+    @patch.object(pluginutils, 'get_plugin_instance')
+    def test_to_dict_and_from_dict(self, mock_get_plugin_instance):
+        # Arrange
+        mock_get_plugin_instance.return_value = self.mock_api
+        self.test_cmd.kwargs = {'title': 'test_title'}
+
+        # Act
+        data = self.test_cmd.to_dict(lambda video: 'video_id')
+        result = UpdateVideoData.from_dict(data, lambda reference: self.test_vid)
+
+        # Assert
+        self.assertEqual('mock_api', data['api'])
+        self.assertEqual('mock_api', result.api_name)
+        mock_get_plugin_instance.assert_not_called()
+        result.exec()
+        mock_get_plugin_instance.assert_called_once()
+        self.mock_api.fetch_data.assert_called_once_with(title='test_title')
+        self.assertEqual('return_fetch_data', self.test_vid.get_source_data('mock_api'))
+
     def test_validate_exec(self):
         # TODO: Implement in source
         # Arrange
@@ -52,8 +52,9 @@ class TestOMDBAPI(TestCase):
 
         mock_get.return_value = self.mock_response
 
-        with self.assertRaises(requests.HTTPError):
+        with self.assertRaises(requests.HTTPError) as context:
             self.api.fetch_data(title='test title')
+        self.assertEqual(429, context.exception.response.status_code)
 
     def test_get_api_url(self):
         # Arrange
@@ -63,6 +64,14 @@ class TestOMDBAPI(TestCase):
         # Assert
         self.assertEqual(type(result), str)
 
+    @patch.dict('os.environ', {'OMDB_URL': 'http://127.0.0.1:8765'})
+    def test_get_api_url_from_environment(self):
+        # Act
+        result = self.api.get_api_url()
+
+        # Assert
+        self.assertEqual('http://127.0.0.1:8765', result)
+
     def test_get_omdb_api_key(self):
         # Arrange
         # Act
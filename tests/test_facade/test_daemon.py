@@ -0,0 +1,159 @@
+# ./tests/test_facade/test_daemon.py
+
+"""
+    Unit tests for FacadeDaemon and DaemonClient
+"""
+
+# Standard library
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.exceptions import DaemonError
+from source.facade.daemon import FacadeDaemon, METHOD_NOT_FOUND, INVALID_PARAMS, PARSE_ERROR
+from source.facade.daemonclient import DaemonClient
+from source.facade.pyvorg_facade import Facade
+from source.services.loadstate_svc import LoadState
+from source.state.application_state import PyvorgState
+from source.utils import configutils
+from source.utils.helper import create_dummy_files
+from tests.test_state.shared import FauxCmd
+
+# Third-party packages
+# n/a
+
+
+class TestFacadeDaemon(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.state_path = self.temp_path / 'state.pickle'
+        self.socket_path = self.temp_path / 'test.sock'
+        self.state_path.touch()
+        self.video_path = self.temp_path / 'videos'
+        self.video_path.mkdir()
+
+        patchers = [
+            patch.object(configutils, 'get_default_state_path', return_value=self.state_path),
+            patch.object(configutils, 'get_default_journal_path', return_value=self.temp_path / 'test.journal')
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.state = PyvorgState()
+        self.daemon = FacadeDaemon(Facade(self.state), self.socket_path)
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, args=(ready,))
+        self.thread.start()
+        ready.wait(5)
+        self.client = DaemonClient.connect(self.socket_path)
+
+    def tearDown(self) -> None:
+        if self.thread.is_alive():
+            self.daemon.stop()
+            self.thread.join(5)
+        self.client.close()
+        self.temp_dir.cleanup()
+
+    def test_connect_no_daemon(self):
+        # Act
+        result = DaemonClient.connect(self.temp_path / 'missing.sock')
+
+        # Assert
+        self.assertIsNone(result)
+
+    def test_call_facade_method(self):
+        # Arrange
+        files = create_dummy_files(self.video_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+
+        # Act
+        self.client.scan_files_in_path(str(self.video_path))
+        status = self.client.get_daemon_status()
+
+        # Assert
+        paths = [video.get_path() for video in self.state.collection.get_videos()]
+        self.assertEqual(set(files), set(paths))
+        self.assertEqual(3, status['videos'])
+        self.assertTrue(status['unsaved_changes'])
+
+    def test_call_returns_result(self):
+        # Arrange
+        self.state.command_buffer.add_command(FauxCmd())
+
+        # Act
+        result = self.client.get_preview_of_staged_operations()
+
+        # Assert
+        self.assertEqual(self.state.command_buffer.preview_buffer(), result)
+        self.assertFalse(self.client.has_interrupted_commit())
+
+    def test_call_raises_remote_exception(self):
+        # Act and Assert
+        with self.assertRaises(IndexError):
+            self.client.commit_staged_operations()
+
+    def test_call_hidden_method(self):
+        # Act and Assert
+        with self.assertRaises(DaemonError):
+            self.client.call('load_state')
+
+    def test_handle_request_errors(self):
+        # Act
+        parse_error = json.loads(self.daemon.handle_request(b'{not json'))
+        not_found = json.loads(self.daemon.handle_request(b'{"id": 1, "method": "load_state"}'))
+        bad_params = json.loads(self.daemon.handle_request(b'{"id": 2, "method": "undo_transaction", "params": [1]}'))
+
+        # Assert
+        self.assertEqual(PARSE_ERROR, parse_error['error']['code'])
+        self.assertEqual(METHOD_NOT_FOUND, not_found['error']['code'])
+        self.assertEqual(INVALID_PARAMS, bad_params['error']['code'])
+
+    def test_save_state(self):
+        # Arrange
+        create_dummy_files(self.video_path, 1, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.client.scan_files_in_path(str(self.video_path))
+
+        # Act
+        self.client.call('save_state')
+
+        # Assert
+        saved_state = PyvorgState()
+        LoadState().call(saved_state)
+        self.assertEqual(1, len(saved_state.collection.get_videos()))
+
+    def test_stop_daemon_saves_changes(self):
+        # Arrange
+        create_dummy_files(self.video_path, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.client.scan_files_in_path(str(self.video_path))
+
+        # Act
+        self.client.stop_daemon()
+        self.thread.join(5)
+
+        # Assert
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(self.socket_path.exists())
+        saved_state = PyvorgState()
+        LoadState().call(saved_state)
+        self.assertEqual(2, len(saved_state.collection.get_videos()))
+
+    def test_socket_owner_only(self):
+        # Act
+        mode = os.stat(self.socket_path).st_mode
+
+        # Assert
+        self.assertEqual(0o600, mode & 0o777)
+
+    def test_serve_forever_already_running(self):
+        # Arrange
+        second_daemon = FacadeDaemon(Facade(PyvorgState()), self.socket_path)
+
+        # Act and Assert
+        with self.assertRaises(RuntimeError):
+            second_daemon.serve_forever()
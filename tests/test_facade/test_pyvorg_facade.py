@@ -5,23 +5,36 @@
 """
 
 # Standard library
+import csv
+import gzip
+import importlib.util
+import json
 from pathlib import Path
 import pickle
-from unittest import TestCase
+import threading
+import time
+from unittest import skipUnless, TestCase
 from unittest.mock import patch, Mock
 from tempfile import TemporaryDirectory
 
 # Local imports
 from source.commands.cmdbuffer import CommandBuffer
+from source.commands.cmdjournal import CommandJournal
 from source.commands.movevideo_cmd import MoveVideoCmd
+from source.constants import FETCH_SUCCEEDED, WORK_QUEUE_MAX_ATTEMPTS
 from source.commands.updatemetadata_cmd import UpdateVideoData
 from source.facade.pyvorg_facade import Facade
 from source.state.application_state import PyvorgState
 from source.state.col import Collection
-from tests.test_state.shared import FauxCmd
+from tests.test_state.shared import FauxCmd, FaultyCmd
 from source.utils import configutils
+from source.utils import metricsutils
 from source.utils import pluginutils
+from source.utils import shardutils
+from source.services import watchpath_svc
+from source.services.runscanworker_svc import RunScanWorker
 from source.utils.helper import create_dummy_files
+from source.utils.workqueueutils import WorkQueue
 
 
 # Third-party Packages
@@ -50,8 +63,10 @@ class TestFacade(TestCase):
         # Assert
         self.assertTrue(self.state.command_buffer.exec_is_empty())
 
-    def test_commit_staged_operations(self):
+    @patch.object(configutils, 'get_default_journal_path')
+    def test_commit_staged_operations(self, mock_get_journal_path):
         # Arrange
+        mock_get_journal_path.return_value = Path(self.temp_dir.name) / 'test.journal'
         test_cmd_1 = Mock()
         test_cmd_1.exec.return_value = None
         test_cmd_2 = Mock()
@@ -67,15 +82,219 @@ class TestFacade(TestCase):
         test_cmd_1.exec.assert_called_once()
         test_cmd_2.exec.assert_called_once()
 
+    @patch.object(configutils, 'get_default_journal_path')
+    def test_commit_staged_operations_resume(self, mock_get_journal_path):
+        # Arrange
+        mock_get_journal_path.return_value = Path(self.temp_dir.name) / 'test.journal'
+        test_cmd_1 = FauxCmd()
+        test_cmd_2 = FaultyCmd()
+        self.state.command_buffer.add_command(test_cmd_1)
+        self.state.command_buffer.add_command(test_cmd_2)
+        pre_commit_state = pickle.dumps(self.state)
+
+        with self.assertRaises(OSError):
+            self.facade.commit_staged_operations()
+
+        # Reload the state as it was saved before the commit
+        self.facade.state = self.state = pickle.loads(pre_commit_state)
+        self.state.command_buffer.cmd_buffer[1].fail = False
+        self.assertTrue(self.facade.has_interrupted_commit())
+
+        # Act
+        self.facade.commit_staged_operations(resume=True)
+
+        # Assert
+        batch = self.state.batch_history[-1]
+        self.assertEqual(2, len(batch.undo_buffer))
+        self.assertTrue(batch.undo_buffer[0].execute_called)
+        self.assertTrue(batch.undo_buffer[1].execute_called)
+        self.assertTrue(self.state.command_buffer.exec_is_empty())
+
+    @patch.object(configutils, 'get_default_journal_path')
+    def test_rollback_interrupted_commit(self, mock_get_journal_path):
+        # Arrange
+        journal_path = Path(self.temp_dir.name) / 'test.journal'
+        mock_get_journal_path.return_value = journal_path
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.state.collection.add_files(files)
+        self.facade.stage_organize_video_files(str(source_path / 'dest'), 'organized')
+        self.state.command_buffer.cmd_buffer[1].exec = Mock(side_effect=OSError('interrupted'))
+
+        with self.assertRaises(OSError):
+            self.facade.commit_staged_operations()
+        self.assertEqual(1, len(list((source_path / 'dest' / 'organized').iterdir())))
+
+        # Act
+        self.facade.rollback_interrupted_commit()
+
+        # Assert
+        self.assertTrue(all(file.exists() for file in files))
+        self.assertFalse(journal_path.exists())
+        self.assertFalse(self.facade.has_interrupted_commit())
+
+    def _crash_commit_after_move(self, seq: int) -> list[Path]:
+        # Stages moves of four files and commits them, as if the process died
+        # once move 'seq' was done but before its completion record was
+        # written; records still waiting for a batch are lost with it
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 4, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.state.collection.add_files(files)
+        self.facade.stage_organize_video_files(str(source_path / 'dest'), 'organized')
+        pre_commit_state = pickle.dumps(self.state)
+        record_complete = CommandJournal.record_complete
+
+        def crash(journal, completed_seq, cmd):
+            if completed_seq == seq:
+                journal.pending.clear()
+                raise OSError('crashed')
+            record_complete(journal, completed_seq, cmd)
+
+        with patch.object(CommandJournal, 'record_complete', crash):
+            with self.assertRaises(OSError):
+                self.facade.commit_staged_operations()
+        self.assertEqual(seq + 1, len(list((source_path / 'dest' / 'organized').iterdir())))
+
+        # Reload the state as it was saved before the commit
+        self.facade.state = self.state = pickle.loads(pre_commit_state)
+        return files
+
+    @patch.object(configutils, 'get_default_journal_path')
+    def test_commit_staged_operations_resume_after_crash(self, mock_get_journal_path):
+        # Arrange
+        mock_get_journal_path.return_value = Path(self.temp_dir.name) / 'test.journal'
+        files = self._crash_commit_after_move(2)
+
+        # Act
+        self.facade.commit_staged_operations(resume=True)
+
+        # Assert
+        organized = Path(self.temp_dir.name) / 'dest' / 'organized'
+        self.assertEqual(sorted(file.name for file in files), sorted(path.name for path in organized.iterdir()))
+        self.assertEqual(4, len(self.state.batch_history[-1].undo_buffer))
+        self.assertTrue(all(video.get_path().parent == organized for video in self.state.collection.get_videos()))
+
+    @patch.object(configutils, 'get_default_journal_path')
+    def test_rollback_interrupted_commit_after_crash(self, mock_get_journal_path):
+        # Arrange
+        mock_get_journal_path.return_value = Path(self.temp_dir.name) / 'test.journal'
+        files = self._crash_commit_after_move(2)
+
+        # Act
+        self.facade.rollback_interrupted_commit()
+
+        # Assert
+        self.assertTrue(all(file.exists() for file in files))
+        self.assertFalse(self.facade.has_interrupted_commit())
+
     def test_export_collection_metadata(self):
-        # TODO: Implement
         # Arrange
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        added_vids = self.state.collection.add_files(files)
+        for num, vid in enumerate(added_vids):
+            vid.set_user_data('year', str(1990 + num))
+        export_path = source_path / 'export.json'
+
+        # Act
+        self.facade.export_collection_metadata(str(export_path))
+
+        # Assert
+        result = json.loads(export_path.read_text())
+        self.assertEqual(set(self.state.collection.get_video_ids()), set(result.keys()))
+
+    def test_export_collection_metadata_streamed(self):
+        # Arrange
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        added_vids = self.state.collection.add_files(files)
+        for num, vid in enumerate(added_vids):
+            vid.set_user_data('year', str(1990 + num))
+        jsonl_path = source_path / 'export.jsonl.gz'
+        compact_path = source_path / 'export.json'
+
         # Act
+        self.facade.export_collection_metadata(str(jsonl_path), 'jsonl', filter_strings=['year>1990'])
+        self.facade.export_collection_metadata(str(compact_path), 'compact')
+
         # Assert
-        pass
+        with gzip.open(jsonl_path, 'rt') as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(2, len(lines))
+        self.assertTrue(all(list(line.values())[0]['user_data']['year'] > '1990' for line in lines))
+
+        result = json.loads(compact_path.read_text())
+        self.assertEqual(3, len(result))
+        self.assertNotIn('\n', compact_path.read_text())
+
+    def test_export_collection_metadata_csv(self):
+        # Arrange
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        for num, vid in enumerate(self.state.collection.add_files(files)):
+            vid.set_user_data('year', 1990 + num)
+        export_path = source_path / 'export.csv'
+
+        # Act
+        self.facade.export_collection_metadata(str(export_path), 'csv')
+
+        # Assert
+        with export_path.open(newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(3, len(rows))
+        self.assertEqual({'1990', '1991', '1992'}, {row['year'] for row in rows})
+        self.assertEqual(['1', '1', '1'], [row['file_data.size'] for row in rows])
+
+    def test_export_collection_metadata_arrow_gzip(self):
+        # Arrange
+        export_path = Path(self.temp_dir.name) / 'export.arrow'
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            self.facade.export_collection_metadata(str(export_path), 'arrow', 'gzip')
+        self.assertFalse(export_path.exists())
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_export_collection_metadata_parquet(self):
+        # Arrange
+        import pyarrow.compute
+        import pyarrow.parquet
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        for num, vid in enumerate(self.state.collection.add_files(files)):
+            vid.set_user_data('year', 1990 + num)
+        export_path = source_path / 'export.parquet'
+
+        # Act
+        self.facade.export_collection_metadata(str(export_path), 'parquet')
+
+        # Assert
+        table = pyarrow.parquet.read_table(export_path)
+        self.assertEqual(3, table.num_rows)
+        self.assertEqual(3, pyarrow.compute.sum(table['file_data.size']).as_py())
+        self.assertEqual('timestamp[us]', str(table.schema.field('file_data.timestamp').type))
+
+    def test_find_duplicates(self):
+        # Arrange
+        scan_path = Path(self.temp_dir.name)
+        original = scan_path / 'movie.mp4'
+        copy = scan_path / 'sub' / 'movie copy.mp4'
+        copy.parent.mkdir()
+        original.write_text('contents')
+        copy.write_text('contents')
+        (scan_path / 'other.mp4').write_text('contents too')
+
+        # Act
+        non_recursive = self.facade.find_duplicates(str(scan_path))
+        recursive = self.facade.find_duplicates(str(scan_path), recursive=True)
+
+        # Assert
+        self.assertEqual([], non_recursive['groups'])
+        self.assertEqual([str(original), str(copy)], recursive['groups'][0]['paths'])
+        self.assertEqual(len('contents'), recursive['reclaimable'])
 
     @patch.object(configutils, 'get_default_state_path')
-    def test_load_state(self, mock_get_state_path):
+    def test_load_state_legacy(self, mock_get_state_path):
         # Arrange
         test_collection = Collection()
         test_command_buffer = CommandBuffer()
@@ -86,9 +305,10 @@ class TestFacade(TestCase):
         from source.state.application_state import PyvorgState
         test_state = PyvorgState(test_collection, test_command_buffer)
 
-        state_path = Path(self.temp_dir.name) / 'test_collection.file'
+        state_path = Path(self.temp_dir.name) / 'test_collection.json'
+        state_path.touch()
         mock_get_state_path.return_value = state_path
-        with open(state_path, 'wb') as file:
+        with open(state_path.with_suffix('.pickle'), 'wb') as file:
             pickle.dump(test_state, file)
 
         # Act
@@ -101,6 +321,44 @@ class TestFacade(TestCase):
         self.assertEqual('test_value', self.facade.state.collection.videos.get('test_key'))
         self.assertEqual('test_object', self.facade.state.command_buffer.cmd_buffer.pop())
 
+    @patch.object(configutils, 'get_default_state_path')
+    def test_list_videos(self, mock_get_state_path):
+        # Arrange
+        temp_path = Path(self.temp_dir.name)
+        mock_get_state_path.return_value = temp_path / 'mock_state.json'
+        files = create_dummy_files(temp_path, 4, lambda x: 'dummy_' + str(x) + '.mp4')
+        for year, video in enumerate(self.state.collection.add_files(files), 1999):
+            video.set_user_data('year', str(year))
+        self.facade.save_state()
+
+        # Act
+        session = Facade(PyvorgState())
+        result = session.list_videos(['year>2000'], ['Year'])
+
+        # Assert
+        self.assertFalse(session.state.collection.videos)
+        self.assertEqual([str(path) for path in sorted(files)[2:]], [row['path'] for row in result])
+        self.assertEqual(['2001', '2002'], [row['year'] for row in result])
+
+    @patch.object(configutils, 'get_default_state_path')
+    def test_list_videos_stale_snapshot(self, mock_get_state_path):
+        # Arrange
+        temp_path = Path(self.temp_dir.name)
+        mock_get_state_path.return_value = temp_path / 'mock_state.json'
+        files = create_dummy_files(temp_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.state.collection.add_files(files[:2])
+        self.facade.save_state()
+        self.assertFalse(configutils.get_snapshot_path().exists())
+        self.assertEqual(2, len(Facade(PyvorgState()).list_videos()))
+        self.state.collection.add_files(files[2:])
+        self.facade.save_state()
+
+        # Act
+        result = Facade(PyvorgState()).list_videos()
+
+        # Assert
+        self.assertEqual(3, len(result))
+
     def test_preview_of_staged_operations(self):
         # Arrange
         test_cmd_1 = Mock()
@@ -119,11 +377,26 @@ class TestFacade(TestCase):
         self.assertTrue('Test cmd 2' in result)
 
     def test_import_collection_metadata(self):
-        # TODO: Implement
         # Arrange
-        # Act
-        # Assert
-        pass
+        source_path = Path(self.temp_dir.name)
+        files = create_dummy_files(source_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        for vid in self.state.collection.add_files(files):
+            vid.set_user_data('title', vid.get_filename())
+        for export_format in ('json', 'jsonl', 'compact'):
+            export_path = source_path / ('export_' + export_format + '.gz')
+            self.facade.export_collection_metadata(str(export_path), export_format)
+            import_session = Facade(PyvorgState())
+
+            # Act
+            result = import_session.import_collection_metadata(export_path)
+
+            # Assert
+            self.assertEqual({'added': 3, 'merged': 0, 'invalid': 0}, result)
+            imported = import_session.state.collection
+            self.assertEqual(set(self.state.collection.get_video_ids()), set(imported.get_video_ids()))
+            for video_id in imported.get_video_ids():
+                self.assertEqual(self.state.collection.get_video(video_id).to_dict(),
+                                 imported.get_video(video_id).to_dict())
 
     @patch.object(configutils, 'get_default_state_path')
     def test_save_state(self, mock_get_state_path):
@@ -137,10 +410,153 @@ class TestFacade(TestCase):
         # Assert
         self.assertTrue(state_path.exists())
 
-        with open(state_path, 'rb') as file:
-            result_collection = pickle.load(file)
-            self.assertIsInstance(result_collection.collection, Collection)
-            self.assertIsInstance(result_collection.command_buffer, CommandBuffer)
+        result_state = shardutils.read_state(state_path.read_bytes(), Collection())
+        self.assertIsInstance(result_state.collection, Collection)
+        self.assertIsInstance(result_state.command_buffer, CommandBuffer)
+
+    @patch.object(configutils, 'get_default_state_path')
+    def test_save_and_load_state_sharded(self, mock_get_state_path):
+        # Arrange
+        temp_path = Path(self.temp_dir.name)
+        mock_get_state_path.return_value = temp_path / 'mock_state.file'
+        files = create_dummy_files(temp_path, 5, lambda x: 'dummy_' + str(x) + '.mp4')
+        videos = self.state.collection.add_files(files)
+        self.state.command_buffer.add_command(MoveVideoCmd(videos[0], temp_path / 'dest', '%title'))
+
+        # Act
+        self.facade.save_state()
+        loaded_session = Facade(PyvorgState())
+        loaded_session.load_state()
+
+        # Assert
+        loaded = loaded_session.state
+        self.assertTrue(any(configutils.get_collection_shard_dir().iterdir()))
+        self.assertEqual(set(self.state.collection.get_paths()), set(loaded.collection.get_paths()))
+        staged_video = loaded.command_buffer.cmd_buffer[0].video
+        self.assertIs(loaded.collection.get_video(videos[0].get_hash()), staged_video)
+
+    @patch.object(configutils, 'get_default_state_path')
+    def test_load_state_corrupt_shard(self, mock_get_state_path):
+        # Arrange
+        temp_path = Path(self.temp_dir.name)
+        state_path = temp_path / 'mock_state.file'
+        mock_get_state_path.return_value = state_path
+        files = create_dummy_files(temp_path, 8, lambda x: 'dummy_' + str(x) + '.mp4')
+        videos = {shardutils.get_shard_key(video.get_hash()): video for video in self.state.collection.add_files(files)}
+        (lost_key, lost_video), (kept_key, kept_video) = list(videos.items())[:2]
+        for video in (lost_video, kept_video):
+            self.state.command_buffer.add_command(MoveVideoCmd(video, temp_path / 'dest', '%title'))
+        self.facade.save_state()
+        saved = state_path.read_bytes()
+        shardutils.get_shard_path(configutils.get_collection_shard_dir(), lost_key).write_bytes(b'not a shard')
+
+        # Act
+        loaded_session = Facade(PyvorgState())
+        with self.assertLogs(level='ERROR'):
+            loaded_session.load_state()
+
+        # Assert
+        staged = loaded_session.state.command_buffer.cmd_buffer
+        self.assertEqual([kept_video.get_hash()], [cmd.video.get_hash() for cmd in staged])
+        backups = list(temp_path.glob(state_path.name + '.*' + shardutils.BACKUP_SUFFIX))
+        self.assertEqual([saved], [path.read_bytes() for path in backups])
+
+    @patch.object(configutils, 'get_default_state_path')
+    def test_save_state_merges_concurrent_changes(self, mock_get_state_path):
+        # Arrange
+        temp_path = Path(self.temp_dir.name)
+        mock_get_state_path.return_value = temp_path / 'mock_state.file'
+        files = create_dummy_files(temp_path, 4, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.state.collection.add_files(files[:3])
+        self.facade.save_state()
+        first, second = Facade(PyvorgState()), Facade(PyvorgState())
+        first.load_state()
+        second.load_state()
+        first_video, second_video = (first.state.collection.get_video_by_path(path) for path in files[:2])
+        first_video.set_user_data('title', 'first')
+        first.state.collection.add_files(files[3:])
+        first.state.command_buffer.add_command(MoveVideoCmd(first_video, temp_path / 'dest', '%title'))
+        second.state.collection.get_video_by_path(files[1]).set_user_data('title', 'second')
+        second.state.collection.remove_path(files[2])
+
+        # Act
+        first.save_state()
+        second.save_state()
+        loaded_session = Facade(PyvorgState())
+        loaded_session.load_state()
+
+        # Assert
+        loaded = loaded_session.state
+        self.assertEqual({str(path) for path in files[:2] + files[3:]}, set(loaded.collection.get_paths()))
+        self.assertEqual('first', loaded.collection.get_video_by_path(files[0]).get_user_data('title'))
+        self.assertEqual('second', loaded.collection.get_video_by_path(files[1]).get_user_data('title'))
+        self.assertEqual(1, len(loaded.command_buffer.cmd_buffer))
+        self.assertEqual(1, len(second.state.command_buffer.cmd_buffer))
+
+    @patch.object(configutils, 'get_default_journal_path')
+    @patch.object(configutils, 'get_default_state_path')
+    def test_scan_with_queue(self, mock_get_state_path, mock_get_journal_path):
+        # Arrange
+        mock_get_state_path.return_value = Path(self.temp_dir.name) / 'mock_state.file'
+        mock_get_journal_path.return_value = Path(self.temp_dir.name) / 'test.journal'
+        scan_path = Path(self.temp_dir.name) / 'videos'
+        queue_path = str(Path(self.temp_dir.name) / 'queue.sqlite')
+        (scan_path / 'sub').mkdir(parents=True)
+        files = create_dummy_files(scan_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        create_dummy_files(scan_path / 'sub', 2, lambda x: 'sub_' + str(x) + '.mp4')
+
+        # Act
+        queued = self.facade.queue_scan(queue_path, str(scan_path), recursive=True)
+        worked = self.facade.run_scan_worker(queue_path, 'worker')
+        collected = self.facade.collect_scan_results(queue_path)
+
+        # Assert
+        status = self.facade.get_scan_queue_status(queue_path)
+        self.assertEqual(2, queued)
+        self.assertEqual({'directories': 2, 'files': 5, 'failed': 0, 'lost': 0}, worked)
+        self.assertEqual({'added': 5, 'invalid': 0}, collected)
+        self.assertEqual(2, status['done'])
+        self.assertEqual(0, status['results'])
+        self.assertIsNotNone(self.state.collection.get_video_by_path(files[0].resolve()))
+        # The files in 'sub' have the same contents as two of the others
+        self.assertEqual(3, len(list(self.state.collection.get_videos())))
+
+    @patch.object(Facade, 'save_state', side_effect=OSError('disk full'))
+    def test_collect_scan_results_save_failed(self, mock_save_state):
+        # Arrange
+        scan_path = Path(self.temp_dir.name) / 'videos'
+        queue_path = str(Path(self.temp_dir.name) / 'queue.sqlite')
+        scan_path.mkdir()
+        create_dummy_files(scan_path, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.facade.queue_scan(queue_path, str(scan_path))
+        self.facade.run_scan_worker(queue_path, 'worker')
+
+        # Act
+        with self.assertRaises(OSError):
+            self.facade.collect_scan_results(queue_path)
+
+        # Assert
+        self.assertEqual(2, self.facade.get_scan_queue_status(queue_path)['results'])
+
+    @patch.object(WorkQueue, 'renew', return_value=False)
+    def test_scan_with_queue_lease_lost(self, mock_renew):
+        # Arrange
+        scan_path = Path(self.temp_dir.name) / 'videos'
+        queue_path = Path(self.temp_dir.name) / 'queue.sqlite'
+        scan_path.mkdir()
+        create_dummy_files(scan_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.facade.queue_scan(str(queue_path), str(scan_path))
+
+        # Act
+        worked = RunScanWorker().call(queue_path, 'worker', lease=0)
+
+        # Assert
+        status = self.facade.get_scan_queue_status(str(queue_path))
+        self.assertTrue(mock_renew.called)
+        # The lease runs out at once, so the worker claims the task again until it is given up
+        self.assertEqual({'directories': 0, 'files': 0, 'failed': 0, 'lost': WORK_QUEUE_MAX_ATTEMPTS}, worked)
+        self.assertEqual(0, status['done'])
+        self.assertEqual(0, status['results'])
 
     def test_scan_files_in_path(self):
         # Arrange
@@ -213,6 +629,28 @@ class TestFacade(TestCase):
             self.assertIn('filename', cmd.kwargs.keys())
             self.assertIn('path', cmd.kwargs.keys())
 
+    @patch.object(pluginutils, 'get_plugin_instance')
+    def test_stage_update_api_metadata_older_than(self, mock_get_plugin_instance):
+        # Arrange
+        files = create_dummy_files(self.temp_dir.name, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        fresh, stale, _ = self.state.collection.add_files(files)
+        fresh.record_fetch('plugin_name')
+        stale.record_fetch('plugin_name')
+        stale.set_fetch_record('plugin_name', {FETCH_SUCCEEDED: '2000-01-01 00:00:00'})
+
+        mock_plugin = Mock()
+        mock_plugin.get_name.return_value = 'plugin_name'
+        mock_plugin.get_required_params.return_value = ['filename']
+        mock_get_plugin_instance.return_value = mock_plugin
+
+        # Act
+        self.facade.stage_update_api_metadata('plugin_name', older_than=7 * 24 * 3600)
+
+        # Assert
+        cmds: list[UpdateVideoData] = self.state.command_buffer._get_commands()
+        self.assertEqual(2, len(cmds))
+        self.assertNotIn(fresh, [cmd.video for cmd in cmds])
+
     def test_undo_transaction(self):
         # Arrange
         test_cmd_1 = FauxCmd()
@@ -237,3 +675,54 @@ class TestFacade(TestCase):
         self.assertTrue(test_cmd_4.undo_called)
         self.assertFalse(test_cmd_1.undo_called)
         self.assertFalse(test_cmd_2.undo_called)
+
+    @patch.object(watchpath_svc, 'WATCH_SETTLE_TIME', 0)
+    @patch.object(watchpath_svc, 'WATCH_POLL_INTERVAL', 0.05)
+    @patch.object(configutils, 'get_default_state_path')
+    def test_watch_path(self, mock_get_state_path):
+        # Arrange
+        mock_get_state_path.return_value = Path(self.temp_dir.name) / 'mock_state.file'
+        watch_path = Path(self.temp_dir.name).resolve() / 'watched'
+        watch_path.mkdir()
+        existing = create_dummy_files(watch_path, 1, lambda x: 'existing_' + str(x) + '.mp4')
+        stop_event = threading.Event()
+        watcher = threading.Thread(target=self.facade.watch_path,
+                                   args=(str(watch_path), False, True, stop_event))
+
+        # Act
+        watcher.start()
+        added = [watch_path / 'added_1.mp4', watch_path / 'added_2.mkv']
+        for num, path in enumerate(added, start=1):
+            path.write_text(f'added {num}')
+        deadline = time.monotonic() + 5
+        while len(self.state.collection.videos) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stop_event.set()
+        watcher.join(5)
+
+        # Assert
+        paths = {video.get_path() for video in self.state.collection.get_videos()}
+        self.assertEqual(set(existing + added), paths)
+        self.assertTrue(mock_get_state_path.return_value.exists())
+
+    @patch.object(configutils, 'get_metrics_path')
+    def test_write_metrics(self, mock_get_metrics_path):
+        # Arrange
+        summary_path = Path(self.temp_dir.name) / 'metrics.json'
+        prometheus_path = Path(self.temp_dir.name) / 'metrics.prom'
+        mock_get_metrics_path.return_value = summary_path
+        scan_path = Path(self.temp_dir.name) / 'videos'
+        scan_path.mkdir()
+        create_dummy_files(scan_path, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        metricsutils.reset()
+
+        # Act
+        self.facade.scan_files_in_path(str(scan_path))
+        self.facade.write_metrics(str(prometheus_path))
+
+        # Assert
+        summary = json.loads(summary_path.read_text())
+        self.assertEqual(3, summary['counters']['scan_files_total'])
+        self.assertEqual(3, summary['counters']['hash_files_total'])
+        self.assertEqual(1, summary['histograms']['scan_seconds']['count'])
+        self.assertIn('pyvorg_scan_files_total 3', prometheus_path.read_text().splitlines())
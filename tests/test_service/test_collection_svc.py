@@ -1,12 +1,16 @@
 # tests/test_service/test_collection_svc.py
 
 # Standard library
+from copy import deepcopy
 from unittest import TestCase
 from unittest.mock import call, Mock
 
 # Local imports
 import source.utils.collectionutils as col_svc
+from source.constants import *
+from source.exceptions import ValidationError
 from source.state.col import Collection
+from source.state.mediafile import MediaFile
 
 # Third-party packages
 
@@ -72,6 +76,54 @@ class TestCollectionService(TestCase):
         self.assertIn('vid_1_val', result.get('vid_1_id').values())
         self.assertIn('vid_2_val', result.get('vid_2_id').values())
 
+    def test_get_metadata_columns(self):
+        # Arrange
+        test_collection = Collection()
+        record_1 = make_record('hash_1', '2000-01-01 00:00:00', {'title': 'first'})
+        record_1[GUESSIT_DATA] = {'year': 1999, 'other': ['Rip']}
+        record_1[FILE_DATA][SIZE] = 10
+        record_2 = make_record('hash_2', 'not a timestamp', {'year': 'n.d.'})
+        record_2[GUESSIT_DATA] = {'year': '2001'}
+        test_collection.add_video_instance(MediaFile.from_dict(record_1))
+        test_collection.add_video_instance(MediaFile.from_dict(record_2))
+
+        # Act
+        result = col_svc.get_metadata_columns(test_collection)
+
+        # Assert
+        self.assertEqual(['hash_1', 'hash_2'], result['id'])
+        self.assertEqual(['first', None], result['title'])
+        self.assertEqual(['1999', 'n.d.'], result['year'])
+        self.assertEqual([1999, 2001], result['guessit.year'])
+        self.assertEqual(['["Rip"]', None], result['guessit.other'])
+        self.assertEqual(['2000-01-01 00:00:00', 'not a timestamp'], result['file_data.timestamp'])
+        self.assertEqual([10, None], result['file_data.size'])
+        self.assertTrue(all(len(column) == 2 for column in result.values()))
+
+    def test_iter_metadata(self):
+        # Arrange
+        video_1 = Mock()
+        video_2 = Mock()
+        video_1.get_hash.return_value = 'vid_1_id'
+        video_2.get_hash.return_value = 'vid_2_id'
+        video_1.get_pref_data.side_effect = lambda x: 'vid_1_' + x
+        video_2.get_pref_data.side_effect = lambda x: 'vid_2_' + x
+        video_1.to_dict.return_value = {'vid_1_key': 'vid_1_val'}
+        video_2.to_dict.return_value = {'vid_2_key': 'vid_2_val'}
+
+        test_collection = Collection()
+        test_collection.add_video_instance(video_1)
+        test_collection.add_video_instance(video_2)
+
+        # Act
+        result_all = list(col_svc.iter_metadata(test_collection))
+        result_filtered = list(col_svc.iter_metadata(test_collection, ['title=vid_2_title']))
+
+        # Assert
+        self.assertEqual([('vid_1_id', {'vid_1_key': 'vid_1_val'}),
+                          ('vid_2_id', {'vid_2_key': 'vid_2_val'})], result_all)
+        self.assertEqual([('vid_2_id', {'vid_2_key': 'vid_2_val'})], result_filtered)
+
     def test_get_filtered_videos(self):
         # Arrange
         mock_vid_1 = Mock()
@@ -92,22 +144,92 @@ class TestCollectionService(TestCase):
 
     def test_import_metadata(self):
         # Arrange
-        mock_collection = Mock()
-        mock_collection.videos = {'base_key': 'base_value'}
-        metadata = {'import_key': 'import_value'}
+        test_collection = Collection()
+        existing = MediaFile.from_dict(make_record('hash_1', '2000-01-01 00:00:00', {'title': 'old'}))
+        test_collection.add_video_instance(existing)
+        records = [
+            ('hash_1', make_record('hash_1', '2001-01-01 00:00:00', {'title': 'new'})),
+            ('hash_2', make_record('hash_2', '2001-01-01 00:00:00', {'title': 'added'})),
+            ('hash_3', {'no_file_data': {}}),
+        ]
 
         # Act
-        col_svc.import_metadata(mock_collection, metadata)
+        result = col_svc.import_metadata(test_collection, records)
 
         # Assert
-        self.assertIn('import_key', mock_collection.videos.keys())
-        self.assertIn('import_value', mock_collection.videos.values())
+        self.assertEqual({'added': 1, 'merged': 1, 'invalid': 1}, result)
+        self.assertEqual('new', test_collection.get_video('hash_1').get_source_data(USER_DATA, 'title'))
+        self.assertEqual('added', test_collection.get_video('hash_2').get_source_data(USER_DATA, 'title'))
+        self.assertIsNone(test_collection.get_video('hash_3'))
 
-    def test_validate_metadata(self):
-        # TODO: Implement source; nothing to test
+    def test_merge_video_data(self):
+        # Arrange
+        older = make_record('hash_1', '2000-01-01 00:00:00', {'title': 'older'})
+        newer = make_record('hash_1', '2001-01-01 00:00:00', {'title': 'newer'})
+        newer[GUESSIT_DATA] = {'title': 'guessed'}
+
+        # Act and Assert
+        video = MediaFile.from_dict(deepcopy(older))
+        col_svc.merge_video_data(video, newer, MERGE_KEEP)
+        self.assertEqual('older', video.get_source_data(USER_DATA, 'title'))
+        self.assertEqual('guessed', video.get_source_data(GUESSIT_DATA, 'title'))
+
+        video = MediaFile.from_dict(deepcopy(older))
+        col_svc.merge_video_data(video, newer, MERGE_NEWEST)
+        self.assertEqual('newer', video.get_source_data(USER_DATA, 'title'))
+
+        video = MediaFile.from_dict(deepcopy(newer))
+        col_svc.merge_video_data(video, older, MERGE_NEWEST)
+        self.assertEqual('newer', video.get_source_data(USER_DATA, 'title'))
+
+        video = MediaFile.from_dict(deepcopy(newer))
+        col_svc.merge_video_data(video, older, MERGE_OVERWRITE)
+        self.assertEqual('older', video.get_source_data(USER_DATA, 'title'))
+        self.assertEqual('2001-01-01 00:00:00', video.get_source_data(FILE_DATA, TIMESTAMP))
+
+    def test_merge_video_data_newest_fetch(self):
         # Arrange
+        local = make_record('hash_1', '2001-01-01 00:00:00', {})
+        local[OMDB_DATA] = {'Title': 'local'}
+        local[FETCH_DATA] = {OMDB_DATA: {FETCH_ATTEMPTED: '2000-06-01 00:00:00',
+                                         FETCH_SUCCEEDED: '2000-06-01 00:00:00', FETCH_ERROR: None}}
+        imported = make_record('hash_1', '2000-01-01 00:00:00', {})
+        imported[OMDB_DATA] = {'Title': 'imported'}
+        imported[FETCH_DATA] = {OMDB_DATA: {FETCH_ATTEMPTED: '2000-07-01 00:00:00',
+                                            FETCH_SUCCEEDED: '2000-07-01 00:00:00', FETCH_ERROR: None}}
+        video = MediaFile.from_dict(deepcopy(local))
 
         # Act
+        col_svc.merge_video_data(video, imported, MERGE_NEWEST)
 
         # Assert
-        pass
+        self.assertEqual('imported', video.get_source_data(OMDB_DATA, 'Title'))
+        self.assertEqual(imported[FETCH_DATA][OMDB_DATA], video.get_fetch_record(OMDB_DATA))
+        self.assertEqual('2001-01-01 00:00:00', video.get_source_data(FILE_DATA, TIMESTAMP))
+
+    def test_validate_metadata(self):
+        # Arrange
+        valid = make_record('hash_1', '2000-01-01 00:00:00', {})
+        wrong_hash = make_record('hash_2', '2000-01-01 00:00:00', {})
+        bad_timestamp = make_record('hash_1', 'yesterday', {})
+        bad_source = make_record('hash_1', '2000-01-01 00:00:00', {})
+        bad_source[OMDB_DATA] = 'not an object'
+
+        # Act and Assert
+        col_svc.validate_metadata('hash_1', valid)
+        for record in (wrong_hash, bad_timestamp, bad_source, 'not an object'):
+            with self.assertRaises(ValidationError):
+                col_svc.validate_metadata('hash_1', record)
+
+
+def make_record(video_hash: str, timestamp: str, user_data: dict) -> dict:
+    return {
+        USER_DATA: user_data,
+        FILE_DATA: {
+            PATH: '/videos/' + video_hash + '.mp4',
+            ROOT: '/videos',
+            FILENAME: video_hash + '.mp4',
+            HASH: video_hash,
+            TIMESTAMP: timestamp
+        }
+    }
@@ -5,8 +5,14 @@
 """
 
 # Standard library
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 # Local imports
+from source.constants import ENV_LOGS_DIR
+from source.utils import configutils
 
 # Third-party packages
 # n/a
@@ -56,6 +62,13 @@ def test_get_user_profile_dir():
 
 def test_get_user_logs_dir():
     # Arrange
-    # Act
-    # Assert
-    pass
+    with TemporaryDirectory() as temp_dir:
+        logs_dir = Path(temp_dir) / 'logs'
+
+        # Act
+        with patch.dict(os.environ, {ENV_LOGS_DIR: str(logs_dir)}):
+            result = configutils.get_user_logs_dir()
+
+        # Assert
+        assert result == logs_dir
+        assert logs_dir.is_dir()
@@ -1,6 +1,7 @@
 # ./source/tests/test_service/test_files_svc.py
 
 # Standard library
+import gzip
 import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -56,6 +57,23 @@ class TestFileService(TestCase):
         with self.assertRaises(FileExistsError):
             fileutils.file_write(already_exists, self.test_data)
 
+    def test_file_write_chunks(self):
+        # Arrange
+        plain_path = Path(self.temp_dir.name) / 'chunks.txt'
+        gzip_path = Path(self.temp_dir.name) / 'chunks.txt.gz'
+        chunks = ['chunk_1\n', 'chunk_2\n']
+
+        # Act
+        fileutils.file_write_chunks(plain_path, iter(chunks))
+        fileutils.file_write_chunks(gzip_path, iter(chunks))
+
+        # Assert
+        self.assertEqual('chunk_1\nchunk_2\n', plain_path.read_text())
+        with gzip.open(gzip_path, 'rt') as file:
+            self.assertEqual('chunk_1\nchunk_2\n', file.read())
+        with self.assertRaises(FileExistsError):
+            fileutils.file_write_chunks(plain_path, iter(chunks))
+
     def test_file_read(self):
         # Arrange
         file_exists = Path(self.temp_dir.name) / 'exists.file'
@@ -3,13 +3,14 @@
 # Standard library
 import importlib
 import os
+from pathlib import Path
 from unittest import TestCase
 from unittest.mock import patch, MagicMock, Mock
 from tempfile import TemporaryDirectory
 import sys
 
 # Local imports
-from source.utils import pluginutils
+from source.utils import packageutils, pluginutils
 from source.datasources.base_metadata_source import MetadataSource
 
 # Third-party packages
@@ -46,6 +47,12 @@ class TestPluginService(TestCase):
     def tearDown(self) -> None:
         self.temp_dir.cleanup()
         sys.path.pop(0)
+        packageutils.clear_registries()
+
+    def import_fake_pkg(self):
+        for name in [name for name in sys.modules if name.startswith(self.fake_pkg_name)]:
+            del sys.modules[name]
+        return importlib.import_module(self.fake_pkg_name)
 
     def test_discover_api_classes(self):
         class FakeAPI(MetadataSource):
@@ -124,6 +131,93 @@ class TestPluginService(TestCase):
         self.assertIsInstance(result_1, MetadataSource)
         self.assertIsInstance(result_2, MetadataSource)
 
+    def test_get_plugin_instance_imports_only_requested(self):
+        # Arrange
+        test_pkg = self.import_fake_pkg()
+
+        # Act
+        result = pluginutils.get_plugin_instance('FakeAPI1', test_pkg)
+
+        # Assert
+        self.assertIsInstance(result, MetadataSource)
+        self.assertIn(f'{self.fake_pkg_name}.{self.fake_mod_1_name}', sys.modules)
+        self.assertNotIn(f'{self.fake_pkg_name}.{self.fake_mod_2_name}', sys.modules)
+
+    def test_get_plugin_names(self):
+        # Arrange
+        test_pkg = self.import_fake_pkg()
+
+        # Act
+        result = pluginutils.get_plugin_names(test_pkg)
+
+        # Assert
+        self.assertEqual({'FakeAPI1', 'FakeAPI2'}, set(result))
+        self.assertNotIn(f'{self.fake_pkg_name}.{self.fake_mod_1_name}', sys.modules)
+
+    def test_get_registry_cached(self):
+        # Arrange
+        test_pkg = self.import_fake_pkg()
+        packageutils.get_registry(test_pkg, MetadataSource, '_plugin')
+
+        # Act
+        with patch.object(packageutils, 'build_registry') as mock_build_registry:
+            result = packageutils.get_registry(test_pkg, MetadataSource, '_plugin')
+
+        # Assert
+        mock_build_registry.assert_not_called()
+        self.assertEqual(f'{self.fake_pkg_name}.{self.fake_mod_1_name}', result['FakeAPI1'])
+
+    def test_get_registry_manifest(self):
+        # Arrange
+        test_pkg = self.import_fake_pkg()
+        manifest_path = Path(self.temp_dir.name) / 'manifest.json'
+        packageutils.get_registry(test_pkg, MetadataSource, '_plugin', manifest_path)
+        packageutils.clear_registries()
+
+        # Act
+        with patch.object(packageutils, 'build_registry') as mock_build_registry:
+            result = packageutils.get_registry(test_pkg, MetadataSource, '_plugin', manifest_path)
+
+        # Assert
+        self.assertTrue(manifest_path.exists())
+        mock_build_registry.assert_not_called()
+        self.assertEqual({'FakeAPI1', 'FakeAPI2'}, set(result.keys()))
+
+    def test_get_registry_manifest_stale(self):
+        # Arrange
+        test_pkg = self.import_fake_pkg()
+        manifest_path = Path(self.temp_dir.name) / 'manifest.json'
+        packageutils.get_registry(test_pkg, MetadataSource, '_plugin', manifest_path)
+        packageutils.clear_registries()
+        fake_mod_3_path = os.path.join(self.temp_path, 'fake_plugin_3.py')
+        with open(fake_mod_3_path, 'w') as file:
+            file.write("from source.datasources.base_metadata_source import MetadataSource\n"
+                       "class FakeAPI3(MetadataSource):\n"
+                       "    pass\n")
+
+        # Act
+        result = packageutils.get_registry(test_pkg, MetadataSource, '_plugin', manifest_path)
+
+        # Assert
+        self.assertEqual({'FakeAPI1', 'FakeAPI2', 'FakeAPI3'}, set(result.keys()))
+
+    def test_scan_subclass_names_indirect(self):
+        # Arrange
+        module_path = Path(self.temp_path) / 'fake_plugin_4.py'
+        module_path.write_text("import base\n"
+                               "class Helper:\n"
+                               "    pass\n"
+                               "class Child(Parent):\n"
+                               "    pass\n"
+                               "class Parent(base.MetadataSource):\n"
+                               "    pass\n")
+
+        # Act
+        result = packageutils.scan_subclass_names(str(module_path), MetadataSource)
+
+        # Assert
+        self.assertEqual({'Parent', 'Child'}, set(result))
+
     def test_get_required_params(self):
         # Arrange
         mock_plugin = Mock()
@@ -1,12 +1,14 @@
 # tests/test_service/test_videoservice.py
 
 # Standard library
+from datetime import datetime, timedelta
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest import TestCase
 from unittest.mock import patch, Mock
 
 # Local imports
+from source.state.mediafile import MediaFile
 from source.utils import videoutils
 from source.utils.helper import create_dummy_files
 
@@ -98,3 +100,23 @@ class TestVideoService(TestCase):
         # Assert
         self.assertIn({'param_1': 'param_1_return', 'param_2': 'param_2_return'}, result)
         self.assertIn({'param_1': 'param_1_return', 'param_2': 'param_2_return'}, result)
+
+    def test_filter_videos_to_fetch(self):
+        # Arrange
+        now = datetime(2000, 3, 1)
+        never, legacy, fresh, stale, failed = videos = [MediaFile() for _ in range(5)]
+        legacy.set_source_data('api', {'title': 'legacy'})
+        for video, succeeded, error in ((fresh, '2000-02-28 00:00:00', None),
+                                        (stale, '2000-01-01 00:00:00', None),
+                                        (failed, '2000-02-28 00:00:00', 'timed out')):
+            video.set_source_data('api', {'title': 'fetched'})
+            video.set_fetch_record('api', {'attempted': '2000-02-29 00:00:00', 'succeeded': succeeded, 'error': error})
+
+        # Act and Assert
+        self.assertEqual(videos, videoutils.filter_videos_to_fetch(videos, 'api', now=now))
+        self.assertEqual([never], videoutils.filter_videos_to_fetch(videos, 'api', missing_only=True, now=now))
+        self.assertEqual([failed], videoutils.filter_videos_to_fetch(videos, 'api', failed_only=True, now=now))
+        self.assertEqual([never, legacy, stale],
+                         videoutils.filter_videos_to_fetch(videos, 'api', older_than=timedelta(days=7), now=now))
+        self.assertEqual([never, failed],
+                         videoutils.filter_videos_to_fetch(videos, 'api', missing_only=True, failed_only=True, now=now))
@@ -23,16 +23,18 @@ class FauxCmd(Command):
     def exec(self):
         self.execute_called = True
 
-    @staticmethod
-    def from_dict(d):
-        pass
+    @classmethod
+    def from_dict(cls, data, read_video):
+        cmd = cls.__new__(cls)
+        cmd.__dict__.update(data)
+        return cmd
 
     @staticmethod
     def from_json(j):
         pass
 
-    def to_dict(self):
-        pass
+    def to_dict(self, write_video):
+        return dict(self.__dict__)
 
     def to_json(self):
         pass
@@ -45,3 +47,15 @@ class FauxCmd(Command):
 
     def validate_undo(self):
         self.undo_is_valid_called = True
+
+
+class FaultyCmd(FauxCmd):
+
+    def __init__(self, fail: bool = True):
+        super().__init__()
+        self.fail = fail
+
+    def exec(self):
+        if self.fail:
+            raise OSError("Simulated failure")
+        super().exec()
@@ -6,6 +6,7 @@
 
 # Standard library
 from pathlib import Path
+import pickle
 from tempfile import TemporaryDirectory
 from unittest import TestCase
 from unittest.mock import call, Mock, patch
@@ -171,14 +172,136 @@ class TestCollection(TestCase):
         self.assertTrue(vid_remove not in self.test_collection.videos.values())
         self.assertTrue(vid_dont_remove in self.test_collection.videos.values())
 
+    def write_copies(self, names: list[str], contents: bytes = b'same contents') -> list[Path]:
+        paths = []
+        for name in names:
+            path = Path(self.test_dir.name, name).resolve()
+            path.write_bytes(contents)
+            paths.append(path)
+        return paths
+
+    def test_add_video_file_copy(self):
+        # Arrange
+        original, copy = self.write_copies(['original.mp4', 'copy.mp4'])
+        video = self.test_collection.add_video_file(original)
+        video.set_source_data('omdb', {'Title': 'Kept'})
+
+        # Act
+        result = self.test_collection.add_video_file(copy)
+
+        # Assert
+        video_id = video.get_hash()
+        self.assertIs(video, result)
+        self.assertEqual({video_id: video}, self.test_collection.videos)
+        self.assertEqual([str(original), str(copy)], self.test_collection.get_locations(video_id))
+        self.assertIs(video, self.test_collection.get_video_by_path(copy))
+        self.assertEqual('Kept', video.get_source_data('omdb', 'Title'))
+
+    def test_add_video_file_contents_changed(self):
+        # Arrange
+        path, = self.write_copies(['video.mp4'])
+        old_id = self.test_collection.add_video_file(path).get_hash()
+        path.write_bytes(b'new contents')
+
+        # Act
+        new_id = self.test_collection.add_video_file(path).get_hash()
+
+        # Assert
+        self.assertEqual([new_id], list(self.test_collection.get_video_ids()))
+        self.assertNotEqual(old_id, new_id)
+        self.assertEqual(new_id, self.test_collection.get_video_id_by_path(path))
+
+    def test_remove_path(self):
+        # Arrange
+        original, copy = self.write_copies(['original.mp4', 'copy.mp4'])
+        video = self.test_collection.add_video_file(original)
+        self.test_collection.add_video_file(copy)
+
+        # Act
+        self.test_collection.remove_path(original)
+
+        # Assert
+        self.assertEqual(copy, video.get_path())
+        self.assertEqual([str(copy)], self.test_collection.get_locations(video.get_hash()))
+        self.assertIsNone(self.test_collection.get_video_by_path(original))
+
+        # Act
+        self.test_collection.remove_path(copy)
+
+        # Assert
+        self.assertEqual({}, self.test_collection.videos)
+        self.assertEqual({}, self.test_collection.copies)
+
+    def test_get_paths_under(self):
+        # Arrange
+        root = Path(self.test_dir.name).resolve()
+        (root / 'dir').mkdir()
+        (root / 'dir2').mkdir()
+        first, second, other = self.write_copies(['dir/a.mp4', 'dir/b.mp4', 'dir2/c.mp4'])
+        for path in (first, second, other):
+            self.test_collection.add_video_file(path)
+        self.assertEqual([str(first), str(second)], self.test_collection.get_paths_under(root / 'dir'))
+
+        # Act
+        self.test_collection.move_path(str(first), str(root / 'dir2' / 'a.mp4'))
+        self.test_collection.remove_path(str(second))
+
+        # Assert
+        self.assertEqual([], self.test_collection.get_paths_under(root / 'dir'))
+        self.assertEqual([str(root / 'dir2' / 'a.mp4'), str(other)],
+                         self.test_collection.get_paths_under(str(root / 'dir2') + '/'))
+        self.assertEqual([str(other)], self.test_collection.get_paths_under(other))
+
+    def test_get_video_id_by_path_after_move(self):
+        # Arrange
+        path, = self.write_copies(['video.mp4'])
+        video = self.test_collection.add_video_file(path)
+        video_id = video.get_hash()
+        new_path = path.with_name('moved.mp4')
+        path.rename(new_path)
+        video.update_file_data(new_path, True)
+        self.test_collection.reindex()
+
+        # Act
+        old_id = self.test_collection.get_video_id_by_path(path)
+        new_id = self.test_collection.get_video_id_by_path(new_path)
+
+        # Assert
+        self.assertIsNone(old_id)
+        self.assertEqual(video_id, new_id)
+
+    def test_pickle_drops_path_index(self):
+        # Arrange
+        original, copy = self.write_copies(['original.mp4', 'copy.mp4'])
+        self.test_collection.add_files([original, copy])
+
+        # Act
+        result = pickle.loads(pickle.dumps(self.test_collection))
+
+        # Assert
+        self.assertIsNone(result.__dict__['_path_index'])
+        self.assertEqual(self.test_collection.copies, result.copies)
+        self.assertIsNotNone(result.get_video_by_path(copy))
+
+    def test_unpickle_without_copies(self):
+        # Arrange
+        legacy = Collection.__new__(Collection)
+
+        # Act
+        legacy.__setstate__({'videos': {}})
+
+        # Assert
+        self.assertEqual({}, legacy.copies)
+        self.assertEqual([], legacy.get_paths())
+
     @patch('source.state.col.Collection.get_videos')
     def test_to_dict(self, mock_get_videos):
         # Arrange
         video_1 = Mock()
         video_2 = Mock()
 
-        video_1.data = {"test key 1": "test data 1"}
-        video_2.data = {"test key 2": "test data 2"}
+        video_1.to_dict.return_value = {"test key 1": "test data 1"}
+        video_2.to_dict.return_value = {"test key 2": "test data 2"}
 
         video_1.get_hash.return_value = "hash_1"
         video_2.get_hash.return_value = "hash_2"
@@ -5,7 +5,9 @@
 """
 
 # Standard library
+import json
 import os.path
+import pickle
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
@@ -51,6 +53,79 @@ class TestVideo(TestCase):
         # Assert
         pass
 
+    def test_from_dict(self):
+        # Arrange
+        data = {FILE_DATA: {HASH: 'fake_hash'}, OMDB_DATA: {'Title': 'fake title'}}
+
+        # Act
+        result = MediaFile.from_dict(data)
+
+        # Assert
+        self.assertEqual('fake_hash', result.get_hash())
+        self.assertEqual('fake title', result.get_source_data(OMDB_DATA, 'Title'))
+        self.assertEqual({}, result.get_source_data(USER_DATA))
+
+    def test_compact_file_data(self):
+        # Act
+        self.test_vid.data = self.test_vid.to_dict()
+
+        # Assert
+        self.assertEqual(32, len(self.test_vid._hash))
+        self.assertEqual(1, self.test_vid._timestamp)
+        self.assertEqual('1970-01-01 00:00:01', self.test_vid.get_source_data(FILE_DATA, TIMESTAMP))
+        self.assertFalse(hasattr(self.test_vid, '__dict__'))
+
+    def test_data_view_writes_through(self):
+        # Act
+        self.test_vid.data[OMDB_DATA] = {'Title': 'fake title'}
+        self.test_vid.data.pop(USER_DATA)
+
+        # Assert
+        self.assertEqual('fake title', self.test_vid.get_source_data(OMDB_DATA, 'Title'))
+        self.assertEqual([FILE_DATA, OMDB_DATA], self.test_vid.get_source_names())
+
+    def test_file_data_view_writes_through(self):
+        # Arrange
+        changed = []
+        self.test_vid.set_listener(changed.append)
+
+        # Act
+        self.test_vid.data[FILE_DATA][HASH] = 'cd' * 32
+        self.test_vid.data[FILE_DATA][FILENAME] = 'renamed.vid'
+        del self.test_vid.data[FILE_DATA][TIMESTAMP]
+
+        # Assert
+        self.assertEqual('cd' * 32, self.test_vid.get_hash())
+        self.assertEqual(Path(self.temp_dir.name, 'renamed.vid'), self.test_vid.get_path())
+        self.assertEqual([PATH, ROOT, FILENAME, HASH], self.test_vid.get_source_keys(FILE_DATA))
+        self.assertIn(self.test_vid, changed)
+        with self.assertRaises(KeyError):
+            self.test_vid.data[FILE_DATA]['duration'] = 1
+        json.dumps(self.test_vid.to_dict())
+
+    def test_pickle(self):
+        # Arrange
+        legacy = object.__new__(MediaFile)
+        legacy.__setstate__({'data': self.test_vid.to_dict()})
+
+        # Act
+        result = pickle.loads(pickle.dumps(self.test_vid))
+
+        # Assert
+        self.assertEqual(self.test_vid.to_dict(), result.to_dict())
+        self.assertEqual(self.test_vid.to_dict(), legacy.to_dict())
+
+    def test_record(self):
+        # Arrange
+        self.test_vid.set_source_data(OMDB_DATA, {'Title': 'fake title'})
+
+        # Act
+        result = MediaFile.from_record(json.loads(json.dumps(self.test_vid.to_record())))
+
+        # Assert
+        self.assertEqual(self.test_vid.to_dict(), result.to_dict())
+        self.assertEqual(self.test_vid.get_source_names(), result.get_source_names())
+
     def test_get_filename(self):
         result = self.test_vid.get_filename()
         expected_filename = self.temp_vid_filename
@@ -97,6 +172,44 @@ class TestVideo(TestCase):
         result = self.test_vid.get_pref_data(key)
         self.assertEqual(expected_value, result)
 
+    def test_get_pref_items(self):
+        # Arrange
+        self.test_vid.data = {
+            USER_DATA: {'Title': 'user title'},
+            OMDB_DATA: {'title': 'omdb title', 'Year': '2001'},
+            'other': {'year': '1999', 'genre': 'drama'}
+        }
+
+        # Act
+        result = self.test_vid.get_pref_items()
+
+        # Assert
+        self.assertEqual({'title': 'user title', 'year': '2001', 'genre': 'drama'}, result)
+        for key in result:
+            self.assertEqual(self.test_vid.get_pref_data(key), result[key])
+
+    def test_record_fetch(self):
+        # Arrange
+        self.test_vid.set_source_data(OMDB_DATA, {'Title': 'omdb title'})
+
+        # Act
+        with patch('source.state.mediafile.timestamp_generate', return_value='2000-01-01 00:00:00'):
+            self.test_vid.record_fetch(OMDB_DATA)
+        with patch('source.state.mediafile.timestamp_generate', return_value='2000-02-01 00:00:00'):
+            self.test_vid.record_fetch(OMDB_DATA, 'timed out')
+        record = self.test_vid.get_fetch_record(OMDB_DATA)
+
+        # Assert
+        self.assertEqual({FETCH_ATTEMPTED: '2000-02-01 00:00:00',
+                          FETCH_SUCCEEDED: '2000-01-01 00:00:00',
+                          FETCH_ERROR: 'timed out'}, record)
+        self.assertIsNone(self.test_vid.get_fetch_record(GUESSIT_DATA))
+        self.assertEqual({OMDB_DATA: record}, json.loads(json.dumps(self.test_vid.to_dict()))[FETCH_DATA])
+        self.assertNotIn(OMDB_DATA, self.test_vid.get_pref_items())
+        self.assertIsNone(self.test_vid.get_pref_data(OMDB_DATA))
+        self.test_vid.set_fetch_record(OMDB_DATA, None)
+        self.assertNotIn(FETCH_DATA, self.test_vid.get_source_names())
+
     def test_get_root(self):
         # Todo: take a better look at testing paths vs strings here
         result = self.test_vid.get_root()
@@ -224,7 +337,8 @@ class TestVideo(TestCase):
                 ROOT: str(test_file.parent),
                 FILENAME: test_file.name,
                 HASH: 'fake hash',
-                TIMESTAMP: 'fake timestamp'
+                TIMESTAMP: 'fake timestamp',
+                SIZE: 10
             }
         self.assertEqual(expected, self.test_vid.data[FILE_DATA])
 
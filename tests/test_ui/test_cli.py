@@ -4,6 +4,11 @@
     Unit tests for ui.py
 """
 # Standard library
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
 from tempfile import TemporaryDirectory
 from unittest import TestCase
 from unittest.mock import Mock
@@ -14,6 +19,17 @@ from source.state.application_state import PyvorgState
 
 # Third-party packages
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+IMPORT_TIME_BUDGET = 0.1  # seconds
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import source.main
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('tqdm', 'guessit', 'requests', 'source.services.scanfilesinpath_svc') if name in sys.modules]
+print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))
+"""
+
 
 class TestUI(TestCase):
     def setUp(self) -> None:
@@ -26,6 +42,33 @@ class TestUI(TestCase):
     def tearDown(self) -> None:
         self.test_dir.cleanup()
 
+    def probe_import(self) -> dict:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([str(PROJECT_ROOT), str(PROJECT_ROOT / 'source')])
+        env.setdefault('OMDB_KEY', 'x')
+        result = subprocess.run([sys.executable, '-c', IMPORT_PROBE],
+                                cwd=self.test_dir.name,
+                                env=env,
+                                capture_output=True,
+                                text=True,
+                                check=True)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_import_defers_heavy_modules(self):
+        # Act
+        result = self.probe_import()
+
+        # Assert
+        self.assertEqual([], result['heavy'])
+
+    def test_import_time_budget(self):
+        # Act
+        # Best of several runs, so a busy machine does not fail the test
+        elapsed = min(self.probe_import()['elapsed'] for _ in range(3))
+
+        # Assert
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
+
     def test_handle_args_commit(self):
         pass
 
@@ -0,0 +1,153 @@
+# ./tests/test_utils/test_columnutils.py
+
+"""
+    Unit tests for source/utils/columnutils.py
+"""
+
+# Standard library
+from unittest import skipUnless, TestCase
+
+# Local imports
+from source.constants import GUESSIT_DATA, OMDB_DATA
+from source.state.mediafile import MediaFile
+from source.utils import collectionutils, columnutils, queryutils
+
+# Third-party packages
+# n/a
+
+FILTER_SETS = [
+    ['year>1990', 'year<2000'],
+    ['year>1990', 'title<brazil', 'year<2000'],
+    ['year=1995'],
+    ['title=alien'],
+    ['title<brazil'],
+    ['title>alien'],
+    ['title>zzz'],
+    ['runtime<100'],
+    ['episode=1'],
+    ['missing=1'],
+    ['title>2000'],
+    ['year=alien'],
+    ['year>=1995', 'year<=2000', 'year!=1997'],
+    ['title!=alien'],
+    ['title>=brazil', 'title<=casablanca'],
+    ['title contains li'],
+    ['title+LIE', 'title-9'],
+    ['title-li'],
+    ['title^a'],
+    ['title startswith "9 s"'],
+    ['title~^(alien|brazil)$'],
+    ['title matches \\d'],
+    ['year in (1995, 2000, alien)'],
+    ['title in (alien, "casablanca", 9)'],
+    ['episode exists'],
+    ['not episode exists', 'missing exists or year<1990'],
+    ['year=1995 or title=brazil'],
+    ['not (year>1990 or title=alien) and runtime+10'],
+    ['year-199 and (title^b or not title+c)']
+]
+
+
+class TestColumnUtils(TestCase):
+    def setUp(self):
+        self.videos = []
+        for index in range(40):
+            video = MediaFile()
+            video.set_user_data('title', ['Alien', 'alien', 'Brazil', 'Casablanca', '9 Songs'][index % 5])
+            video.set_source_data(OMDB_DATA, {'Year': f'{1980 + index}–{1990 + index}',
+                                              'Runtime': f'{80 + index} min'})
+            if index % 3:
+                video.set_source_data(GUESSIT_DATA, {'year': 1900 + index, 'episode': [1, 2]})
+            self.videos.append(video)
+
+    def test_encode_value(self):
+        # Assert
+        self.assertEqual((columnutils.NUMBER, 1999.0, '1999–2001'), columnutils.encode_value('1999–2001'))
+        self.assertEqual((columnutils.NUMBER, 2.0, '2'), columnutils.encode_value(2))
+        self.assertEqual((columnutils.TEXT, 0.0, 'Alien'), columnutils.encode_value('Alien'))
+        self.assertEqual((columnutils.OTHER, 0.0, '[1, 2]'), columnutils.encode_value([1, 2]))
+
+    @skipUnless(columnutils.has_numpy(), "numpy is not installed")
+    def test_filter(self):
+        # Arrange
+        view = columnutils.ColumnView(self.videos)
+        partial_view = columnutils.ColumnView(self.videos)
+
+        for filter_strings in FILTER_SETS:
+            # Act
+            result = view.filter(filter_strings)
+            partial_result = partial_view.filter(filter_strings, keep=False)
+
+            # Assert
+            query = queryutils.compile_query(filter_strings)
+            expected = [video for video in self.videos if query.matches(queryutils.get_video_parts(video))]
+            self.assertEqual(expected, result, filter_strings)
+            self.assertEqual(expected, partial_result, filter_strings)
+
+    def test_trigram_index(self):
+        # Arrange
+        texts = ['alien', 'aliens', 'brazil', 'the alienist']
+        index = columnutils.TrigramIndex(enumerate(texts))
+
+        # Act and Assert
+        self.assertEqual([0, 1, 3], index.search('lien', texts.__getitem__))
+        self.assertEqual([1], index.search('ens', texts.__getitem__))
+        self.assertEqual([], index.search('zzz', texts.__getitem__))
+        self.assertIsNone(index.search('li', texts.__getitem__))
+
+    @skipUnless(columnutils.has_numpy(), "numpy is not installed")
+    def test_filter_indexes_kept_titles(self):
+        # Arrange
+        view = columnutils.ColumnView(self.videos)
+
+        # Act
+        partial_result = view.filter(['title contains lie'], keep=False)
+        partial_indexes = set(view.indexes)
+        result = view.filter(['title contains lie'])
+
+        # Assert
+        self.assertEqual(set(), partial_indexes)
+        self.assertEqual({'title'}, set(view.indexes))
+        self.assertEqual(partial_result, result)
+        self.assertEqual(16, len(result))
+
+    @skipUnless(columnutils.has_numpy(), "numpy is not installed")
+    def test_filter_partial_columns(self):
+        # Arrange
+        view = columnutils.ColumnView(self.videos)
+
+        # Act
+        view.filter(['year>1990', 'title<brazil'], keep=False)
+
+        # Assert
+        self.assertEqual({'year'}, set(view.columns))
+
+    @skipUnless(columnutils.has_numpy(), "numpy is not installed")
+    def test_filter_builds_columns_once(self):
+        # Arrange
+        view = columnutils.ColumnView(self.videos)
+
+        # Act
+        view.filter(['year>1990'])
+        self.videos[0].set_user_data('year', '1995')
+        result = view.filter(['year>1990', 'year<2000'])
+
+        # Assert
+        self.assertEqual({'year'}, set(view.columns))
+        self.assertNotIn(self.videos[0], result)
+
+    @skipUnless(columnutils.has_numpy(), "numpy is not installed")
+    def test_get_filtered_videos_vectorized(self):
+        # Arrange
+        collection = collectionutils.Collection()
+        for index, video in enumerate(self.videos):
+            video.set_hash(f'{index:064x}')
+            collection.add_video_instance(video)
+
+        for filter_strings in FILTER_SETS:
+            # Act
+            result = collectionutils.get_filtered_videos(collection, filter_strings, vectorized=True)
+
+            # Assert
+            expected = collectionutils.get_filtered_videos(collection, filter_strings, vectorized=False)
+            self.assertEqual(expected, result, filter_strings)
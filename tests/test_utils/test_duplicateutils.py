@@ -0,0 +1,150 @@
+# ./tests/test_utils/test_duplicateutils.py
+
+"""
+    Unit tests for source/utils/duplicateutils.py
+"""
+
+# Standard library
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.state.col import Collection
+from source.utils import duplicateutils, fileutils
+
+# Third-party packages
+# n/a
+
+
+class TestDuplicateUtils(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write_files(self, contents: dict[str, bytes]) -> list[Path]:
+        paths = []
+        for name, data in contents.items():
+            path = self.root / name
+            path.write_bytes(data)
+            paths.append(path)
+        return paths
+
+    def test_find_duplicates(self):
+        # Arrange
+        paths = self.write_files({
+            'a.mp4': b'same contents',
+            'b.mp4': b'same contents',
+            'c.mkv': b'same contents',
+            'd.mp4': b'diff contents',
+            'e.mp4': b'another size',
+            'f.mp4': b''
+        })
+
+        # Act
+        result = duplicateutils.find_duplicates(paths)
+
+        # Assert
+        self.assertEqual(1, len(result['groups']))
+        self.assertEqual([str(path) for path in paths[:3]], result['groups'][0]['paths'])
+        self.assertEqual(13, result['groups'][0]['size'])
+        self.assertEqual(2, result['duplicates'])
+        self.assertEqual(26, result['reclaimable'])
+        # Four partial reads of the 13 byte files and three full reads
+        self.assertEqual(13 * 4 + 13 * 3, result['bytes_read'])
+
+    def test_find_duplicates_unique_sizes_not_read(self):
+        # Arrange
+        paths = self.write_files({'a.mp4': b'a', 'b.mp4': b'bb', 'c.mp4': b'ccc'})
+
+        # Act
+        with patch.object(fileutils, 'hash_partial') as mock_hash_partial, \
+                patch.object(fileutils, 'hash_sha256') as mock_hash_sha256:
+            result = duplicateutils.find_duplicates(paths)
+
+        # Assert
+        mock_hash_partial.assert_not_called()
+        mock_hash_sha256.assert_not_called()
+        self.assertEqual([], result['groups'])
+        self.assertEqual(0, result['bytes_read'])
+
+    def test_find_duplicates_partial_hash_differs(self):
+        # Arrange
+        paths = self.write_files({'a.mp4': b'head-1-tail', 'b.mp4': b'head-2-tail', 'c.mp4': b'xxxx-1-tail'})
+
+        # Act
+        with patch.object(fileutils, 'hash_sha256', wraps=fileutils.hash_sha256) as mock_hash_sha256:
+            result = duplicateutils.find_duplicates(paths, chunk_size=4)
+
+        # Assert
+        self.assertEqual([], result['groups'])
+        self.assertEqual(2, mock_hash_sha256.call_count)
+
+    def test_find_duplicates_hard_links(self):
+        # Arrange
+        original, copy = self.write_files({'a.mp4': b'contents', 'b.mp4': b'contents'})
+        link = self.root / 'link.mp4'
+        os.link(original, link)
+
+        # Act
+        result = duplicateutils.find_duplicates([original, copy, link])
+
+        # Assert
+        self.assertEqual(1, len(result['groups']))
+        self.assertEqual(3, len(result['groups'][0]['paths']))
+        self.assertEqual(8, result['reclaimable'])
+
+    def test_find_duplicates_cached_hashes(self):
+        # Arrange
+        paths = self.write_files({'a.mp4': b'same contents', 'b.mp4': b'same contents'})
+        past = time.time() - 3600
+        for path in paths:
+            os.utime(path, (past, past))
+        sha256 = fileutils.hash_sha256(paths[0])
+        cached_hashes = {str(path): (sha256, time.time()) for path in paths}
+
+        # Act
+        with patch.object(fileutils, 'hash_partial') as mock_hash_partial, \
+                patch.object(fileutils, 'hash_sha256') as mock_hash_sha256:
+            result = duplicateutils.find_duplicates(paths, cached_hashes)
+
+        # Assert
+        mock_hash_partial.assert_not_called()
+        mock_hash_sha256.assert_not_called()
+        self.assertEqual(sha256, result['groups'][0]['hash'])
+        self.assertEqual(0, result['bytes_read'])
+
+    def test_get_cached_hashes(self):
+        # Arrange
+        original, copy = self.write_files({'a.mp4': b'same contents', 'b.mp4': b'same contents'})
+        past = time.time() - 3600
+        os.utime(original, (past, past))
+        collection = Collection()
+        collection.add_file(original)
+        cached_hashes = duplicateutils.get_cached_hashes(collection)
+
+        # Act
+        with patch.object(fileutils, 'hash_sha256', wraps=fileutils.hash_sha256) as mock_hash_sha256:
+            result = duplicateutils.find_duplicates([original, copy], cached_hashes)
+
+        # Assert
+        self.assertEqual([str(original)], list(cached_hashes.keys()))
+        mock_hash_sha256.assert_called_once_with(copy)
+        self.assertEqual(1, len(result['groups']))
+
+    def test_get_valid_cached_hash_modified(self):
+        # Arrange
+        path, = self.write_files({'a.mp4': b'contents'})
+        cached_hashes = {str(path): ('stale', time.time() - 3600)}
+
+        # Act
+        result = duplicateutils.get_valid_cached_hash([path], cached_hashes)
+
+        # Assert
+        self.assertIsNone(result)
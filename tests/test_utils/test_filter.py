@@ -36,6 +36,14 @@ class TestFilter(TestCase):
         self.assertTrue(Filter.compare_numeric(1, "=", 1))
         self.assertFalse(Filter.compare_numeric(1, "=", 2))
 
+    def test_compare_text(self):
+        # Assert
+        self.assertTrue(Filter.compare_text("Alien", "+", "lie"))
+        self.assertFalse(Filter.compare_text("Alien", "-", "lie"))
+        self.assertTrue(Filter.compare_text("Alien", "^", "ali"))
+        self.assertFalse(Filter.compare_text("The Alien", "^", "ali"))
+        self.assertTrue(Filter.compare_text("Alien", "~", Filter.prepare_operand("~", "^a.*N$")))
+
     @patch('source.utils.filter.Filter.parse_filter_string', return_value=("key", "op", "val"))
     def test_from_String(self, mock_parse):
         # Arrange
@@ -75,12 +83,36 @@ class TestFilter(TestCase):
         self.assertFalse(test_filter_1.matches("1971"))
         self.assertTrue(test_filter_2.matches("test string"))
         self.assertFalse(test_filter_2.matches("test_string"))
+        self.assertFalse(test_filter_1.matches(None))
+        self.assertFalse(test_filter_1.matches([1969]))
+        self.assertFalse(test_filter_1.matches("test string"))
+        self.assertFalse(test_filter_2.matches("1969"))
+
+    def test_matches_operators(self):
+        # Assert
+        self.assertTrue(Filter.from_string("year!=1970").matches("1971"))
+        self.assertTrue(Filter.from_string("year>=1970").matches("1970"))
+        self.assertFalse(Filter.from_string("title<=alien").matches("Brazil"))
+        self.assertTrue(Filter.from_string("year+97").matches(1970))
+        self.assertFalse(Filter.from_string("title-lie").matches("Alien"))
+        self.assertFalse(Filter.from_string("title-lie").matches(None))
+        self.assertTrue(Filter("year", "in", "1969, 1970").matches("1970"))
+        self.assertTrue(Filter("title", "in", ["alien", "brazil"]).matches("Brazil"))
+        self.assertTrue(Filter("genre", "exists", None).matches(["Horror"]))
+        self.assertFalse(Filter("genre", "exists", None).matches(None))
+
+    def test_prepare_operand_invalid_regex(self):
+        # Assert
+        with self.assertRaises(ValueError):
+            Filter("title", "~", "(")
 
     def test_parse_filter_string(self):
         # Assert
         self.assertEqual(("year", "<", "1970"), Filter.parse_filter_string("year<1970"))
         self.assertEqual(("title", "=", "name of movie"), Filter.parse_filter_string("title=name of movie"))
         self.assertEqual(("rating", ">", "8.0"), Filter.parse_filter_string("rating>8.0"))
+        self.assertEqual(("year", ">=", "1970"), Filter.parse_filter_string("year >= 1970"))
+        self.assertEqual(("title", "~", "^The\\D"), Filter.parse_filter_string("Title~^The\\D"))
 
     def test_parse_filter_string_invalid(self):
         # Assert
@@ -86,6 +86,16 @@ class TestHelper(TestCase):
         # Assert
         pass
 
+    def test_parse_duration(self):
+        # Act and Assert
+        self.assertEqual(timedelta(days=30), parse_duration('30d'))
+        self.assertEqual(timedelta(days=1, hours=12), parse_duration('1d12h'))
+        self.assertEqual(timedelta(minutes=90), parse_duration('1.5h'))
+        self.assertEqual(timedelta(weeks=2), parse_duration(' 2W '))
+        for string in ['', '30', 'd', '30x', '1d x']:
+            with self.assertRaises(ValueError, msg=string):
+                parse_duration(string)
+
     def test_timestamp_generate(self):
         # TODO: Implement
         pass
@@ -99,6 +109,12 @@ class TestHelper(TestCase):
         self.assertTrue(timestamp_validate(valid_timestamp))
         self.assertFalse(timestamp_validate(invalid_timestamp))
 
+    def test_timestamp_parse(self):
+        # Act and assert
+        self.assertEqual(datetime(2000, 1, 1, 1), timestamp_parse('2000-01-01 01:00:00'))
+        self.assertIsNone(timestamp_parse('01:00:00 2000-01-01'))
+        self.assertIsNone(timestamp_parse(None))
+
     def test_update_api_data(self):
         # TODO: Implement
         # Arrange
@@ -0,0 +1,63 @@
+# ./tests/test_utils/test_lockutils.py
+
+"""
+    Unit tests for source/utils/lockutils.py
+"""
+
+# Standard library
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import threading
+import time
+from unittest import skipIf, TestCase
+
+# Local imports
+from source.utils.lockutils import FileLock
+
+# Third-party packages
+# n/a
+
+
+class TestLockUtils(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.lock_path = Path(self.temp_dir.name) / 'state.lock'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_exclusive_lock_times_out(self):
+        # Arrange
+        with FileLock(self.lock_path):
+            # Act and Assert
+            with self.assertRaises(TimeoutError):
+                FileLock(self.lock_path, timeout=0.1).acquire()
+
+    @skipIf(os.name == 'nt', "Windows has no shared locks")
+    def test_shared_locks(self):
+        # Act and Assert
+        with FileLock(self.lock_path, shared=True), FileLock(self.lock_path, shared=True, timeout=0.1):
+            with self.assertRaises(TimeoutError):
+                FileLock(self.lock_path, timeout=0.1).acquire()
+
+    def test_lock_waits_for_release(self):
+        # Arrange
+        order = []
+        lock = FileLock(self.lock_path)
+        lock.acquire()
+
+        def wait_for_lock():
+            with FileLock(self.lock_path, timeout=5):
+                order.append('waiter')
+        waiter = threading.Thread(target=wait_for_lock)
+
+        # Act
+        waiter.start()
+        time.sleep(0.2)
+        order.append('holder')
+        lock.release()
+        waiter.join(5)
+
+        # Assert
+        self.assertEqual(['holder', 'waiter'], order)
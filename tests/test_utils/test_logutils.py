@@ -0,0 +1,106 @@
+# ./tests/test_utils/test_logutils.py
+
+"""
+    Unit tests for source/utils/logutils.py
+"""
+
+# Standard library
+import logging
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.constants import ENV_LOG_LEVEL, ENV_LOG_LEVELS
+from source.utils import configutils, helper, logutils
+
+# Third-party packages
+# n/a
+
+
+def make_record(level: int = logging.INFO, name: str = 'root', module: str = 'fileutils') -> logging.LogRecord:
+    record = logging.LogRecord(name, level, f'{module}.py', 1, 'message', None, None)
+    record.module = module
+    return record
+
+
+class TestLogUtils(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.log_path = Path(self.temp_dir.name) / 'logs.txt'
+
+    def tearDown(self):
+        logutils.stop()
+        self.temp_dir.cleanup()
+        # Restore the logging set up when the package was imported
+        helper.logger_init(configutils.get_user_logs_dir())
+
+    def test_batching_file_handler(self):
+        # Arrange
+        handler = logutils.BatchingFileHandler(self.log_path, batch_size=3)
+
+        # Act
+        handler.handle(make_record())
+        handler.handle(make_record())
+        pending = self.log_path.read_text()
+        handler.handle(make_record())
+        batched = self.log_path.read_text()
+        handler.handle(make_record(logging.ERROR))
+        error = self.log_path.read_text()
+        handler.close()
+
+        # Assert
+        self.assertEqual('', pending)
+        self.assertEqual(3, len(batched.splitlines()))
+        self.assertEqual(4, len(error.splitlines()))
+
+    def test_module_level_filter(self):
+        # Arrange
+        log_filter = logutils.ModuleLevelFilter(logging.INFO, {'fileutils': logging.WARNING,
+                                                               'urllib3': logging.DEBUG})
+
+        # Act and Assert
+        self.assertFalse(log_filter.filter(make_record(logging.INFO)))
+        self.assertTrue(log_filter.filter(make_record(logging.WARNING)))
+        self.assertTrue(log_filter.filter(make_record(logging.DEBUG, 'urllib3.connectionpool', 'connectionpool')))
+        self.assertFalse(log_filter.filter(make_record(logging.DEBUG, 'root', 'col')))
+        self.assertTrue(log_filter.filter(make_record(logging.INFO, 'root', 'col')))
+
+    def test_parse_levels(self):
+        # Act
+        levels = logutils.parse_levels('fileutils=debug, urllib3 = WARNING,')
+
+        # Assert
+        self.assertEqual({'fileutils': logging.DEBUG, 'urllib3': logging.WARNING}, levels)
+        with self.assertRaises(ValueError):
+            logutils.parse_levels('fileutils')
+        with self.assertRaises(ValueError):
+            logutils.parse_levels('fileutils=LOUD')
+
+    def test_get_levels_invalid(self):
+        # Act
+        with patch.dict(os.environ, {ENV_LOG_LEVEL: 'LOUD', ENV_LOG_LEVELS: 'fileutils'}):
+            level, levels, problems = logutils.get_levels()
+
+        # Assert
+        self.assertEqual(logging.INFO, level)
+        self.assertEqual({}, levels)
+        self.assertEqual(2, len(problems))
+
+    def test_configure(self):
+        # Arrange
+        env = {ENV_LOG_LEVEL: 'WARNING', ENV_LOG_LEVELS: 'pyvorg.test=DEBUG'}
+        handler = logutils.BatchingFileHandler(self.log_path)
+        handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+
+        # Act
+        with patch.dict(os.environ, env):
+            logutils.configure(self.log_path, [handler])
+        logging.getLogger('pyvorg.test.child').debug('written')
+        logging.info('dropped')
+        logutils.stop()
+
+        # Assert
+        self.assertEqual('DEBUG written\n', self.log_path.read_text())
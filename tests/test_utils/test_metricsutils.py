@@ -0,0 +1,105 @@
+# ./tests/test_utils/test_metricsutils.py
+
+"""
+    Unit tests for source/utils/metricsutils.py
+"""
+
+# Standard library
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+# Local imports
+from source.utils import fileutils, metricsutils
+
+# Third-party packages
+# n/a
+
+
+class TestMetricsUtils(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        metricsutils.reset()
+
+    def tearDown(self) -> None:
+        metricsutils.reset()
+        self.temp_dir.cleanup()
+
+    def test_increment(self):
+        # Act
+        metricsutils.increment('files_total')
+        metricsutils.increment('files_total', 2)
+        metricsutils.increment('files_total', source='omdb')
+
+        # Assert
+        counters = metricsutils.get_summary()['counters']
+        self.assertEqual({'files_total': 3, 'files_total{source="omdb"}': 1}, counters)
+
+    def test_observe(self):
+        # Act
+        for value in [0.002, 0.003, 0.02, 2.0]:
+            metricsutils.observe('fetch_seconds', value)
+
+        # Assert
+        histogram = metricsutils.get_summary()['histograms']['fetch_seconds']
+        self.assertEqual(4, histogram['count'])
+        self.assertAlmostEqual(2.025, histogram['sum'])
+        self.assertEqual(0.002, histogram['min'])
+        self.assertEqual(2.0, histogram['max'])
+        self.assertEqual(0.005, histogram['p50'])
+        self.assertEqual(2.0, histogram['p99'])
+
+    def test_timed_error(self):
+        # Act
+        with self.assertRaises(ValueError):
+            with metricsutils.timed('fetch', source='omdb'):
+                raise ValueError
+
+        # Assert
+        summary = metricsutils.get_summary()
+        self.assertEqual(1, summary['counters']['fetch_errors_total{source="omdb"}'])
+        self.assertEqual(1, summary['histograms']['fetch_seconds{source="omdb"}']['count'])
+
+    def test_hash_sha256_throughput(self):
+        # Arrange
+        path = Path(self.temp_dir.name) / 'video.mp4'
+        path.write_bytes(b'x' * 1000)
+
+        # Act
+        fileutils.hash_sha256(path)
+
+        # Assert
+        summary = metricsutils.get_summary()
+        self.assertEqual(1, summary['counters']['hash_files_total'])
+        self.assertEqual(1000, summary['counters']['hash_bytes_total'])
+        self.assertEqual(1, summary['histograms']['hash_seconds']['count'])
+        self.assertGreater(summary['throughput']['hash_bytes_per_second'], 0)
+
+    def test_to_prometheus(self):
+        # Arrange
+        metricsutils.increment('move_files_total', 2)
+        metricsutils.observe('move_seconds', 0.02)
+
+        # Act
+        result = metricsutils.to_prometheus().splitlines()
+
+        # Assert
+        self.assertIn('# TYPE pyvorg_move_files_total counter', result)
+        self.assertIn('pyvorg_move_files_total 2', result)
+        self.assertIn('# TYPE pyvorg_move_seconds histogram', result)
+        self.assertIn('pyvorg_move_seconds_bucket{le="0.01"} 0', result)
+        self.assertIn('pyvorg_move_seconds_bucket{le="0.05"} 1', result)
+        self.assertIn('pyvorg_move_seconds_bucket{le="+Inf"} 1', result)
+        self.assertIn('pyvorg_move_seconds_count 1', result)
+
+    def test_write_summary(self):
+        # Arrange
+        path = Path(self.temp_dir.name) / 'metrics.json'
+        metricsutils.increment('scan_files_total', 5)
+
+        # Act
+        metricsutils.write_summary(path)
+
+        # Assert
+        self.assertEqual(5, json.loads(path.read_text())['counters']['scan_files_total'])
@@ -0,0 +1,76 @@
+# ./tests/test_utils/test_profileutils.py
+
+"""
+    Unit tests for source/utils/profileutils.py
+"""
+
+# Standard library
+from pathlib import Path
+import pstats
+from tempfile import TemporaryDirectory
+import time
+from unittest import TestCase
+
+# Local imports
+from source.constants import PROFILE_SAMPLE
+from source.utils import profileutils
+
+# Third-party packages
+# n/a
+
+
+def busy_function(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfileUtils(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_profiled_cprofile(self):
+        # Act
+        with profileutils.profiled('scan', output_dir=self.output_dir) as report:
+            busy_function(0.01)
+
+        # Assert
+        self.assertEqual(self.output_dir, report['path'].parent)
+        self.assertTrue(report['path'].name.startswith('scan-'))
+        self.assertEqual('.prof', report['path'].suffix)
+        stats = pstats.Stats(str(report['path']))
+        self.assertIn('busy_function', [name for _, _, name in stats.stats])
+        self.assertIn('busy_function', report['summary'])
+        self.assertIn('Ordered by: internal time', report['summary'])
+
+    def test_profiled_sample(self):
+        # Act
+        with profileutils.profiled('scan', PROFILE_SAMPLE, output_dir=self.output_dir) as report:
+            busy_function(0.2)
+
+        # Assert
+        self.assertEqual('.folded', report['path'].suffix)
+        lines = report['path'].read_text().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('busy_function', stack.split(';')[-1])
+        self.assertGreater(int(count), 0)
+        self.assertIn('busy_function', report['summary'])
+
+    def test_profiled_written_when_raised(self):
+        # Act
+        with self.assertRaises(ValueError):
+            with profileutils.profiled('scan', output_dir=self.output_dir) as report:
+                raise ValueError
+
+        # Assert
+        self.assertTrue(report['path'].exists())
+
+    def test_get_profiler_invalid_mode(self):
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            profileutils.get_profiler('invalid')
@@ -0,0 +1,104 @@
+# ./tests/test_utils/test_progressutils.py
+
+"""
+    Unit tests for source/utils/progressutils.py
+"""
+
+# Standard library
+import io
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.constants import ENV_PROGRESS, PROGRESS_BAR, PROGRESS_LOG, PROGRESS_OFF
+from source.utils import fileutils, progressutils
+
+# Third-party packages
+# n/a
+
+
+class TTYStream(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+class TestProgressUtils(TestCase):
+    def test_get_mode(self):
+        # Act and Assert
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(PROGRESS_BAR, progressutils.get_mode(TTYStream()))
+            self.assertEqual(PROGRESS_LOG, progressutils.get_mode(io.StringIO()))
+        with patch.dict(os.environ, {ENV_PROGRESS: PROGRESS_OFF}):
+            self.assertEqual(PROGRESS_OFF, progressutils.get_mode(TTYStream()))
+
+    def test_track_threads(self):
+        # Arrange
+        def report():
+            for _ in range(1000):
+                progressutils.get_current().update(items=1, size=10)
+
+        # Act
+        with patch.dict(os.environ, {ENV_PROGRESS: PROGRESS_LOG}):
+            with progressutils.track('Testing', 4000, 40000, io.StringIO()) as progress:
+                threads = [Thread(target=report) for _ in range(4)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        # Assert
+        self.assertEqual(4000, progress.items)
+        self.assertEqual(40000, progress.bytes)
+        self.assertIsInstance(progressutils.get_current(), progressutils.NullProgress)
+
+    def test_track_bar_throttled(self):
+        # Arrange
+        stream = TTYStream()
+
+        # Act
+        with patch.dict(os.environ, {}, clear=True):
+            with progressutils.track('Testing', 100000, stream=stream) as progress:
+                for _ in range(100000):
+                    progress.update(items=1)
+
+        # Assert
+        lines = stream.getvalue().split('\r')
+        self.assertLess(len(lines), 100)
+        self.assertIn('[Testing]  100,000/100,000', lines[-1])
+
+    def test_track_log(self):
+        # Arrange
+        stream = io.StringIO()
+
+        # Act
+        with patch.dict(os.environ, {ENV_PROGRESS: PROGRESS_LOG}), self.assertLogs(level='INFO') as logs:
+            with progressutils.track('Testing', 2, stream=stream) as progress:
+                list(progress.iterate(['a', 'b']))
+
+        # Assert
+        self.assertEqual('', stream.getvalue())
+        self.assertIn('[Testing]  2/2', logs.output[-1])
+
+    def test_hash_sha256_reports_bytes(self):
+        # Arrange
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'video.mp4'
+            path.write_bytes(b'x' * 100000)
+
+            # Act
+            with patch.dict(os.environ, {ENV_PROGRESS: PROGRESS_LOG}):
+                with progressutils.track('Hashing', 1, 100000, io.StringIO()) as progress:
+                    fileutils.hash_sha256(path)
+
+        # Assert
+        self.assertEqual(100000, progress.bytes)
+
+    def test_format_bytes(self):
+        # Act and Assert
+        self.assertEqual('999 B', progressutils.format_bytes(999))
+        self.assertEqual('1.5 MB', progressutils.format_bytes(1.5e6))
+        self.assertEqual('2.0 TB', progressutils.format_bytes(2e12))
@@ -0,0 +1,91 @@
+# ./tests/test_utils/test_queryutils.py
+
+"""
+    Unit tests for source/utils/queryutils.py
+"""
+
+# Standard library
+from unittest import TestCase
+
+# Local imports
+from source.utils import queryutils
+from source.utils.filter import Filter
+from source.utils.queryutils import Condition, Not
+
+# Third-party packages
+# n/a
+
+
+def describe(node):
+    # A nested tuple of the node's structure, for comparisons
+    if isinstance(node, Condition):
+        operand = node.filter.right_operand
+        return node.filter.key, node.filter.operator, getattr(operand, 'pattern', operand)
+    if isinstance(node, Not):
+        return 'not', describe(node.child)
+    return type(node).__name__.lower(), [describe(child) for child in node.children]
+
+
+class TestQueryUtils(TestCase):
+    def test_parse_query_legacy(self):
+        # Act and Assert
+        self.assertEqual(('year', '<', 1970.0), describe(queryutils.parse_query('year<1970')))
+        self.assertEqual(('title', '=', 'name of movie'), describe(queryutils.parse_query('title=Name of Movie')))
+        self.assertEqual(('title', '=', 'tom and jerry'), describe(queryutils.parse_query('title=tom and jerry')))
+        self.assertEqual(('title', '=', 'alien (1979)'), describe(queryutils.parse_query('title=Alien (1979)')))
+        self.assertEqual(('title', '=', "'71"), describe(queryutils.parse_query("title='71")))
+
+    def test_parse_query_operators(self):
+        # Act and Assert
+        self.assertEqual(('year', '>=', 1990.0), describe(queryutils.parse_query('year >= 1990')))
+        self.assertEqual(('rated', '!=', 'r'), describe(queryutils.parse_query('rated!=R')))
+        self.assertEqual(('title', '+', 'alien'), describe(queryutils.parse_query('title contains Alien')))
+        self.assertEqual(('title', '-', 'alien'), describe(queryutils.parse_query('title-alien')))
+        self.assertEqual(('title', '^', 'the'), describe(queryutils.parse_query('title startswith The')))
+        self.assertEqual(('title', '~', r'^The\D'), describe(queryutils.parse_query(r'title matches ^The\D')))
+        self.assertEqual(('year', 'in', [1999.0, 'alien']), describe(queryutils.parse_query('year in (1999, Alien)')))
+        self.assertEqual(('imdbid', 'exists', None), describe(queryutils.parse_query('IMDBID exists')))
+
+    def test_parse_query_logic(self):
+        # Act
+        node = queryutils.parse_query('title=tom and jerry or not (year<1990 and genre+drama)')
+
+        # Assert
+        self.assertEqual(('or', [('title', '=', 'tom and jerry'),
+                                 ('not', ('and', [('year', '<', 1990.0), ('genre', '+', 'drama')]))]),
+                         describe(node))
+        self.assertEqual(('and', [('title', '=', 'alien'), ('year', '>', 1990.0)]),
+                         describe(queryutils.parse_query('title=alien AND year>1990')))
+
+    def test_parse_query_quoted(self):
+        # Act and Assert
+        self.assertEqual(('title', '=', 'a (b) or c'), describe(queryutils.parse_query('title="a (b) or c"')))
+        self.assertEqual(('title', '=', "it's"), describe(queryutils.parse_query(r"title='it\'s'")))
+        self.assertEqual(('title', 'in', ['a, b', 'c']), describe(queryutils.parse_query('title in ("a, b", c)')))
+
+    def test_parse_query_invalid(self):
+        for string in ['title', 'title=', '(title=x', 'year in 1999', 'not', 'title~(']:
+            # Act and Assert
+            with self.assertRaises(ValueError, msg=string):
+                queryutils.parse_query(string)
+
+    def test_compile_query(self):
+        # Act
+        query = queryutils.compile_query(['title~alien or year>1990', 'not not title exists', 'year=1995'])
+
+        # Assert
+        self.assertIsNone(queryutils.compile_query([]))
+        self.assertEqual(('and', [('title', 'exists', None),
+                                  ('year', '=', 1995.0),
+                                  ('or', [('year', '>', 1990.0), ('title', '~', 'alien')])]),
+                         describe(query))
+
+    def test_matches(self):
+        # Arrange
+        values = {'title': 'Alien', 'year': '1979', 'genre': ['Horror']}
+        query = queryutils.compile_query(['title+lie and (year<1980 or missing exists) and not genre=horror'])
+
+        # Act and Assert
+        self.assertTrue(query.matches(lambda key: Filter.get_parts(values.get(key))))
+        values['year'] = '1986'
+        self.assertFalse(query.matches(lambda key: Filter.get_parts(values.get(key))))
@@ -0,0 +1,41 @@
+# tests/test_utils/test_serializeutils.py
+
+"""
+    Unit tests for source/utils/serializeutils.py
+"""
+
+# Standard library
+import io
+from unittest import TestCase
+
+# Local imports
+from source.exceptions import ValidationError
+from source.utils import serializeutils
+
+# Third-party packages
+# n/a
+
+
+class TestSerializeUtils(TestCase):
+
+    def test_iter_json_members(self):
+        # Arrange
+        file = io.StringIO('{\n  "a": {"title": "first"},\n  "b": [1, 2]\n}\n{"c": null}\n')
+
+        # Act
+        result = list(serializeutils.iter_json_members(file, chunk_size=4))
+
+        # Assert
+        self.assertEqual([('a', {'title': 'first'}), ('b', [1, 2]), ('c', None)], result)
+
+    def test_iter_json_members_too_long(self):
+        # Arrange
+        file = io.StringIO('{"a": 1, "b": "' + 'x' * 100)
+
+        # Act
+        members = serializeutils.iter_json_members(file, chunk_size=8, max_member_size=32)
+
+        # Assert
+        self.assertEqual(('a', 1), next(members))
+        with self.assertRaises(ValidationError):
+            next(members)
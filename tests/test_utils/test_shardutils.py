@@ -0,0 +1,228 @@
+# ./tests/test_utils/test_shardutils.py
+
+"""
+    Unit tests for source/utils/shardutils.py
+"""
+
+# Standard library
+import json
+from pathlib import Path
+import pickle
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.constants import COLLECTION_SHARD_FORMAT, COLLECTION_SHARD_FORMAT_VERSION, FILE_DATA, TIMESTAMP
+from source.state.col import Collection
+from source.utils import serializeutils, shardutils
+from source.utils.helper import create_dummy_files
+
+# Third-party packages
+# n/a
+
+
+class TestShardUtils(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.shard_dir = self.temp_path / 'shards'
+        self.shard_dir.mkdir()
+        files = create_dummy_files(self.temp_path, 20, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.collection = Collection()
+        self.collection.add_files(files)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_shard_key(self):
+        # Act and Assert
+        self.assertEqual('ab', shardutils.get_shard_key('AB12cd', 2))
+        self.assertEqual(shardutils.get_shard_key('test_key', 2), shardutils.get_shard_key('test_key', 2))
+        self.assertEqual(2, len(shardutils.get_shard_key('test_key', 2)))
+
+    def test_save_and_load_shards(self):
+        # Act
+        saved = shardutils.save_shards(self.collection, self.shard_dir)
+        loaded_collection = Collection()
+        loaded = shardutils.load_shards(loaded_collection, self.shard_dir)
+
+        # Assert
+        keys = {shardutils.get_shard_key(video_id) for video_id in self.collection.get_video_ids()}
+        self.assertEqual(keys, set(shardutils.get_shard_paths(self.shard_dir)))
+        self.assertEqual(len(keys), saved['written'])
+        self.assertEqual(len(keys), loaded['read'])
+        self.assertEqual(set(self.collection.get_paths()), set(loaded_collection.get_paths()))
+
+    def test_save_shards_only_changed(self):
+        # Arrange
+        shardutils.save_shards(self.collection, self.shard_dir)
+        video_id = next(iter(self.collection.get_video_ids()))
+        removed_id = list(self.collection.get_video_ids())[-1]
+        self.collection.get_video(video_id).set_user_data('title', 'changed')
+        self.collection.remove_from_collection([self.collection.get_video(removed_id)])
+        shard_keys = {shardutils.get_shard_key(key) for key in self.collection.get_video_ids()}
+
+        # Act
+        stats = shardutils.save_shards(self.collection, self.shard_dir)
+
+        # Assert
+        changed = {shardutils.get_shard_key(video_id), shardutils.get_shard_key(removed_id)}
+        self.assertEqual(len(changed & shard_keys), stats['written'])
+        self.assertEqual(len(changed - shard_keys), stats['removed'])
+        self.assertEqual(shard_keys, set(shardutils.get_shard_paths(self.shard_dir)))
+
+    def test_save_shards_encodes_only_changed(self):
+        # Arrange
+        shardutils.save_shards(self.collection, self.shard_dir)
+        loaded_collection = Collection()
+        shardutils.load_shards(loaded_collection, self.shard_dir)
+        video_id = next(iter(loaded_collection.get_video_ids()))
+        encode_shard = shardutils.encode_shard
+
+        # Act
+        with patch.object(shardutils, 'encode_shard', side_effect=encode_shard) as mock_encode_shard:
+            unchanged = shardutils.save_shards(loaded_collection, self.shard_dir)
+            loaded_collection.get_video(video_id).set_user_data('title', 'changed')
+            changed = shardutils.save_shards(loaded_collection, self.shard_dir)
+
+        # Assert
+        self.assertEqual(1, mock_encode_shard.call_count)
+        self.assertEqual(0, unchanged['written'])
+        self.assertEqual(1, changed['written'])
+        reloaded_collection = Collection()
+        shardutils.load_shards(reloaded_collection, self.shard_dir)
+        self.assertEqual('changed', reloaded_collection.get_video(video_id).get_user_data('title'))
+
+    def test_save_shards_untracked_change(self):
+        # Arrange
+        shardutils.save_shards(self.collection, self.shard_dir)
+        video_id = next(iter(self.collection.get_video_ids()))
+        video = self.collection.get_video(video_id)
+
+        # Act
+        video.set_hash('cd' * 32)
+        stats = shardutils.save_shards(self.collection, self.shard_dir)
+
+        # Assert
+        self.assertEqual(1, stats['written'])
+        loaded_collection = Collection()
+        shardutils.load_shards(loaded_collection, self.shard_dir)
+        self.assertEqual('cd' * 32, loaded_collection.get_video(video_id).get_hash())
+
+    def test_load_shards_corrupt(self):
+        # Arrange
+        shardutils.save_shards(self.collection, self.shard_dir)
+        key, path = next(iter(shardutils.get_shard_paths(self.shard_dir).items()))
+        path.write_bytes(b'not a shard')
+
+        # Act
+        loaded_collection = Collection()
+        with self.assertLogs(level='ERROR'):
+            stats = shardutils.load_shards(loaded_collection, self.shard_dir)
+
+        # Assert
+        self.assertEqual(1, stats['corrupt'])
+        self.assertFalse(path.exists())
+        self.assertTrue(path.with_name(path.name + shardutils.CORRUPT_SUFFIX).exists())
+        expected = [video_id for video_id in self.collection.get_video_ids()
+                    if shardutils.get_shard_key(video_id) != key]
+        self.assertEqual(set(expected), set(loaded_collection.get_video_ids()))
+
+    def test_video_references(self):
+        # Arrange
+        video = next(iter(self.collection.get_videos()))
+        other = pickle.loads(pickle.dumps(video))
+        references = [shardutils.get_video_writer(self.collection)(obj) for obj in (video, other)]
+
+        # Act
+        read_video = shardutils.get_video_reader(self.collection)
+        loaded = [read_video(reference) for reference in json.loads(json.dumps(references))]
+
+        # Assert
+        self.assertEqual(video.get_hash(), references[0])
+        self.assertIs(video, loaded[0])
+        self.assertIsNot(other, loaded[1])
+        self.assertEqual(other.to_dict(), loaded[1].to_dict())
+        with self.assertRaises(ValueError):
+            shardutils.get_video_reader(Collection())(references[0])
+
+    def test_legacy_references(self):
+        # Arrange
+        video = next(iter(self.collection.get_videos()))
+        data = serializeutils.obj_to_pickle([video], lambda obj: ('video', obj.get_hash()) if obj is video else None)
+
+        # Act
+        loaded = serializeutils.pickle_to_object(data, shardutils.get_reference_reader(self.collection))
+
+        # Assert
+        self.assertIs(video, loaded[0])
+        with self.assertRaises(pickle.UnpicklingError):
+            serializeutils.pickle_to_object(data, shardutils.get_reference_reader(Collection()))
+
+    def test_load_legacy_shards(self):
+        # Arrange
+        for key, shard in shardutils.split_collection(self.collection).items():
+            shardutils.get_shard_path(self.shard_dir, key).with_suffix('.pickle').write_bytes(pickle.dumps(shard))
+
+        # Act
+        loaded_collection = Collection()
+        stats = shardutils.load_shards(loaded_collection, self.shard_dir, legacy=True)
+
+        # Assert
+        self.assertEqual(len(list(self.shard_dir.iterdir())), stats['read'])
+        self.assertEqual(set(self.collection.get_paths()), set(loaded_collection.get_paths()))
+        self.assertEqual({}, loaded_collection.shard_bases)
+
+    def test_read_shard_newer_version(self):
+        # Arrange
+        data = serializeutils.obj_to_versioned_json(COLLECTION_SHARD_FORMAT,
+                                                    COLLECTION_SHARD_FORMAT_VERSION + 1,
+                                                    {'videos': {}, 'copies': {}})
+
+        # Act and Assert
+        with self.assertRaises(ValueError):
+            shardutils.read_shard(data)
+
+    def test_merge_video_conflict(self):
+        # Arrange
+        base = next(iter(self.collection.get_videos()))
+        video_id = base.get_hash()
+        ours = pickle.loads(pickle.dumps(base))
+        theirs = pickle.loads(pickle.dumps(base))
+        ours.set_user_data('title', 'ours')
+        ours.set_source_data('OMDB', {'Year': '2001'})
+        theirs.set_user_data('title', 'theirs')
+        theirs.set_source_data('guessit', {'title': 'theirs'})
+        collection = Collection()
+        collection.add_video_instance(ours)
+
+        # Act
+        conflicts = shardutils.merge_video(collection, video_id, base, ours, theirs)
+
+        # Assert
+        self.assertEqual(1, conflicts)
+        self.assertIs(ours, collection.get_video(video_id))
+        self.assertEqual('ours', ours.get_user_data('title'))
+        self.assertEqual({'Year': '2001'}, ours.get_source_data('OMDB'))
+        self.assertEqual({'title': 'theirs'}, ours.get_source_data('guessit'))
+
+    def test_merge_video_file_data(self):
+        # Arrange
+        base = next(iter(self.collection.get_videos()))
+        video_id = base.get_hash()
+        ours = pickle.loads(pickle.dumps(base))
+        theirs = pickle.loads(pickle.dumps(base))
+        ours.data[FILE_DATA][TIMESTAMP] = '2001-01-01 00:00:00'
+        theirs.data[FILE_DATA][TIMESTAMP] = '2002-01-01 00:00:00'
+        theirs.set_user_data('title', 'theirs')
+        collection = Collection()
+        collection.add_video_instance(ours)
+
+        # Act
+        conflicts = shardutils.merge_video(collection, video_id, base, ours, theirs)
+
+        # Assert
+        self.assertEqual(0, conflicts)
+        self.assertEqual('2002-01-01 00:00:00', ours.get_source_data(FILE_DATA, TIMESTAMP))
+        self.assertEqual('theirs', ours.get_user_data('title'))
@@ -0,0 +1,136 @@
+# ./tests/test_utils/test_snapshotutils.py
+
+"""
+    Unit tests for source/utils/snapshotutils.py
+"""
+
+# Standard library
+from itertools import product
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+# Local imports
+from source.constants import GUESSIT_DATA, OMDB_DATA, SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION
+from source.state.col import Collection
+from source.utils import collectionutils, columnutils, serializeutils, shardutils, snapshotutils
+from source.utils.helper import create_dummy_files
+
+# Third-party packages
+# n/a
+
+
+class TestSnapshotUtils(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.snapshot_path = self.temp_path / 'state.snapshot'
+        files = create_dummy_files(self.temp_path, 12, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.collection = Collection()
+        for index, video in enumerate(self.collection.add_files(files)):
+            video.set_user_data('title', ['Alien', 'alien', 'Brazil', 'Casablanca'][index % 4])
+            video.set_source_data(OMDB_DATA, {'Year': f'{1990 + index}–{2000 + index}', 'Runtime': f'{90 + index} min'})
+            if index % 3:
+                video.set_source_data(GUESSIT_DATA, {'year': 1900 + index, 'episode': [1, 2]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_and_read_snapshot(self):
+        # Act
+        written = snapshotutils.write_snapshot(self.collection, self.snapshot_path)
+        with snapshotutils.Snapshot(self.snapshot_path) as snapshot:
+            rows = [snapshot.get_row(row, ['title', 'year', 'episode', 'missing']) for row in range(len(snapshot))]
+            keys = snapshot.get_keys()
+
+        # Assert
+        self.assertEqual(self.snapshot_path.stat().st_size, written)
+        self.assertEqual(sorted(str(path) for path in self.collection.get_paths()), [row['path'] for row in rows])
+        for row in rows:
+            video = self.collection.get_video(row['id'])
+            self.assertEqual(str(video.get_path()), row['path'])
+            self.assertEqual(video.get_pref_data('title'), row['title'])
+            self.assertEqual(str(video.get_pref_data('year')), row['year'])
+            self.assertIsNone(row['missing'])
+        self.assertIn('[1, 2]', [row['episode'] for row in rows])
+        self.assertIn('runtime', keys)
+
+    def test_filter_rows(self):
+        # Arrange
+        snapshotutils.write_snapshot(self.collection, self.snapshot_path)
+        filter_sets = [[], ['title=alien'], ['title<brazil'], ['year>1995'], ['year<1993', 'title=alien'],
+                       ['runtime=95'], ['episode=1'], ['missing=1'], ['title>2000'], ['year=alien'],
+                       ['title contains LIE'], ['title-lie'], ['title+li or year>=1999'], ['title^a', 'year!=1994'],
+                       ['title~^(alien|brazil)$'], ['year in (1993, 1995)'], ['title in (alien, casablanca)'],
+                       ['episode exists'], ['not missing exists and not (title=alien or runtime<95)'],
+                       ['runtime+10'], ['title contains zzz']]
+
+        with snapshotutils.Snapshot(self.snapshot_path) as snapshot:
+            for vectorized, filter_strings in product({False, columnutils.has_numpy()}, filter_sets):
+                # Act
+                with patch.object(columnutils, 'has_numpy', return_value=vectorized):
+                    result = {snapshot.get_id(row) for row in snapshot.filter_rows(filter_strings)}
+
+                # Assert
+                expected = {video_id for video_id, video
+                            in collectionutils.iter_filtered_videos(self.collection, filter_strings)}
+                self.assertEqual(expected, result, filter_strings)
+
+    def test_trigram_index(self):
+        # Arrange
+        snapshotutils.write_snapshot(self.collection, self.snapshot_path)
+
+        with snapshotutils.Snapshot(self.snapshot_path) as snapshot:
+            index = snapshot._indexes['title']
+
+            # Act
+            found = index.search('lie', lambda code: snapshot.get_string(code).lower())
+
+            # Assert
+            trigrams = set().union(*map(columnutils.get_trigrams, ['alien', 'brazil', 'casablanca']))
+            self.assertEqual(sorted(trigrams), [index[position] for position in range(len(index))])
+            self.assertEqual({'Alien', 'alien'}, set(map(snapshot.get_string, found)))
+            self.assertEqual((), index.get_postings('zzz'))
+
+    def test_empty_collection(self):
+        # Act
+        snapshotutils.write_snapshot(Collection(), self.snapshot_path)
+
+        # Assert
+        with snapshotutils.Snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(0, len(snapshot))
+            self.assertEqual([], snapshot.filter_rows(['title=alien']))
+
+    def test_is_current(self):
+        # Arrange
+        shard_dir = self.temp_path / 'shards'
+        shard_dir.mkdir()
+        shardutils.save_shards(self.collection, shard_dir)
+        shard_tag = snapshotutils.get_shard_tag(shard_dir)
+        snapshotutils.write_snapshot(self.collection, self.snapshot_path, shard_tag)
+
+        # Act and Assert
+        self.assertTrue(snapshotutils.is_current(self.snapshot_path, shard_tag))
+        self.collection.get_videos()[0].set_user_data('title', 'Dune')
+        shardutils.save_shards(self.collection, shard_dir)
+        self.assertFalse(snapshotutils.is_current(self.snapshot_path, snapshotutils.get_shard_tag(shard_dir)))
+        self.assertFalse(snapshotutils.is_current(self.temp_path / 'missing.snapshot', shard_tag))
+
+    def test_is_readable(self):
+        # Arrange
+        snapshotutils.write_snapshot(self.collection, self.snapshot_path)
+        newer_path = self.temp_path / 'newer.snapshot'
+        header = serializeutils.obj_to_versioned_json(SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION + 1, {})
+        newer_path.write_bytes(snapshotutils.MAGIC + snapshotutils.HEADER_LENGTH.pack(len(header)) + header)
+        damaged_path = self.temp_path / 'damaged.snapshot'
+        damaged_path.write_bytes(self.snapshot_path.read_bytes()[:100])
+
+        # Act and Assert
+        self.assertTrue(snapshotutils.is_readable(self.snapshot_path))
+        self.assertFalse(snapshotutils.is_readable(self.temp_path / 'missing.snapshot'))
+        self.assertFalse(snapshotutils.is_readable(newer_path))
+        with self.assertRaises(ValueError):
+            snapshotutils.Snapshot(newer_path)
+        with self.assertRaises(ValueError):
+            snapshotutils.Snapshot(damaged_path)
@@ -0,0 +1,269 @@
+# ./tests/test_utils/test_watchutils.py
+
+"""
+    Unit tests for source/utils/watchutils.py
+"""
+
+# Standard library
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+from unittest import skipUnless, TestCase
+
+# Local imports
+from source.constants import WATCH_CREATED, WATCH_DELETED, WATCH_MODIFIED, WATCH_MOVED
+from source.state.col import Collection
+from source.utils import watchutils
+from source.utils.helper import create_dummy_files
+
+# Third-party packages
+# n/a
+
+
+def wait_until_idle(sync: watchutils.CollectionSync, timeout: float = 5) -> bool:
+    changed = False
+    deadline = time.monotonic() + timeout
+    while not sync.is_idle() and time.monotonic() < deadline:
+        changed |= sync.process()
+        time.sleep(0.01)
+    return changed
+
+
+class TestPollingWatcher(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_poll(self):
+        # Arrange
+        kept, moved, deleted = create_dummy_files(self.root, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        (self.root / 'notes.txt').write_text('not a video')
+        watcher = watchutils.PollingWatcher(self.root)
+        created = self.root / 'new.mkv'
+        created.write_bytes(b'new')
+        moved_to = self.root / 'renamed.mp4'
+        moved.rename(moved_to)
+        deleted.unlink()
+        kept.write_bytes(b'more data than before')
+
+        # Act
+        result = watcher.poll(0)
+
+        # Assert
+        self.assertIn((WATCH_CREATED, created, None), result)
+        self.assertIn((WATCH_MOVED, moved, moved_to), result)
+        self.assertIn((WATCH_DELETED, deleted, None), result)
+        self.assertIn((WATCH_MODIFIED, kept, None), result)
+        self.assertEqual(4, len(result))
+
+
+@skipUnless(watchutils.InotifyWatcher.is_available(), 'inotify is not available')
+class TestInotifyWatcher(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.watcher = watchutils.InotifyWatcher(self.root, recursive=True)
+
+    def tearDown(self) -> None:
+        self.watcher.close()
+        self.temp_dir.cleanup()
+
+    def test_poll(self):
+        # Arrange
+        created = self.root / 'new.mkv'
+        created.write_bytes(b'new')
+        moved_to = self.root / 'renamed.mkv'
+        created.rename(moved_to)
+        moved_to.unlink()
+
+        # Act
+        result = self.watcher.poll(1)
+
+        # Assert
+        self.assertEqual([
+            (WATCH_CREATED, created, None),
+            (WATCH_MODIFIED, created, None),
+            (WATCH_MOVED, created, moved_to),
+            (WATCH_DELETED, moved_to, None)
+        ], result)
+
+    def test_poll_new_directory(self):
+        # Arrange
+        sub_dir = self.root / 'sub'
+        sub_dir.mkdir()
+        self.watcher.poll(1)
+        video = sub_dir / 'new.mp4'
+
+        # Act
+        video.write_bytes(b'new')
+        result = self.watcher.poll(1)
+
+        # Assert
+        self.assertIn((WATCH_CREATED, video, None), result)
+
+    def test_poll_moved_out(self):
+        # Arrange
+        with TemporaryDirectory() as outside:
+            video = self.root / 'video.mp4'
+            video.write_bytes(b'video')
+            self.watcher.poll(1)
+
+            # Act
+            video.rename(Path(outside) / 'video.mp4')
+            result = self.watcher.poll(1)
+
+        # Assert
+        self.assertEqual([(WATCH_DELETED, video, None)], result)
+
+
+class TestCollectionSync(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        self.collection = Collection()
+        self.sync = watchutils.CollectionSync(self.collection, settle_time=0)
+
+    def tearDown(self) -> None:
+        self.sync.close()
+        self.temp_dir.cleanup()
+
+    def get_paths(self) -> set[Path]:
+        return {video.get_path() for video in self.collection.get_videos()}
+
+    def test_handle_events_created(self):
+        # Arrange
+        files = create_dummy_files(self.root, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        events = [(WATCH_CREATED, path, None) for path in files]
+
+        # Act
+        self.sync.handle_events(events)
+        changed = wait_until_idle(self.sync)
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual(set(files), self.get_paths())
+
+    def test_handle_events_waits_for_stable_size(self):
+        # Arrange
+        self.sync.settle_time = 60
+        video = self.root / 'downloading.mp4'
+        video.write_bytes(b'partial')
+
+        # Act
+        self.sync.handle_events([(WATCH_CREATED, video, None)])
+        self.sync.process()
+        video.write_bytes(b'partial and then some')
+        self.sync.process()
+
+        # Assert
+        self.assertIn(str(video), self.sync.pending)
+        self.assertFalse(self.sync.hashing)
+        self.assertEqual(0, len(self.collection.videos))
+
+    def test_handle_events_moved_directory(self):
+        # Arrange
+        sub_dir = self.root / 'sub'
+        sub_dir.mkdir()
+        files = create_dummy_files(sub_dir, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.collection.add_files(files)
+        sync = watchutils.CollectionSync(self.collection, settle_time=0)
+        hashes = set(self.collection.get_video_ids())
+        new_dir = self.root / 'renamed'
+        sub_dir.rename(new_dir)
+
+        # Act
+        changed = sync.handle_events([(WATCH_MOVED, sub_dir, new_dir)])
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual({new_dir / path.name for path in files}, self.get_paths())
+        self.assertEqual(hashes, set(self.collection.get_video_ids()))
+        self.assertTrue(sync.is_idle())
+        sync.close()
+
+    def test_handle_events_deleted(self):
+        # Arrange
+        files = create_dummy_files(self.root, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.collection.add_files(files)
+        sync = watchutils.CollectionSync(self.collection, settle_time=0)
+        files[0].unlink()
+
+        # Act
+        changed = sync.handle_events([(WATCH_DELETED, files[0], None)])
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual({files[1]}, self.get_paths())
+        sync.close()
+
+    def test_reconcile(self):
+        # Arrange
+        files = create_dummy_files(self.root, 3, lambda x: 'dummy_' + str(x) + '.mp4')
+        known = self.collection.add_files(files[:2])
+        sync = watchutils.CollectionSync(self.collection, settle_time=0)
+        files[0].unlink()
+
+        # Act
+        sync.reconcile(self.root, files[1:])
+        queued = set(sync.pending)
+        wait_until_idle(sync)
+
+        # Assert
+        self.assertEqual({str(files[2])}, queued)
+        self.assertEqual(set(files[1:]), self.get_paths())
+        self.assertIn(known[1], self.collection.get_videos())
+        sync.close()
+
+    def test_reconcile_keeps_subdirectories(self):
+        # Arrange
+        sub_dir = self.root / 'sub'
+        sub_dir.mkdir()
+        top = create_dummy_files(self.root, 1, lambda x: 'top_' + str(x) + '.mp4')
+        nested = create_dummy_files(sub_dir, 1, lambda x: 'nested_' + str(x) + '.mp4')
+        self.collection.add_files(top + nested)
+        sync = watchutils.CollectionSync(self.collection, settle_time=0)
+
+        # Act
+        changed = sync.reconcile(self.root, top, recursive=False)
+
+        # Assert
+        self.assertFalse(changed)
+        self.assertEqual({str(path) for path in top + nested}, set(self.collection.get_paths()))
+        sync.close()
+
+    def test_reconcile_keeps_unmatched_files(self):
+        # Arrange
+        videos = create_dummy_files(self.root, 2, lambda x: 'dummy_' + str(x) + '.mp4')
+        self.collection.add_files(videos)
+        sync = watchutils.CollectionSync(self.collection, '*.mkv', settle_time=0)
+
+        # Act
+        changed = sync.reconcile(self.root, [], recursive=True)
+
+        # Assert
+        self.assertFalse(changed)
+        self.assertEqual({str(path) for path in videos}, set(self.collection.get_paths()))
+        self.assertTrue(sync.is_idle())
+        sync.close()
+
+    def test_handle_events_copy_deleted(self):
+        # Arrange
+        original = self.root / 'original.mp4'
+        copy = self.root / 'copy.mp4'
+        original.write_bytes(b'same contents')
+        copy.write_bytes(b'same contents')
+        self.collection.add_files([original, copy])
+        sync = watchutils.CollectionSync(self.collection, settle_time=0)
+        original.unlink()
+
+        # Act
+        changed = sync.handle_events([(WATCH_DELETED, original, None)])
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual({copy}, self.get_paths())
+        self.assertEqual([str(copy)], self.collection.get_paths())
+        sync.close()
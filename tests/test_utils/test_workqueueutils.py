@@ -0,0 +1,120 @@
+# ./tests/test_utils/test_workqueueutils.py
+
+"""
+    Unit tests for source/utils/workqueueutils.py
+"""
+
+# Standard library
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+# Local imports
+from source.constants import WORK_QUEUE_MAX_ATTEMPTS
+from source.utils import workqueueutils
+from source.utils.workqueueutils import WorkQueue
+
+# Third-party packages
+# n/a
+
+
+class TestWorkQueueUtils(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.queue_path = Path(self.temp_dir.name) / 'queue.sqlite'
+        self.queue = WorkQueue(self.queue_path)
+        self.queue.add_tasks([('/videos/a', '*'), ('/videos/b', '*')])
+
+    def tearDown(self):
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_claim_is_exclusive(self):
+        # Arrange
+        other = WorkQueue(self.queue_path)
+
+        # Act
+        first = self.queue.claim('first')
+        second = other.claim('second')
+        third = other.claim('second')
+        other.close()
+
+        # Assert
+        self.assertEqual('/videos/a', first[1])
+        self.assertEqual('/videos/b', second[1])
+        self.assertIsNone(third)
+
+    def test_claim_expired_lease(self):
+        # Arrange
+        task = self.queue.claim('first', lease=-1)
+        self.queue.claim('first')
+
+        # Act
+        reclaimed = self.queue.claim('second')
+
+        # Assert
+        self.assertEqual(task, reclaimed)
+        self.assertFalse(self.queue.renew(task[0], 'first'))
+        self.assertTrue(self.queue.renew(task[0], 'second'))
+        self.assertFalse(self.queue.complete(task[0], 'first', [('abc', {})]))
+        self.assertFalse(self.queue.fail(task[0], 'first', 'unreadable'))
+        self.assertFalse(self.queue.release(task[0], 'first'))
+        self.assertEqual(2, self.queue.get_status()[workqueueutils.CLAIMED])
+        self.assertEqual(0, self.queue.get_status()['results'])
+
+    def test_fail_gives_up_after_max_attempts(self):
+        # Arrange
+        task = self.queue.claim('worker')
+        self.queue.fail(task[0], 'worker', 'unreadable')
+
+        # Act
+        for _ in range(WORK_QUEUE_MAX_ATTEMPTS - 1):
+            self.assertEqual(task, self.queue.claim('worker'))
+            self.queue.fail(task[0], 'worker', 'unreadable')
+
+        # Assert
+        status = self.queue.get_status()
+        self.assertNotEqual(task, self.queue.claim('worker'))
+        self.assertEqual(1, status[workqueueutils.FAILED])
+        self.assertEqual([{'directory': task[1], 'error': 'unreadable'}], status['errors'])
+
+    def test_release(self):
+        # Arrange
+        task = self.queue.claim('worker')
+
+        # Act
+        self.queue.release(task[0], 'worker')
+
+        # Assert
+        self.assertEqual(task, self.queue.claim('worker'))
+        self.assertEqual(1, self.queue.get_status()[workqueueutils.CLAIMED])
+
+    def test_complete_and_collect(self):
+        # Arrange
+        task = self.queue.claim('worker')
+        self.queue.complete(task[0], 'worker', [('abc', {'file_data': {'hash': 'abc'}})])
+
+        # Act
+        results = list(self.queue.iter_results())
+        self.queue.mark_collected(result_id for result_id, _, _ in results)
+
+        # Assert
+        self.assertEqual([('abc', {'file_data': {'hash': 'abc'}})], [result[1:] for result in results])
+        self.assertEqual([], list(self.queue.iter_results()))
+        self.assertEqual(1, self.queue.get_status()[workqueueutils.DONE])
+
+    def test_add_tasks_requeues_done(self):
+        # Arrange
+        task = self.queue.claim('worker')
+        self.queue.complete(task[0], 'worker', [])
+        claimed = self.queue.claim('worker')
+
+        # Act
+        changed = self.queue.add_tasks([('/videos/a', '*'), ('/videos/b', '*'), ('/videos/c', '*')])
+
+        # Assert
+        status = self.queue.get_status()
+        self.assertEqual(2, changed)
+        self.assertEqual(2, status[workqueueutils.PENDING])
+        self.assertEqual(1, status[workqueueutils.CLAIMED])
+        self.assertNotEqual(claimed, self.queue.claim('worker'))